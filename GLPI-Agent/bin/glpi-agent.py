@@ -110,6 +110,8 @@ class GLPIAgentCLI:
                           help='always send data to server (false)')
         parser.add_argument('--backend-collect-timeout', dest='backend_collect_timeout', metavar='TIME',
                           help='timeout for inventory modules execution (180)')
+        parser.add_argument('--backend-collect-workers', dest='backend_collect_workers', metavar='COUNT',
+                          help='inventory modules to run concurrently (4)')
         parser.add_argument('--additional-content', dest='additional_content', metavar='FILE',
                           help='additional inventory content file')
         parser.add_argument('--assetname-support', type=int, dest='assetname_support', 
@@ -131,6 +133,10 @@ class GLPIAgentCLI:
         # ESX task specific options
         parser.add_argument('--esx-itemtype', dest='esx_itemtype', metavar='TYPE',
                           help='set ESX asset type for target supporting genericity like GLPI 11+')
+        parser.add_argument('--esx-workers', type=int, dest='esx_workers', metavar='COUNT',
+                          help='ESX servers to inventory concurrently (1)')
+        parser.add_argument('--esx-timeout', type=int, dest='esx_timeout', metavar='TIME',
+                          help='delay allowed to inventory an ESX server, in seconds (600)')
         
         # RemoteInventory task specific options
         parser.add_argument('--remote', dest='remote', metavar='REMOTE[,REMOTE]...',
@@ -263,6 +269,8 @@ Inventory task specific options:
   --json                         save the inventory as JSON (false)
   -f --force                     always send data to server (false)
   --backend-collect-timeout=TIME timeout for inventory modules execution (180)
+  --backend-collect-workers=COUNT
+                                 inventory modules to run concurrently (4)
   --additional-content=FILE      additional inventory content file
 
 Network options:
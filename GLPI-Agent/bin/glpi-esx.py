@@ -20,6 +20,7 @@ import gzip
 import json
 import xml.etree.ElementTree as ET
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 
@@ -225,6 +226,61 @@ def inventory_from_dump(esx, options):
     sys.exit(0)
 
 
+# ==========================
+# Multiple hosts
+# ==========================
+def get_hosts(hosts):
+    """Get hosts list from --host options, each one can be a comma separated list"""
+    result = []
+    for option in hosts or []:
+        for host in option.split(","):
+            host = host.strip()
+            if host and host not in result:
+                result.append(host)
+    return result
+
+
+def inventory_host(host, args, config, logger, target):
+    """Inventory one ESX server, run in a worker thread"""
+    esx = ESX(logger=logger, config=config, target=target)
+    if args.timeout:
+        esx.timeout(args.timeout)
+
+    if not esx.connect(host, args.user, args.password):
+        return f"Connection failed: {esx.last_error()}"
+
+    dump_callback = dump_from_hostfullinfo if args.dump else None
+    esx.server_inventory(args.path, dump_callback)
+    return esx.last_error()
+
+
+def inventory_hosts(hosts, args, config, logger, target):
+    """
+    Inventory ESX servers concurrently, up to --workers at a time
+
+    Returns the number of failed hosts.
+    """
+    failures = 0
+    workers = max(min(args.workers, len(hosts)), 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(inventory_host, host, args, config, logger, target): host
+            for host in hosts
+        }
+        for future in as_completed(futures):
+            host = futures[future]
+            try:
+                error = future.result()
+            except Exception as e:
+                error = str(e)
+            if error:
+                failures += 1
+                print(f"{host}: {error}", file=sys.stderr)
+            else:
+                logger.info(f"{host}: inventory done")
+    return failures
+
+
 # ==========================
 # Version Info
 # ==========================
@@ -242,13 +298,17 @@ def main():
     parser = argparse.ArgumentParser(
         description="vCenter/ESX/ESXi remote inventory from command line (Standalone Python Edition)"
     )
-    parser.add_argument("--host", help="ESX server hostname")
+    parser.add_argument("--host", action="append",
+                        help="ESX server hostname, can be used many times or be a comma separated list")
     parser.add_argument("--user", help="User name")
     parser.add_argument("--password", help="User password")
-    parser.add_argument("--path", help="Output directory or file", default="-")
+    parser.add_argument("--path", help="Output directory or file, must be a directory with many hosts", default="-")
     parser.add_argument("--json", action="store_true", help="Use JSON format")
     parser.add_argument("--dump", action="store_true", help="Also dump host info")
     parser.add_argument("--dumpfile", help="Generate inventory from dump file")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="ESX servers to inventory concurrently (1)")
+    parser.add_argument("--timeout", type=int, help="Requests timeout in seconds")
     parser.add_argument("--debug", action="count", default=0, help="Enable debug logging")
     parser.add_argument("--version", action="store_true", help="Show version and exit")
 
@@ -269,17 +329,17 @@ def main():
         if args.dumpfile:
             inventory_from_dump(esx, args)
 
-        if not all([args.host, args.user, args.password]):
+        hosts = get_hosts(args.host)
+        if not all([hosts, args.user, args.password]):
             parser.print_help()
             sys.exit(1)
 
-        if not esx.connect(args.host, args.user, args.password):
-            print(f"Connection failed: {esx.last_error()}", file=sys.stderr)
+        # Concurrent hosts would interleave on stdout or overwrite one file
+        if len(hosts) > 1 and not os.path.isdir(args.path):
+            print("--path must be an existing directory to inventory many hosts", file=sys.stderr)
             sys.exit(1)
 
-        dump_callback = dump_from_hostfullinfo if args.dump else None
-        esx.server_inventory(args.path, dump_callback)
-        sys.exit(0)
+        sys.exit(1 if inventory_hosts(hosts, args, config, logger, target) else 0)
 
     finally:
         shutil.rmtree(temp_dir, ignore_errors=True)
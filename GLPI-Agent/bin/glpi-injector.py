@@ -5,19 +5,28 @@ to GLPI, OCS Inventory, or compatible servers.
 
 Fully functional Python 3 implementation — no GLPI Agent dependencies required.
 Supports gzip compression, OAuth2 token auth, SSL options, and proxy settings.
+
+Directory loading can use a pool of workers sharing one HTTP session, and a
+checkpoint file to resume an interrupted injection.
 """
 
 import sys
 import os
 import argparse
+import io
 import json
 import gzip
 import uuid
 import re
 import time
 import random
+import tempfile
+import threading
+import zlib
 import requests
 import platform
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse, urlunparse
 import xml.etree.ElementTree as ET
 
@@ -30,6 +39,14 @@ except ImportError:
 
 failed_files = []
 
+# Read and compress files by chunks of this size
+CHUNK_SIZE = 65536
+
+# Renew OAuth token this number of seconds before it expires
+TOKEN_EXPIRATION_MARGIN = 30
+
+GZIP_MAGIC = b'\x1f\x8b'
+
 # ---------------------------------------------------------------------
 # XML Parsing Helpers
 # ---------------------------------------------------------------------
@@ -89,87 +106,195 @@ def new_agentid():
 
 
 # ---------------------------------------------------------------------
-# Core Send Function
+# HTTP Session and OAuth2 Token
 # ---------------------------------------------------------------------
-def send_content(content_bytes, agentid, args):
-    """Send one inventory file or data blob to the GLPI/OCS endpoint."""
-    content = uncompress(content_bytes)
-    useragent = args.useragent or 'GLPI-Injector'
-    verify = not args.no_ssl_check
-    cert = args.ssl_cert_file if args.ssl_cert_file else None
-
-    # Extract client version from XML or JSON to set User-Agent if requested
-    if args.xml_ua or args.json_ua:
-        if content.startswith(b'<?xml'):
-            tree = xml_to_dict(content)
-            if tree and 'REQUEST' in tree and 'CONTENT' in tree['REQUEST']:
-                ver = tree['REQUEST']['CONTENT'].get('VERSIONCLIENT')
-                if ver:
-                    useragent = ver
-        elif b'{' in content:
-            try:
-                j = json.loads(content.decode('utf-8'))
-                ver = j.get('content', {}).get('versionclient')
-                if ver:
-                    useragent = ver
-            except Exception:
-                pass
+_session = None
+_oauth_token = None
+_session_lock = threading.Lock()
 
-    # Create session
-    session = requests.Session()
-    session.headers.update({'User-Agent': useragent})
 
-    if args.proxy:
-        session.proxies = {'http': args.proxy, 'https': args.proxy}
+class OAuthToken:
+    """OAuth2 client credentials bearer token, shared by all requests."""
 
-    url = args.url
-    info = ""
-
-    if args.no_ssl_check and url.startswith('https'):
-        info = " (SSL check disabled)"
-
-    # OAuth2 Client Credentials flow
-    bearer_token = None
-    if args.oauth_client_id and args.oauth_client_secret:
-        parsed = urlparse(url)
+    def __init__(self, args):
+        parsed = urlparse(args.url)
         path = parsed.path
         match = re.match(r'^(.*)(marketplace|plugins).*', path)
         if match:
             path = match.group(1)
         path = path.rstrip('/') + '/api.php/token'
-        token_url = urlunparse((parsed.scheme, parsed.netloc, path, parsed.params, parsed.query, parsed.fragment))
-
-        oauth_data = {
+        self.url = urlunparse((parsed.scheme, parsed.netloc, path, parsed.params, parsed.query, parsed.fragment))
+        self.data = {
             'grant_type': 'client_credentials',
             'client_id': args.oauth_client_id,
             'client_secret': args.oauth_client_secret,
             'scope': 'inventory'
         }
+        self.debug = args.debug
+        self._token = None
+        self._expiration = None
+        self._lock = threading.Lock()
+
+    def get(self, session):
+        """Get current token, requesting a new one if none is valid."""
+        with self._lock:
+            if self._token and (self._expiration is None or time.time() < self._expiration):
+                return self._token
+
+            self._token = None
+            try:
+                resp_oauth = session.post(self.url, json=self.data)
+                if resp_oauth.ok:
+                    reply = resp_oauth.json()
+                    self._token = reply.get('access_token')
+                    expires_in = reply.get('expires_in')
+                    self._expiration = time.time() + int(expires_in) - TOKEN_EXPIRATION_MARGIN \
+                        if expires_in else None
+                    if self.debug:
+                        print(f"[DEBUG] Got OAuth token, expires in {expires_in or '?'} seconds")
+                else:
+                    print(f"ERROR (OAuth): {resp_oauth.status_code} {resp_oauth.reason}")
+            except Exception as e:
+                print(f"ERROR (OAuth): {e}")
+
+            return self._token
+
+    def invalidate(self, token):
+        """Forget token if still the current one, after server rejected it."""
+        with self._lock:
+            if self._token == token:
+                self._token = None
+
+
+def get_session(args):
+    """Get the HTTP session and OAuth token shared by all requests."""
+    global _session, _oauth_token
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(args.workers, 1))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.verify = not args.no_ssl_check
+            session.cert = args.ssl_cert_file if args.ssl_cert_file else None
+            if args.proxy:
+                session.proxies = {'http': args.proxy, 'https': args.proxy}
+            _oauth_token = OAuthToken(args) \
+                if args.oauth_client_id and args.oauth_client_secret else None
+            _session = session
+        return _session, _oauth_token
+
 
+# ---------------------------------------------------------------------
+# Content Handling
+# ---------------------------------------------------------------------
+def open_content(handle):
+    """Get readable stream of uncompressed content from a binary handle."""
+    magic = handle.read(2)
+    handle.seek(0)
+    if magic == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=handle, mode='rb')
+    return handle
+
+
+def get_useragent(stream, args):
+    """Extract client version from XML or JSON content if requested."""
+    useragent = args.useragent or 'GLPI-Injector'
+    if not (args.xml_ua or args.json_ua):
+        return stream, useragent
+
+    # Content has to be fully parsed
+    content = stream.read()
+    if content.startswith(b'<?xml'):
+        tree = xml_to_dict(content)
+        if tree and 'REQUEST' in tree and 'CONTENT' in tree['REQUEST']:
+            ver = tree['REQUEST']['CONTENT'].get('VERSIONCLIENT')
+            if ver:
+                useragent = ver
+    elif b'{' in content:
         try:
-            resp_oauth = session.post(token_url, json=oauth_data, verify=verify, cert=cert)
-            if resp_oauth.ok:
-                bearer_token = resp_oauth.json().get('access_token')
-            else:
-                print(f"ERROR (OAuth): {resp_oauth.status_code} {resp_oauth.reason}")
-        except Exception as e:
-            print(f"ERROR (OAuth): {e}")
+            j = json.loads(content.decode('utf-8'))
+            ver = j.get('content', {}).get('versionclient')
+            if ver:
+                useragent = ver
+        except Exception:
+            pass
+
+    return io.BytesIO(content), useragent
+
+
+def compress_stream(stream):
+    """Compress stream content by chunks into a temporary file.
+
+    Only one chunk is kept in memory, and the returned file can be read
+    again if the request has to be retried.
+    """
+    compressed = tempfile.TemporaryFile()
+    # Same gzip format than gzip.compress()
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+        compressed.write(compressor.compress(chunk))
+    compressed.write(compressor.flush())
+    compressed.seek(0)
+    return compressed
+
+
+# ---------------------------------------------------------------------
+# Core Send Function
+# ---------------------------------------------------------------------
+def post_content(session, oauth_token, url, body, headers):
+    """Post body, retrying once with a new OAuth token if it was rejected."""
+    start = body.tell()
+    bearer_token = None
+    for _ in range(2):
+        if oauth_token:
+            bearer_token = oauth_token.get(session)
+            if bearer_token:
+                headers['Authorization'] = f"Bearer {bearer_token}"
+
+        body.seek(start)
+        resp = session.post(url, data=body, headers=headers, allow_redirects=True)
+
+        # Retry once with a new token if server rejected current one
+        if resp.status_code != 401 or not bearer_token:
+            break
+        oauth_token.invalidate(bearer_token)
+
+    return resp
+
+
+def send_content(content, agentid, args):
+    """Send one inventory file or data blob to the GLPI/OCS endpoint.
+
+    Content can be bytes or a seekable binary file handle which is then
+    read by chunks.
+    """
+    handle = io.BytesIO(content) if isinstance(content, bytes) else content
+    stream, useragent = get_useragent(open_content(handle), args)
+
+    session, oauth_token = get_session(args)
+
+    url = args.url
+    info = ""
+
+    if args.no_ssl_check and url.startswith('https'):
+        info = " (SSL check disabled)"
 
     headers = {
         'Pragma': 'no-cache',
+        'User-Agent': useragent,
     }
 
     if args.no_compression:
         headers['Content-Type'] = 'application/json' if agentid else 'application/xml'
-        content_to_send = content
+        # Plain files are directly streamed
+        body = stream if stream is handle else io.BytesIO(stream.read())
     else:
         headers['Content-Type'] = 'application/x-compress-zlib'
-        content_to_send = gzip.compress(content)
+        body = compress_stream(stream)
 
     if agentid:
         headers['GLPI-Agent-ID'] = agentid
-    if bearer_token:
-        headers['Authorization'] = f"Bearer {bearer_token}"
 
     # Debug request ID
     requestid = None
@@ -179,10 +304,14 @@ def send_content(content_bytes, agentid, args):
         print(f"[DEBUG] Sending request {requestid} (AgentID={agentid})")
 
     try:
-        resp = session.post(url, data=content_to_send, headers=headers, verify=verify, cert=cert, allow_redirects=True)
+        resp = post_content(session, oauth_token, url, body, headers)
     except requests.RequestException as e:
         print(f"ERROR: Request failed ({e})")
         return False
+    finally:
+        # Only close bodies we created
+        if body is not handle:
+            body.close()
 
     # Handle response
     error = None
@@ -222,29 +351,69 @@ def send_content(content_bytes, agentid, args):
 # ---------------------------------------------------------------------
 # File and Directory Handling
 # ---------------------------------------------------------------------
-def load_file(file_path, args):
+class Checkpoint:
+    """Record of successfully injected files, to resume an injection."""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.done = set(line.rstrip('\n') for line in f if line.strip())
+        self._handle = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def __contains__(self, file_path):
+        return os.path.abspath(file_path) in self.done
+
+    def add(self, file_path):
+        """Record file as injected."""
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            self.done.add(file_path)
+            self._handle.write(file_path + '\n')
+            self._handle.flush()
+
+    def close(self):
+        self._handle.close()
+
+
+def load_file(file_path, args, checkpoint=None):
     """Load and send a single file."""
     if not os.path.isfile(file_path):
         sys.exit(f"File {file_path} not found.")
     if not os.access(file_path, os.R_OK):
         sys.exit(f"File {file_path} not readable.")
 
+    if checkpoint and file_path in checkpoint:
+        if args.verbose:
+            print(f"Skipped {file_path} already injected as recorded in {checkpoint.path}")
+        return
+
+    inject_file(file_path, args, checkpoint)
+
+
+def inject_file(file_path, args, checkpoint=None):
+    """Send a file, streaming its content."""
     if args.verbose:
         print(f"Processing file: {file_path}")
 
-    with open(file_path, 'rb') as f:
-        if USE_FCNTL:
-            try:
-                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-            except BlockingIOError:
-                print(f"File {file_path} is locked, skipping.")
-                return
-        content = f.read()
-
     uuid_match = re.search(r'([0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12})\.(?:json|data)$', file_path, re.I)
     agentid = uuid_match.group(1) if uuid_match else new_agentid()
 
-    success = send_content(content, agentid, args)
+    try:
+        with open(file_path, 'rb') as f:
+            if USE_FCNTL:
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    print(f"File {file_path} is locked, skipping.")
+                    return
+            success = send_content(f, agentid, args)
+    except OSError as e:
+        print(f"ERROR: Can't read {file_path}: {e}")
+        success = False
+
     if success and args.remove:
         try:
             os.unlink(file_path)
@@ -253,23 +422,48 @@ def load_file(file_path, args):
         except OSError as e:
             print(f"Failed to remove {file_path}: {e}")
 
+    if success and checkpoint:
+        checkpoint.add(file_path)
+
     if not success:
         failed_files.append(file_path)
 
 
-def load_directory(directory, args):
-    """Process all inventory files in a directory."""
-    if not os.path.isdir(directory):
-        sys.exit(f"Directory {directory} not found.")
-
+def get_directory_files(directory, args):
+    """Iterate over inventory files in a directory."""
     for root, _, files in os.walk(directory):
         for file in files:
             if re.search(r'\.(?:data|json|ocs|xml)$', file):
-                load_file(os.path.join(root, file), args)
+                yield os.path.join(root, file)
         if not args.recursive:
             break
 
 
+def load_directory(directory, args, checkpoint=None):
+    """Process all inventory files in a directory with a pool of workers."""
+    if not os.path.isdir(directory):
+        sys.exit(f"Directory {directory} not found.")
+
+    skipped = 0
+    pending = set()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for file_path in get_directory_files(directory, args):
+            if checkpoint and file_path in checkpoint:
+                skipped += 1
+                continue
+            # Don't queue more files than workers can soon handle
+            if len(pending) >= 2 * args.workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(executor.submit(inject_file, file_path, args, checkpoint))
+        for future in pending:
+            future.result()
+
+    if skipped and args.verbose:
+        print(f"Skipped {skipped} files already injected as recorded in {checkpoint.path}")
+
+
 def load_stdin(args):
     """Read and send inventory data from STDIN."""
     content = sys.stdin.buffer.read()
@@ -290,6 +484,7 @@ def main():
 Examples:
   glpi-injector -v -f /tmp/toto.json --url https://example.com/
   glpi-injector -v -R -d /srv/ftp/fusion --url https://example.com/
+  glpi-injector -R -w 8 --checkpoint /tmp/done.txt -d /srv/ftp/fusion --url https://example.com/
 """
     )
     parser.add_argument('-d', '--directory', help='load every inventory file from directory')
@@ -309,21 +504,32 @@ Examples:
     parser.add_argument('--ssl-cert-file', help='client certificate file')
     parser.add_argument('--oauth-client-id', help='OAuth client ID')
     parser.add_argument('--oauth-client-secret', help='OAuth client secret')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='number of files sent concurrently when loading a directory')
+    parser.add_argument('--checkpoint',
+                        help='file recording injected files, to skip them when loading directory again')
 
     args = parser.parse_args()
     if args.debug:
         args.verbose = True
+    if args.workers < 1:
+        parser.error("workers must be a positive number")
+
+    checkpoint = Checkpoint(args.checkpoint) if args.checkpoint else None
 
     if args.stdin:
         load_stdin(args)
     elif args.file:
-        load_file(args.file, args)
+        load_file(args.file, args, checkpoint)
     elif args.directory:
-        load_directory(args.directory, args)
+        load_directory(args.directory, args, checkpoint)
     else:
         parser.print_help()
         sys.exit(1)
 
+    if checkpoint:
+        checkpoint.close()
+
     if failed_files:
         print("\nFailed to send:")
         for f in failed_files:
@@ -34,15 +34,20 @@ except ImportError:
 DEFAULT = {
     'additional-content': None,
     'backend-collect-timeout': 180,
+    'backend-collect-workers': 4,
     'ca-cert-dir': None,
     'ca-cert-file': None,
+    'collect-checksums-cache': 100000,
     'color': None,
     'conf-reload-interval': 0,
     'debug': None,
     'delaytime': 3600,
     'esx-itemtype': None,
+    'esx-timeout': 600,
+    'esx-workers': 1,
     'glpi-version': None,
     'itemtype': None,
+    'remote-host-key-policy': 'reject',
     'remote-scheduling': 0,
     'remote-workers': 1,
     'force': None,
@@ -163,6 +163,7 @@ class HTTPClient:
                 file_path: Optional[str] = None,
                 no_proxy_host: Optional[str] = None,
                 timeout: Optional[int] = None,
+                stream: bool = False,
                 **skip_errors) -> requests.Response:
         """
         Send HTTP request with authentication and SSL handling.
@@ -172,6 +173,7 @@ class HTTPClient:
             file_path: Optional file path to save response to
             no_proxy_host: Host to exclude from proxy
             timeout: Custom timeout for this request
+            stream: Don't read response content, caller must read or close it
             **skip_errors: HTTP status codes to skip error logging for
             
         Returns:
@@ -215,7 +217,7 @@ class HTTPClient:
                 prepared,
                 timeout=use_timeout,
                 verify=not self.no_ssl_check,
-                stream=bool(file_path)
+                stream=stream or bool(file_path)
             )
             
             # Save to file if requested
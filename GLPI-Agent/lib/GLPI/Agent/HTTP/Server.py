@@ -57,11 +57,200 @@ MAX_KEEP_ALIVE = 8
 # Log prefix
 LOG_PREFIX = "[http server] "
 
+# Forget shared deploy parts index entries not requested for an hour
+SHARED_PARTS_TIMEOUT = 3600
+
+# Single bytes range supported by deploy parts requests
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
 # HTTP Request structure
 HTTPRequest = namedtuple('HTTPRequest', [
     'method', 'path', 'query', 'version', 'headers', 'body', 'client_ip'
 ])
 
+# Response content sent from a file, with sendfile() when possible
+FileContent = namedtuple('FileContent', ['path', 'offset', 'length'])
+
+
+class SharedPartsIndex:
+    """
+    Index of verified deploy shared file parts.
+
+    Shared parts are stored by Deploy task under
+    deploy/fileparts/shared/<expiration>/<a>/<b>/<cdefgh> paths. A part is
+    only hashed the first time it is requested, then it is served while its
+    expiration time is not reached and its file is not changed or removed.
+    Parts are downloaded by a forked task, so they are indexed when first
+    requested and not when downloaded.
+    """
+
+    def __init__(self):
+        # Verified parts: sha512 -> (path, size, stat key, expiration, last access)
+        self._parts: Dict[str, Tuple[str, int, Tuple, int, float]] = {}
+        # Stat keys of files which didn't match their requested sha512
+        self._invalid: Dict[str, Tuple] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stat_key(stat: os.stat_result) -> Tuple:
+        return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+    @staticmethod
+    def _sha512(path: str) -> Optional[str]:
+        sha = hashlib.sha512()
+        try:
+            with open(path, 'rb') as handle:
+                for chunk in iter(lambda: handle.read(1048576), b''):
+                    sha.update(chunk)
+        except OSError:
+            return None
+        return sha.hexdigest()
+
+    def add(self, sha512: str, path: str, expiration: int = 0) -> bool:
+        """
+        Index a part file after checking its sha512.
+
+        Args:
+            sha512: Part sha512
+            path: Part file path
+            expiration: Part expiration time, from its storage directory name
+
+        Returns:
+            True if part was indexed
+        """
+        try:
+            key = self._stat_key(os.stat(path))
+        except OSError:
+            return False
+
+        with self._lock:
+            if self._invalid.get(path) == key:
+                return False
+
+        if self._sha512(path) != sha512:
+            with self._lock:
+                self._invalid[path] = key
+            return False
+
+        with self._lock:
+            self._invalid.pop(path, None)
+            self._parts[sha512] = (path, key[0], key, expiration, time.time())
+        return True
+
+    def get(self, sha512: str) -> Optional[Tuple[str, int]]:
+        """
+        Get an indexed part still valid.
+
+        Args:
+            sha512: Part sha512
+
+        Returns:
+            Tuple of part file path and size, or None
+        """
+        with self._lock:
+            entry = self._parts.get(sha512)
+        if not entry:
+            return None
+
+        path, size, key, expiration, _ = entry
+        try:
+            valid = (not expiration or expiration > time.time()) \
+                and self._stat_key(os.stat(path)) == key
+        except OSError:
+            valid = False
+
+        with self._lock:
+            if not valid:
+                self._parts.pop(sha512, None)
+                return None
+            self._parts[sha512] = (path, size, key, expiration, time.time())
+        return path, size
+
+    def find(self, sha512: str, directories: List[str]) -> Optional[Tuple[str, int]]:
+        """
+        Get a part from index, or search and index it.
+
+        Args:
+            sha512: Part sha512
+            directories: Shared parts directories
+
+        Returns:
+            Tuple of part file path and size, or None
+        """
+        part = self.get(sha512)
+        if part:
+            return part
+
+        sub_file_path = os.path.join(sha512[0], sha512[1], sha512[2:8])
+        now = time.time()
+        for directory in directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                expiration = int(entry.name) if entry.name.isdigit() else 0
+                if expiration and expiration <= now:
+                    continue
+                path = os.path.join(entry.path, sub_file_path)
+                if os.path.isfile(path) and self.add(sha512, path, expiration):
+                    return self.get(sha512)
+
+        return None
+
+    def expire(self) -> None:
+        """Forget expired, removed or not recently requested parts."""
+        now = time.time()
+        with self._lock:
+            parts = list(self._parts.items())
+            self._invalid = {
+                path: key for path, key in self._invalid.items() if os.path.exists(path)
+            }
+
+        for sha512, (path, _, key, expiration, access) in parts:
+            try:
+                valid = (not expiration or expiration > now) \
+                    and access + SHARED_PARTS_TIMEOUT > now \
+                    and self._stat_key(os.stat(path)) == key
+            except OSError:
+                valid = False
+            if not valid:
+                with self._lock:
+                    self._parts.pop(sha512, None)
+
+    def __len__(self) -> int:
+        return len(self._parts)
+
+
+def parse_range(value: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single bytes Range header value.
+
+    Args:
+        value: Range header value
+        size: Content size
+
+    Returns:
+        Tuple of offset and length, None if not a supported range.
+        Length is 0 for an unsatisfiable range.
+    """
+    match = RANGE_RE.match(value.replace(' ', '')) if value else None
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+
+    first, last = match.groups()
+    if first == '':
+        # Suffix range
+        length = min(int(last), size)
+        return (size - length, length)
+
+    first = int(first)
+    last = min(int(last), size - 1) if last != '' else size - 1
+    if first >= size or last < first:
+        return (first, 0)
+
+    return (first, last - first + 1)
+
 
 class HTTPRequestHandler(BaseHTTPRequestHandler):
     """HTTP Request Handler for GLPI Agent Server"""
@@ -80,6 +269,28 @@ class HTTPRequestHandler(BaseHTTPRequestHandler):
     def parse_custom_request(self):
         """Parse HTTP request and return HTTPRequest object"""
         try:
+            # Request line and headers are already parsed when called from
+            # do_GET or do_POST, only the body remains to read
+            if getattr(self, 'command', None):
+                headers = {key.lower(): value for key, value in self.headers.items()}
+                parsed = urlparse(self.path)
+                body = b''
+                try:
+                    content_length = int(headers.get('content-length') or 0)
+                    if content_length > 0:
+                        body = self.rfile.read(content_length)
+                except (ValueError, OSError):
+                    pass
+                return HTTPRequest(
+                    method=self.command,
+                    path=unquote(parsed.path),
+                    query=parsed.query,
+                    version=self.request_version,
+                    headers=headers,
+                    body=body,
+                    client_ip=self.client_address[0] if self.client_address else 'unknown'
+                )
+
             # Parse request line
             line = self.rfile.readline(self.server.max_request_size if hasattr(self.server, 'max_request_size') else 65537)
             if not line:
@@ -143,13 +354,14 @@ class HTTPRequestHandler(BaseHTTPRequestHandler):
     def send_response_data(self, status_code: int, content: bytes = b'', 
                           content_type: str = 'text/html; charset=utf-8',
                           headers: Optional[Dict[str, str]] = None):
-        """Send HTTP response"""
+        """Send HTTP response, content can be bytes or a FileContent"""
         status_text = HTTPStatus(status_code).phrase
         
         # Build response
         response_headers = {
             'Content-Type': content_type,
-            'Content-Length': str(len(content)),
+            'Content-Length': str(content.length if isinstance(content, FileContent)
+                                  else len(content)),
             'Connection': 'close',
         }
         
@@ -166,11 +378,26 @@ class HTTPRequestHandler(BaseHTTPRequestHandler):
         self.wfile.write(b'\r\n')
         
         # Send body
-        if content:
+        if isinstance(content, FileContent):
+            self.wfile.flush()
+            self.send_file_content(content)
+        elif content:
             self.wfile.write(content)
         
         self.wfile.flush()
     
+    def send_file_content(self, content: FileContent):
+        """
+        Send file content on connection.
+        
+        socket.sendfile() uses zero-copy os.sendfile() when the connection
+        supports it and falls back to buffered send, like for SSL connections.
+        """
+        if not content.length:
+            return
+        with open(content.path, 'rb') as handle:
+            self.connection.sendfile(handle, content.offset, content.length)
+    
     def do_GET(self):
         """Handle GET request"""
         self.handle_http_request()
@@ -232,7 +459,9 @@ class Server:
         self._pollers: Dict[int, Any] = {}
         self._timer_event = None
         self._cached_root_content: Optional[bytes] = None
-        self._cached_deploy_content: Optional[bytes] = None
+        self._deploy_part: Optional[Tuple[str, int]] = None
+        self._shared_parts = SharedPartsIndex()
+        self._shared_parts_expiration = 0
         
         # Trust-related attributes
         self.trust: Dict[str, List[Any]] = {}
@@ -463,16 +692,24 @@ class Server:
             return (status_code, self._get_error_message(status_code), 'text/html', headers)
         
         elif path.startswith('/deploy/'):
-            sha512 = path[8:]  # Remove '/deploy/' prefix
+            # Peers request parts as /deploy/getFile/<a>/<ab>/<sha512>
+            sha512 = path.rsplit('/', 1)[-1]
             status_code = self._handle_deploy(request, client_ip, sha512)
-            if status_code == 200 and self._cached_deploy_content:
-                # Determine content type from file extension
-                content_type = 'application/octet-stream'
-                if sha512.endswith(('.json', '.xml', '.txt')):
-                    content_type = 'text/plain'
-                elif sha512.endswith('.html'):
-                    content_type = 'text/html'
-                return (200, self._cached_deploy_content, content_type, headers)
+            if status_code == 200 and self._deploy_part:
+                part_path, size = self._deploy_part
+                self._deploy_part = None
+                headers['Accept-Ranges'] = 'bytes'
+                content_range = parse_range(request.headers.get('range'), size)
+                if content_range is None:
+                    return (200, FileContent(part_path, 0, size),
+                            'application/octet-stream', headers)
+                offset, length = content_range
+                if not length:
+                    headers['Content-Range'] = f"bytes */{size}"
+                    return (416, b'', 'text/html', headers)
+                headers['Content-Range'] = f"bytes {offset}-{offset + length - 1}/{size}"
+                return (206, FileContent(part_path, offset, length),
+                        'application/octet-stream', headers)
             return (status_code, self._get_error_message(status_code), 'text/html', headers)
         
         elif path == '/now':
@@ -582,66 +819,32 @@ class Server:
         Returns:
             HTTP status code
         """
-        # Parse SHA512 to get file path (first char, second char, next 6 chars)
-        if len(sha512) < 8:
-            return 404
-        
-        match = re.match(r'^(.)(.)(.{6})', sha512)
-        if not match:
+        # Part path is computed from sha512 (first char, second char, next 6 chars)
+        if not re.match(r'^[0-9a-fA-F]{128}$', sha512):
             return 404
-        
-        sub_file_path = f"{match.group(1)}/{match.group(2)}/{match.group(3)}"
-        
-        try:
-            import hashlib
-        except ImportError:
-            self.logger.error("Failed to load hashlib")
-            return 501
-        
-        path = None
-        count = 0
-        
-        # Search for file in deploy directories
+        sha512 = sha512.lower()
+
+        # Regularly forget expired or removed parts
+        if self._shared_parts_expiration <= time.time():
+            self._shared_parts.expire()
+            self._shared_parts_expiration = time.time() + TRUSTED_CACHE_TIMEOUT
+
+        # Search for part in targets deploy shared parts directories
+        directories = []
         if self.agent and hasattr(self.agent, 'getTargets'):
             for target in self.agent.getTargets():
                 if not hasattr(target, 'storage'):
                     continue
-                
                 storage_dir = target.storage.getDirectory()
-                pattern = f"{storage_dir}/deploy/fileparts/shared/*"
-                
-                for shared_dir in glob.glob(pattern):
-                    file_path = os.path.join(shared_dir, sub_file_path)
-                    
-                    if not os.path.isfile(file_path):
-                        continue
-                    
-                    count += 1
-                    
-                    # Verify SHA512 hash
-                    sha = hashlib.sha512()
-                    with open(file_path, 'rb') as f:
-                        sha.update(f.read())
-                    
-                    if sha.hexdigest() == sha512:
-                        path = file_path
-                        break
-                
-                if path:
-                    break
-        
-        if path:
-            # Store file path for response
-            try:
-                with open(path, 'rb') as f:
-                    self._cached_deploy_content = f.read()
-                return 200
-            except Exception as e:
-                self.logger.error(f"{LOG_PREFIX}Error reading deploy file: {e}")
-                return 500
-        else:
+                directories.append(os.path.join(storage_dir, 'deploy', 'fileparts', 'shared'))
+
+        part = self._shared_parts.find(sha512, directories)
+        if not part:
             return 404
 
+        self._deploy_part = part
+        return 200
+
     def _handle_now(self, request: HTTPRequest, client_ip: str) -> int:
         """
         Handle /now request to trigger immediate run.
@@ -11,7 +11,9 @@ import re
 import json
 import time
 import hashlib
+import threading
 import glob as file_glob
+from functools import wraps
 from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
@@ -198,6 +200,15 @@ DONT_CHECK_SECTIONS = {'ACCESSLOG', 'VERSIONPROVIDER'}
 CHECKED_SECTIONS = sorted([s for s in FIELDS.keys() if s not in DONT_CHECK_SECTIONS])
 
 
+def _synchronized(method):
+    """Serialize content updates as inventory modules may run concurrently."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class Inventory:
     """
     Inventory data structure for GLPI Agent.
@@ -237,6 +248,7 @@ class Inventory:
         self._json_merge: Optional[Any] = None
         self.last_state_file: Optional[str] = None
         self.last_state_content: Optional[Any] = None
+        self._lock = threading.RLock()
         
         # Initialize content
         agent_string = AGENT_STRING or f"{PROVIDER}-Inventory_v{VERSION}"
@@ -392,6 +404,7 @@ class Inventory:
             return sect.get(field)
         return None
     
+    @_synchronized
     def mergeContent(self, content: Dict) -> None:
         """
         Merge content into inventory.
@@ -424,6 +437,7 @@ class Inventory:
                 else:
                     self.addEntry(section=section, entry=data)
     
+    @_synchronized
     def addEntry(self, section: str, entry: Dict) -> None:
         """
         Add entry to inventory section.
@@ -481,6 +495,7 @@ class Inventory:
             self.content[section] = []
         self.content[section].append(entry)
     
+    @_synchronized
     def setEntry(self, section: str, entry: Dict) -> None:
         """Set single entry (replacing existing)."""
         self.addEntry(section=section, entry=entry)
@@ -491,6 +506,7 @@ class Inventory:
         """Get hardware field value."""
         return self.getField('HARDWARE', field) if field else self.getSection('HARDWARE')
     
+    @_synchronized
     def setHardware(self, args: Dict) -> None:
         """Set hardware information."""
         if 'HARDWARE' not in self.content:
@@ -507,6 +523,7 @@ class Inventory:
             
             self.content['HARDWARE'][field] = get_sanitized_string(str(value))
     
+    @_synchronized
     def setOperatingSystem(self, args: Dict) -> None:
         """Set operating system information."""
         if 'OPERATINGSYSTEM' not in self.content:
@@ -523,6 +540,7 @@ class Inventory:
         """Get BIOS field value."""
         return self.getField('BIOS', field) if field else self.getSection('BIOS')
     
+    @_synchronized
     def setBios(self, args: Dict) -> None:
         """Set BIOS information."""
         if 'BIOS' not in self.content:
@@ -535,6 +553,7 @@ class Inventory:
             
             self.content['BIOS'][field] = get_sanitized_string(str(value))
     
+    @_synchronized
     def setAccessLog(self, args: Dict) -> None:
         """Set access log information."""
         if 'ACCESSLOG' not in self.content:
@@ -547,6 +566,7 @@ class Inventory:
             
             self.content['ACCESSLOG'][field] = get_sanitized_string(str(value))
     
+    @_synchronized
     def setTag(self, tag: str) -> None:
         """Set inventory tag."""
         if not tag:
@@ -806,7 +826,7 @@ class Inventory:
             
             while remaining:
                 # Extract key
-                match = re.match(r'^(\w+):(.*), remaining)
+                match = re.match(r'^(\w+):(.*)', remaining)
                 if not match:
                     break
                 
@@ -823,14 +843,14 @@ class Inventory:
                     temp_marker = ',' * ord(quote)
                     remaining = remaining.replace(f'\\{quote}', f'\\{temp_marker}')
                     
-                    match = re.match(rf'^[{quote}]([^{quote}]+)[{quote}](.*), remaining)
+                    match = re.match(rf'^[{quote}]([^{quote}]+)[{quote}](.*)', remaining)
                     if match:
                         value = match.group(1).replace(f'\\{temp_marker}', quote)
                         remaining = match.group(2).replace(f'\\{temp_marker}', f'\\{quote}')
                     else:
                         break
                 else:
-                    match = re.match(r'^([^,]+)(.*), remaining)
+                    match = re.match(r'^([^,]+)(.*)', remaining)
                     if match:
                         value = match.group(1)
                         remaining = match.group(2)
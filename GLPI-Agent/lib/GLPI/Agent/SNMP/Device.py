@@ -15,6 +15,7 @@ License: Compatible with GLPI Agent
 """
 
 import re
+import time
 from typing import Dict, List, Optional, Any, Union
 from collections import defaultdict
 
@@ -117,7 +118,8 @@ class SNMPDevice:
             snmp: SNMP session object (mandatory)
             glpi: GLPI server version string for feature support checking
             logger: Logger instance for debugging
-            **params: Additional parameters
+            **params: Additional parameters, deadline is the time.monotonic()
+                value after which no more SNMP request is sent
             
         Raises:
             ValueError: If snmp parameter is not provided
@@ -131,6 +133,12 @@ class SNMPDevice:
         self.logger = logger
         self.MIBSUPPORT = None
         
+        self.deadline = params.get('deadline')
+        
+        # SNMP results cache by VLAN context
+        self._context = None
+        self._cache = {}
+        
         # Initialize data containers
         self._init_data_containers()
     
@@ -144,10 +152,68 @@ class SNMPDevice:
         self.INFO = {}
         self.IPS = {}
     
+    def expired(self) -> bool:
+        """Check if the device deadline has been reached."""
+        return self.deadline is not None and time.monotonic() > self.deadline
+    
+    def _get_cache(self) -> Dict[str, Dict]:
+        """Get results cache for current VLAN context."""
+        if self._context not in self._cache:
+            self._cache[self._context] = {'walks': {}, 'gets': {}}
+        return self._cache[self._context]
+    
+    @staticmethod
+    def _find_walked(cache: Dict, oid: str) -> Optional[tuple]:
+        """
+        Find a walked subtree containing an OID.
+        
+        Returns:
+            Tuple with the subtree values and the OID suffix relative to
+            the subtree base, or None if not walked
+        """
+        walks = cache['walks']
+        if oid in walks:
+            return walks[oid], ''
+        
+        # Check all OID ancestors, from the nearest one
+        base = oid
+        while '.' in base:
+            base = base[:base.rindex('.')]
+            if base in walks:
+                return walks[base], oid[len(base) + 1:]
+        
+        return None
+    
+    def _cached_get(self, oid: str) -> tuple:
+        """
+        Get a value from cache.
+        
+        Returns:
+            Tuple telling if the OID value is known and the value
+        """
+        cache = self._get_cache()
+        key = oid.lstrip('.')
+        
+        if key in cache['gets']:
+            return True, cache['gets'][key]
+        
+        walked = self._find_walked(cache, key)
+        if walked:
+            values, suffix = walked
+            # A walked subtree knows all its OIDs, unless the walk failed
+            if suffix and values:
+                return True, values.get(suffix)
+        
+        return False, None
+    
     def get(self, oid: str) -> Optional[Any]:
         """
         Perform SNMP GET operation on a single OID.
         
+        Values are cached by VLAN context, and OIDs inside an already
+        walked subtree are answered from the walk result. Failures are not
+        cached as they can't be told apart from a transient timeout.
+        
         Args:
             oid: The OID string to query
             
@@ -157,12 +223,68 @@ class SNMPDevice:
         if not self.snmp or not oid:
             return None
         
-        return self.snmp.get(oid)
+        known, value = self._cached_get(oid)
+        if known:
+            return value
+        
+        if self.expired():
+            return None
+        
+        value = self.snmp.get(oid)
+        # None may only mean a request timeout, so it is asked again next time
+        if value is not None:
+            self._get_cache()['gets'][oid.lstrip('.')] = value
+        return value
+    
+    def get_many(self, oids: List[str]) -> Dict[str, Optional[Any]]:
+        """
+        Perform SNMP GET operations on many OIDs.
+        
+        Requests are batched when the SNMP session supports it, and only
+        sent for OIDs not already cached.
+        
+        Args:
+            oids: List of OID strings to query
+            
+        Returns:
+            Dictionary mapping each OID to its value, or None if failed
+        """
+        oids = [oid for oid in oids if oid]
+        if not self.snmp or not oids:
+            return {oid: None for oid in oids}
+        
+        values = {}
+        missing = []
+        for oid in oids:
+            known, value = self._cached_get(oid)
+            if known:
+                values[oid] = value
+            else:
+                missing.append(oid)
+        
+        if missing and not self.expired():
+            if hasattr(self.snmp, 'get_many'):
+                results = self.snmp.get_many(missing)
+            else:
+                results = {oid: self.snmp.get(oid) for oid in missing}
+            gets = self._get_cache()['gets']
+            for oid in missing:
+                values[oid] = results.get(oid)
+                if values[oid] is not None:
+                    gets[oid.lstrip('.')] = values[oid]
+        else:
+            values.update((oid, None) for oid in missing)
+        
+        return values
     
     def walk(self, oid: str) -> Optional[Dict[str, Any]]:
         """
         Perform SNMP WALK operation on an OID tree.
         
+        Results are cached by VLAN context as ordered OID trees, so walking
+        the same OID or one of its sub-OIDs is answered from the cache.
+        Walks cut short by request failures are not cached.
+        
         Args:
             oid: The root OID string to walk
             
@@ -175,7 +297,38 @@ class SNMPDevice:
         if not self.snmp or not oid:
             return None
         
-        return self.snmp.walk(oid)
+        cache = self._get_cache()
+        key = oid.lstrip('.')
+        
+        walked = self._find_walked(cache, key)
+        if walked:
+            values, suffix = walked
+            if not suffix:
+                return dict(values) if values else None
+            prefix = suffix + '.'
+            offset = len(prefix)
+            subtree = {
+                index[offset:]: value for index, value in values.items()
+                if index.startswith(prefix)
+            }
+            return subtree or None
+        
+        if self.expired():
+            return None
+        
+        values = self.snmp.walk(oid)
+        
+        # Don't cache a walk cut short by request failures as complete
+        if getattr(self.snmp, 'walk_truncated', False):
+            return values
+        
+        # Forget cached sub-OIDs walks, now included in this one
+        prefix = key + '.'
+        for walked_oid in [o for o in cache['walks'] if o.startswith(prefix)]:
+            del cache['walks'][walked_oid]
+        cache['walks'][key] = dict(values) if values else {}
+        
+        return values
     
     def disable_walk(self):
         """
@@ -190,6 +343,9 @@ class SNMPDevice:
         """
         Switch SNMP context to a specific VLAN.
         
+        Cached results are kept by context, which is only changed once the
+        switch succeeded.
+        
         Args:
             vlan_id: VLAN ID to switch to
             
@@ -199,7 +355,9 @@ class SNMPDevice:
         if not self.snmp or not vlan_id:
             return None
         
-        return self.snmp.switch_vlan_context(vlan_id)
+        result = self.snmp.switch_vlan_context(vlan_id)
+        self._context = str(vlan_id)
+        return result
     
     def reset_original_context(self) -> Optional[Any]:
         """
@@ -211,7 +369,9 @@ class SNMPDevice:
         if not self.snmp:
             return None
         
-        return self.snmp.reset_original_context()
+        result = self.snmp.reset_original_context()
+        self._context = None
+        return result
     
     def load_mib_support(self, sysobjectid: str, config=None):
         """
@@ -225,9 +385,9 @@ class SNMPDevice:
             config: Configuration dictionary for plugins
         """
         # Import here to avoid circular dependencies
-        from mib_support import MibSupport
+        from GLPI.Agent.SNMP.MibSupport import MibSupportManager
         
-        self.MIBSUPPORT = MibSupport(
+        self.MIBSUPPORT = MibSupportManager(
             sysobjectid=sysobjectid,
             device=self,
             config=config,
@@ -617,6 +777,32 @@ class SNMPDevice:
             if re.search(r'configure /etc.*snmp.*\.conf', self.CONTACT):
                 delattr(self, 'CONTACT')
     
+    def set_sysobjectid_infos(self, sysobjectid: str, datadir: Optional[str] = None):
+        """
+        Set device type, manufacturer and model from sysobject.ids database.
+        
+        Args:
+            sysobjectid: System Object ID from SNMP
+            datadir: Agent data directory
+        """
+        from GLPI.Agent.Tools.IdsIndex import get_sysobject_id_info
+        
+        # Let the session share what it learns with same model devices
+        if hasattr(self.snmp, 'set_sysobjectid'):
+            self.snmp.set_sysobjectid(sysobjectid)
+        
+        infos = get_sysobject_id_info(id=sysobjectid, datadir=datadir,
+                                      logger=self.logger)
+        if not infos:
+            return
+        
+        if infos.get('type'):
+            self.TYPE = infos['type']
+        if infos.get('manufacturer'):
+            self.MANUFACTURER = infos['manufacturer']
+        if infos.get('model'):
+            self.MODEL = infos['model']
+    
     def set_snmp_hostname(self):
         """Set the SNMP hostname using MIB support if available."""
         if self.MIBSUPPORT:
@@ -636,6 +822,13 @@ class SNMPDevice:
             oid_list: Dictionary of field definitions with OIDs and types
             target_dict: Target dictionary to store the results
         """
+        # Get all OIDs at once
+        oids = []
+        for variable in oid_list.values():
+            oid = variable['oid']
+            oids.extend(oid if isinstance(oid, (list, dict)) else [oid])
+        values = self.get_many(oids)
+        
         for key, variable in oid_list.items():
             var_type = variable['type']
             oid = variable['oid']
@@ -644,7 +837,7 @@ class SNMPDevice:
             # Handle list of OIDs
             if isinstance(oid, list):
                 for single_oid in oid:
-                    raw_value = self.get(single_oid)
+                    raw_value = values.get(single_oid)
                     if raw_value and var_type in ('memory', 'count'):
                         # Skip if no number present
                         if not re.search(r'\d+', str(raw_value)):
@@ -655,7 +848,7 @@ class SNMPDevice:
             # Handle dict of OIDs with units
             elif isinstance(oid, dict):
                 for single_oid, unit in oid.items():
-                    raw_value = self.get(single_oid)
+                    raw_value = values.get(single_oid)
                     if raw_value and var_type in ('memory', 'count'):
                         if not re.search(r'\d+', str(raw_value)):
                             raw_value = None
@@ -666,7 +859,7 @@ class SNMPDevice:
             
             # Handle single OID string
             else:
-                raw_value = self.get(oid)
+                raw_value = values.get(oid)
             
             if raw_value is None:
                 continue
@@ -779,7 +972,8 @@ class SNMPDevice:
         """
         # Try standard ENTITY-MIB first
         try:
-            from components import Components
+            from GLPI.Agent.SNMP.Device.Components import \
+                GLPIAgentSNMPDeviceComponents as Components
             components = Components(device=self)
             if components:
                 for component in components.get_physical_components():
@@ -17,6 +17,7 @@ License: Compatible with GLPI Agent
 
 import os
 import re
+import threading
 import time
 from typing import Optional, Dict, Any, List
 from pysnmp.hlapi import (
@@ -92,6 +93,22 @@ class SNMPLive:
         'oids': '.1.3.6.1.2.1.1.1.0',  # sysDescr.0
     }
     
+    # GETBULK max-repetitions used for walks until a better value is known
+    DEFAULT_MAX_REPETITIONS = 25
+    
+    # Number of times a walk shrinks max-repetitions after a timeout, as a
+    # timeout may also mean the device just stopped answering
+    MAX_TIMEOUT_SHRINKS = 2
+    
+    # Varbinds packed in a GET request until a better value is known
+    DEFAULT_MAX_VARBINDS = 32
+    
+    # Best request sizes learnt by device and by sysObjectID, shared by
+    # all sessions
+    _learnt: Dict[Any, int] = {}
+    _learnt_lock = threading.Lock()
+    _learnt_size = 4096
+    
     def __init__(self, hostname: str = None, version: str = None, 
                  community: str = None, username: str = None,
                  authprotocol: str = None, authpassword: str = None,
@@ -151,6 +168,10 @@ class SNMPLive:
         self.context = None
         self.oldsession = None
         self._session_error = None
+        # Set when last walk stopped on an error before the subtree end
+        self.walk_truncated = False
+        # Device sysObjectID, set once known to share learnt request sizes
+        self._sysobjectid = None
         
         if version_normalized == 'snmpv3':
             # SNMPv3 - only username is mandatory
@@ -536,6 +557,96 @@ class SNMPLive:
         
         return None
     
+    @staticmethod
+    def _get_value(value: Any) -> Optional[str]:
+        """Filter out GET error responses."""
+        value_str = str(value)
+        if not value_str:
+            return None
+        for error in ('noSuchInstance', 'noSuchObject', 'endOfMibView',
+                      'No response from remote host'):
+            if error in value_str:
+                return None
+        return value_str
+    
+    def get_many(self, oids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Perform SNMP GET operations on many OIDs with as few requests as possible.
+        
+        OIDs are packed in requests of the best size known for the device.
+        The size is halved when the device answers tooBig or doesn't answer
+        a large request. When the device reports an error on a varbind, like
+        SNMPv1 noSuchName, this OID is set as missing and the request is sent
+        again without it. Other errors fall back to one get() per OID.
+        
+        Args:
+            oids: List of OID strings to query
+            
+        Returns:
+            Dictionary mapping each requested OID to its value, or None
+            with the same meaning as get() returning None
+        """
+        values: Dict[str, Optional[str]] = {oid: None for oid in oids if oid}
+        
+        if not values or not hasattr(self, 'session') or not self.session:
+            return values
+        
+        context_name = self.context if self.context else ''
+        context = ContextData(contextName=context_name)
+        
+        max_varbinds = self._get_learnt('max_varbinds', self.DEFAULT_MAX_VARBINDS)
+        timeout_shrinked = False
+        pending = list(values)
+        
+        while pending:
+            chunk = pending[:max_varbinds]
+            try:
+                error_indication, error_status, error_index, var_binds = next(
+                    getCmd(
+                        self.session['engine'],
+                        self.session['auth_data'],
+                        self.session['transport'],
+                        context,
+                        *[ObjectType(ObjectIdentity(oid)) for oid in chunk]
+                    )
+                )
+            except Exception:
+                return values
+            
+            if error_indication:
+                # Device may drop too large requests, but also be down
+                if len(chunk) > 1 and not timeout_shrinked and \
+                        'timeout' in str(error_indication).lower():
+                    timeout_shrinked = True
+                    max_varbinds = max(1, len(chunk) // 2)
+                    continue
+                return values
+            
+            if error_status:
+                error = error_status.prettyPrint() \
+                    if hasattr(error_status, 'prettyPrint') else str(error_status)
+                if error == 'tooBig' and len(chunk) > 1:
+                    max_varbinds = max(1, len(chunk) // 2)
+                    self._set_learnt('max_varbinds', max_varbinds)
+                    continue
+                index = int(error_index or 0)
+                if 0 < index <= len(chunk):
+                    # Request again without failing varbind
+                    pending.remove(chunk[index - 1])
+                    continue
+                for oid in chunk:
+                    values[oid] = self.get(oid)
+                pending = pending[len(chunk):]
+                continue
+            
+            for oid, (name, value) in zip(chunk, var_binds):
+                values[oid] = self._get_value(value)
+            pending = pending[len(chunk):]
+        
+        self._set_learnt('max_varbinds', max_varbinds)
+        
+        return values
+    
     def walk(self, oid: str) -> Optional[Dict[str, Any]]:
         """
         Perform SNMP WALK operation on an OID tree.
@@ -566,6 +677,9 @@ class SNMPLive:
         Note:
             Keys are OID suffixes (portion after base OID + 1), not full OIDs.
             This matches the Perl implementation exactly.
+            
+            With SNMPv2c and SNMPv3, GETBULK max-repetitions is adapted to
+            what the device supports, see _bulk_walk().
         """
         if not oid:
             return None
@@ -577,83 +691,214 @@ class SNMPLive:
         context_name = self.context if self.context else ''
         context = ContextData(contextName=context_name)
         
-        # Calculate offset for suffix extraction
-        # Remove leading dot if present for length calculation
-        base_oid_clean = oid.lstrip('.')
-        offset = len(base_oid_clean) + 1  # +1 for the dot separator
-        
         values = {}
+        self.walk_truncated = True
         
         try:
-            # Determine which command to use based on SNMP version
-            version_id = self.session['version_id']
-            
-            if version_id == SNMP_VERSION_1:
-                # SNMPv1 uses nextCmd (GETNEXT)
-                cmd_generator = nextCmd(
-                    self.session['engine'],
-                    self.session['auth_data'],
-                    self.session['transport'],
-                    context,
-                    ObjectType(ObjectIdentity(oid)),
-                    lexicographicMode=False
-                )
+            if self.session['version_id'] == SNMP_VERSION_1:
+                # SNMPv1 has no GETBULK, use nextCmd (GETNEXT)
+                complete = self._next_walk(oid, context, values)
             else:
-                # SNMPv2c and SNMPv3 use bulkCmd (GETBULK) with maxRepetitions=1
-                # to match Perl Net::SNMP get_table behavior
-                cmd_generator = bulkCmd(
-                    self.session['engine'],
-                    self.session['auth_data'],
-                    self.session['transport'],
-                    context,
-                    0,  # nonRepeaters
-                    1,  # maxRepetitions (matches Perl's -maxrepetitions => 1)
-                    ObjectType(ObjectIdentity(oid)),
-                    lexicographicMode=False
-                )
+                complete = self._bulk_walk(oid, context, values)
+        except Exception:
+            return None
+        
+        self.walk_truncated = not complete
+        
+        # Return None if no values found (matching Perl behavior)
+        if not values:
+            return None
+        
+        return values
+    
+    @staticmethod
+    def _walk_value(base_oid: str, offset: int, name: Any, value: Any,
+                    values: Dict[str, Any]) -> bool:
+        """
+        Store a walked value under its suffix relative to the base OID.
+        
+        Returns:
+            False if the OID is out of the walked subtree
+        """
+        full_oid_clean = str(name).lstrip('.')
+        if not full_oid_clean.startswith(base_oid + '.'):
+            return False
+        
+        value_str = str(value)
+        if 'endOfMibView' in value_str:
+            return False
+        
+        values[full_oid_clean[offset:]] = value_str
+        return True
+    
+    def _next_walk(self, oid: str, context: Any, values: Dict[str, Any]) -> bool:
+        """
+        Walk an OID tree with GETNEXT requests.
+        
+        Returns:
+            False if the walk was cut short by a request failure
+        """
+        base_oid = oid.lstrip('.')
+        offset = len(base_oid) + 1
+        
+        cmd_generator = nextCmd(
+            self.session['engine'],
+            self.session['auth_data'],
+            self.session['transport'],
+            context,
+            ObjectType(ObjectIdentity(oid)),
+            lexicographicMode=False
+        )
+        
+        for (error_indication, error_status, error_index, var_binds) in cmd_generator:
+            if error_indication:
+                return False
+            # SNMPv1 agents answer noSuchName at the end of their MIB view
+            if error_status:
+                return True
+            for name, value in var_binds:
+                if not self._walk_value(base_oid, offset, name, value, values):
+                    return True
+        
+        return True
+    
+    def _bulk_walk(self, oid: str, context: Any, values: Dict[str, Any]) -> bool:
+        """
+        Walk an OID tree with GETBULK requests.
+        
+        Max-repetitions starts from the best value known for this device or
+        its model. It is halved when the device answers tooBig or times out,
+        and the walk resumes from the last received OID. The value which
+        completed the walk is remembered for next walks, see
+        _learn_repetitions().
+        
+        Returns:
+            False if the walk was cut short by request failures
+        """
+        base_oid = oid.lstrip('.')
+        offset = len(base_oid) + 1
+        
+        max_repetitions = self._get_learnt('max_repetitions',
+                                           self.DEFAULT_MAX_REPETITIONS)
+        timeout_shrinks = 0
+        shrinked = False
+        current = oid
+        
+        while True:
+            cmd_generator = bulkCmd(
+                self.session['engine'],
+                self.session['auth_data'],
+                self.session['transport'],
+                context,
+                0,  # nonRepeaters
+                max_repetitions,
+                ObjectType(ObjectIdentity(current)),
+                # Walk resumes from a leaf OID after a shrink, so pysnmp must
+                # not stop outside of it: _walk_value() checks the subtree
+                lexicographicMode=True
+            )
             
-            # Iterate through results
+            error = None
+            # The generator yields one row at a time, a GETBULK response
+            # bringing max_repetitions rows
+            rows = 0
             for (error_indication, error_status, error_index, var_binds) in cmd_generator:
                 if error_indication:
+                    error = 'timeout' if 'timeout' in str(error_indication).lower() \
+                        else str(error_indication)
                     break
                 
                 if error_status:
+                    error = error_status.prettyPrint() \
+                        if hasattr(error_status, 'prettyPrint') else str(error_status)
                     break
                 
-                # Process var_binds
-                for var_bind in var_binds:
-                    name, value = var_bind
-                    full_oid = str(name)
-                    value_str = str(value)
-                    
-                    # Extract suffix (portion after base OID)
-                    # Ensure full_oid starts with dot for consistency
-                    if not full_oid.startswith('.'):
-                        full_oid = '.' + full_oid
-                    
-                    # Remove leading dot for suffix calculation
-                    full_oid_clean = full_oid.lstrip('.')
-                    
-                    # Calculate suffix by removing base OID portion
-                    if len(full_oid_clean) > offset:
-                        suffix = full_oid_clean[offset:]
-                    else:
-                        # If somehow we get an OID shorter than expected,
-                        # use the full OID
-                        suffix = full_oid_clean
-                    
-                    values[suffix] = value_str
+                rows += 1
+                for name, value in var_binds:
+                    # Stop as soon as we leave the subtree
+                    if not self._walk_value(base_oid, offset, name, value, values):
+                        self._learn_repetitions(max_repetitions,
+                                                rows > max_repetitions and not shrinked)
+                        return True
+                    current = '.' + str(name).lstrip('.')
+            
+            if not error:
+                self._learn_repetitions(max_repetitions,
+                                        rows > max_repetitions and not shrinked)
+                return True
+            
+            if max_repetitions == 1:
+                return False
+            
+            if error == 'timeout':
+                if timeout_shrinks >= self.MAX_TIMEOUT_SHRINKS:
+                    return False
+                timeout_shrinks += 1
+            elif error != 'tooBig':
+                return False
+            
+            max_repetitions = max(1, max_repetitions // 2)
+            shrinked = True
+            # Also forget a too large value for next walks if this one fails
+            self._set_learnt('max_repetitions', max_repetitions)
+    
+    def _learn_repetitions(self, max_repetitions: int, grow: bool) -> None:
+        """
+        Remember max-repetitions which completed a walk.
         
-        except StopIteration:
-            pass
-        except Exception:
-            return None
+        When the walk needed many GETBULK responses without any error, the value
+        grows back by a quarter up to DEFAULT_MAX_REPETITIONS, so a value
+        shrunk on a transient timeout or on a table with large rows doesn't
+        stay for all next walks.
+        """
+        if grow and max_repetitions < self.DEFAULT_MAX_REPETITIONS:
+            max_repetitions = min(self.DEFAULT_MAX_REPETITIONS,
+                                  max_repetitions + max(1, max_repetitions // 4))
+        self._set_learnt('max_repetitions', max_repetitions)
+    
+    def set_sysobjectid(self, sysobjectid: Optional[str]) -> None:
+        """
+        Set device sysObjectID, as got by SNMPDevice.set_sysobjectid_infos().
         
-        # Return None if no values found (matching Perl behavior)
-        if not values:
-            return None
+        Request sizes learnt for this session are then also shared with
+        other devices of the same model. Until it is set, they are only
+        learnt for this device.
+        """
+        self._sysobjectid = sysobjectid or None
+    
+    def _get_learnt(self, name: str, default: int) -> int:
+        """
+        Get best known request size for this device.
         
-        return values
+        Args:
+            name: Request size name, max_repetitions or max_varbinds
+            default: Value to use if nothing was learnt
+        """
+        with SNMPLive._learnt_lock:
+            value = SNMPLive._learnt.get((name, 'host', self._hostname, self._port))
+        if value:
+            return value
+        
+        if self._sysobjectid:
+            with SNMPLive._learnt_lock:
+                value = SNMPLive._learnt.get((name, 'sysobjectid', self._sysobjectid))
+        
+        return value or default
+    
+    def _set_learnt(self, name: str, value: int) -> None:
+        """Remember request size for this device and its sysObjectID."""
+        keys = [(name, 'host', self._hostname, self._port)]
+        if self._sysobjectid:
+            keys.append((name, 'sysobjectid', self._sysobjectid))
+        
+        with SNMPLive._learnt_lock:
+            cache = SNMPLive._learnt
+            for key in keys:
+                cache.pop(key, None)
+                cache[key] = value
+            # Forget oldest entries
+            while len(cache) > SNMPLive._learnt_size:
+                del cache[next(iter(cache))]
     
     def peer_address(self) -> Optional[str]:
         """
@@ -24,6 +24,19 @@ class MibSupportManager:
 
         sysorid_mib_support = {}
 
+        # Probe all private OIDs at once
+        private_oids = [
+            mib_support['privateoid'] for mib_support in available_mib_support
+            if mib_support.get('privateoid') and not (
+                mib_support.get('sysobjectid') and sysobjectid and
+                mib_support['sysobjectid'].search(sysobjectid)
+            )
+        ]
+        if hasattr(device, 'get_many'):
+            private_values = device.get_many(private_oids)
+        else:
+            private_values = {oid: device.get(oid) for oid in private_oids}
+
         for mib_support in available_mib_support:
             mibname = mib_support.get('name')
             module_name = mib_support.get('module')
@@ -41,7 +54,7 @@ class MibSupportManager:
             # Private OID match
             private_oid = mib_support.get('privateoid')
             if private_oid:
-                if device.get(private_oid) is not None:
+                if private_values.get(private_oid) is not None:
                     self.logger.debug(f"PrivateOID match: {mibname} MIB support enabled")
                     module = mib_support['module_ref']
                     self._SUPPORT[module] = module(device=device)
@@ -20,6 +20,7 @@ import time
 import struct
 import hashlib
 import hmac
+import threading
 from typing import Optional, Dict, Tuple, Any, Union, List
 from dataclasses import dataclass
 from enum import Enum
@@ -306,6 +307,16 @@ class USM:
     # Class variable for engine ID (shared across instances)
     _engine_id_cache = None
     
+    # Process-wide key caches, only held in memory. Passwords are never
+    # used as keys, only their fingerprint:
+    #  - Ku, the engine independent digest of the expanded password
+    #  - Kul, the Ku localized for an engine ID
+    _ku_cache: Dict[Tuple[str, bytes], bytes] = {}
+    _ku_cache_size = 64
+    _kul_cache: Dict[Tuple[str, bytes, bytes], bytes] = {}
+    _kul_cache_size = 4096
+    _key_cache_lock = threading.Lock()
+    
     def __init__(
         self,
         username: str = '',
@@ -651,14 +662,17 @@ class USM:
         
         Process:
         1. Expand password by repetition to 2^20 octets (1,048,576 bytes)
-        2. Compute digest of expanded password
-        3. Localize: hash(digest + engine_id + digest)
+        2. Compute digest of expanded password, aka Ku
+        3. Localize: hash(Ku + engine_id + Ku)
         
         This creates a key that is:
         - Computationally expensive to brute-force (1M hash operations)
         - Unique to the authoritative engine ID
         - Derived deterministically from the password
         
+        Ku doesn't depend on engine ID, so it is only computed once per
+        password and protocol, and localized keys are cached per engine ID.
+        
         Args:
             password: The password to localize
             
@@ -668,45 +682,14 @@ class USM:
         Raises:
             USMSecurityError: If hash function not available
         """
-        info = AUTH_PROTOCOL_INFO[self._auth_protocol]
-        hash_func = info.get('hash_func')
-        
-        if not hash_func:
-            raise USMSecurityError(
-                f'Hash function not available for protocol: {self._auth_protocol}'
-            )
-        
-        # Create hash object
-        h = hash_func()
-        
-        # Expand password to 2^20 octets by repetition
-        password_bytes = password.encode('utf-8')
-        password_len = len(password_bytes)
-        
-        # Calculate repetitions needed
-        target_size = 2 ** 20  # 1,048,576 bytes
-        repetitions = (target_size // password_len) + 1
-        expanded = password_bytes * repetitions
-        
-        # Hash in chunks of 2048 bytes (for memory efficiency)
-        chunk_size = 2048
-        total_hashed = 0
-        
-        while total_hashed < target_size:
-            chunk = expanded[total_hashed:total_hashed + chunk_size]
-            h.update(chunk)
-            total_hashed += len(chunk)
-        
-        # Get initial digest
-        digest = h.digest()
-        
-        # Localize with engine ID
-        h = hash_func()
-        h.update(digest)
-        h.update(self._engine_id)
-        h.update(digest)
-        
-        return h.digest()
+        return _localize_password(password, self._engine_id, self._auth_protocol)
+    
+    @classmethod
+    def clear_key_cache(cls):
+        """Forget all cached keys."""
+        with cls._key_cache_lock:
+            cls._ku_cache.clear()
+            cls._kul_cache.clear()
     
     # ========================================================================
     # Key Validation
@@ -1195,6 +1178,76 @@ def generate_engine_id() -> bytes:
         return b'\x80\x00\x00\x00\x05' + random_bytes
 
 
+def _cache_key(cache: Dict, size: int, key: Tuple, value: bytes):
+    """Store a key in a bounded cache, forgetting oldest entries."""
+    cache.pop(key, None)
+    cache[key] = value
+    while len(cache) > size:
+        del cache[next(iter(cache))]
+
+
+def _password_to_ku(password: bytes, auth_protocol: str) -> bytes:
+    """
+    Get the engine independent key for a password (RFC 3414 Section A.2).
+    
+    Args:
+        password: Password bytes
+        auth_protocol: Authentication protocol OID
+        
+    Returns:
+        Digest of the password expanded to 2^20 octets
+    """
+    hash_func = AUTH_PROTOCOL_INFO[auth_protocol].get('hash_func')
+    if not hash_func:
+        raise USMSecurityError(
+            f'Hash function not available for protocol: {auth_protocol}'
+        )
+    if not password:
+        raise USMSecurityError('Unable to generate key from an empty password')
+    
+    # Expand password to 2^20 octets by repetition
+    target_size = 2 ** 20  # 1,048,576 bytes
+    repetitions = (target_size // len(password)) + 1
+    expanded = memoryview(password * repetitions)[:target_size]
+    
+    return hash_func(expanded).digest()
+
+
+def _localize_password(password: str, engine_id: bytes, auth_protocol: str) -> bytes:
+    """
+    Get a password localized key for an engine ID, using USM key caches.
+    
+    Args:
+        password: Password string
+        engine_id: Authoritative engine ID
+        auth_protocol: Authentication protocol OID
+        
+    Returns:
+        Localized key bytes
+    """
+    password_bytes = password.encode('utf-8')
+    fingerprint = hashlib.sha256(password_bytes).digest()
+    kul_key = (auth_protocol, fingerprint, engine_id)
+    
+    with USM._key_cache_lock:
+        kul = USM._kul_cache.get(kul_key)
+        ku = USM._ku_cache.get((auth_protocol, fingerprint))
+    if kul:
+        return kul
+    
+    if not ku:
+        ku = _password_to_ku(password_bytes, auth_protocol)
+    
+    hash_func = AUTH_PROTOCOL_INFO[auth_protocol]['hash_func']
+    kul = hash_func(ku + engine_id + ku).digest()
+    
+    with USM._key_cache_lock:
+        _cache_key(USM._ku_cache, USM._ku_cache_size, (auth_protocol, fingerprint), ku)
+        _cache_key(USM._kul_cache, USM._kul_cache_size, kul_key, kul)
+    
+    return kul
+
+
 def password_to_key(password: str, engine_id: bytes, auth_protocol: str = AUTH_PROTOCOL_HMACSHA) -> bytes:
     """
     Convert password to localized key.
@@ -1207,13 +1260,10 @@ def password_to_key(password: str, engine_id: bytes, auth_protocol: str = AUTH_P
     Returns:
         Localized key bytes
     """
-    usm = USM(
-        username='temp',
-        auth_protocol=auth_protocol,
-        auth_password=password,
-        engine_id=engine_id
-    )
-    return usm._auth_key
+    if auth_protocol not in AUTH_PROTOCOL_INFO:
+        raise USMSecurityError(f'Unknown authentication protocol: {auth_protocol}')
+    
+    return _localize_password(password, engine_id, auth_protocol)
 
 
 # ============================================================================
@@ -6,7 +6,9 @@ without requiring their Perl library.
 """
 
 import re
+import xml.etree.ElementTree as ElementTree
 from urllib.parse import urlparse
+from xml.sax.saxutils import escape
 import requests
 from requests.cookies import RequestsCookieJar
 
@@ -15,6 +17,71 @@ from requests.cookies import RequestsCookieJar
 # from glpi.agent.xml import XML
 # from glpi.agent.soap.vmware.host import Host
 
+# VirtualMachine properties used by Host.get_virtual_machines()
+VM_PROPERTIES = (
+    'name',
+    'summary',
+    'config.annotation',
+    'config.hardware.device',
+    'guest.hostName',
+    'guest.net',
+)
+
+# Elements always returned as list, like XML force_array parser option
+FORCE_ARRAY = ('returnval', 'propSet')
+
+XSI_TYPE = '{http://www.w3.org/2001/XMLSchema-instance}type'
+
+
+def _local_name(tag):
+    """Strip namespace from an ElementTree tag."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _element_to_hash(element):
+    """
+    Convert an element like XML dump_as_hash() with attributes skipped.
+
+    Args:
+        element: ElementTree element
+
+    Returns:
+        dict for elements with children, list for ArrayOf typed elements,
+        text otherwise
+    """
+    # Values of a property path, like config.hardware.device, are typed as
+    # arrays, like ArrayOfVirtualDevice, with items named after their type.
+    # They are lists like the same property within its parent object.
+    if element.get(XSI_TYPE, '').rsplit(':', 1)[-1].startswith('ArrayOf'):
+        return [_element_to_hash(child) for child in element]
+
+    if not len(element):
+        return (element.text or '').strip()
+
+    ref = {}
+    for child in element:
+        name = _local_name(child.tag)
+        value = _element_to_hash(child)
+        if name in ref:
+            if not isinstance(ref[name], list):
+                ref[name] = [ref[name]]
+            ref[name].append(value)
+        elif name in FORCE_ARRAY:
+            ref[name] = [value]
+        else:
+            ref[name] = value
+    return ref
+
+
+def _set_property(ref, path, value):
+    """Set a property value in nested dicts from its dotted path."""
+    keys = path.split('.')
+    for key in keys[:-1]:
+        if not isinstance(ref.get(key), dict):
+            ref[key] = {}
+        ref = ref[key]
+    ref[keys[-1]] = value
+
 class VMware:
     """
     Equivalent to GLPI::Agent::SOAP::VMware
@@ -85,13 +152,15 @@ class VMware:
         """
         return self._last_error or ''
     
-    def _send(self, action, xml_to_send):
+    def _send(self, action, xml_to_send, stream=False):
         """
         Send a SOAP request to the VMware service.
         
         Args:
             action: The SOAP action name
             xml_to_send: The XML SOAP envelope to send
+            stream: Return a file-like object to read response from
+                instead of response content
             
         Returns:
             str or None: Response content on success, None on failure
@@ -108,10 +177,14 @@ class VMware:
                 self.url,
                 data=xml_to_send,
                 headers=headers,
-                timeout=self._timeout
+                timeout=self._timeout,
+                stream=stream
             )
             
             if response.status_code == 200:
+                if stream:
+                    response.raw.decode_content = True
+                    return response.raw
                 return response.text
             else:
                 # Try to extract fault string from error
@@ -315,6 +388,95 @@ class VMware:
         
         return self._parseAnswer(answer) or []
     
+    def _iterReturnvals(self, handle):
+        """
+        Parse a RetrieveProperties response from a stream.
+
+        Only one returnval element is kept in memory at a time.
+
+        Args:
+            handle: File-like object to read response from
+
+        Yields:
+            dict: returnval content, with properties by name
+        """
+        depth = 0
+        parent = None
+        try:
+            for event, element in ElementTree.iterparse(handle, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    # Keep Body response element to free parsed returnvals
+                    if depth == 3:
+                        parent = element
+                    continue
+
+                depth -= 1
+                name = _local_name(element.tag)
+                if name == 'returnval' and depth == 3:
+                    val = _element_to_hash(element)
+                    props = {}
+                    for prop in val.get('propSet', []) if isinstance(val, dict) else []:
+                        if isinstance(prop, dict) and prop.get('name') and 'val' in prop:
+                            props[prop['name']] = prop['val']
+                    yield val.get('obj', '') if isinstance(val, dict) else '', props
+                    if parent is not None:
+                        parent.clear()
+                elif name == 'faultstring':
+                    self._last_error = (element.text or '').strip()
+        except ElementTree.ParseError as e:
+            self._last_error = f"Malformed RetrieveProperties response: {e}"
+
+    def _getVirtualMachinesByIds(self, vm_ids):
+        """
+        Get information about virtual machines with a single request.
+
+        Only properties listed in VM_PROPERTIES are requested.
+
+        Args:
+            vm_ids: Virtual machine IDs
+
+        Returns:
+            list or None: VM information for each ID, in the same order and
+                like _getVirtualMachineById() returns it, None on failure
+        """
+        if not vm_ids:
+            return []
+
+        paths = ''.join(f'<pathSet>{path}</pathSet>' for path in VM_PROPERTIES)
+        objects = ''.join(
+            f'<objectSet><obj type="VirtualMachine">{escape(str(vm_id))}</obj></objectSet>'
+            for vm_id in vm_ids
+        )
+        req = '''<?xml version="1.0" encoding="UTF-8"?>
+        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+        xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+        xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+        <soapenv:Body>
+        <RetrieveProperties xmlns="urn:vim25"><_this type="PropertyCollector">%s</_this>
+        <specSet><propSet><type>VirtualMachine</type><all>0</all>%s</propSet>%s
+        </specSet></RetrieveProperties></soapenv:Body></soapenv:Envelope>'''
+
+        handle = self._send(
+            'RetrieveProperties',
+            req % (self.property_collector, paths, objects),
+            stream=True
+        )
+        if not handle:
+            return None
+
+        machines = {}
+        self._last_error = None
+        for vm_id, props in self._iterReturnvals(handle):
+            machine = machines.setdefault(vm_id, {})
+            for path, value in props.items():
+                _set_property(machine, path, value)
+
+        if not machines and self._last_error:
+            return None
+
+        return [[machines[vm_id]] if vm_id in machines else [] for vm_id in vm_ids]
+
     def getHostFullInfo(self, host_id=None):
         """
         Get full information about a host including all VMs.
@@ -360,9 +522,10 @@ class VMware:
         else:
             machine_id_list = self._getVirtualMachineList()
         
-        # Get details for each VM
-        for vm_id in machine_id_list:
-            vms.append(self._getVirtualMachineById(vm_id))
+        # Get details for all VMs at once, or for each VM if not supported
+        vms = self._getVirtualMachinesByIds(machine_id_list)
+        if vms is None:
+            vms = [self._getVirtualMachineById(vm_id) for vm_id in machine_id_list]
         
         # Create Host object
         host = Host(hash=ref, vms=vms)
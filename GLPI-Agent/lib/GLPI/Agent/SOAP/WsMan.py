@@ -1,5 +1,8 @@
 import os
 import re
+import sys
+import threading
+import time
 import uuid
 from typing import Dict, Any, List, Optional
 
@@ -143,7 +146,7 @@ class WsManElement:
     def string(self) -> str:
         return str(self._args[0]) if self._args else ""
 
-    def is(self, value: str) -> bool:
+    def is_action(self, value: str) -> bool:
         return self.string().lower() == value.lower()
 
     def isvalid(self) -> bool:
@@ -253,7 +256,14 @@ class Enumeration(WsManElement):
 
 # Global Variables (Module level state, mirroring Perl)
 _xml: Optional[GLPIAgentXML] = None
+# XML handler is stateful and shared by all clients, possibly run by threads
+_xml_lock = threading.Lock()
 _wsman_debug: bool = os.environ.get('WSMAN_DEBUG') is not None
+# Idle shells kept by a client and how long, in seconds, an idle shell can
+# be reused. Remote WinRM service deletes idle shells after its own
+# IdleTimeout, 180 seconds by default on recent Windows
+SHELL_POOL_SIZE = 2
+SHELL_IDLE_TIMEOUT = 60
 _HIVEREF: Dict[str, int] = {
     'HKEY_CLASSES_ROOT': 0x80000000,
     'HKEY_CURRENT_USER': 0x80000001,
@@ -317,7 +327,9 @@ class WsManClient(HTTPClient):
         self._noauth = 0 if params.get('user') and params.get('password') else 1
         self._lastresponse = None
         self._resource_class = None
-        self._exitcode = None
+        # Idle remote shells kept open for next commands, shared by threads
+        self._shells: List[Dict[str, Any]] = []
+        self._shells_lock = threading.Lock()
 
         # 3. Global XML utility setup (Perl's singleton check)
         if _xml is None:
@@ -341,7 +353,8 @@ class WsManClient(HTTPClient):
         global _xml, _wsman_debug
 
         header = header or {}
-        message = _xml.write(envelope.get())
+        with _xml_lock:
+            message = _xml.write(envelope.get())
 
         if not message:
             return self.abort("Won't send wrong request")
@@ -369,18 +382,20 @@ class WsManClient(HTTPClient):
             print("<====\n", response.as_string(), "<====\n", file=sys.stderr)
 
         if response.is_success():
-            _xml.string(response.content())
-            return _xml.dump_as_hash()
+            with _xml_lock:
+                _xml.string(response.content())
+                return _xml.dump_as_hash()
         
         # Handle non-successful response that might contain SOAP Fault (HTTP 500)
         content_type = response.header('Content-Type')
         if content_type and 'application/soap+xml' in content_type:
-            _xml.string(response.content())
-            response_hash = _xml.dump_as_hash()
+            with _xml_lock:
+                _xml.string(response.content())
+                response_hash = _xml.dump_as_hash()
             envelope = Envelope(response_hash)
             
             # Mock check for fault action
-            if envelope.header.action().is("fault"):
+            if envelope.header.action().is_action("fault"):
                 # Mock extraction of error code
                 code = envelope.body.fault.get('errorCode') # Need to assume where code is
                 if code and code == '2150858752':
@@ -528,8 +543,8 @@ class WsManClient(HTTPClient):
                 self.lasterror("Malformed enumerate response, no 'Action' found in Header")
                 break
 
-            ispull = respaction.is('pullresponse')
-            if not (ispull or respaction.is('enumerateresponse')):
+            ispull = respaction.is_action('pullresponse')
+            if not (ispull or respaction.is_action('enumerateresponse')):
                 self.lasterror(f"Not an enumerate response but {respaction.what()}")
                 break
 
@@ -608,7 +623,7 @@ class WsManClient(HTTPClient):
         self.end(operationid)
 
         # Forget what resource was requested
-        del self._resource_class
+        self._resource_class = None
 
         return items
 
@@ -753,8 +768,12 @@ class WsManClient(HTTPClient):
 
     def shell(self, command: str) -> Optional[Dict[str, Any]]:
         """
-        Creates a remote shell, executes a command, retrieves output,
-        signals termination, and deletes the shell resource.
+        Runs a command in a remote shell and retrieves its output.
+
+        The shell is taken from the idle shells pool when possible and put
+        back in the pool after the command, so the shell is only created
+        and deleted once for a sequence of commands. Call close_shells()
+        when done with the client.
         """
         if not command: return None
 
@@ -766,7 +785,81 @@ class WsManClient(HTTPClient):
                 logcommand = logcommand[:115] + " ..."
             self.debug2(f"Requesting '{logcommand}' run to {self.url()}")
 
-        # --- 1. CREATE SHELL ---
+        shell = self._get_shell()
+        if not shell: return None
+
+        cid = self._command(shell, command)
+        if not cid and shell['reused']:
+            # Remote may have deleted the shell after its own idle timeout
+            self.debug2("Pooled shell not usable, creating a new one")
+            self._delete_shell(shell)
+            shell = self._get_shell()
+            if not shell: return None
+            cid = self._command(shell, command)
+        if not cid:
+            self._delete_shell(shell)
+            return None
+
+        # --- RECEIVE OUTPUT STREAM ---
+        # Exit code is returned with output as many commands can run at the
+        # same time in pooled shells
+        buffer, exitcode = self.receive(shell['sid'], shell['resource'], shell['selectorset'], cid)
+        if exitcode is None:
+            exitcode = 255
+
+        # --- SIGNAL TERMINATE ---
+        # Frees the command on remote side, the shell itself is kept
+        self.signal(shell['sid'], shell['resource'], shell['selectorset'], cid, 'terminate')
+
+        self._release_shell(shell)
+
+        # Perl returns a scalar ref: \$buffer. Python returns the string directly.
+        return {
+            'stdout': buffer,
+            'exitcode': exitcode,
+        }
+
+    def _get_shell(self) -> Optional[Dict[str, Any]]:
+        """Gets an idle shell from the pool, or creates a new one."""
+        now = time.monotonic()
+        while True:
+            with self._shells_lock:
+                if not self._shells:
+                    break
+                shell = self._shells.pop()
+            if shell['expiration'] > now:
+                shell['reused'] = True
+                return shell
+            self._delete_shell(shell)
+
+        return self._create_shell()
+
+    def _release_shell(self, shell: Dict[str, Any]) -> None:
+        """Puts a shell back in the idle shells pool."""
+        with self._shells_lock:
+            if len(self._shells) < SHELL_POOL_SIZE:
+                shell['expiration'] = time.monotonic() + SHELL_IDLE_TIMEOUT
+                self._shells.append(shell)
+                return
+        self._delete_shell(shell)
+
+    def close_shells(self) -> None:
+        """Deletes all idle shells kept in the pool."""
+        with self._shells_lock:
+            shells, self._shells = self._shells, []
+        for shell in shells:
+            self._delete_shell(shell)
+
+    def _delete_shell(self, shell: Dict[str, Any]) -> None:
+        """Deletes a remote shell resource and ends the operation."""
+        delete_opid = self.delete(shell['sid'], shell['resource'], shell['selectorset'])
+        if delete_opid is None:
+            self.lasterror("Resource deletion failure")
+        else:
+            self.end(delete_opid)
+
+    def _create_shell(self) -> Optional[Dict[str, Any]]:
+        """Creates a remote cmd shell."""
         messageid = MessageID()
         sid = SessionId()
         operationid = OperationID()
@@ -809,7 +902,7 @@ class WsManClient(HTTPClient):
         if not isinstance(header, Header): return self.abort("Malformed create response, no 'Header' node found")
         respaction = header.action()
         if not isinstance(respaction, Action): return self.abort("Malformed create response, no 'Action' found in Header")
-        if not respaction.is('createresponse'): return self.abort(f"Not a create response but {respaction.what()}")
+        if not respaction.is_action('createresponse'): return self.abort(f"Not a create response but {respaction.what()}")
         related = header.get('RelatesTo')
         if not related or related.string() != messageid.string(): return self.abort("Got message not related to our shell create request")
         thisopid = header.get('OperationID')
@@ -823,7 +916,16 @@ class WsManClient(HTTPClient):
         selectorset = reference.get('SelectorSet')
         if not isinstance(selectorset, SelectorSet): return self.abort("Malformed create response, no 'SelectorSet' returned")
 
-        # --- 2. EXECUTE COMMAND ---
+        return {
+            'sid': sid,
+            'shell': shell,
+            'resource': resource,
+            'selectorset': selectorset,
+            'reused': False,
+        }
+
+    def _command(self, shell: Dict[str, Any], command: str) -> Optional[str]:
+        """Starts a command in a remote shell and returns its CommandId."""
         messageid = MessageID()
         operationid = OperationID()
         action = Action("command")
@@ -833,33 +935,33 @@ class WsManClient(HTTPClient):
             Namespace('s', 'a', 'w', 'p'),
             Header(
                 To(self.url()),
-                resource,
+                shell['resource'],
                 ReplyTo().anonymous,
                 action,
                 messageid,
                 MaxEnvelopeSize(512000),
                 Locale(self._lang),
                 DataLocale(self._lang),
-                sid,
+                shell['sid'],
                 operationid,
                 SequenceId(),
-                selectorset,
+                shell['selectorset'],
                 OperationTimeout(60),
                 optionset,
             ),
-            Body(shell.commandline(command)),
+            Body(shell['shell'].commandline(command)),
         )
         response_hash = self._send(request)
         if not response_hash: return self.abort("No command response")
 
         envelope = Envelope(response_hash)
-        
+
         # Response validation (command)
         header = envelope.header
         if not isinstance(header, Header): return self.abort("Malformed command response, no 'Header' node found")
         respaction = header.action()
         if not isinstance(respaction, Action): return self.abort("Malformed command response, no 'Action' found in Header")
-        if not respaction.is('commandresponse'): return self.abort(f"Not a command response but {respaction.what()}")
+        if not respaction.is_action('commandresponse'): return self.abort(f"Not a command response but {respaction.what()}")
         related = header.get('RelatesTo')
         if not related or related.string() != messageid.string(): return self.abort("Got message not related to our shell command request")
         thisopid = header.get('OperationID')
@@ -873,30 +975,17 @@ class WsManClient(HTTPClient):
         cid = commandid.string()
         if not cid: return self.abort("Malformed command response, no CommandId value found")
 
-        # --- 3. RECEIVE OUTPUT STREAM ---
-        buffer = self.receive(sid, resource, selectorset, cid)
-        exitcode = self._exitcode if self._exitcode is not None else 255
-        del self._exitcode
-
-        # --- 4. SIGNAL TERMINATE ---
-        self.signal(sid, resource, selectorset, cid, 'terminate')
-
-        # --- 5. DELETE SHELL RESOURCE ---
-        delete_opid = self.delete(sid, resource, selectorset)
-        if delete_opid is None: self.lasterror("Resource deletion failure")
+        return cid
 
-        # --- 6. END OPERATION ---
-        if delete_opid: self.end(delete_opid)
-
-        # Perl returns a scalar ref: \$buffer. Python returns the string directly.
-        return {
-            'stdout': buffer,
-            'exitcode': exitcode,
-        }
+    def receive(self, sid: SessionId, resource: ResourceURI, selectorset: SelectorSet, cid: str) -> tuple:
+        """
+        Receives output stream from an executing shell command.
 
-    def receive(self, sid: SessionId, resource: ResourceURI, selectorset: SelectorSet, cid: str) -> Optional[str]:
-        """Receives output stream from an executing shell command."""
+        Returns a tuple with command output and exit code, exit code being
+        None if not received.
+        """
         stdout: Optional[str] = ""
+        exitcode = None
 
         while True:
             messageid = MessageID()
@@ -932,7 +1021,7 @@ class WsManClient(HTTPClient):
             if not isinstance(header, Header): self.abort("Malformed receive response, no 'Header' node found"); break
             action = header.action()
             if not isinstance(action, Action): self.abort("Malformed receive response, no 'Action' found in Header"); break
-            if not action.is('receiveresponse'): self.abort(f"Not a receive response but {action.what()}"); break
+            if not action.is_action('receiveresponse'): self.abort(f"Not a receive response but {action.what()}"); break
             related = header.get('RelatesTo')
             if not related or related.string() != messageid.string(): self.abort("Got message not related to receive request"); break
             thisopid = header.get('OperationID')
@@ -959,18 +1048,17 @@ class WsManClient(HTTPClient):
                     self.debug2(f"Command stderr: {line}")
 
             # Mock exit code and done state
-            exitcode = cmdstate.get('ExitCode')
-            if exitcode is not None:
+            if cmdstate.get('ExitCode') is not None:
+                exitcode = cmdstate.get('ExitCode')
                 self.debug2(f"Command exited with code: {exitcode}")
                 # Mock stream completeness check
                 # self.debug2("Command stdout seems truncated") unless streams.stdout_is_full(cid)
                 # self.debug2("Command stderr seems truncated") unless streams.stderr_is_full(cid)
-                self._exitcode = exitcode
 
             if cmdstate.get('Done'): # Mock cmdstate->done(cid)
                 break
 
-        return stdout
+        return stdout, exitcode
 
     def signal(self, sid: SessionId, resource: ResourceURI, selectorset: SelectorSet, cid: str, signal: str):
         """Sends a signal (e.g., terminate) to a running shell command."""
@@ -1013,7 +1101,7 @@ class WsManClient(HTTPClient):
         if not isinstance(header, Header): return self.abort("Malformed signal response, no 'Header' node found")
         respaction = header.action()
         if not isinstance(respaction, Action): return self.abort("Malformed signal response, no 'Action' found in Header")
-        if not respaction.is('signalresponse'): return self.abort(f"Not a signal response but {respaction.what()}")
+        if not respaction.is_action('signalresponse'): return self.abort(f"Not a signal response but {respaction.what()}")
         related = header.get('RelatesTo')
         if not related or related.string() != messageid.string(): return self.abort("Got message not related to signal request")
         thisopid = header.get('OperationID')
@@ -1054,7 +1142,7 @@ class WsManClient(HTTPClient):
         if not isinstance(header, Header): return self.abort("Malformed delete response, no 'Header' node found")
         respaction = header.action()
         if not isinstance(respaction, Action): return self.abort("Malformed delete response, no 'Action' found in Header")
-        if not respaction.is('deleteresponse'): return self.abort(f"Not a delete response but {respaction.what()}")
+        if not respaction.is_action('deleteresponse'): return self.abort(f"Not a delete response but {respaction.what()}")
         related = header.get('RelatesTo')
         if not related or related.string() != messageid.string(): return self.abort("Got message not related to delete request")
         thisopid = header.get('OperationID')
@@ -1079,7 +1167,6 @@ class WsManClient(HTTPClient):
 
 if __name__ == '__main__':
     # This block provides a minimal example of how the class would be used.
-    import sys
     
     # Simple Logger Mock
     class LoggerMock:
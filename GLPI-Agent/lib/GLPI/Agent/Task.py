@@ -15,6 +15,8 @@ from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
+from GLPI.Agent.Tools.Manifest import get_modules_manifest
+
 # Import actual Logger from converted module
 try:
     from .logger import Logger
@@ -136,26 +138,14 @@ class GLPITask(ABC):
             # Default to current class name
             task = self.__class__.__name__.replace('Task', '')
         
+        package_name = f"GLPI.Agent.Task.{task}"
+
+        # Modules are listed from the task manifest, so without importing them
+        manifest = get_modules_manifest(package_name, logger=self.logger)
+        if manifest is not None:
+            return sorted(manifest)
+
         modules = []
-        
-        # Determine package name
-        # If this is glpi_agent.task.inventory.InventoryTask,
-        # we want to find modules in glpi_agent.task.inventory package
-        current_module = self.__class__.__module__
-        parts = current_module.split('.')
-        
-        # Build package path
-        if len(parts) >= 3 and parts[-2] == 'task':
-            # We're in glpi_agent.task.something
-            package_name = '.'.join(parts[:-1])
-        else:
-            # Try to construct from task name
-            if '.' in current_module:
-                base = '.'.join(current_module.split('.')[:-1])
-                package_name = f"{base}.task.{task.lower()}"
-            else:
-                package_name = f"glpi_agent.task.{task.lower()}"
-        
         try:
             # Import the package
             package = importlib.import_module(package_name)
@@ -7,7 +7,6 @@ This module handles data collection tasks from the GLPI server.
 import hashlib
 import os
 import re
-from pathlib import Path
 from typing import Dict, List, Any, Callable, Optional
 
 from GLPI.Agent.Task.Collect.Version import VERSION
@@ -20,6 +19,17 @@ _OPTIONAL = 0
 _MANDATORY = 1
 _OPTIONAL_EXCLUSIVE = 2
 
+# findFile doesn't walk pseudo file systems
+PRUNED_DIRS = ('/proc', '/sys', '/dev')
+
+# findFile files are hashed by chunks of this size
+FIND_FILE_CHUNK_SIZE = 1024 * 1024
+
+# findFile digests cache in target storage, keyed by device, inode, size
+# and modification time of files, see collect-checksums-cache option
+CHECKSUMS_STORAGE = 'collect-checksums'
+CHECKSUMS_CACHE_SIZE = 100000
+
 
 class CollectTask:
     """GLPI Agent Collect Task"""
@@ -31,6 +41,11 @@ class CollectTask:
         self.target = target
         self.deviceid = deviceid
         self.client = None
+        self._checksums = None
+        self._checksums_updated = False
+        # Cached digests used during this run
+        self._checksums_used = set()
+        self._checksums_pruned = False
         
         # Function mapping
         self.functions: Dict[str, Callable] = {
@@ -445,132 +460,231 @@ class CollectTask:
         
         return [result]
 
-    def _find_file(self, logger=None, dir='/', limit=50, recursive=False, 
+    def _find_file(self, logger=None, dir='/', limit=50, recursive=False,
                    filter=None, **kwargs) -> List[Dict]:
         """
         Find files matching specified criteria.
-        
+
+        Directories are walked with os.scandir and filters are applied from
+        the cheapest to the most expensive one: entry type and name filters
+        don't need any stat, size filters need one stat, and files are only
+        hashed when all other filters passed. Computed digests are cached in
+        target storage, so a file is not read again until it changes.
+
         Args:
             logger: Logger instance
             dir: Directory to search in
             limit: Maximum number of results
             recursive: Whether to search recursively
             filter: Dictionary of filter criteria
-        
+
         Returns:
             List of dictionaries with 'size' and 'path' keys
         """
         if filter is None:
             filter = {}
-        
-        search_dir = Path(dir)
-        if not search_dir.exists() or not search_dir.is_dir():
+
+        if not os.path.isdir(dir):
             return []
-        
+
         if logger:
             logger.debug(f"Looking for file under '{dir}' folder")
-        
+
+        # checkSumSHA2 is historic, was sha256
+        checksums = {}
+        if filter.get('checkSumSHA512'):
+            checksums['sha512'] = filter['checkSumSHA512'].lower()
+        if filter.get('checkSumSHA256') or filter.get('checkSumSHA2'):
+            checksums['sha256'] = (filter.get('checkSumSHA256') or filter['checkSumSHA2']).lower()
+
+        is_dir = filter.get('is_dir', False) and not checksums
+        is_file = filter.get('is_file', False)
+        name = filter.get('name')
+        iname = filter['iname'].lower() if 'iname' in filter else None
+
+        regex = None
+        if 'regex' in filter:
+            try:
+                regex = re.compile(filter['regex'])
+            except re.error as e:
+                if logger:
+                    logger.error(f"Invalid findFile regex '{filter['regex']}': {e}")
+                return []
+
         results = []
-        
-        def check_file(file_path: Path) -> bool:
-            """Check if file matches all filters"""
-            # Check directory filter
-            is_dir_filter = filter.get('is_dir', False)
-            is_file_filter = filter.get('is_file', False)
-            checksum_sha512 = filter.get('checkSumSHA512')
-            checksum_sha2 = filter.get('checkSumSHA2')
-            checksum_sha256 = filter.get('checkSumSHA256')
-            
-            if is_dir_filter and not checksum_sha512 and not checksum_sha2:
-                if not file_path.is_dir():
-                    return False
-            
-            if is_file_filter:
-                if not file_path.is_file():
-                    return False
-            
-            filename = file_path.name
-            
-            # Name filter (case-sensitive)
-            if 'name' in filter:
-                if filename != filter['name']:
-                    return False
-            
-            # Name filter (case-insensitive)
-            if 'iname' in filter:
-                if filename.lower() != filter['iname'].lower():
-                    return False
-            
-            # Regex filter
-            if 'regex' in filter:
-                if not re.search(filter['regex'], str(file_path)):
-                    return False
-            
-            # Get file size
+        stack = [dir]
+        while stack and len(results) < limit:
             try:
-                size = file_path.stat().st_size
-            except (OSError, IOError):
-                return False
-            
-            # Size filters
-            if 'sizeEquals' in filter:
-                if size != filter['sizeEquals']:
-                    return False
-            
-            if 'sizeGreater' in filter:
-                if size < filter['sizeGreater']:
-                    return False
-            
-            if 'sizeLower' in filter:
-                if size > filter['sizeLower']:
-                    return False
-            
-            # SHA512 checksum filter
-            if checksum_sha512:
-                try:
-                    with open(file_path, 'rb') as f:
-                        sha512 = hashlib.sha512(f.read()).hexdigest()
-                        if sha512 != checksum_sha512.lower():
-                            return False
-                except (OSError, IOError):
-                    return False
-            
-            # SHA256 checksum filter (checkSumSHA2 is historic, was sha256)
-            expected_sha256 = checksum_sha256 or checksum_sha2
-            if expected_sha256:
+                with os.scandir(stack.pop()) as iterator:
+                    entries = list(iterator)
+            except OSError:
+                continue
+
+            subdirs = []
+            for entry in entries:
                 try:
-                    with open(file_path, 'rb') as f:
-                        sha256 = hashlib.sha256(f.read()).hexdigest()
-                        if sha256 != expected_sha256.lower():
-                            return False
-                except (OSError, IOError):
-                    return False
-            
-            # All filters passed
-            if logger:
-                logger.debug2(f"Found file: {file_path}")
-            
-            results.append({
-                'size': size,
-                'path': str(file_path)
-            })
-            
-            return True
-        
-        # Traverse directory
-        if recursive:
-            for file_path in search_dir.rglob('*'):
-                check_file(file_path)
-                if len(results) >= limit:
-                    break
-        else:
-            for file_path in search_dir.iterdir():
-                check_file(file_path)
+                    if recursive and entry.is_dir(follow_symlinks=False) \
+                            and entry.path not in PRUNED_DIRS:
+                        subdirs.append(entry.path)
+
+                    if is_dir and not entry.is_dir():
+                        continue
+                    if is_file and not entry.is_file():
+                        continue
+                    if name is not None and entry.name != name:
+                        continue
+                    if iname is not None and entry.name.lower() != iname:
+                        continue
+                    if regex and not regex.search(entry.path):
+                        continue
+                    # Only regular files can match a checksum, don't
+                    # block reading a fifo or a device
+                    if checksums and not entry.is_file():
+                        continue
+
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                size = stat.st_size
+                if 'sizeEquals' in filter and size != filter['sizeEquals']:
+                    continue
+                if 'sizeGreater' in filter and size < filter['sizeGreater']:
+                    continue
+                if 'sizeLower' in filter and size > filter['sizeLower']:
+                    continue
+
+                if checksums:
+                    digests = self._get_file_digests(entry.path, stat, list(checksums))
+                    if not digests or any(digests[algorithm] != checksum
+                                          for algorithm, checksum in checksums.items()):
+                        continue
+
+                if logger:
+                    logger.debug2(f"Found file: {entry.path}")
+
+                results.append({
+                    'size': size,
+                    'path': entry.path
+                })
                 if len(results) >= limit:
                     break
-        
+
+            # Walk subdirectories in scandir order
+            stack.extend(reversed(subdirs))
+
+        if self._checksums_updated:
+            self._save_checksums()
+
         return results
 
+    def _checksums_cache_size(self) -> int:
+        """Get the maximum number of files with cached digests"""
+        size = (self.config or {}).get('collect-checksums-cache')
+        try:
+            return max(int(size), 0) if size is not None else CHECKSUMS_CACHE_SIZE
+        except (TypeError, ValueError):
+            return CHECKSUMS_CACHE_SIZE
+
+    def _restore_checksums(self) -> Dict[tuple, tuple]:
+        """
+        Get file digests cache, restored from target storage on first call.
+
+        Returns:
+            Path and digests by algorithm tuples by file key
+        """
+        if self._checksums is None:
+            storage = self.target.getStorage() if self.target else None
+            checksums = storage.restore(name=CHECKSUMS_STORAGE) if storage else None
+            # Forget cache from older format
+            if not isinstance(checksums, dict) or \
+                    not all(isinstance(value, tuple) for value in checksums.values()):
+                checksums = {}
+            self._checksums = checksums
+        return self._checksums
+
+    def _prune_checksums(self) -> None:
+        """Drop cached digests of files which vanished or changed"""
+        checksums = self._restore_checksums()
+        for key in [key for key in checksums if key not in self._checksums_used]:
+            try:
+                stat = os.stat(checksums[key][0])
+            except OSError:
+                stat = None
+            if not stat or (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns) != key:
+                del checksums[key]
+                self._checksums_updated = True
+        self._checksums_pruned = True
+
+    def _save_checksums(self) -> None:
+        """Save file digests cache in target storage"""
+        if not self._checksums_pruned:
+            self._prune_checksums()
+
+        storage = self.target.getStorage() if self.target else None
+        if storage:
+            storage.save(name=CHECKSUMS_STORAGE, data=self._restore_checksums())
+        self._checksums_updated = False
+
+    def _get_file_digests(self, path: str, stat: os.stat_result,
+                          algorithms: List[str]) -> Optional[Dict[str, str]]:
+        """
+        Get file digests, from cache if the file didn't change.
+
+        Args:
+            path: File path
+            stat: File stat result
+            algorithms: hashlib algorithms names
+
+        Returns:
+            Digests by algorithm, or None if file can't be read
+        """
+        # DirEntry.stat() doesn't set device and inode on Windows
+        if not stat.st_ino:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+
+        checksums = self._restore_checksums()
+        key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        digests = checksums[key][1] if key in checksums else {}
+        missing = [algorithm for algorithm in algorithms if algorithm not in digests]
+
+        if missing:
+            hashes = [hashlib.new(algorithm) for algorithm in missing]
+            try:
+                with open(path, 'rb') as handle:
+                    for chunk in iter(lambda: handle.read(FIND_FILE_CHUNK_SIZE), b''):
+                        for digest in hashes:
+                            digest.update(chunk)
+                    after = os.fstat(handle.fileno())
+            except OSError:
+                return None
+
+            digests = dict(digests)
+            digests.update(
+                (algorithm, digest.hexdigest()) for algorithm, digest in zip(missing, hashes)
+            )
+            # Don't cache digests of a file updated while it was read
+            if (after.st_size, after.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+                return digests
+
+            # When cache is full, make room from vanished or changed files
+            # once, then keep cached digests rather than evicting ones the
+            # next run of the same walk would need
+            if key not in checksums and len(checksums) >= self._checksums_cache_size() \
+                    and not self._checksums_pruned:
+                self._prune_checksums()
+            if key not in checksums and len(checksums) >= self._checksums_cache_size():
+                return digests
+
+            checksums[key] = (path, digests)
+            self._checksums_updated = True
+
+        self._checksums_used.add(key)
+        return digests
+
     def _run_command(self, logger=None, command=None, filter=None, **kwargs) -> List[Dict]:
         """
         Run a command and return output.
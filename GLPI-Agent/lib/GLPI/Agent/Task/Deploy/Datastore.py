@@ -1,6 +1,7 @@
 import os
 import glob
 import shutil
+import threading
 import time
 from pathlib import Path
 from typing import Optional
@@ -29,6 +30,10 @@ class Datastore:
         # P2P network storage (lazy initialized)
         self._p2pnetstorage = None
         self._save_expiration = None
+        
+        # Verified file parts: sha512 -> [path, size, mtime_ns, inode]
+        self._verified_parts = None
+        self._verified_parts_lock = threading.Lock()
     
     def cleanUp(self) -> int:
         """Clean up expired files and directories, return remaining count"""
@@ -137,8 +142,8 @@ class Datastore:
         # Return True if less than 2GB (2000MB) free
         return free_space < 2000
     
-    def getP2PNet(self) -> Optional[dict]:
-        """Get P2P network peer information from storage"""
+    def _getStorage(self) -> Optional[Storage]:
+        """Get agent storage, shared by P2P network and verified parts data"""
         if not self._p2pnetstorage:
             if not self.config or not self.config.get('vardir'):
                 return None
@@ -152,7 +157,11 @@ class Datastore:
                 self.logger.error(f"Failed to create P2P storage: {e}")
                 return None
         
-        if not self._p2pnetstorage:
+        return self._p2pnetstorage
+    
+    def getP2PNet(self) -> Optional[dict]:
+        """Get P2P network peer information from storage"""
+        if not self._getStorage():
             return None
         
         try:
@@ -161,18 +170,78 @@ class Datastore:
             self.logger.error(f"Failed to restore P2P network data: {e}")
             return None
     
-    def saveP2PNet(self, peers: dict):
+    def saveP2PNet(self, peers: dict, force: bool = False):
         """Save P2P network peer information to storage"""
-        if not self._p2pnetstorage or not peers:
+        if not self._getStorage() or not peers:
             return
         
         # Don't save too often - use 60 second throttling
         current_time = time.time()
-        if self._save_expiration and current_time <= self._save_expiration:
+        if not force and self._save_expiration and current_time <= self._save_expiration:
             return
         
         try:
             self._p2pnetstorage.save(name="p2pnet", data=peers)
             self._save_expiration = current_time + 60
         except Exception as e:
-            self.logger.error(f"Failed to save P2P network data: {e}")
\ No newline at end of file
+            self.logger.error(f"Failed to save P2P network data: {e}")
+    
+    def _getVerifiedParts(self) -> dict:
+        if self._verified_parts is None:
+            storage = self._getStorage()
+            parts = storage.restore(name="deploy-parts") if storage else None
+            self._verified_parts = parts if isinstance(parts, dict) else {}
+        return self._verified_parts
+    
+    def checkVerifiedPart(self, sha512: str, path: str) -> bool:
+        """
+        Check a file part was verified, so it doesn't need to be hashed again.
+        
+        A part is still verified while its size, mtime and inode don't change,
+        so even after it has been moved to a new retention directory.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        
+        with self._verified_parts_lock:
+            parts = self._getVerifiedParts()
+            entry = parts.get(sha512)
+            if not entry or list(entry[1:]) != [stat.st_size, stat.st_mtime_ns, stat.st_ino]:
+                return False
+            parts[sha512] = [path] + list(entry[1:])
+        return True
+    
+    def setVerifiedPart(self, sha512: str, path: str):
+        """Remember a file part has just been verified"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        
+        with self._verified_parts_lock:
+            self._getVerifiedParts()[sha512] = [
+                path, stat.st_size, stat.st_mtime_ns, stat.st_ino
+            ]
+    
+    def saveVerifiedParts(self):
+        """Save verified file parts still stored in datastore"""
+        storage = self._getStorage()
+        if not storage or self._verified_parts is None:
+            return
+        
+        with self._verified_parts_lock:
+            self._verified_parts = {
+                sha512: entry for sha512, entry in self._verified_parts.items()
+                if os.path.exists(entry[0])
+            }
+            parts = dict(self._verified_parts)
+        
+        try:
+            if parts:
+                storage.save(name="deploy-parts", data=parts)
+            else:
+                storage.remove(name="deploy-parts")
+        except Exception as e:
+            self.logger.error(f"Failed to save verified parts data: {e}")
@@ -1,7 +1,10 @@
 import gzip
+import hashlib
+import io
 import os
 import shutil
 import subprocess
+import tarfile
 from pathlib import Path
 from typing import List, TYPE_CHECKING
 
@@ -12,6 +15,74 @@ if TYPE_CHECKING:
     from .file import File
 
 
+# Archives extracted while their parts are read, without assembling them
+STREAMED_ARCHIVES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+
+class FilePartsReader(io.RawIOBase):
+    """
+    Read-only stream on a file content, read from its gzipped parts.
+
+    Parts are opened in turn while reading, and the file sha512 is computed
+    on read data so the file can be verified once fully read.
+    """
+
+    def __init__(self, file: 'File', logger=None):
+        super().__init__()
+        self._file = file
+        self._logger = logger
+        self._parts = iter(file.multiparts)
+        self._part = None
+        self._sha = hashlib.sha512()
+        self.missing = None
+
+    def readable(self) -> bool:
+        return True
+
+    def _next_part(self) -> bool:
+        if self._part:
+            self._part.close()
+            self._part = None
+
+        sha512 = next(self._parts, None)
+        if sha512 is None:
+            return False
+
+        path = self._file.getPartFilePath(sha512)
+        if not Path(path).is_file():
+            # Keep reading as the file sha512 check will fail
+            if self._logger:
+                self._logger.debug(f"Missing multipart element '{path}'")
+            self.missing = path
+            return self._next_part()
+
+        if self._logger:
+            self._logger.debug(f"reading {sha512}")
+        self._part = gzip.open(path, 'rb')
+        return True
+
+    def readinto(self, buffer) -> int:
+        while True:
+            if not self._part and not self._next_part():
+                return 0
+            count = self._part.readinto(buffer)
+            if count:
+                self._sha.update(memoryview(buffer)[:count])
+                return count
+            self._part.close()
+            self._part = None
+
+    def close(self):
+        if self._part:
+            self._part.close()
+            self._part = None
+        super().close()
+
+    def verified(self) -> bool:
+        """Check file sha512, to be called when fully read"""
+        return self._sha.hexdigest() == self._file.sha512
+
+
 class WorkDir:
     def __init__(self, **params):
         self.path = params.get('path')
@@ -34,8 +105,15 @@ class WorkDir:
         self.files.append(file)
     
     def prepare(self) -> bool:
-        """Prepare work directory by assembling and extracting files"""
+        """
+        Prepare work directory by assembling and extracting files.
+        
+        Parts are read in a single pass, verifying the file sha512 while
+        reading. Tar archives to uncompress are extracted from this stream,
+        other files are written once to the work directory.
+        """
         logger = self.logger
+        archives = []
         
         # Rebuild complete files from file parts
         for file in self.files:
@@ -59,76 +137,106 @@ class WorkDir:
                 if '.tar.gz' in file.name_local.lower():
                     file.name_local = f"{short_sha512}.tar.gz"
                 else:
-                    # Handle other archive extensions
-                    for ext in ['.tar', '.gz', '.7z', '.bz2']:
+                    # Handle other archive extensions, keeping tar ones so
+                    # they are still extracted while reading parts
+                    for ext in STREAMED_ARCHIVES + ('.gz', '.7z', '.bz2'):
                         if file.name_local.lower().endswith(ext):
                             file.name_local = f"{short_sha512}{ext}"
                             break
             
             final_file_path = Path(self.path) / file.name_local
             
-            # Open final file for writing
-            try:
-                with open(final_file_path, 'wb') as fh:
-                    for sha512 in file.multiparts:
-                        part_file_path = file.getPartFilePath(sha512)
-                        
-                        if not Path(part_file_path).is_file():
-                            logger.debug(f"Missing multipart element '{part_file_path}'")
-                            continue
-                        
-                        try:
-                            # Read gzipped part file
-                            with gzip.open(part_file_path, 'rb') as part:
-                                logger.debug(f"reading {sha512}")
-                                while True:
-                                    buf = part.read(1024)
-                                    if not buf:
-                                        break
-                                    fh.write(buf)
-                        except Exception as e:
-                            logger.info(f"Failed to open '{part_file_path}': {e}")
-                            return False
+            if file.uncompress and file.name_local.lower().endswith(STREAMED_ARCHIVES):
+                if not self._extract_stream(file):
+                    return False
+                continue
             
+            # Write final file
+            reader = FilePartsReader(file, logger)
+            try:
+                with reader, open(final_file_path, 'wb') as fh:
+                    shutil.copyfileobj(reader, fh, 1048576)
             except Exception as e:
-                logger.debug(f"Failed to open '{final_file_path}': {e}")
+                logger.info(f"Failed to construct '{final_file_path}': {e}")
                 return False
             
             # Validate assembled file
-            if not file.validateFileByPath(str(final_file_path)):
+            if not reader.verified():
                 logger.info(f"Failed to construct the final file: {final_file_path}")
                 return False
-        
-        # Extract compressed files
-        for file in self.files:
-            final_file_path = Path(self.path) / file.name_local
             
             if file.uncompress:
-                success = False
-                
-                # Try 7z first if available
-                if self._can_run('7z'):
-                    success = self._extract_with_7z(str(final_file_path))
-                
-                # Fall back to Python archive extraction
-                if not success:
-                    try:
-                        archive = Archive(archive=str(final_file_path))
-                        if archive:
-                            success = archive.extract(to=self.path)
-                        else:
-                            logger.info("Failed to create Archive object")
-                    except Exception as e:
-                        logger.debug(f"Failed to extract '{final_file_path}': {e}")
-                
-                # Remove original compressed file after extraction
+                archives.append(final_file_path)
+        
+        # Extract other compressed files
+        for final_file_path in archives:
+            success = False
+            
+            # Try 7z first if available
+            if self._can_run('7z'):
+                success = self._extract_with_7z(str(final_file_path))
+            
+            # Fall back to Python archive extraction
+            if not success:
                 try:
-                    final_file_path.unlink()
-                except:
+                    archive = Archive(file=str(final_file_path), logger=logger)
+                    if archive:
+                        success = archive.extract(to=self.path)
+                    else:
+                        logger.info("Failed to create Archive object")
+                except Exception as e:
+                    logger.debug(f"Failed to extract '{final_file_path}': {e}")
+            
+            # Remove original compressed file after extraction
+            try:
+                final_file_path.unlink()
+            except:
+                pass
+        
+        return True
+    
+    def _extract_stream(self, file: 'File') -> bool:
+        """
+        Extract a tar archive, possibly compressed, while reading its parts.
+        
+        Extracted content is removed if the archive sha512 doesn't match.
+        """
+        logger = self.logger
+        reader = FilePartsReader(file, logger)
+        
+        try:
+            with reader, io.BufferedReader(reader, 1048576) as stream:
+                with tarfile.open(fileobj=stream, mode='r|*') as tar:
+                    if hasattr(tarfile, 'data_filter'):
+                        tar.extractall(self.path, filter='data')
+                    else:
+                        tar.extractall(self.path)
+                # Read any trailing data so the whole file is verified
+                while stream.read(1048576):
                     pass
+                verified = reader.verified()
+        except Exception as e:
+            logger.info(f"Failed to extract {file.name}: {e}")
+            verified = False
+        
+        if not verified:
+            logger.info(f"Failed to construct the final file: {file.name}")
+            self._clean()
+            return False
         
         return True
     
+    def _clean(self):
+        """Remove work directory content"""
+        for entry in os.scandir(self.path):
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                try:
+                    os.unlink(entry.path)
+                except OSError:
+                    pass
+    
     def _can_run(self, command: str) -> bool:
         """Check if a command is available in PATH"""
         try:
@@ -1,18 +1,39 @@
 import hashlib
 import os
 import shutil
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Optional, TYPE_CHECKING
 
 from ....logger import Logger
 
+try:
+    import requests
+except ImportError:
+    requests = None
+
+try:
+    from GLPI.Agent.Task.Deploy.P2P import P2P
+except ImportError:
+    P2P = None
+
 if TYPE_CHECKING:
     from .datastore import Datastore
     from ....http.fusion_client import FusionClient
 
 
 class File:
+    # Parts downloaded concurrently
+    DOWNLOAD_WORKERS = 4
+    
+    # Each part is tried on all sources this number of times
+    DOWNLOAD_RETRIES = 2
+    
+    # Parts are streamed to disk and hashed by chunks of this size
+    DOWNLOAD_CHUNK_SIZE = 1048576
+    
     def __init__(self, **params):
         if not params.get('datastore'):
             raise ValueError("No datastore parameter")
@@ -48,6 +69,10 @@ class File:
         
         # P2P network instance (lazy loaded)
         self.p2pnet = None
+        
+        # Last peer a part was downloaded from, tried first for next parts
+        self._last_peer = None
+        self._last_peer_lock = threading.Lock()
     
     def normalizedPartFilePath(self, sha512: str) -> Optional[str]:
         """Get normalized file path for a part based on SHA512"""
@@ -122,10 +147,10 @@ class File:
             if Path(current_path).is_file():
                 new_path = self.normalizedPartFilePath(sha512)
                 if new_path and current_path != new_path:
-                    updates[current_path] = new_path
+                    updates[current_path] = (new_path, sha512)
         
         # Perform the moves
-        for old_path, new_path in updates.items():
+        for old_path, (new_path, sha512) in updates.items():
             try:
                 # Create parent directories
                 Path(new_path).parent.mkdir(parents=True, exist_ok=True)
@@ -135,6 +160,10 @@ class File:
                 
                 # Clean up old path
                 self._cleanPath(old_path)
+                
+                # Moved part keeps its verified state
+                if hasattr(self.datastore, 'checkVerifiedPart'):
+                    self.datastore.checkVerifiedPart(sha512, new_path)
             except Exception as e:
                 self.logger.error(f"Failed to move {old_path} to {new_path}: {e}")
     
@@ -168,88 +197,130 @@ class File:
         return self.normalizedPartFilePath(sha512) or ""
     
     def download(self):
-        """Download all file parts from mirrors and P2P peers"""
+        """
+        Download all file parts from mirrors and P2P peers.
+        
+        Missing parts are downloaded concurrently. Each part is streamed to
+        disk while being hashed, and only moved to its final path when its
+        sha512 is verified. A part failing on a source is tried on the next
+        one, peers first, then mirrors.
+        """
         if not self.mirrors:
             self.logger.error("No mirror set on deploy job")
             raise RuntimeError("No mirrors configured")
         
         # Get configuration from datastore
-        config = getattr(self.datastore, 'config', {})
+        config = getattr(self.datastore, 'config', None) or {}
         port = config.get('httpd-port', 62354)
-        workers = max(config.get('remote-workers', 10), 10)
         
         # Try to set up P2P if enabled
         peers = []
-        if self.p2p:
+        if self.p2p and P2P:
             try:
-                # This would require implementing the P2P module
-                # For now, we'll skip P2P functionality
-                self.logger.debug("P2P functionality not implemented in Python version")
+                self.p2pnet = P2P(
+                    logger=self.logger,
+                    datastore=self.datastore,
+                    max_workers=max(config.get('remote-workers') or 10, 10)
+                )
+                peers = self.p2pnet.find_peers(port)
             except Exception as e:
                 self.logger.debug(f"Failed to enable P2P: {e}")
+                self.p2pnet = None
+                peers = []
+        
+        parts = [
+            sha512 for sha512 in self.multiparts
+            if not self._isPartDownloaded(sha512)
+        ]
+        
+        failed = []
+        if parts:
+            workers = min(self.DOWNLOAD_WORKERS, len(parts))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(self._downloadPart, sha512, peers, port): sha512
+                    for sha512 in parts
+                }
+                for future in as_completed(futures):
+                    try:
+                        downloaded = future.result()
+                    except Exception as e:
+                        self.logger.debug(f"Part {futures[future]} download failure: {e}")
+                        downloaded = False
+                    if not downloaded:
+                        failed.append(futures[future])
+        
+        if hasattr(self.datastore, 'saveVerifiedParts'):
+            self.datastore.saveVerifiedParts()
+        
+        # Save peers scores for next downloads
+        if self.p2pnet:
+            try:
+                self.p2pnet.save()
+            except Exception as e:
+                self.logger.debug(f"Failed to save P2P peers: {e}")
+        
+        if failed:
+            self.logger.debug(
+                f"{len(failed)}/{len(self.multiparts)} parts of {self.name} not downloaded"
+            )
+    
+    def _isPartDownloaded(self, sha512: str) -> bool:
+        """Check a part is stored, only hashing it if not already verified"""
+        path = self.getPartFilePath(sha512)
+        if not Path(path).is_file():
+            return False
         
-        last_peer = None
-        next_path_update = self._getNextPathUpdateTime()
+        if hasattr(self.datastore, 'checkVerifiedPart') \
+                and self.datastore.checkVerifiedPart(sha512, path):
+            return True
         
-        # Download each part
-        for sha512 in self.multiparts:
-            path = self.getPartFilePath(sha512)
-            
-            # Skip if file exists and validates
-            if Path(path).is_file() and self._getSha512ByFile(path) == sha512:
-                continue
+        if self._getSha512ByFile(path) != sha512:
+            return False
+        
+        if hasattr(self.datastore, 'setVerifiedPart'):
+            self.datastore.setVerifiedPart(sha512, path)
+        return True
+    
+    def _downloadPart(self, sha512: str, peers: List[str], port: int) -> bool:
+        """Download a part, trying every peer and mirror"""
+        for attempt in range(self.DOWNLOAD_RETRIES):
+            if attempt:
+                self.logger.debug2(f"Retrying part {sha512} download")
+                time.sleep(attempt)
             
-            # Create parent directory
+            # Path is computed for each try so retention time starts from now
+            path = self.getPartFilePath(sha512)
             Path(path).parent.mkdir(parents=True, exist_ok=True)
             
-            # Try last successful peer first
-            if last_peer:
-                if self._downloadPeer(last_peer, sha512, path, port):
-                    continue
+            # Try last successful peer first, as it should have next parts,
+            # then best ranked peers
+            with self._last_peer_lock:
+                last_peer = self._last_peer
+            if self.p2pnet:
+                peers = self.p2pnet.get_peers()
+            sources = [last_peer] if last_peer else []
+            sources.extend(peer for peer in peers if peer != last_peer)
             
-            # Try all peers
-            success = False
-            for peer in peers:
+            for peer in sources:
+                start = time.time()
                 if self._downloadPeer(peer, sha512, path, port):
-                    last_peer = peer
-                    success = True
-                    break
-                
-                # Update file path periodically during long searches
-                if time.time() > next_path_update:
-                    new_path = self.normalizedPartFilePath(sha512)
-                    if new_path:
-                        path = new_path
-                    next_path_update = self._getNextPathUpdateTime()
-            
-            if success:
-                continue
+                    with self._last_peer_lock:
+                        self._last_peer = peer
+                    if self.p2pnet:
+                        self.p2pnet.record_success(
+                            peer, os.path.getsize(path), time.time() - start
+                        )
+                    return True
+                with self._last_peer_lock:
+                    if self._last_peer == peer:
+                        self._last_peer = None
             
-            # Try mirrors
             for mirror in self.mirrors:
                 if self._download(mirror, sha512, path):
-                    success = True
-                    break
-                
-                # Update file path periodically
-                if time.time() > next_path_update:
-                    new_path = self.normalizedPartFilePath(sha512)
-                    if new_path:
-                        path = new_path
-                    next_path_update = self._getNextPathUpdateTime()
-            
-            # Check if we failed to download
-            if not success:
-                if not last_peer and not peers and not self.mirrors:
-                    self.logger.debug("Can't download part as no mirror is defined")
-                    self.logger.debug("You probably missed to enable the GLPI option to use GLPI server as a mirror")
-                    self.logger.error("Aborting download: no mirror")
-                    break
-    
-    def _getNextPathUpdateTime(self) -> float:
-        """Get next path update time (aligned to minute boundary)"""
-        current_time = time.time()
-        return current_time + 60 - (current_time % 60)
+                    return True
+        
+        return False
     
     def _downloadPeer(self, peer: str, sha512: str, path: str, port: int) -> bool:
         """Download from a P2P peer"""
@@ -257,7 +328,7 @@ class File:
         return self._download(source, sha512, path, peer)
     
     def _download(self, source: str, sha512: str, path: str, peer: Optional[str] = None) -> bool:
-        """Download a file part from a source URL"""
+        """Download a file part from a source URL, streaming it to disk"""
         if not source.startswith(('http://', 'https://')):
             self.logger.error(f"Source or mirror is not a valid URL: {source}")
             return False
@@ -278,52 +349,70 @@ class File:
         # Set timeout based on whether this is a peer or mirror
         timeout = 1 if peer else 180
         
+        # Part is only visible at its path once verified
+        temp = f"{path}.download"
+        sha = hashlib.sha512()
+        
         try:
-            # Make HTTP request
             if self.client:
                 # Use the existing HTTP client
-                response = self.client.request('GET', url, timeout=timeout)
-                
+                response = self.client.request(
+                    requests.Request('GET', url), timeout=timeout, stream=True
+                )
+            else:
+                # Fall back to basic HTTP request
+                response = requests.get(url, timeout=timeout, stream=True)
+            
+            try:
                 if response.status_code != 200:
                     if peer and (response.status_code != 404 or 'Nothing found' in response.text):
                         self.logger.debug2(f"Remote peer {peer} is useless, we should forget it for a while")
                         if self.p2pnet:
-                            self.p2pnet.forgetPeer(peer)
-                    return False
-                
-                # Write response content to file
-                with open(path, 'wb') as f:
-                    f.write(response.content)
-            else:
-                # Fall back to basic HTTP request
-                import requests
-                response = requests.get(url, timeout=timeout)
-                
-                if response.status_code != 200:
+                            self.p2pnet.forget_peer(peer)
+                    elif peer and self.p2pnet:
+                        # Peer doesn't have this part
+                        self.p2pnet.record_failure(peer)
                     return False
                 
-                with open(path, 'wb') as f:
-                    f.write(response.content)
+                with open(temp, 'wb') as handle:
+                    for chunk in response.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE):
+                        sha.update(chunk)
+                        handle.write(chunk)
+            finally:
+                response.close()
         
         except Exception as e:
             self.logger.debug(f"Download failed for {url}: {e}")
-            return False
-        
-        # Verify file exists
-        if not Path(path).is_file():
+            self._removeFile(temp)
+            if peer and self.p2pnet:
+                self.p2pnet.forget_peer(peer)
             return False
         
         # Validate SHA512
-        if self._getSha512ByFile(path) != sha512:
+        if sha.hexdigest() != sha512:
             self.logger.debug(f"SHA512 failure: {sha512}")
-            try:
-                Path(path).unlink()
-            except:
-                pass
+            self._removeFile(temp)
             return False
         
+        try:
+            os.replace(temp, path)
+        except OSError as e:
+            self.logger.debug(f"Failed to store part {path}: {e}")
+            self._removeFile(temp)
+            return False
+        
+        if hasattr(self.datastore, 'setVerifiedPart'):
+            self.datastore.setVerifiedPart(sha512, path)
+        
         return True
     
+    @staticmethod
+    def _removeFile(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    
     def filePartsExists(self) -> bool:
         """Check if all file parts exist"""
         for sha512 in self.multiparts:
@@ -337,7 +426,7 @@ class File:
         try:
             sha512_hash = hashlib.sha512()
             with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b""):
+                for chunk in iter(lambda: f.read(self.DOWNLOAD_CHUNK_SIZE), b""):
                     sha512_hash.update(chunk)
             return sha512_hash.hexdigest()
         except Exception as e:
@@ -2,21 +2,41 @@
 GLPI Agent Task Deploy P2P Module
 
 Peer-to-peer file distribution for deployment tasks.
+
+Peers are agents of the local subnets with their HTTP server listening. They
+are found by probing addresses around the agent ones with a TCP connection
+on agent port. Found peers are kept in a cache saved in agent storage, with
+an expiration time and a score:
+- peers are first ranked by their probe latency
+- each part downloaded from a peer updates its throughput, so peers which
+  already served parts and are fast are preferred
+- peers failing to serve parts are demoted, and forgotten when useless
 """
 
-import time
+import ipaddress
 import platform
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 
 
+# Peer probe connection timeout, in seconds
+PROBE_TIMEOUT = 0.5
+
+# Weight of last download in peer throughput average
+THROUGHPUT_WEIGHT = 0.3
+
+
 class P2P:
     """Peer-to-peer network handler for deployment"""
-    
-    def __init__(self, logger=None, datastore=None, max_workers=10, 
+
+    def __init__(self, logger=None, datastore=None, max_workers=10,
                  cache_timeout=1200, scan_timeout=5, max_peers=512, max_size=5000):
         """
         Initialize P2P handler.
-        
+
         Args:
             logger: Logger instance
             datastore: Datastore instance
@@ -34,136 +54,328 @@ class P2P:
         self.max_peers = max_peers
         self.max_size = max_size
         self.p2pnet = {}
-        
+        self._lock = threading.Lock()
+
         # On Windows, max_workers should not be bigger than 60 due to threading limitations
         if platform.system() == 'Windows' and self.max_workers > 60:
             if self.logger:
                 self.logger.info(f"Limiting workers from {self.max_workers} to 60 on Windows")
             self.max_workers = 60
-    
+
     def find_peers(self, port: int) -> List[str]:
         """
         Find peers in the network.
-        
+
         Args:
             port: Port to scan for peers
-        
+
         Returns:
-            List of active peer addresses
+            List of active peer addresses, best ones first
         """
         if self.logger:
             self.logger.info("looking for a peer in the network")
-        
+
         # Load cached peer network
-        if (not self.p2pnet or 'peers' not in self.p2pnet) and self.datastore:
-            self.p2pnet = self.datastore.get_p2p_net() or {}
-        
-        # Check if cached peers are still valid
-        if self.p2pnet and self.p2pnet.get('peerscount'):
-            now = time.time()
-            peers = self.p2pnet.get('peers', [])
-            
-            # Check if any peers have expired
-            all_valid = all(
-                self.p2pnet.get(peer, {}).get('expires', 0) >= now
-                for peer in peers
-            )
-            
-            if all_valid:
-                # Return active peers
-                return [
-                    peer for peer in peers
-                    if self.p2pnet.get(peer, {}).get('active')
-                ]
-        
+        if not self.p2pnet.get('peers') and self.datastore:
+            p2pnet = self.datastore.getP2PNet()
+            if isinstance(p2pnet, dict) and isinstance(p2pnet.get('peers'), dict):
+                self.p2pnet = p2pnet
+
+        # Use cached peers while the scan is not expired
+        if self.p2pnet.get('expires', 0) >= time.time() and self.p2pnet.get('port') == port:
+            peers = self.get_peers()
+            if self.logger:
+                self.logger.debug(f"Using {len(peers)} cached peer(s)")
+            return peers
+
         # Need to scan for new peers
         interfaces = self._get_interfaces()
-        
+
         if not interfaces:
             if self.logger:
                 self.logger.info("No network interfaces found")
             return []
-        
+
         # Find addresses with IP and netmask
         addresses = []
         for interface in interfaces:
             if not interface.get('IPADDRESS') or not interface.get('IPMASK'):
                 continue
-            if interface.get('STATUS', '').lower() != 'up':
+            # Interfaces from ip command have no status
+            if interface.get('STATUS', 'up').lower() != 'up':
                 continue
-            
+
             addresses.append({
                 'ip': interface['IPADDRESS'],
                 'mask': interface['IPMASK']
             })
-        
+
         if not addresses:
             if self.logger:
                 self.logger.info("No local address found")
             return []
-        
-        # Scan for potential peers
+
+        # Scan for potential peers, nearest ones first
         potential_peers = []
         for address in addresses:
-            potential_peers.extend(self._get_potential_peers(address))
-        
+            local = int(ipaddress.IPv4Address(address['ip']))
+            peers = sorted(
+                self._get_potential_peers(address),
+                key=lambda peer: abs(int(ipaddress.IPv4Address(peer)) - local)
+            )
+            for peer in peers:
+                if peer not in potential_peers:
+                    potential_peers.append(peer)
+
         # Scan and validate peers
         return self._scan_peers(potential_peers, port)
-    
+
     def _get_interfaces(self) -> List[Dict]:
         """Get network interfaces for the system"""
-        # Placeholder - would import platform-specific tools
-        # On Linux: from GLPI.Agent.Tools.Linux import get_interfaces_from_ifconfig
-        # On Windows: from GLPI.Agent.Tools.Win32 import get_interfaces
+        system = platform.system()
+        try:
+            if system == 'Linux':
+                from GLPI.Agent.Tools.Linux import (get_interfaces_from_ifconfig,
+                                                    get_interfaces_from_ip)
+                return get_interfaces_from_ifconfig(logger=self.logger) \
+                    or get_interfaces_from_ip(logger=self.logger)
+            if system == 'Windows':
+                return self._get_win32_interfaces()
+            from GLPI.Agent.Tools.BSD import get_interfaces_from_ifconfig
+            return get_interfaces_from_ifconfig(logger=self.logger)
+        except ImportError as e:
+            if self.logger:
+                self.logger.error(f"Can't list network interfaces, P2P disabled: {e}")
         return []
-    
-    def _get_potential_peers(self, address: Dict) -> List[str]:
+
+    def _get_win32_interfaces(self) -> List[Dict]:
+        """Get network interfaces from WMI network adapters"""
+        from GLPI.Agent.Tools.Win32 import get_wmi_objects
+        from GLPI.Agent.Tools.Win32.NetAdapter import NetAdapter
+
+        # Adapters configurations, indexed by adapter index
+        configurations: List[Optional[Dict]] = []
+        for adapter in get_wmi_objects(
+            query="SELECT Index, IPEnabled, MACAddress, IPAddress, IPSubnet "
+                  "FROM Win32_NetworkAdapterConfiguration",
+            properties=['Index', 'IPEnabled', 'MACAddress', 'IPAddress', 'IPSubnet'],
+            logger=self.logger,
+        ):
+            if adapter.get('Index') is None:
+                continue
+            index = int(adapter['Index'])
+            if index >= len(configurations):
+                configurations.extend([None] * (index + 1 - len(configurations)))
+            configurations[index] = {
+                'STATUS': 'Up' if adapter.get('IPEnabled') else 'Down',
+                'MACADDR': adapter.get('MACAddress'),
+                # Only IPv4 addresses are used to find peers
+                'addresses': [
+                    (address, mask) for address, mask in zip(adapter.get('IPAddress') or [],
+                                                             adapter.get('IPSubnet') or [])
+                    if ':' not in address
+                ],
+            }
+
+        interfaces = []
+        for adapter in get_wmi_objects(
+            query="SELECT Index, PNPDeviceID FROM Win32_NetworkAdapter",
+            properties=['Index', 'PNPDeviceID'],
+            logger=self.logger,
+        ):
+            try:
+                interfaces.extend(NetAdapter(adapter, configurations).get_interfaces() or [])
+            except (ValueError, IndexError):
+                # Adapter without configuration or PNP device id
+                continue
+
+        return interfaces
+
+    def _get_potential_peers(self, address: Dict, limit: Optional[int] = None) -> List[str]:
         """
         Get list of potential peer IPs from an address range.
-        
+
+        Addresses are taken around the agent one, half before and half after,
+        completing with addresses on the other side at the network edges.
+
         Args:
             address: Dictionary with 'ip' and 'mask' keys
-        
+            limit: Maximum number of addresses, max_peers by default
+
         Returns:
             List of potential peer IP addresses
         """
-        # Placeholder - would calculate IP range based on address and mask
-        return []
-    
+        limit = limit or self.max_peers
+
+        try:
+            ip = ipaddress.IPv4Address(address['ip'])
+            network = ipaddress.IPv4Network(f"{address['ip']}/{address['mask']}", strict=False)
+        except (KeyError, ValueError):
+            return []
+
+        # Ignore loopback, large networks are limited to addresses around agent one
+        if ip.is_loopback:
+            return []
+
+        # Network and broadcast addresses are not peers
+        first = int(network.network_address) + 1
+        last = int(network.broadcast_address) - 1
+        current = int(ip)
+
+        before = list(range(max(first, current - limit), current))
+        after = list(range(current + 1, min(last, current + limit) + 1))
+
+        half = limit // 2
+        count_before = min(len(before), half)
+        count_after = min(len(after), limit - count_before)
+        extra = min(len(before) - count_before, limit - count_before - count_after)
+
+        # Addresses before and after, then extra ones before if after ones are missing
+        ordered = before[len(before) - count_before:] + after[:count_after]
+        ordered += reversed(before[len(before) - count_before - extra:len(before) - count_before])
+
+        return [str(ipaddress.IPv4Address(peer)) for peer in ordered]
+
+    def _probe(self, peer: str, port: int) -> Optional[float]:
+        """Get peer agent port connection latency, or None if not reachable"""
+        start = time.time()
+        try:
+            with socket.create_connection((peer, port), timeout=PROBE_TIMEOUT):
+                pass
+        except OSError:
+            return None
+        return time.time() - start
+
     def _scan_peers(self, potential_peers: List[str], port: int) -> List[str]:
         """
         Scan potential peers to find active ones.
-        
+
         Args:
             potential_peers: List of IP addresses to scan
             port: Port to check
-        
+
         Returns:
-            List of active peer addresses
+            List of active peer addresses, best ones first
         """
-        # Placeholder - would use threading/multiprocessing to scan peers
-        # Would ping peers and check if they're running the agent
-        return []
-    
-    def get_peer_for_file(self, file_hash: str) -> Optional[str]:
+        now = time.time()
+        known = self.p2pnet.get('peers') or {}
+        peers = {}
+
+        if potential_peers:
+            if self.logger:
+                self.logger.debug(
+                    f"Scanning {len(potential_peers)} potential peer(s) on port {port}"
+                )
+
+            # Keep nearest first order, so nearest peers are probed before
+            # scan timeout
+            workers = min(self.max_workers, len(potential_peers))
+            deadline = now + self.scan_timeout
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                latencies = executor.map(
+                    lambda peer: self._probe(peer, port) if time.time() < deadline else None,
+                    potential_peers
+                )
+                for peer, latency in zip(potential_peers, latencies):
+                    if latency is None:
+                        continue
+                    # Keep throughput known from previous downloads
+                    previous = known.get(peer) or {}
+                    peers[peer] = {
+                        'latency': latency,
+                        'throughput': previous.get('throughput', 0),
+                        'failures': 0,
+                        'expires': now + self.cache_timeout,
+                    }
+
+        with self._lock:
+            self.p2pnet = {
+                'peers': peers,
+                'port': port,
+                'expires': now + self.cache_timeout,
+            }
+        self._save(force=True)
+
+        if self.logger:
+            self.logger.debug(f"Found {len(peers)} peer(s)")
+
+        return self.get_peers()
+
+    def _save(self, force: bool = False):
+        if not self.datastore:
+            return
+        with self._lock:
+            p2pnet = {
+                'peers': {peer: dict(infos) for peer, infos in self.p2pnet.get('peers', {}).items()},
+                'port': self.p2pnet.get('port'),
+                'expires': self.p2pnet.get('expires', 0),
+            }
+        self.datastore.saveP2PNet(p2pnet, force=force)
+
+    def save(self):
+        """Save peers cache with updated scores"""
+        self._save(force=True)
+
+    def get_peers(self) -> List[str]:
         """
-        Get a peer that has the specified file.
-        
-        Args:
-            file_hash: Hash of the file to find
-        
+        Get known peers not expired, best ones first.
+
+        Peers with a known throughput are preferred, fastest first, then
+        peers by probe latency. Peers failing to serve parts are tried last.
+
         Returns:
-            Peer address or None
+            List of peer addresses
         """
-        # Placeholder - would check which peers have the file
-        return None
-    
-    def register_file(self, file_hash: str) -> None:
+        now = time.time()
+        with self._lock:
+            peers = [
+                (peer, infos) for peer, infos in (self.p2pnet.get('peers') or {}).items()
+                if infos.get('expires', 0) >= now
+            ]
+
+        peers.sort(key=lambda item: (
+            item[1].get('failures', 0),
+            -item[1].get('throughput', 0),
+            item[1].get('latency', PROBE_TIMEOUT),
+        ))
+        return [peer for peer, _ in peers[:self.max_peers]]
+
+    def record_success(self, peer: str, size: int, duration: float) -> None:
         """
-        Register a file as available on this peer.
-        
+        Update peer score after a part has been downloaded from it.
+
+        Args:
+            peer: Peer address
+            size: Downloaded part size
+            duration: Download duration in seconds
+        """
+        throughput = size / max(duration, 0.001)
+        with self._lock:
+            infos = (self.p2pnet.get('peers') or {}).get(peer)
+            if not infos:
+                return
+            previous = infos.get('throughput') or throughput
+            infos['throughput'] = (1 - THROUGHPUT_WEIGHT) * previous + THROUGHPUT_WEIGHT * throughput
+            infos['failures'] = 0
+
+    def record_failure(self, peer: str) -> None:
+        """
+        Demote a peer after it didn't serve a part, like when it doesn't have it.
+
+        Args:
+            peer: Peer address
+        """
+        with self._lock:
+            infos = (self.p2pnet.get('peers') or {}).get(peer)
+            if infos:
+                infos['failures'] = infos.get('failures', 0) + 1
+
+    def forget_peer(self, peer: str) -> None:
+        """
+        Forget a useless peer until next scan.
+
         Args:
-            file_hash: Hash of the file to register
+            peer: Peer address
         """
-        # Placeholder - would announce file availability to peers
-        pass
+        with self._lock:
+            (self.p2pnet.get('peers') or {}).pop(peer, None)
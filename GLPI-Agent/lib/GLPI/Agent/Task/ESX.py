@@ -10,11 +10,20 @@ Functions:
 - get_host_ids: Returns the list of host ids
 """
 
-from typing import List, Dict, Optional, Callable, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Callable, Any, Tuple
+import copy
 import math
+import threading
+import time
 
 from GLPI.Agent.Task.ESX.Version import VERSION
 
+try:
+    from GLPI.Agent.SOAP.VMware import VMware
+except ImportError:
+    VMware = None
+
 __version__ = VERSION
 
 
@@ -36,6 +45,7 @@ class ESXTask:
         self._timeout = None
         self.serverclient = None
         self.esx = None
+        self._serverclient_lock = threading.Lock()
     
     def is_enabled(self) -> bool:
         """Check if the task is enabled"""
@@ -60,19 +70,18 @@ class ESXTask:
         """
         url = f'https://{host}/sdk/vimService'
         
+        if VMware is None:
+            self.set_last_error("VMware SOAP support not available")
+            return False
+        
         try:
-            # Would import GLPI.Agent.SOAP.VMware
-            # vpbs = VMwareSOAP(url=url, vcenter=True, timeout=self.timeout())
-            # if not vpbs.connect(user, password):
-            #     self.set_last_error(vpbs.last_error() or "Connection failure")
-            #     return False
-            # 
-            # self.vpbs = vpbs
-            # return True
+            vpbs = VMware(url=url, vcenter=True, timeout=self.timeout())
+            if not vpbs.connect(user, password):
+                self.set_last_error(vpbs.lastError() or "Connection failure")
+                return False
             
-            # Placeholder for now
-            self.set_last_error("VMware SOAP connection not implemented")
-            return False
+            self.vpbs = vpbs
+            return True
             
         except Exception as e:
             self.set_last_error(str(e))
@@ -293,69 +302,102 @@ class ESXTask:
         if self.logger:
             self.logger.info(f"Having to contact {job_count} remote ESX server{plural}")
         
-        # Process each job
-        for job in jobs['jobs']:
-            if not self.connect(
-                host=job.get('host', ''),
-                user=job.get('user', ''),
-                password=job.get('password', '')
-            ):
-                # Send error log to server
-                # self.client.send(
-                #     url=self.esx_remote,
-                #     args={
-                #         'action': 'setLog',
-                #         'machineid': self.deviceid,
-                #         'part': 'login',
-                #         'uuid': job.get('uuid'),
-                #         'msg': self.get_last_error(),
-                #         'code': 'ko'
-                #     }
-                # )
-                continue
-            
-            # Perform server inventory
-            self.server_inventory()
-            
+        # Initialize server client once as it is shared by all jobs
+        if not self._init_server_client():
+            return None
+
+        # Report each job status as soon as it is done
+        for job, part, error in self._run_jobs(jobs['jobs']):
+            if error and self.logger:
+                self.logger.error(f"ESX {job.get('host', '')} {part} failure: {error}")
             # Send result log to server
-            # if self.get_last_error():
-            #     self.client.send(
-            #         url=self.esx_remote,
-            #         args={
-            #             'action': 'setLog',
-            #             'machineid': self.deviceid,
-            #             'part': 'inventory',
-            #             'uuid': job.get('uuid'),
-            #             'msg': self.get_last_error(),
-            #             'code': 'ko'
-            #         }
-            #     )
-            # else:
-            #     self.client.send(
-            #         url=self.esx_remote,
-            #         args={
-            #             'action': 'setLog',
-            #             'machineid': self.deviceid,
-            #             'uuid': job.get('uuid'),
-            #             'code': 'ok'
-            #         }
-            #     )
+            # args = {
+            #     'action': 'setLog',
+            #     'machineid': self.deviceid,
+            #     'uuid': job.get('uuid'),
+            #     'code': 'ko' if error else 'ok'
+            # }
+            # if error:
+            #     args.update(part=part, msg=error)
+            # self.client.send(url=self.esx_remote, args=args)
         
         return self
     
-    def server_inventory(self, path: Optional[str] = None, 
-                        host_callback: Optional[Callable] = None,
-                        deviceids: Optional[Dict[str, str]] = None) -> None:
+    def workers(self) -> int:
+        """Get the maximum number of ESX servers to inventory concurrently"""
+        workers = self.config.get('esx-workers') if self.config else None
+        try:
+            return max(int(workers or 1), 1)
+        except (TypeError, ValueError):
+            return 1
+    
+    def host_timeout(self) -> int:
+        """Get the delay allowed to inventory all hosts of an ESX server"""
+        timeout = self.config.get('esx-timeout') if self.config else None
+        try:
+            return int(timeout or 0) or 600
+        except (TypeError, ValueError):
+            return 600
+    
+    def _run_jobs(self, jobs: List[Dict[str, Any]]):
         """
-        Perform server inventory.
+        Process jobs concurrently, up to esx-workers at a time.
         
         Args:
-            path: Optional path for local target
-            host_callback: Optional callback function for dumping data
-            deviceids: Optional dictionary of device IDs
+            jobs: Jobs from server
+        
+        Yields:
+            Tuples of job, failed part and error or None, as jobs are done
         """
-        # Initialize GLPI server submission if required
-        if self.target and self.target.is_type('server') and not self.serverclient:
+        workers = max(min(self.workers(), len(jobs)), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self._process_job, job): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    part, error = future.result()
+                except Exception as e:
+                    part, error = 'inventory', str(e)
+                yield futures[future], part, error
+    
+    def _process_job(self, job: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """
+        Inventory an ESX server from a job, run in a worker thread.
+        
+        The job is handled by a copy of the task so connection and last error
+        are not shared with other jobs.
+        
+        Args:
+            job: Job from server with host, user and password
+        
+        Returns:
+            Tuple of failed part, 'login' or 'inventory', and error or None
+        """
+        task = copy.copy(self)
+        task.vpbs = None
+        task.esx = None
+        task.last_error = None
+        
+        deadline = time.monotonic() + self.host_timeout()
+        
+        if not task.connect(
+            host=job.get('host', ''),
+            user=job.get('user', ''),
+            password=job.get('password', '')
+        ):
+            return 'login', task.get_last_error() or "Connection failure"
+        
+        task.server_inventory(deadline=deadline)
+        
+        return 'inventory', task.get_last_error()
+    
+    def _init_server_client(self) -> bool:
+        """Initialize GLPI server submission client if required"""
+        if not self.target or not self.target.is_type('server'):
+            return True
+        
+        with self._serverclient_lock:
+            if self.serverclient:
+                return True
             try:
                 if self.target.is_glpi_server():
                     # from GLPI.Agent.HTTP.Client.GLPI import GLPIClient
@@ -375,11 +417,42 @@ class ESXTask:
                     pass
             except Exception as e:
                 self.set_last_error(f"Protocol library can't be loaded: {e}")
-                return
+                return False
+        
+        return True
+    
+    def server_inventory(self, path: Optional[str] = None, 
+                        host_callback: Optional[Callable] = None,
+                        deviceids: Optional[Dict[str, str]] = None,
+                        deadline: Optional[float] = None) -> None:
+        """
+        Perform server inventory.
+        
+        Args:
+            path: Optional path for local target
+            host_callback: Optional callback function for dumping data
+            deviceids: Optional dictionary of device IDs
+            deadline: Optional time.monotonic() value after which remaining
+                hosts are not inventoried
+        """
+        # Initialize GLPI server submission if required
+        if not self._init_server_client():
+            return
         
         host_ids = self.get_host_ids()
         
-        for host_id in host_ids:
+        for count, host_id in enumerate(host_ids):
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.set_last_error(
+                        f"Timeout reached, {len(host_ids) - count} host(s) not inventoried"
+                    )
+                    break
+                # Don't let a request run after deadline
+                if remaining < self.timeout():
+                    self.timeout(max(int(remaining), 1))
+            
             deviceid = None
             if isinstance(deviceids, dict):
                 deviceid = deviceids.get(host_id)
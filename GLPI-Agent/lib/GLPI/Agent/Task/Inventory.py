@@ -10,13 +10,19 @@ import os
 import sys
 import time
 import signal
+import threading
 import importlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from typing import Any, Dict, List, Optional
 
+from GLPI.Agent.Tools.Manifest import get_modules_manifest, is_platform_enabled
+
 # Import base classes and dependencies
 try:
     from .task import GLPITask
-    from .tools import trim_whitespace, run_function, any_func, empty
+    from .tools import (trim_whitespace, run_function, any_func, empty, get_os_name,
+                        set_command_cache_for_tools, reset_command_cache_for_tools)
     from .inventory import Inventory
     from .xml_handler import XMLHandler
     from .event import Event
@@ -25,7 +31,9 @@ try:
 except ImportError:
     try:
         from glpi_agent.task.task import GLPITask
-        from glpi_agent.tools import trim_whitespace, run_function, any_func, empty
+        from glpi_agent.tools import (trim_whitespace, run_function, any_func, empty,
+                                     get_os_name, set_command_cache_for_tools,
+                                     reset_command_cache_for_tools)
         from glpi_agent.inventory import Inventory
         from glpi_agent.xml_handler import XMLHandler
         from glpi_agent.event import Event
@@ -273,11 +281,20 @@ class InventoryTask(GLPITask):
             (self.target.isType('server') and not self.target.isGlpiServer())):
             self.disabled['database'] = 1
         
-        # Initialize and run modules
-        self._initModulesList()
+        # Share commands output between modules during this run
+        set_command_cache_for_tools()
         
-        if not self.aborted:
-            self._feedInventory()
+        try:
+            # Initialize and run modules
+            self._initModulesList()
+            
+            if not self.aborted:
+                self._feedInventory()
+        finally:
+            stats = reset_command_cache_for_tools()
+            self.logger.debug(
+                f"Commands output cache: {stats['hits']} hits, {stats['misses']} misses"
+            )
         
         # Clean up modules from memory
         self.modules = {}
@@ -487,6 +504,9 @@ class InventoryTask(GLPITask):
         if not modules:
             raise Exception("no inventory module found")
         
+        manifest = get_modules_manifest('GLPI.Agent.Task.Inventory', logger=self.logger)
+
+        # Categories are read from the manifest, no module is imported
         categories = {}
         
         for module_name in sorted(modules):
@@ -494,25 +514,24 @@ class InventoryTask(GLPITask):
             if module_name.endswith(('Version', 'Module')):
                 continue
             
-            try:
-                module = importlib.import_module(module_name)
-                
-                # Get main category
-                if hasattr(module, 'category'):
-                    cat = module.category()
-                    if cat:
-                        categories[cat] = 1
-                
-                # Get additional categories
-                if hasattr(module, 'other_categories'):
-                    for cat in module.other_categories():
-                        categories[cat] = 1
-            
-            except ImportError:
+            infos = manifest.get(module_name) if manifest else None
+            if infos is None:
                 continue
+
+            if infos.get('category'):
+                categories[infos['category']] = 1
+            for cat in infos.get('other_categories') or []:
+                categories[cat] = 1
         
         return list(categories.keys())
     
+    def _supportAborting(self) -> None:
+        """Abort the inventory on SIGTERM when run from the main thread."""
+        # Signal handlers can only be set from the main thread, remote
+        # inventories are run from RemoteInventory task worker threads
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda sig, frame: setattr(self, 'aborted', 1))
+    
     def _initModulesList(self) -> None:
         """Initialize list of inventory modules and check dependencies."""
         logger = self.logger
@@ -522,8 +541,13 @@ class InventoryTask(GLPITask):
         if not modules:
             raise Exception("no inventory module found")
         
+        # Scheduling data is read from the manifest so modules dedicated to
+        # another platform or with a disabled category are never imported
+        manifest = get_modules_manifest('GLPI.Agent.Task.Inventory', logger=logger) or {}
+        os_name = get_os_name()
+
         # Support aborting
-        signal.signal(signal.SIGTERM, lambda sig, frame: setattr(self, 'aborted', 1))
+        self._supportAborting()
         
         # First pass: determine enabled modules
         for module_name in sorted(modules):
@@ -547,25 +571,34 @@ class InventoryTask(GLPITask):
                 self.modules[module_name] = {'enabled': 0}
                 continue
             
-            # Try to load module
-            try:
-                module = importlib.import_module(module_name)
-            except ImportError as e:
-                logger.debug(
-                    f"module {module_name} disabled: failure to load ({e})"
+            infos = manifest.get(module_name)
+            if infos is None:
+                # Not in manifest, read scheduling data from module itself
+                try:
+                    infos = self._getModuleInfos(module_name)
+                except ImportError as e:
+                    logger.debug(
+                        f"module {module_name} disabled: failure to load ({e})"
+                    )
+                    self.modules[module_name] = {'enabled': 0}
+                    continue
+            
+            # Check platform
+            if not is_platform_enabled(infos, os_name):
+                logger.debug2(
+                    f"module {module_name} disabled: not supported on {os_name}"
                 )
                 self.modules[module_name] = {'enabled': 0}
                 continue
             
             # Check category
-            if hasattr(module, 'category'):
-                category = module.category()
-                if category and self.disabled.get(category):
-                    logger.debug2(
-                        f"module {module_name} disabled: '{category}' category disabled"
-                    )
-                    self.modules[module_name] = {'enabled': 0}
-                    continue
+            category = infos.get('category')
+            if category and self.disabled.get(category):
+                logger.debug2(
+                    f"module {module_name} disabled: '{category}' category disabled"
+                )
+                self.modules[module_name] = {'enabled': 0}
+                continue
             
             # Check if enabled
             enabled = run_function(
@@ -590,23 +623,20 @@ class InventoryTask(GLPITask):
             
             # Module is enabled
             run_after = [parent] if parent else []
-            if hasattr(module, 'runAfter'):
-                run_after.extend(module.runAfter)
-            if hasattr(module, 'runAfterIfEnabled'):
-                run_after.extend(module.runAfterIfEnabled)
-            
-            run_after_if_enabled = {}
-            if hasattr(module, 'runAfterIfEnabled'):
-                run_after_if_enabled = {
-                    m: 1 for m in module.runAfterIfEnabled
-                }
+            run_after.extend(infos.get('runAfter') or [])
+            run_after.extend(infos.get('runAfterIfEnabled') or [])
+            
+            run_after_if_enabled = {
+                m: 1 for m in infos.get('runAfterIfEnabled') or []
+            }
             
             self.modules[module_name] = {
                 'enabled': 1,
                 'done': 0,
                 'used': 0,
                 'runAfter': run_after,
-                'runAfterIfEnabled': run_after_if_enabled
+                'runAfterIfEnabled': run_after_if_enabled,
+                'runMeIfTheseChecksFailed': infos.get('runMeIfTheseChecksFailed') or [],
             }
         
         # Second pass: disable fallback modules
@@ -617,41 +647,69 @@ class InventoryTask(GLPITask):
             if not self.modules.get(module_name, {}).get('enabled'):
                 continue
             
-            try:
-                module = importlib.import_module(module_name)
-                if not hasattr(module, 'runMeIfTheseChecksFailed'):
-                    continue
-                
-                failed = None
-                for other in module.runMeIfTheseChecksFailed:
-                    if self.modules.get(other, {}).get('enabled'):
-                        failed = other
-                        break
-                
-                if failed:
-                    self.modules[module_name]['enabled'] = 0
-                    logger.debug(
-                        f"module {module_name} disabled because of {failed}"
-                    )
+            failed = None
+            for other in self.modules[module_name]['runMeIfTheseChecksFailed']:
+                if self.modules.get(other, {}).get('enabled'):
+                    failed = other
+                    break
             
-            except ImportError:
-                continue
+            if failed:
+                self.modules[module_name]['enabled'] = 0
+                logger.debug(
+                    f"module {module_name} disabled because of {failed}"
+                )
     
-    def _runModule(self, module_name: str) -> None:
+    @staticmethod
+    def _getModuleInfos(module_name: str) -> Dict[str, Any]:
         """
-        Run a single inventory module.
+        Get scheduling data of a module missing from the manifest.
         
         Args:
-            module_name: Full module name to run
+            module_name: Full module name
+            
+        Returns:
+            Dictionary like manifest modules infos
+            
+        Raises:
+            ImportError: If module can't be loaded
         """
-        logger = self.logger
+        module = importlib.import_module(module_name)
         
-        if self.modules[module_name]['done']:
-            return
+        def get(*names):
+            for name in names:
+                value = getattr(module, name, None)
+                if value is None:
+                    continue
+                value = value() if callable(value) else value
+                if isinstance(value, (list, tuple)):
+                    return [item.replace('::', '.') for item in value]
+                return value
+            return None
         
-        self.modules[module_name]['used'] = 1  # Lock
+        return {
+            'category': get('category'),
+            'runAfter': get('runAfter', 'run_after'),
+            'runAfterIfEnabled': get('runAfterIfEnabled', 'run_after_if_enabled'),
+            'runMeIfTheseChecksFailed': get('runMeIfTheseChecksFailed',
+                                            'run_me_if_these_checks_failed'),
+            'platform': None,
+        }
+    
+    def _getModuleDependencies(self, module_name: str) -> List[str]:
+        """
+        Get enabled modules which must run before the given one.
+        
+        Args:
+            module_name: Full module name
+            
+        Returns:
+            List of enabled module names to run first
+            
+        Raises:
+            Exception: If a hard dependency is missing or not enabled
+        """
+        dependencies = []
         
-        # Run dependencies first
         for other in self.modules[module_name]['runAfter']:
             if other not in self.modules:
                 raise Exception(
@@ -668,20 +726,33 @@ class InventoryTask(GLPITask):
                         f"module {other}, needed before {module_name}, not enabled"
                     )
             
-            if self.modules[other]['used']:
-                raise Exception(
-                    f"circular dependency between {module_name} and {other}"
-                )
-            
-            self._runModule(other)
+            if other not in dependencies:
+                dependencies.append(other)
         
-        logger.debug(f"Running {module_name}")
+        return dependencies
+    
+    def _runModule(self, module_name: str) -> None:
+        """
+        Run a single inventory module.
+        
+        Dependencies are resolved by the scheduler in _feedInventory, so
+        this only executes the module itself.
+        
+        Args:
+            module_name: Full module name to run
+        """
+        if self.modules[module_name]['done']:
+            return
+        
+        self.modules[module_name]['used'] = 1  # Lock
+        
+        self.logger.debug(f"Running {module_name}")
         
         # Execute module
         run_function(
             module=module_name,
             function="doInventory",
-            logger=logger,
+            logger=self.logger,
             timeout=self.config.get('backend-collect-timeout', 180),
             params={
                 'datadir': self.datadir,
@@ -689,6 +760,7 @@ class InventoryTask(GLPITask):
                 'no_category': self.disabled,
                 'logger': self.logger,
                 'registry': self.registry,
+                'storage': self.target.getStorage(),
                 'params': self.params,
                 'scan_homedirs': self.config.get('scan-homedirs'),
                 'scan_profiles': self.config.get('scan-profiles'),
@@ -699,22 +771,93 @@ class InventoryTask(GLPITask):
         self.modules[module_name]['done'] = 1
         self.modules[module_name]['used'] = 0  # Unlock
     
+    def _getWorkers(self) -> int:
+        """
+        Get the number of inventory modules allowed to run concurrently.
+        
+        Returns:
+            Workers count, at least 1
+        """
+        workers = str(self.config.get('backend-collect-workers', 4) or 1)
+        return max(1, int(workers)) if workers.isdigit() else 1
+    
     def _feedInventory(self) -> None:
-        """Run all enabled inventory modules."""
+        """
+        Run all enabled inventory modules.
+        
+        Modules are scheduled as a dependency graph built from runAfter and
+        runAfterIfEnabled: a module is submitted to a bounded thread pool as
+        soon as all the modules it depends on are done. Most modules are
+        waiting on commands output, so independent modules overlap nicely.
+        """
         begin = time.time()
         
-        enabled_modules = [
+        enabled_modules = sorted(
             name for name, info in self.modules.items()
             if info.get('enabled')
-        ]
+        )
         
         # Support aborting
-        signal.signal(signal.SIGTERM, lambda sig, frame: setattr(self, 'aborted', 1))
+        self._supportAborting()
+        
+        # Build dependency graph
+        pending: Dict[str, set] = {}
+        dependents: Dict[str, List[str]] = {name: [] for name in enabled_modules}
+        for module_name in enabled_modules:
+            pending[module_name] = set(self._getModuleDependencies(module_name))
+            for other in pending[module_name]:
+                dependents[other].append(module_name)
+        
+        ready = [name for name in enabled_modules if not pending[name]]
+        running: Dict[Any, str] = {}
+        
+        workers = self._getWorkers()
+        self.logger.debug2(
+            f"Running {len(enabled_modules)} inventory modules with {workers} workers"
+        )
         
-        for module_name in sorted(enabled_modules):
-            self._runModule(module_name)
-            if self.aborted:
-                return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while ready or running:
+                while ready and not self.aborted:
+                    module_name = ready.pop(0)
+                    # Modules share the task context, like the remote
+                    future = executor.submit(
+                        contextvars.copy_context().run, self._runModule, module_name
+                    )
+                    running[future] = module_name
+                
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    module_name = running.pop(future)
+                    # Unexpected failure outside run_function protection
+                    error = future.exception()
+                    if error:
+                        self.logger.debug(f"module {module_name} failure: {error}")
+                    
+                    # Even a failing module unlocks its dependents like
+                    # in sequential mode
+                    for other in dependents[module_name]:
+                        pending[other].discard(module_name)
+                        if not pending[other]:
+                            ready.append(other)
+                    ready.sort()
+                
+                if self.aborted:
+                    ready = []
+        
+        if self.aborted:
+            return
+        
+        blocked = [name for name in enabled_modules if pending[name]]
+        if blocked:
+            raise Exception(
+                f"circular dependency between {blocked[0]} and "
+                f"{sorted(pending[blocked[0]])[0]}"
+            )
         
         # Inject additional content
         self._injectContent()
@@ -3,16 +3,33 @@
 GLPI Agent Task Inventory Generic Softwares Deb - Python Implementation
 """
 
+import os
 import re
-from typing import Any, List, Dict, Optional
+from typing import Any, Iterable, List, Dict, Optional
 
 from GLPI.Agent.Task.Inventory.Module import InventoryModule
-from GLPI.Agent.Tools import can_run, get_all_lines, get_first_match
+from GLPI.Agent.Tools import (can_run, get_all_lines, get_first_match,
+                              get_remote_for_tools)
+from GLPI.Agent.Tools.Softwares import get_cached_packages
 
 
 class Deb(InventoryModule):
     """Debian package inventory module."""
     
+    STATUS_FILE = '/var/lib/dpkg/status'
+    
+    # Publisher is read from lsb_release which relies on os-release
+    CACHE_SOURCES = [STATUS_FILE, '/etc/os-release']
+    
+    STATUS_FIELDS = {
+        'Package': 'NAME',
+        'Architecture': 'ARCH',
+        'Version': 'VERSION',
+        'Installed-Size': 'FILESIZE',
+        'Section': 'SYSTEM_CATEGORY',
+        'Status': 'STATUS',
+    }
+    
     @staticmethod
     def isEnabled(**params: Any) -> bool:
         """Check if module should be enabled."""
@@ -24,21 +41,52 @@ class Deb(InventoryModule):
         inventory = params.get('inventory')
         logger = params.get('logger')
         
-        command = (
-            "dpkg-query --show --showformat='"
-            "${Package}\t"
-            "${Architecture}\t"
-            "${Version}\t"
-            "${Installed-Size}\t"
-            "${Section}\t"
-            "${Status}\n"
-            "'"
+        packages = get_cached_packages(
+            name='deb',
+            sources=Deb.CACHE_SOURCES,
+            builder=lambda: Deb._get_packages(logger=logger),
+            storage=params.get('storage'),
+            logger=logger,
         )
-        
-        packages = Deb._get_packages_list(logger=logger, command=command)
         if not packages:
             return
         
+        for package in packages:
+            if inventory:
+                inventory.add_entry(
+                    section='SOFTWARES',
+                    entry=package
+                )
+    
+    @staticmethod
+    def _get_packages(**params) -> Optional[List[Dict[str, Any]]]:
+        """Get list of Debian packages with their publisher."""
+        logger = params.get('logger')
+        
+        # dpkg status file can only be read locally
+        packages = None
+        if not get_remote_for_tools() and os.access(Deb.STATUS_FILE, os.R_OK):
+            packages = Deb._get_packages_from_status(
+                logger=logger,
+                file=Deb.STATUS_FILE,
+            )
+        
+        if packages is None:
+            command = (
+                "dpkg-query --show --showformat='"
+                "${Package}\t"
+                "${Architecture}\t"
+                "${Version}\t"
+                "${Installed-Size}\t"
+                "${Section}\t"
+                "${Status}\n"
+                "'"
+            )
+            packages = Deb._get_packages_list(logger=logger, command=command)
+        
+        if not packages:
+            return None
+        
         # Mimic RPM inventory behaviour, as GLPI aggregates software
         # based on name and publisher
         publisher = get_first_match(
@@ -49,11 +97,85 @@ class Deb(InventoryModule):
         
         for package in packages:
             package['PUBLISHER'] = publisher
-            if inventory:
-                inventory.add_entry(
-                    section='SOFTWARES',
-                    entry=package
+        
+        return packages
+    
+    @staticmethod
+    def _get_packages_from_status(**params) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get list of Debian packages from dpkg status database.
+        
+        Args:
+            **params: Parameters including file or handle, and logger
+            
+        Returns:
+            List of packages, or None if database can't be read
+        """
+        handle = params.get('handle')
+        if handle:
+            return Deb._parse_status(handle, params.get('logger'))
+        
+        try:
+            with open(params['file'], 'r', encoding='utf-8', errors='replace') as handle:
+                return Deb._parse_status(handle, params.get('logger'))
+        except OSError as e:
+            logger = params.get('logger')
+            if logger:
+                logger.debug(f"Can't read {params['file']}: {e}")
+            return None
+    
+    @staticmethod
+    def _parse_status(lines: Iterable[str], logger=None) -> List[Dict[str, Any]]:
+        """Parse dpkg status stanzas, streaming lines."""
+        packages = []
+        stanza: Dict[str, str] = {}
+        
+        for line in lines:
+            # Blank line ends a stanza
+            if not line.strip():
+                if stanza:
+                    Deb._add_status_package(packages, stanza, logger)
+                    stanza = {}
+                continue
+            
+            # Skip continuation lines, like descriptions and conffiles
+            if line[0] in ' \t':
+                continue
+            
+            field, sep, value = line.partition(':')
+            if sep and field in Deb.STATUS_FIELDS:
+                stanza[Deb.STATUS_FIELDS[field]] = value.strip()
+        
+        if stanza:
+            Deb._add_status_package(packages, stanza, logger)
+        
+        return packages
+    
+    @staticmethod
+    def _add_status_package(packages: List[Dict[str, Any]],
+                            stanza: Dict[str, str], logger=None) -> None:
+        """Add package parsed from a dpkg status stanza if installed."""
+        name = stanza.get('NAME')
+        if not name:
+            return
+        
+        status = stanza.get('STATUS', '')
+        if status and not status.endswith(' installed'):
+            if logger:
+                logger.debug(
+                    f"Skipping {name} package as not installed, status='{status}'"
                 )
+            return
+        
+        filesize = stanza.get('FILESIZE', '')
+        packages.append({
+            'NAME': name,
+            'ARCH': stanza.get('ARCH', ''),
+            'VERSION': stanza.get('VERSION', ''),
+            'FILESIZE': int(filesize) * 1024 if filesize.isdigit() else 0,
+            'FROM': 'deb',
+            'SYSTEM_CATEGORY': stanza.get('SYSTEM_CATEGORY', '')
+        })
     
     @staticmethod
     def _get_packages_list(**params) -> Optional[List[Dict[str, Any]]]:
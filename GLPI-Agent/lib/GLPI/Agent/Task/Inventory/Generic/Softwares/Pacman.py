@@ -8,6 +8,7 @@ from typing import Any, List, Dict, Optional
 
 from GLPI.Agent.Task.Inventory.Module import InventoryModule
 from GLPI.Agent.Tools import can_run, get_all_lines
+from GLPI.Agent.Tools.Softwares import get_cached_packages
 
 
 class Pacman(InventoryModule):
@@ -18,6 +19,9 @@ class Pacman(InventoryModule):
         'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'
     ], start=0)}
     
+    # Holds one folder per installed package version
+    CACHE_SOURCES = ['/var/lib/pacman/local']
+    
     @staticmethod
     def isEnabled(**params: Any) -> bool:
         """Check if module should be enabled."""
@@ -29,9 +33,15 @@ class Pacman(InventoryModule):
         inventory = params.get('inventory')
         logger = params.get('logger')
         
-        packages = Pacman._get_packages_list(
+        packages = get_cached_packages(
+            name='pacman',
+            sources=Pacman.CACHE_SOURCES,
+            builder=lambda: Pacman._get_packages_list(
+                logger=logger,
+                command='pacman -Qqi'
+            ),
+            storage=params.get('storage'),
             logger=logger,
-            command='pacman -Qqi'
         )
         if not packages:
             return
@@ -8,11 +8,20 @@ from typing import Any, List, Dict, Optional
 
 from GLPI.Agent.Task.Inventory.Module import InventoryModule
 from GLPI.Agent.Tools import can_run, get_all_lines
+from GLPI.Agent.Tools.Softwares import get_cached_packages
 
 
 class RPM(InventoryModule):
     """RPM package inventory module."""
     
+    # rpmdb files for sqlite, bdb and ndb backends, updated in place
+    CACHE_SOURCES = [
+        '/var/lib/rpm/rpmdb.sqlite',
+        '/var/lib/rpm/rpmdb.sqlite-wal',
+        '/var/lib/rpm/Packages',
+        '/var/lib/rpm/Packages.db',
+    ]
+    
     @staticmethod
     def isEnabled(**params: Any) -> bool:
         """Check if module should be enabled."""
@@ -37,7 +46,13 @@ class RPM(InventoryModule):
             "'"
         )
         
-        packages = RPM._get_packages_list(logger=logger, command=command)
+        packages = get_cached_packages(
+            name='rpm',
+            sources=RPM.CACHE_SOURCES,
+            builder=lambda: RPM._get_packages_list(logger=logger, command=command),
+            storage=params.get('storage'),
+            logger=logger,
+        )
         if not packages:
             return
         
@@ -11,6 +11,7 @@ from typing import Any, List, Dict, Optional
 
 from GLPI.Agent.Task.Inventory.Module import InventoryModule
 from GLPI.Agent.Tools import can_run, get_first_line, get_first_match, get_all_lines, has_folder, get_canonical_size
+from GLPI.Agent.Tools.Softwares import get_cached_packages
 
 
 class Snap(InventoryModule):
@@ -23,6 +24,9 @@ class Snap(InventoryModule):
         'contact': 'HELPLINK',
     }
     
+    # Installed and refreshed snaps are downloaded here
+    CACHE_SOURCES = ['/var/lib/snapd/snaps']
+    
     @staticmethod
     def isEnabled(**params: Any) -> bool:
         """Check if module should be enabled."""
@@ -56,12 +60,34 @@ class Snap(InventoryModule):
         if snapd and snapd == 'unavailable':
             return
         
+        packages = get_cached_packages(
+            name='snap',
+            sources=Snap.CACHE_SOURCES,
+            builder=lambda: Snap._get_packages(logger=logger),
+            storage=params.get('storage'),
+            logger=logger,
+        )
+        if not packages:
+            return
+        
+        for snap in packages:
+            if inventory:
+                inventory.add_entry(
+                    section='SOFTWARES',
+                    entry=snap
+                )
+    
+    @staticmethod
+    def _get_packages(**params) -> Optional[List[Dict[str, Any]]]:
+        """Get list of Snap packages with their detailed infos."""
+        logger = params.get('logger')
+        
         packages = Snap._get_packages_list(
             logger=logger,
             command='snap list --color never',
         )
         if not packages:
-            return
+            return None
         
         for snap in packages:
             rev = snap.pop('_REVISION', None)
@@ -71,11 +97,8 @@ class Snap(InventoryModule):
                 command=f'snap info --color never --abs-time {snap["NAME"]}',
                 file=f'/snap/{snap["NAME"]}/{rev}/meta/snap.yaml',
             )
-            if inventory:
-                inventory.add_entry(
-                    section='SOFTWARES',
-                    entry=snap
-                )
+        
+        return packages
     
     @staticmethod
     def _get_packages_list(**params) -> Optional[List[Dict[str, Any]]]:
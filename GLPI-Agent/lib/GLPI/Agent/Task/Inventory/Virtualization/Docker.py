@@ -1,16 +1,98 @@
 #!/usr/bin/env python3
 """
 GLPI Agent Task Inventory Virtualization Docker - Python Implementation
+
+Containers are listed with the Docker Engine API through the daemon unix
+socket when available, Podman service socket providing the same API, or
+with the docker command otherwise.
 """
 
+import http.client
 import json
-from typing import Any, List, Dict
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Dict, Optional
 
 from GLPI.Agent.Task.Inventory.Module import InventoryModule
-from GLPI.Agent.Tools import can_run, get_all_lines
+from GLPI.Agent.Tools import can_run, get_all_lines, get_remote_for_tools
 from GLPI.Agent.Tools.Virtualization import STATUS_RUNNING, STATUS_OFF
 
 
+class EngineAPIConnection(http.client.HTTPConnection):
+    """HTTP connection to Engine API over a unix socket."""
+    
+    def __init__(self, path: str, timeout: float = 10):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+    
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class EngineAPI:
+    """
+    Docker Engine API client.
+    
+    Each thread keeps its own keep-alive connection to the socket.
+    """
+    
+    def __init__(self, path: str, timeout: float = 10):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+    
+    def get(self, url: str) -> Any:
+        """
+        Get decoded JSON response for an API GET request.
+        
+        Args:
+            url: API request path
+            
+        Returns:
+            Decoded response
+            
+        Raises:
+            OSError: On connection failure or unexpected response
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = EngineAPIConnection(self.path, timeout=self.timeout)
+            self._local.connection = connection
+        
+        try:
+            connection.request('GET', url)
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            connection.close()
+            self._local.connection = None
+            raise OSError(f"{url} request failed: {e}") from e
+        
+        if response.status != 200:
+            raise OSError(f"{url} request failed: {response.status} {response.reason}")
+        
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise OSError(f"{url} request failed: {e}") from e
+    
+    def close(self):
+        """Close current thread connection."""
+        connection = getattr(self._local, 'connection', None)
+        if connection:
+            connection.close()
+            self._local.connection = None
+
+
 class Docker(InventoryModule):
     """Docker containers detection module."""
     
@@ -20,10 +102,19 @@ class Docker(InventoryModule):
     # formatting separator
     SEPARATOR = '#=#=#'
     
+    # Engine API sockets, after the one set in DOCKER_HOST environment
+    SOCKETS = ['/var/run/docker.sock', '/run/podman/podman.sock']
+    
+    # Containers inspected concurrently through Engine API
+    INSPECT_WORKERS = 8
+    
+    # Listed container states for which inspect says running
+    RUNNING_STATES = ('running', 'paused', 'restarting')
+    
     @staticmethod
     def isEnabled(**params: Any) -> bool:
         """Check if module should be enabled."""
-        return can_run('docker')
+        return can_run('docker') or Docker._get_socket() is not None
     
     @staticmethod
     def doInventory(**params: Any) -> None:
@@ -31,20 +122,115 @@ class Docker(InventoryModule):
         inventory = params.get('inventory')
         logger = params.get('logger')
         
-        # formatting with a Go template (required by docker ps command)
-        wanted = ['{{.' + field + '}}' for field in Docker.WANTED_INFOS]
-        template = Docker.SEPARATOR.join(wanted)
+        containers = None
+        path = Docker._get_socket()
+        if path:
+            try:
+                containers = Docker._get_api_containers(api=EngineAPI(path))
+            except OSError as e:
+                if logger:
+                    logger.debug(f"Can't use Engine API on {path}: {e}")
+        
+        if containers is None:
+            # formatting with a Go template (required by docker ps command)
+            wanted = ['{{.' + field + '}}' for field in Docker.WANTED_INFOS]
+            template = Docker.SEPARATOR.join(wanted)
+            containers = Docker._get_containers(
+                logger=logger,
+                command=f'docker ps -a --format "{template}"'
+            )
         
-        for container in Docker._get_containers(
-            logger=logger,
-            command=f'docker ps -a --format "{template}"'
-        ):
+        for container in containers:
             if inventory:
                 inventory.add_entry(
                     section='VIRTUALMACHINES',
                     entry=container
                 )
     
+    @staticmethod
+    def _get_socket() -> Optional[str]:
+        """Get Engine API unix socket path if one is available locally."""
+        # Engine API can only be reached locally
+        if get_remote_for_tools():
+            return None
+        
+        sockets = list(Docker.SOCKETS)
+        docker_host = os.environ.get('DOCKER_HOST', '')
+        if docker_host.startswith('unix://'):
+            sockets.insert(0, docker_host[len('unix://'):])
+        
+        for path in sockets:
+            if os.access(path, os.R_OK | os.W_OK):
+                return path
+        
+        return None
+    
+    @staticmethod
+    def _get_api_containers(**params) -> List[Dict[str, Any]]:
+        """
+        Get containers from Engine API.
+        
+        Args:
+            **params: Parameters including api, an EngineAPI instance
+            
+        Returns:
+            List of containers
+            
+        Raises:
+            OSError: If containers can't be listed
+        """
+        api = params['api']
+        
+        listed = api.get('/containers/json?all=1')
+        if not isinstance(listed, list):
+            raise OSError("unexpected containers list")
+        
+        containers = []
+        uninspected = []
+        for item in listed:
+            if not isinstance(item, dict) or not item.get('Id'):
+                continue
+            
+            container = {
+                'VMTYPE': 'docker',
+                'UUID': item['Id'][:12],
+                'IMAGE': item.get('Image', ''),
+                'NAME': ','.join(name.lstrip('/') for name in item.get('Names') or []),
+                'STATUS': '',
+            }
+            
+            state = item.get('State')
+            if isinstance(state, str) and state:
+                container['STATUS'] = STATUS_RUNNING if state in Docker.RUNNING_STATES \
+                    else STATUS_OFF
+            else:
+                # State is not listed by older API versions
+                uninspected.append((container, item['Id']))
+            
+            containers.append(container)
+        
+        if uninspected:
+            with ThreadPoolExecutor(max_workers=Docker.INSPECT_WORKERS) as executor:
+                statuses = executor.map(
+                    lambda entry: Docker._get_api_status(api, entry[1]),
+                    uninspected
+                )
+                for (container, _), status in zip(uninspected, statuses):
+                    container['STATUS'] = status
+        
+        return containers
+    
+    @staticmethod
+    def _get_api_status(api: EngineAPI, container_id: str) -> str:
+        """Get container status from Engine API inspect request."""
+        try:
+            container_data = api.get(f'/containers/{container_id}/json')
+            running = container_data.get('State', {}).get('Running', False)
+        except (OSError, AttributeError):
+            return ''
+        
+        return STATUS_RUNNING if running else STATUS_OFF
+    
     @staticmethod
     def _get_containers(**params) -> List[Dict[str, Any]]:
         """Get Docker containers."""
@@ -1,18 +1,41 @@
 #!/usr/bin/env python3
 """
 GLPI Agent Task Inventory Virtualization Libvirt - Python Implementation
+
+Domains are read with libvirt python bindings when available, or with virsh
+otherwise. With virsh, all domains XML are dumped by a single virsh call
+per URI and parsed while being read.
 """
 
-from typing import Any, Dict, List, Optional
+import re
+import shlex
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterable, List, Optional
 
 from GLPI.Agent.Task.Inventory.Module import InventoryModule
-from GLPI.Agent.Tools import get_all_lines, can_run
-from GLPI.Agent.XML import XML
+from GLPI.Agent.Tools import get_all_lines, get_file_handle, can_run, get_remote_for_tools
+
+try:
+    import libvirt
+except ImportError:
+    libvirt = None
 
 
 class Libvirt(InventoryModule):
     """Libvirt/KVM/LXC virtual machines detection module using virsh."""
 
+    # virsh list states by libvirt domain state
+    STATES = {
+        0: 'no state',
+        1: 'running',
+        2: 'idle',
+        3: 'paused',
+        4: 'in shutdown',
+        5: 'off',
+        6: 'crashed',
+        7: 'pmsuspended',
+    }
+
     @staticmethod
     def isEnabled(**params: Any) -> bool:
         """Check if module should be enabled (virsh available)."""
@@ -36,26 +59,93 @@ class Libvirt(InventoryModule):
     def _get_machines(**params) -> List[Dict[str, Any]]:
         uri = params.get('uri')
         logger = params.get('logger')
+
+        if libvirt and not get_remote_for_tools():
+            machines = Libvirt._get_libvirt_machines(uri=uri, logger=logger)
+            if machines is not None:
+                return machines
+
         uri_param = f"-c {uri}" if uri else ""
 
         machines = Libvirt._parse_list(
             command=f"virsh {uri_param} --readonly list --all".strip(),
             logger=logger,
         )
+        if not machines:
+            return machines
+
+        # Dump all domains with one virsh call running a commands list
+        script = '; '.join(
+            f"dumpxml --domain {shlex.quote(machine['NAME'])}" for machine in machines
+        )
+        domains = Libvirt._parse_dumpxmls(
+            command=f"virsh {uri_param} --readonly {shlex.quote(script)}",
+            logger=logger,
+        )
 
         for machine in machines:
-            infos = Libvirt._parse_dumpxml(
-                command=f"virsh {uri_param} --readonly dumpxml {machine['NAME']}",
-                logger=logger,
-            )
+            infos = domains.get(machine['NAME'])
             if infos:
-                machine['MEMORY'] = infos.get('memory')
-                machine['UUID'] = infos.get('uuid')
-                machine['SUBSYSTEM'] = infos.get('vmtype')
-                machine['VCPU'] = infos.get('vcpu')
+                Libvirt._set_machine_infos(machine, infos)
+            elif logger:
+                logger.error(f"No virsh xmldump output for {machine['NAME']}")
+
+        return machines
+
+    @staticmethod
+    def _get_libvirt_machines(**params) -> Optional[List[Dict[str, Any]]]:
+        """Get machines with libvirt bindings, None if connection failed."""
+        uri = params.get('uri')
+        logger = params.get('logger')
+
+        try:
+            connection = libvirt.openReadOnly(uri)
+        except libvirt.libvirtError as e:
+            if logger:
+                logger.debug(f"Can't connect to libvirt{' ' + uri if uri else ''}: {e}")
+            return None
+
+        machines = []
+        try:
+            for domain in connection.listAllDomains():
+                try:
+                    name = domain.name()
+                    # ignore Xen Dom0
+                    if name == 'Domain-0':
+                        continue
+                    state, _ = domain.state()
+                    xml = domain.XMLDesc(0)
+                except libvirt.libvirtError as e:
+                    # Domain may have been undefined in the meantime
+                    if logger:
+                        logger.debug(f"Can't read libvirt domain: {e}")
+                    continue
+
+                machine = {
+                    'NAME': name,
+                    'STATUS': Libvirt.STATES.get(state, ''),
+                    'VMTYPE': 'libvirt',
+                }
+                infos = next(iter(Libvirt._iter_domains([xml], logger)), None)
+                if infos:
+                    Libvirt._set_machine_infos(machine, infos)
+                machines.append(machine)
+        except libvirt.libvirtError as e:
+            if logger:
+                logger.debug(f"Can't list libvirt domains: {e}")
+            return None
+        finally:
+            connection.close()
 
         return machines
 
+    @staticmethod
+    def _set_machine_infos(machine: Dict[str, Any], infos: Dict[str, Any]) -> None:
+        machine['MEMORY'] = infos.get('memory')
+        machine['UUID'] = infos.get('uuid')
+        machine['SUBSYSTEM'] = infos.get('vmtype')
+        machine['VCPU'] = infos.get('vcpu')
+
     @staticmethod
     def _parse_list(**params) -> List[Dict[str, Any]]:
         lines = get_all_lines(**params) or []
@@ -69,7 +159,6 @@ class Libvirt(InventoryModule):
 
             # Expected format: Id Name State (or with blanks for Id)
             # Regex ported from perl: ^\s*(\d+|)(\-|)\s+(\S+)\s+(\S.+)
-            import re
             m = re.match(r"^\s*(\d+|)(\-|)\s+(\S+)\s+(\S.+)", line)
             if not m:
                 continue
@@ -92,10 +181,78 @@ class Libvirt(InventoryModule):
         return machines
 
     @staticmethod
-    def _get_key_text(value):
-        if isinstance(value, dict):
-            return value.get('#text')
-        return value
+    def _get_domain_infos(domain: ET.Element) -> Dict[str, Any]:
+        """Get infos from a domain XML element."""
+        memory = None
+        current_memory = domain.findtext('currentMemory')
+        if current_memory:
+            m = re.match(r"(\d+)\d{3}$", current_memory.strip())
+            if m:
+                memory = int(m.group(1))
+
+        vcpu = domain.findtext('vcpu')
+        uuid = domain.findtext('uuid')
+
+        return {
+            'name': (domain.findtext('name') or '').strip(),
+            'vcpu': vcpu.strip() if vcpu else vcpu,
+            'uuid': uuid.strip() if uuid else uuid,
+            'vmtype': domain.get('type'),
+            'memory': memory,
+        }
+
+    @staticmethod
+    def _iter_domains(chunks: Iterable[str], logger=None) -> Iterable[Dict[str, Any]]:
+        """
+        Parse domains infos from successive XML documents, incrementally.
+
+        Args:
+            chunks: XML content, as lines or any chunks
+            logger: Logger instance
+
+        Yields:
+            Domain infos dictionaries, as soon as each domain is parsed
+        """
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        # Wrap concatenated documents under a single root
+        parser.feed('<domains>')
+
+        root = None
+        depth = 0
+        try:
+            for chunk in chunks:
+                parser.feed(chunk)
+                for event, element in parser.read_events():
+                    if event == 'start':
+                        if root is None:
+                            root = element
+                        depth += 1
+                        continue
+                    depth -= 1
+                    if depth == 1 and element.tag == 'domain':
+                        yield Libvirt._get_domain_infos(element)
+                        # Forget parsed domain
+                        root.remove(element)
+        except ET.ParseError as e:
+            if logger:
+                logger.error(f"Failed to parse XML output: {e}")
+
+    @staticmethod
+    def _parse_dumpxmls(**params) -> Dict[str, Dict[str, Any]]:
+        """Get domains infos by name from successive virsh dumpxml outputs."""
+        logger = params.get('logger')
+        handle = get_file_handle(**params)
+        if not handle:
+            return {}
+
+        domains = {}
+        try:
+            for infos in Libvirt._iter_domains(handle, logger):
+                domains[infos.pop('name')] = infos
+        finally:
+            handle.close()
+
+        return domains
 
     @staticmethod
     def _parse_dumpxml(**params) -> Optional[Dict[str, Any]]:
@@ -106,29 +263,11 @@ class Libvirt(InventoryModule):
                 logger.error('No virsh xmldump output')
             return None
 
-        try:
-            data = XML(string='\n'.join(lines)).dump_as_hash()
-        except Exception:
+        infos = next(iter(Libvirt._iter_domains(['\n'.join(lines)], logger)), None)
+        if not infos:
             if logger:
                 logger.error('Failed to parse XML output')
             return None
 
-        domain = data.get('domain', {}) if isinstance(data, dict) else {}
-        vcpu = Libvirt._get_key_text(domain.get('vcpu'))
-        uuid = Libvirt._get_key_text(domain.get('uuid'))
-        vmtype = domain.get('-type')
-        memory = None
-        current_memory = Libvirt._get_key_text(domain.get('currentMemory'))
-        if isinstance(current_memory, str):
-            import re
-            m = re.match(r"(\d+)\d{3}$", current_memory)
-            if m:
-                memory = int(m.group(1))
-
-        return {
-            'vcpu': vcpu,
-            'uuid': uuid,
-            'vmtype': vmtype,
-            'memory': memory,
-        }
-
+        infos.pop('name')
+        return infos
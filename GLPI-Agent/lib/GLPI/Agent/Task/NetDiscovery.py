@@ -4,10 +4,15 @@ GLPI Agent Task NetDiscovery Module
 This module performs network discovery to find devices on the network.
 """
 
+import threading
 from typing import List, Dict, Optional, Any
 
+from GLPI.Agent.Version import VERSION as AGENT_VERSION
 from GLPI.Agent.Task.NetDiscovery.Version import VERSION
 from GLPI.Agent.Task.NetDiscovery.Job import NetDiscoveryJob
+from GLPI.Agent.Task.NetDiscovery.Scanner import NetDiscoveryScanner, SNMP_SUPPORT
+from GLPI.Agent.HTTP.Client.OCS import GLPIAgentHTTPClientOCS
+from GLPI.Agent.XML.Query import Query
 
 __version__ = VERSION
 
@@ -24,6 +29,9 @@ class NetDiscoveryTask:
         self.target = target
         self.deviceid = deviceid
         self.client = None
+        self.options = None
+        self._pending = []
+        self._pending_lock = threading.Lock()
     
     def is_enabled(self, contact=None) -> bool:
         """Check if the task is enabled"""
@@ -47,6 +55,7 @@ class NetDiscoveryTask:
                 self.logger.debug("NetDiscovery task execution not requested")
             return False
         
+        self.options = options
         return True
     
     def run(self) -> Optional[bool]:
@@ -55,31 +64,134 @@ class NetDiscoveryTask:
         if hasattr(self, 'reset_event'):
             self.reset_event()
         
-        # This is a placeholder for the actual implementation
-        # The real implementation would:
-        # 1. Initialize SNMP libraries
-        # 2. Get jobs from server
-        # 3. Process IP ranges
-        # 4. Scan devices
-        # 5. Send results back to server
+        if not SNMP_SUPPORT:
+            if self.logger:
+                self.logger.error("Can't run NetDiscovery task: pysnmp python module needed")
+            return None
         
-        if self.logger:
-            self.logger.info("NetDiscovery task run (placeholder implementation)")
+        jobs = self.get_jobs()
+        if not jobs:
+            if self.logger:
+                self.logger.debug("NetDiscovery task: no job to run")
+            return None
+        
+        config = self.config or {}
+        self.client = GLPIAgentHTTPClientOCS(
+            logger=self.logger,
+            timeout=config.get('timeout', 180),
+            ca_cert_file=config.get('ca-cert-file'),
+            ssl_verify=not config.get('no-ssl-check'),
+            compression='none' if config.get('no-compression') else 'gzip',
+        )
+        
+        for job in jobs:
+            self._send_message({
+                'AGENT': {
+                    'START': 1,
+                    'AGENTVERSION': AGENT_VERSION,
+                },
+                'MODULEVERSION': VERSION,
+                'PROCESSNUMBER': job.pid(),
+            })
+            
+            self.scan_addresses(job)
+            
+            self._send_message({
+                'AGENT': {
+                    'END': 1,
+                },
+                'MODULEVERSION': VERSION,
+                'PROCESSNUMBER': job.pid(),
+            })
         
         return True
     
+    def get_jobs(self) -> List[NetDiscoveryJob]:
+        """
+        Get jobs from server NETDISCOVERY options.
+        
+        Returns:
+            List of NetDiscoveryJob instances
+        """
+        options = self.options
+        if not options:
+            return []
+        
+        params = options.get('PARAM')
+        if isinstance(params, list):
+            params = params[0] if params else {}
+        
+        if not params or not params.get('PID'):
+            if self.logger:
+                self.logger.error("no PID parameter in NetDiscovery job")
+            return []
+        
+        ranges = options.get('RANGEIP')
+        if isinstance(ranges, dict):
+            ranges = [ranges]
+        if not ranges:
+            if self.logger:
+                self.logger.error("no IP range defined in NetDiscovery job")
+            return []
+        
+        credentials = options.get('AUTHENTICATION')
+        if isinstance(credentials, dict) and 'ID' in credentials:
+            credentials = [credentials]
+        
+        return [
+            NetDiscoveryJob(
+                logger=self.logger,
+                params=params,
+                credentials=credentials,
+                ranges=ranges,
+            )
+        ]
+    
     def scan_addresses(self, job: NetDiscoveryJob) -> List[Dict]:
         """
         Scan addresses defined in the job.
         
+        Discovered devices are sent to the server by DEVICE_PER_MESSAGE
+        batches while the scan is still running.
+        
         Args:
             job: NetDiscoveryJob instance
         
         Returns:
             List of discovered devices
         """
-        # Placeholder for scanning logic
-        return []
+        for range_config in job.ranges():
+            ok, params = job.get_queue_params(range_config)
+            if ok:
+                job.update_queue(params['size'], params['range'])
+        
+        size = job.queuesize()
+        if not size:
+            return []
+        
+        if self.logger:
+            self.logger.info(f"scanning {size} addresses for job {job.pid()}")
+        
+        self._send_message({
+            'AGENT': {
+                'NBIP': size,
+            },
+            'PROCESSNUMBER': job.pid(),
+        })
+        
+        def add_device(device: Dict) -> None:
+            self._add_device(device, job.pid())
+        
+        scanner = NetDiscoveryScanner(job, callback=add_device, logger=self.logger)
+        try:
+            devices = scanner.run()
+        finally:
+            self._flush_devices(job.pid())
+        
+        if self.logger:
+            self.logger.info(f"{len(devices)} devices found for job {job.pid()}")
+        
+        return devices
     
     def scan_device(self, ip: str, credentials: List[Dict], options: Dict) -> Optional[Dict]:
         """
@@ -88,23 +200,75 @@ class NetDiscoveryTask:
         Args:
             ip: IP address to scan
             credentials: List of credentials to try
-            options: Scanning options
+            options: Scanning options: ports, domains, entity and timeout
         
         Returns:
             Device information dictionary or None
         """
-        # Placeholder for device scanning logic
-        return None
+        job = NetDiscoveryJob(
+            logger=self.logger,
+            params={'TIMEOUT': options.get('timeout', 1)},
+            credentials=credentials,
+            ranges=[{
+                'IPSTART': ip,
+                'IPEND': ip,
+                'PORT': options.get('ports'),
+                'PROTOCOL': options.get('domains'),
+                'ENTITY': options.get('entity'),
+            }],
+        )
+        for range_config in job.ranges():
+            ok, params = job.get_queue_params(range_config)
+            if ok:
+                job.update_queue(params['size'], params['range'])
+        
+        devices = NetDiscoveryScanner(job, logger=self.logger, max_probes=1).run()
+        return devices[0] if devices else None
     
-    def send_results(self, devices: List[Dict]) -> bool:
+    def send_results(self, devices: List[Dict], pid: int = 0) -> bool:
         """
         Send discovery results to server.
         
         Args:
             devices: List of discovered devices
+            pid: Job process number
         
         Returns:
             True if successful, False otherwise
         """
-        # Placeholder for sending results
-        return True
+        if not devices:
+            return True
+        
+        return self._send_message({
+            'DEVICE': devices,
+            'MODULEVERSION': VERSION,
+            'PROCESSNUMBER': pid,
+        })
+    
+    def _add_device(self, device: Dict, pid: int) -> None:
+        """Queue a discovered device and send a full batch."""
+        with self._pending_lock:
+            self._pending.append(device)
+            if len(self._pending) < DEVICE_PER_MESSAGE:
+                return
+            devices, self._pending = self._pending, []
+        self.send_results(devices, pid)
+    
+    def _flush_devices(self, pid: int) -> None:
+        """Send remaining queued devices."""
+        with self._pending_lock:
+            devices, self._pending = self._pending, []
+        self.send_results(devices, pid)
+    
+    def _send_message(self, content: Dict) -> bool:
+        """Send a NETDISCOVERY message to the server."""
+        if not self.client or not self.target:
+            return False
+        
+        message = Query(
+            deviceid=self.deviceid or 'foo',
+            query='NETDISCOVERY',
+            content=content,
+        )
+        
+        return self.client.send(self.target.getUrl(), message) is not None
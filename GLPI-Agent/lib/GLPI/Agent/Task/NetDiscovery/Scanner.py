@@ -0,0 +1,499 @@
+"""
+GLPI Agent Task NetDiscovery Scanner Module
+
+Asynchronous SNMP discovery engine.
+
+All probes share a single SNMP engine and UDP socket per transport domain,
+so thousands of probes can be in flight without a thread per address.
+Addresses are pulled lazily from the job queue by a bounded set of
+coroutines, each host being probed for one credential/port/domain at a time.
+Devices answering a probe are then inventoried with the synchronous SNMP
+stack in a thread pool sized by the job THREADS_DISCOVERY parameter.
+"""
+
+import asyncio
+import ipaddress
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from pysnmp.hlapi.asyncio import (
+        SnmpEngine,
+        CommunityData,
+        UsmUserData,
+        UdpTransportTarget,
+        Udp6TransportTarget,
+        ContextData,
+        ObjectType,
+        ObjectIdentity,
+        usmNoAuthProtocol,
+        usmHMACMD5AuthProtocol,
+        usmHMACSHAAuthProtocol,
+        usmHMAC128SHA224AuthProtocol,
+        usmHMAC192SHA256AuthProtocol,
+        usmHMAC256SHA384AuthProtocol,
+        usmHMAC384SHA512AuthProtocol,
+        usmNoPrivProtocol,
+        usmDESPrivProtocol,
+        usmAesCfb128Protocol,
+        usmAesCfb192Protocol,
+        usmAesCfb256Protocol,
+    )
+    try:
+        # pysnmp >= 6.2
+        from pysnmp.hlapi.asyncio import get_cmd
+    except ImportError:
+        from pysnmp.hlapi.asyncio import getCmd as get_cmd
+except (ImportError, AttributeError):
+    # pysnmp 4.x asyncio support uses asyncio.coroutine, removed in Python 3.11
+    SnmpEngine = None
+
+try:
+    from GLPI.Agent.SNMP.Live import SNMPLive
+    from GLPI.Agent.SNMP.Device import SNMPDevice
+except ImportError:
+    SNMPLive = SNMPDevice = None
+
+
+__all__ = [
+    'AdaptiveTimeout',
+    'NetDiscoveryScanner',
+    'SNMP_SUPPORT',
+]
+
+SNMP_SUPPORT = SnmpEngine is not None
+
+# Maximum number of hosts probed at the same time
+MAX_INFLIGHT_PROBES = 1024
+
+# Probe retries, each attempt using the current adaptive timeout
+PROBE_RETRIES = 1
+
+# Minimal delay between two probes sent to the same host
+HOST_PROBE_INTERVAL = 0.05
+
+# Adaptive timeout bounds, in seconds
+MIN_PROBE_TIMEOUT = 0.2
+INITIAL_PROBE_TIMEOUT = 1.0
+
+# sysDescr.0, like SNMPLive default session test
+PROBE_OID = '.1.3.6.1.2.1.1.1.0'
+SYSOBJECTID_OID = '.1.3.6.1.2.1.1.2.0'
+
+SUPPORTED_DOMAINS = ('udp', 'udp/ipv4', 'udp/ipv6')
+
+_INVALID_VALUES = ('noSuchInstance', 'noSuchObject', 'endOfMibView')
+
+
+class AdaptiveTimeout:
+    """
+    Probe timeout estimator.
+
+    Follows RFC 6298 retransmission timeout computation: smoothed round trip
+    time and its variation are updated from answered probes, and the timeout
+    is bound between a minimum and the job timeout. One estimator is shared
+    by all addresses of a range, and is only used for probes.
+    """
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    GRANULARITY = 0.01
+
+    def __init__(self, initial: float = INITIAL_PROBE_TIMEOUT,
+                 minimum: float = MIN_PROBE_TIMEOUT,
+                 maximum: Optional[float] = None):
+        """
+        Initialize estimator.
+
+        Args:
+            initial: Timeout to use until a round trip time is measured
+            minimum: Lower timeout bound
+            maximum: Upper timeout bound
+        """
+        self._minimum = minimum
+        self._maximum = maximum if maximum and maximum > minimum else None
+        self._initial = initial
+        self._srtt: Optional[float] = None
+        self._rttvar: Optional[float] = None
+
+    def update(self, rtt: float) -> None:
+        """
+        Update estimation with a measured round trip time.
+
+        Args:
+            rtt: Round trip time in seconds of a probe answered at first attempt
+        """
+        if self._srtt is None:
+            self._srtt = rtt
+            self._rttvar = rtt / 2
+        else:
+            self._rttvar = (1 - self.BETA) * self._rttvar + \
+                self.BETA * abs(self._srtt - rtt)
+            self._srtt = (1 - self.ALPHA) * self._srtt + self.ALPHA * rtt
+
+    def timeout(self) -> float:
+        """
+        Get current timeout.
+
+        Returns:
+            Timeout in seconds
+        """
+        if self._srtt is None:
+            value = self._initial
+        else:
+            value = self._srtt + max(self.GRANULARITY, 4 * self._rttvar)
+        value = max(value, self._minimum)
+        if self._maximum:
+            value = min(value, self._maximum)
+        return value
+
+
+def _get_auth_data(credential: Dict) -> Any:
+    """Get pysnmp authentication data from a job SNMP credential."""
+    version = credential.get('VERSION')
+    if version == '3':
+        auth_protocols = {
+            'md5': usmHMACMD5AuthProtocol,
+            'sha': usmHMACSHAAuthProtocol,
+            'sha224': usmHMAC128SHA224AuthProtocol,
+            'sha256': usmHMAC192SHA256AuthProtocol,
+            'sha384': usmHMAC256SHA384AuthProtocol,
+            'sha512': usmHMAC384SHA512AuthProtocol,
+        }
+        priv_protocols = {
+            'des': usmDESPrivProtocol,
+            'aes': usmAesCfb128Protocol,
+            'aes128': usmAesCfb128Protocol,
+            'aes192': usmAesCfb192Protocol,
+            'aes256': usmAesCfb256Protocol,
+            'aes256c': usmAesCfb256Protocol,
+        }
+        auth_password = credential.get('AUTHPASSWORD')
+        priv_password = credential.get('PRIVPASSWORD')
+        auth_protocol = usmNoAuthProtocol
+        if credential.get('AUTHPROTOCOL') and auth_password:
+            auth_protocol = auth_protocols.get(
+                credential['AUTHPROTOCOL'].lower(), usmNoAuthProtocol)
+        priv_protocol = usmNoPrivProtocol
+        if credential.get('PRIVPROTOCOL') and priv_password:
+            priv_protocol = priv_protocols.get(
+                credential['PRIVPROTOCOL'].lower(), usmNoPrivProtocol)
+        return UsmUserData(
+            credential['USERNAME'],
+            authKey=auth_password,
+            privKey=priv_password,
+            authProtocol=auth_protocol,
+            privProtocol=priv_protocol,
+        )
+
+    return CommunityData(credential.get('COMMUNITY'),
+                         mpModel=0 if version == '1' else 1)
+
+
+async def _get_transport(domain: str, ip: str, port: int, timeout: float) -> Any:
+    """Get pysnmp transport target, retries being handled by the scanner."""
+    target = Udp6TransportTarget if domain == 'udp/ipv6' else UdpTransportTarget
+    if hasattr(target, 'create'):
+        # pysnmp >= 6.2 resolves address asynchronously
+        return await target.create((ip, port), timeout=timeout, retries=0)
+    return target((ip, port), timeout=timeout, retries=0)
+
+
+def _get_device_info(snmp: Any, logger=None) -> Optional[Dict]:
+    """
+    Get discovery information from a device answering SNMP requests.
+
+    Args:
+        snmp: SNMPLive session
+        logger: Logger instance
+
+    Returns:
+        Discovery information dictionary or None
+    """
+    device = SNMPDevice(snmp=snmp, logger=logger)
+
+    device.set_base_infos()
+
+    sysobjectid = device.get(SYSOBJECTID_OID)
+    if sysobjectid:
+        device.set_sysobjectid_infos(sysobjectid)
+        device.load_mib_support(sysobjectid)
+
+    device.set_snmp_hostname()
+    device.set_type()
+    device.set_manufacturer()
+    device.set_model()
+    device.set_serial()
+    device.set_mac()
+    device.set_ip()
+
+    return device.get_discovery_info() or None
+
+
+class NetDiscoveryScanner:
+    """
+    Asynchronous SNMP discovery of a NetDiscovery job queue.
+
+    The job queue must have been initialized with get_queue_params() and
+    update_queue(). Discovered devices are passed to the callback as soon as
+    they are known, from a dedicated thread and in discovery order, so the
+    callback can send them to the server without blocking probes.
+    """
+
+    def __init__(self, job, callback: Optional[Callable[[Dict], Any]] = None,
+                 logger=None, max_probes: int = MAX_INFLIGHT_PROBES):
+        """
+        Initialize the scanner.
+
+        Args:
+            job: NetDiscoveryJob instance with initialized queue
+            callback: Function called with each discovered device
+            logger: Logger instance
+            max_probes: Maximum number of hosts probed at the same time
+        """
+        self.job = job
+        self.logger = logger
+        self._callback = callback
+        self._max_probes = max(1, int(max_probes))
+        self._timeouts: Dict[Any, AdaptiveTimeout] = {}
+        self._engine = None
+        self._devices: List[Dict] = []
+
+    def run(self) -> List[Dict]:
+        """
+        Scan all addresses in job queue.
+
+        Returns:
+            List of discovered devices
+        """
+        if not SNMP_SUPPORT:
+            raise RuntimeError("pysnmp python module needed for network discovery")
+
+        asyncio.run(self._run())
+        return self._devices
+
+    async def _run(self) -> None:
+        self._engine = SnmpEngine()
+        results: asyncio.Queue = asyncio.Queue()
+
+        threads = max(1, int(self.job.max_threads() or 1))
+        with ThreadPoolExecutor(max_workers=threads,
+                                thread_name_prefix='netdiscovery') as pool, \
+                ThreadPoolExecutor(max_workers=1,
+                                   thread_name_prefix='netdiscovery-results') as sender:
+            consumer = asyncio.ensure_future(self._consume(results, sender))
+            try:
+                workers = [
+                    asyncio.ensure_future(self._worker(pool, results))
+                    for _ in range(min(self._max_probes, self.job.queuesize() or 1))
+                ]
+                await asyncio.gather(*workers)
+            finally:
+                await results.put(None)
+                await consumer
+                self._close_engine()
+
+    def _close_engine(self) -> None:
+        if not self._engine:
+            return
+        close = getattr(self._engine, 'close_dispatcher', None)
+        if close:
+            close()
+        else:
+            dispatcher = getattr(self._engine, 'transportDispatcher', None)
+            if dispatcher:
+                dispatcher.closeDispatcher()
+        self._engine = None
+
+    async def _consume(self, results: asyncio.Queue, sender: ThreadPoolExecutor) -> None:
+        """Pass discovered devices to callback in a dedicated thread."""
+        loop = asyncio.get_running_loop()
+        while True:
+            device = await results.get()
+            if device is None:
+                return
+            self._devices.append(device)
+            if not self._callback:
+                continue
+            try:
+                await loop.run_in_executor(sender, self._callback, device)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"failed to handle discovered device: {e}")
+
+    async def _worker(self, pool: ThreadPoolExecutor, results: asyncio.Queue) -> None:
+        """Scan queued addresses until queue is empty."""
+        while True:
+            # No await between both calls, so ip always belongs to range
+            range_config = self.job.range()
+            ip = self.job.nextip()
+            if not ip:
+                return
+
+            try:
+                device = await self.scan_address(ip, range_config, pool)
+            except Exception as e:
+                device = None
+                if self.logger:
+                    self.logger.debug(f"- scanning {ip} failed: {e}")
+            finally:
+                self.job.done()
+
+            if device:
+                results.put_nowait(device)
+
+    def _get_timeout(self, range_config: Dict) -> AdaptiveTimeout:
+        """Get probe timeout estimator shared by a range addresses."""
+        key = (range_config.get('start'), range_config.get('end'))
+        if key not in self._timeouts:
+            maximum = float(self.job.timeout() or INITIAL_PROBE_TIMEOUT)
+            self._timeouts[key] = AdaptiveTimeout(
+                initial=min(INITIAL_PROBE_TIMEOUT, maximum),
+                maximum=maximum,
+            )
+        return self._timeouts[key]
+
+    async def scan_address(self, ip: str, range_config: Dict,
+                           pool: ThreadPoolExecutor) -> Optional[Dict]:
+        """
+        Probe an address with all range credentials, ports and domains.
+
+        Args:
+            ip: Address to scan
+            range_config: Job range configuration
+            pool: Executor used to get device informations
+
+        Returns:
+            Discovered device or None
+        """
+        credentials = range_config.get('snmp_credentials') or \
+            self.job.snmp_credentials() or []
+        ports = range_config.get('ports') or [161]
+        domains = range_config.get('domains') or ['udp/ipv4']
+        estimator = self._get_timeout(range_config)
+        ipv6 = ipaddress.ip_address(ip).version == 6
+
+        probes = 0
+        for domain in domains:
+            if domain not in SUPPORTED_DOMAINS:
+                continue
+            if ipv6 != (domain == 'udp/ipv6'):
+                continue
+            for port in ports:
+                for credential in credentials:
+                    # Rate limit probes sent to the same host
+                    if probes:
+                        await asyncio.sleep(HOST_PROBE_INTERVAL)
+                    probes += 1
+
+                    answered = await self.probe(ip, port, domain, credential, estimator)
+                    if not answered:
+                        if self.logger:
+                            self.logger.debug2(
+                                f"- scanning {ip} with SNMP, credentials "
+                                f"{credential.get('ID')}: no response"
+                            )
+                        continue
+
+                    loop = asyncio.get_running_loop()
+                    device = await loop.run_in_executor(
+                        pool, self.get_device, ip, port, domain, credential
+                    )
+                    if not device:
+                        continue
+
+                    if self.logger:
+                        self.logger.debug(
+                            f"- scanning {ip} with SNMP, credentials "
+                            f"{credential.get('ID')}: success"
+                        )
+
+                    device['IP'] = ip
+                    device['AUTHSNMP'] = credential.get('ID')
+                    if port and port != 161:
+                        device['AUTHPORT'] = port
+                    if domain not in ('udp', 'udp/ipv4'):
+                        device['AUTHPROTOCOL'] = domain
+                    if range_config.get('entity') is not None:
+                        device['ENTITY'] = range_config['entity']
+                    return device
+
+        return None
+
+    async def probe(self, ip: str, port: int, domain: str, credential: Dict,
+                    estimator: AdaptiveTimeout) -> bool:
+        """
+        Check if an address answers SNMP request with a credential.
+
+        Args:
+            ip: Address to probe
+            port: SNMP port
+            domain: Transport domain
+            credential: Job SNMP credential
+            estimator: Timeout estimator updated on first attempt answer
+
+        Returns:
+            True if a valid value was returned
+        """
+        loop = asyncio.get_running_loop()
+        auth = _get_auth_data(credential)
+
+        for attempt in range(PROBE_RETRIES + 1):
+            transport = await _get_transport(domain, ip, port, estimator.timeout())
+            start = loop.time()
+            error_indication, error_status, _, var_binds = await get_cmd(
+                self._engine, auth, transport, ContextData(),
+                ObjectType(ObjectIdentity(PROBE_OID))
+            )
+            if error_indication:
+                # Only retry on timeout, authentication errors are final
+                if 'timeout' in str(error_indication).lower():
+                    continue
+                return False
+
+            # Karn's algorithm: don't sample retried requests
+            if not attempt:
+                estimator.update(loop.time() - start)
+
+            if error_status:
+                return False
+
+            for _, value in var_binds:
+                value = str(value)
+                if value and not any(invalid in value for invalid in _INVALID_VALUES):
+                    return True
+            return False
+
+        return False
+
+    def get_device(self, ip: str, port: int, domain: str,
+                   credential: Dict) -> Optional[Dict]:
+        """
+        Get device discovery information, run in thread pool.
+
+        The adaptive probe timeout is tuned for one small request, so the
+        walks and requests getting device information use the job timeout.
+
+        Args:
+            ip: Device address
+            port: SNMP port
+            domain: Transport domain
+            credential: Job SNMP credential
+
+        Returns:
+            Discovery information dictionary or None
+        """
+        snmp = SNMPLive(
+            hostname=ip,
+            port=port,
+            domain=domain,
+            timeout=self.job.timeout(),
+            version=credential.get('VERSION'),
+            community=credential.get('COMMUNITY'),
+            username=credential.get('USERNAME'),
+            authprotocol=credential.get('AUTHPROTOCOL'),
+            authpassword=credential.get('AUTHPASSWORD'),
+            privprotocol=credential.get('PRIVPROTOCOL'),
+            privpassword=credential.get('PRIVPASSWORD'),
+        )
+        return _get_device_info(snmp, logger=self.logger)
@@ -4,13 +4,38 @@ GLPI Agent Task NetInventory Module
 This module performs SNMP inventory of network devices.
 """
 
-from typing import List, Dict, Optional, Any
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Optional
 
 from GLPI.Agent.Task.NetInventory.Version import VERSION
 from GLPI.Agent.Task.NetInventory.Job import NetInventoryJob
+from GLPI.Agent.SNMP.Live import SNMPLive
+from GLPI.Agent.SNMP.Device import SNMPDevice
+from GLPI.Agent.HTTP.Client.OCS import GLPIAgentHTTPClientOCS
+from GLPI.Agent.XML.Query import Query
 
 __version__ = VERSION
 
+SYSOBJECTID_OID = '.1.3.6.1.2.1.1.2.0'
+
+# Discovery fields reported in inventory INFO section
+INFO_FIELDS = {
+    'SNMPHOSTNAME': 'NAME',
+    'DESCRIPTION': 'COMMENTS',
+    'CONTACT': 'CONTACT',
+    'FIRMWARE': 'FIRMWARE',
+    'IPS': 'IPS',
+    'LOCATION': 'LOCATION',
+    'MAC': 'MAC',
+    'MANUFACTURER': 'MANUFACTURER',
+    'MEMORY': 'MEMORY',
+    'MODEL': 'MODEL',
+    'SERIAL': 'SERIAL',
+    'TYPE': 'TYPE',
+    'UPTIME': 'UPTIME',
+}
+
 
 class NetInventoryTask:
     """GLPI Agent Network Inventory Task"""
@@ -22,6 +47,7 @@ class NetInventoryTask:
         self.target = target
         self.deviceid = deviceid
         self.client = None
+        self.options = None
     
     def is_enabled(self, contact=None) -> bool:
         """Check if the task is enabled"""
@@ -45,6 +71,7 @@ class NetInventoryTask:
                 self.logger.debug("NetInventory task execution not requested")
             return False
         
+        self.options = options
         return True
     
     def run(self) -> Optional[bool]:
@@ -53,55 +80,279 @@ class NetInventoryTask:
         if hasattr(self, 'reset_event'):
             self.reset_event()
         
-        # This is a placeholder for the actual implementation
-        # The real implementation would:
-        # 1. Initialize SNMP libraries
-        # 2. Get jobs from server
-        # 3. Query devices via SNMP
-        # 4. Create inventory from SNMP data
-        # 5. Send results back to server
+        jobs = self.get_jobs()
+        if not jobs:
+            if self.logger:
+                self.logger.debug("NetInventory task: no job to run")
+            return None
         
-        if self.logger:
-            self.logger.info("NetInventory task run (placeholder implementation)")
+        config = self.config or {}
+        self.client = GLPIAgentHTTPClientOCS(
+            logger=self.logger,
+            timeout=config.get('timeout', 180),
+            ca_cert_file=config.get('ca-cert-file'),
+            ssl_verify=not config.get('no-ssl-check'),
+            compression='none' if config.get('no-compression') else 'gzip',
+        )
+        
+        for job in jobs:
+            if not job.skip_start_stop():
+                self._send_message({
+                    'AGENT': {
+                        'START': 1,
+                    },
+                    'MODULEVERSION': VERSION,
+                    'PROCESSNUMBER': job.pid(),
+                })
+            
+            self.run_job(job)
+            
+            if not job.skip_start_stop():
+                self._send_message({
+                    'AGENT': {
+                        'END': 1,
+                    },
+                    'MODULEVERSION': VERSION,
+                    'PROCESSNUMBER': job.pid(),
+                })
         
         return True
     
-    def query_device(self, device: Dict, credentials: Dict) -> Optional[Dict]:
+    def get_jobs(self) -> List[NetInventoryJob]:
+        """
+        Get jobs from server SNMPQUERY options.
+        
+        Returns:
+            List of NetInventoryJob instances
+        """
+        options = self.options
+        if not options:
+            return []
+        
+        params = options.get('PARAM')
+        if isinstance(params, list):
+            params = params[0] if params else {}
+        
+        if not params or not params.get('PID'):
+            if self.logger:
+                self.logger.error("no PID parameter in NetInventory job")
+            return []
+        
+        devices = options.get('DEVICE')
+        if isinstance(devices, dict):
+            devices = [devices]
+        if not devices:
+            if self.logger:
+                self.logger.error("no device defined in NetInventory job")
+            return []
+        
+        credentials = options.get('AUTHENTICATION')
+        if isinstance(credentials, dict):
+            credentials = [credentials]
+        
+        return [
+            NetInventoryJob(
+                logger=self.logger,
+                params=params,
+                credentials=credentials,
+                devices=devices,
+            )
+        ]
+    
+    def run_job(self, job: NetInventoryJob) -> int:
+        """
+        Inventory all job devices.
+        
+        Devices are queried by a pool of job max_threads() workers, each
+        device inventory being sent to the server as soon as it is done.
+        
+        Args:
+            job: NetInventoryJob instance
+        
+        Returns:
+            Number of inventoried devices
+        """
+        job.update_queue(job.devices())
+        
+        workers = max(1, int(job.max_threads() or 1))
+        count = 0
+        
+        if self.logger:
+            self.logger.info(
+                f"inventorying {job.count()} devices for job {job.pid()} "
+                f"with {workers} workers"
+            )
+        
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix='netinventory') as pool:
+            running = {}
+            while True:
+                # Keep all workers busy
+                while len(running) < workers:
+                    device = job.nextdevice()
+                    if not device:
+                        break
+                    future = pool.submit(self._inventory_device, job, device)
+                    running[future] = device
+                
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    device = running.pop(future)
+                    job.done()
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = self._error(device, str(e))
+                    if 'ERROR' not in result:
+                        count += 1
+                    self.send_result(result, job.pid())
+        
+        return count
+    
+    def _inventory_device(self, job: NetInventoryJob, device: Dict) -> Dict:
+        """Get device inventory or error, run in worker thread."""
+        credential = job.credential(device.get('AUTHSNMP_ID'))
+        if not credential:
+            return self._error(device, "no valid credential")
+        
+        deadline = time.monotonic() + job.device_timeout()
+        
+        try:
+            inventory = self.query_device(device, credential,
+                                          timeout=job.timeout(), deadline=deadline)
+        except Exception as e:
+            return self._error(device, str(e))
+        
+        if time.monotonic() > deadline:
+            return self._error(device, f"inventory not done after {job.device_timeout()}s")
+        
+        if not inventory:
+            return self._error(device, "no response")
+        
+        return inventory
+    
+    def _error(self, device: Dict, message: str) -> Dict:
+        """Get device error result."""
+        if self.logger:
+            self.logger.error(f"[{device.get('IP')}] {message}")
+        return {
+            'ERROR': {
+                'ID': device.get('ID'),
+                'TYPE': device.get('TYPE'),
+                'MESSAGE': message,
+            }
+        }
+    
+    def query_device(self, device: Dict, credentials: Dict,
+                     timeout: Optional[int] = None,
+                     deadline: Optional[float] = None) -> Optional[Dict]:
         """
         Query a single device via SNMP.
         
         Args:
             device: Device information
             credentials: SNMP credentials
+            timeout: SNMP requests timeout
+            deadline: time.monotonic() value after which SNMP requests are
+                no more sent to the device
         
         Returns:
             Device inventory data or None
         """
-        # Placeholder for SNMP query logic
-        return None
+        snmp = SNMPLive(
+            hostname=device.get('IP'),
+            port=device.get('PORT') or 161,
+            domain=device.get('PROTOCOL') or 'udp/ipv4',
+            timeout=timeout or 15,
+            version=credentials.get('VERSION'),
+            community=credentials.get('COMMUNITY'),
+            username=credentials.get('USERNAME'),
+            authprotocol=credentials.get('AUTHPROTOCOL'),
+            authpassword=credentials.get('AUTHPASSWORD'),
+            privprotocol=credentials.get('PRIVPROTOCOL'),
+            privpassword=credentials.get('PRIVPASSWORD'),
+        )
+        snmp.testSession()
+        
+        snmp_device = SNMPDevice(snmp=snmp, logger=self.logger, deadline=deadline)
+        
+        snmp_device.set_base_infos()
+        
+        sysobjectid = snmp_device.get(SYSOBJECTID_OID)
+        if sysobjectid:
+            snmp_device.set_sysobjectid_infos(sysobjectid,
+                                              datadir=getattr(self, 'datadir', None))
+            snmp_device.load_mib_support(sysobjectid, config=self.config)
+        
+        snmp_device.set_snmp_hostname()
+        snmp_device.set_type()
+        snmp_device.set_manufacturer()
+        snmp_device.set_model()
+        snmp_device.set_serial()
+        snmp_device.set_mac()
+        snmp_device.set_ip()
+        snmp_device.set_inventory_base_infos()
+        snmp_device.set_components()
+        snmp_device.run_mib_support()
+        
+        return self.create_inventory(snmp_device, device)
     
-    def create_inventory(self, device_data: Dict) -> Optional[Any]:
+    def create_inventory(self, snmp_device: SNMPDevice, device: Dict) -> Optional[Dict]:
         """
-        Create an inventory object from device data.
+        Create an inventory from a queried device.
         
         Args:
-            device_data: Raw device data from SNMP
+            snmp_device: SNMPDevice instance after all informations were set
+            device: Device information from server
         
         Returns:
-            Inventory object
+            Inventory dictionary
         """
-        # Placeholder for inventory creation
-        return None
+        inventory = snmp_device.get_inventory()
+        if not inventory:
+            return None
+        
+        info = inventory.setdefault('INFO', {})
+        for field, key in INFO_FIELDS.items():
+            value = getattr(snmp_device, field, None)
+            if value is not None and key not in info:
+                info[key] = value
+        
+        info['ID'] = device.get('ID')
+        if device.get('TYPE'):
+            info['TYPE'] = device['TYPE']
+        
+        return inventory
     
-    def send_result(self, inventory: Any) -> bool:
+    def send_result(self, inventory: Dict, pid: int = 0) -> bool:
         """
         Send inventory result to server.
         
         Args:
-            inventory: Inventory object
+            inventory: Device inventory or error
+            pid: Job process number
         
         Returns:
             True if successful, False otherwise
         """
-        # Placeholder for sending results
-        return True
+        return self._send_message({
+            'DEVICE': inventory,
+            'MODULEVERSION': VERSION,
+            'PROCESSNUMBER': pid,
+        })
+    
+    def _send_message(self, content: Dict) -> bool:
+        """Send a SNMPQUERY message to the server."""
+        if not self.client or not self.target:
+            return False
+        
+        message = Query(
+            deviceid=self.deviceid or 'foo',
+            query='SNMPQUERY',
+            content=content,
+        )
+        
+        return self.client.send(self.target.getUrl(), message) is not None
@@ -6,6 +6,9 @@ Handles network inventory job configuration and queue management.
 
 from typing import List, Dict, Optional, Any
 
+# Default maximum time in seconds allowed to inventory one device
+DEVICE_TIMEOUT = 900
+
 
 class NetInventoryJob:
     """NetInventory Job Handler"""
@@ -41,6 +44,10 @@ class NetInventoryJob:
         """Get maximum number of threads"""
         return self._params.get('THREADS_QUERY', 1)
     
+    def device_timeout(self) -> int:
+        """Get maximum time allowed to inventory one device"""
+        return self._params.get('DEVICE_TIMEOUT', DEVICE_TIMEOUT)
+    
     def count(self) -> int:
         """Get device count"""
         return self._count
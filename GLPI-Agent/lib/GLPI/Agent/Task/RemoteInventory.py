@@ -4,8 +4,11 @@ GLPI Agent Task RemoteInventory Module
 This module performs inventory of remote systems via SSH or WinRM.
 """
 
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Any
 
+from GLPI.Agent.Tools import set_remote_for_tools, reset_remote_for_tools
 from GLPI.Agent.Task.RemoteInventory.Version import VERSION
 from GLPI.Agent.Task.RemoteInventory.Remotes import Remotes
 
@@ -15,13 +18,15 @@ __version__ = VERSION
 class RemoteInventoryTask:
     """GLPI Agent Remote Inventory Task"""
     
-    def __init__(self, logger=None, config=None, target=None, deviceid=None, storage=None):
+    def __init__(self, logger=None, config=None, target=None, deviceid=None, storage=None,
+                 datadir=None):
         """Initialize the RemoteInventory task"""
         self.logger = logger
         self.config = config
         self.target = target
         self.deviceid = deviceid
         self.storage = storage
+        self.datadir = datadir
         self.remotes = None
     
     def is_enabled(self) -> bool:
@@ -67,9 +72,21 @@ class RemoteInventoryTask:
         if self.logger:
             self.logger.info(f"Processing {self.remotes.count()} remote(s)")
         
-        # Process each remote
-        for remote in self.remotes.getall():
-            self.process_remote(remote)
+        # Process remotes concurrently, each worker keeping at most one
+        # connection opened so remote-workers caps connections count
+        remotes = self.remotes.getall()
+        workers = max(int((self.config or {}).get('remote-workers') or 1), 1)
+        with ThreadPoolExecutor(max_workers=min(workers, len(remotes))) as executor:
+            # Each remote is set for tools in its own context
+            futures = [
+                executor.submit(contextvars.copy_context().run, self.process_remote, remote)
+                for remote in remotes
+            ]
+            for remote, future in zip(remotes, futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    remote.run_error(str(e))
         
         # Save remotes state
         if self.remotes:
@@ -87,14 +104,34 @@ class RemoteInventoryTask:
         Returns:
             True if successful, False otherwise
         """
-        # This is a placeholder for the actual implementation
-        # The real implementation would:
-        # 1. Connect to the remote system
-        # 2. Run inventory command
-        # 3. Parse the inventory data
-        # 4. Send to server or save locally
-        
         if self.logger:
-            self.logger.debug(f"Processing remote: {remote.url()}")
+            self.logger.debug(f"Processing remote: {remote.safe_url()}")
+        
+        if not remote.connect():
+            return False
+        
+        try:
+            if not remote.prepare():
+                remote.run_error("can't prepare remote for inventory")
+                return False
+            
+            from GLPI.Agent.Task.Inventory import InventoryTask
+            
+            inventory = InventoryTask(
+                logger=self.logger,
+                config=self.config,
+                target=self.target,
+                datadir=self.datadir,
+                deviceid=remote.deviceid(),
+            )
+            inventory.setRemote(remote.protocol())
+            
+            set_remote_for_tools(remote)
+            try:
+                inventory.run()
+            finally:
+                reset_remote_for_tools()
+        finally:
+            remote.disconnect()
         
         return True
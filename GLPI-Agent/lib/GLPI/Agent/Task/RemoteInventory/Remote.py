@@ -97,6 +97,21 @@ class Remote:
         """Get the remote URL"""
         return self._url
     
+    def protocol(self) -> Optional[str]:
+        """Get the remote protocol, like ssh or winrm"""
+        return self._protocol
+    
+    def connect(self) -> bool:
+        """Establish connection, to be implemented by protocol classes"""
+        return False
+    
+    def prepare(self) -> bool:
+        """Prepare connected remote for inventory"""
+        return True
+    
+    def disconnect(self) -> None:
+        """Close connection"""
+    
     def safe_url(self) -> Optional[str]:
         """Get a safe URL (without credentials) for identification"""
         if not self._url:
@@ -2,42 +2,397 @@
 GLPI Agent Task RemoteInventory Remote SSH Module
 
 SSH-based remote inventory connection.
+
+Only one connection is opened per remote and kept during the whole
+inventory, each command being run on a new channel of this connection:
+- with libssh2 mode, or when paramiko is available and ssh mode is not
+  forced, a paramiko transport is used
+- otherwise, an OpenSSH master connection is started and commands are run
+  by ssh clients multiplexed on it through a control socket
+
+Small files are read in batch by a single remote shell script and then
+served from memory.
 """
 
+import io
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
 from GLPI.Agent.Task.RemoteInventory.Remote import Remote
 
+try:
+    import paramiko
+except ImportError:
+    paramiko = None
+
 
 class Ssh(Remote):
     """SSH remote inventory connection"""
-    
+
     supported = True
     supported_modes = ('ssh', 'libssh2', 'perl')
-    
+
+    # Channels opened concurrently on the connection, OpenSSH server
+    # MaxSessions defaults to 10
+    MAX_CHANNELS = 8
+
+    # Files read when connecting as most inventories need them
+    PREFETCH_FILES = (
+        '/etc/os-release',
+        '/etc/lsb-release',
+        '/etc/debian_version',
+        '/etc/redhat-release',
+        '/etc/hostname',
+        '/etc/machine-id',
+        '/etc/timezone',
+        '/proc/cpuinfo',
+        '/proc/meminfo',
+        '/proc/uptime',
+        '/proc/version',
+        '/proc/mounts',
+        '/etc/passwd',
+        '/etc/group',
+    )
+
     def __init__(self, **kwargs):
         """Initialize SSH remote connection"""
         super().__init__(**kwargs)
-        
+
         # Set default SSH port if not specified
         if not self._port:
             self._port = 22
-    
+
+        self._client = None
+        self._control_dir = None
+        self._channels = threading.BoundedSemaphore(self.MAX_CHANNELS)
+        self._files: Dict[str, Optional[str]] = {}
+        self._os_name = None
+        self._users: Optional[List[Dict[str, Any]]] = None
+
+    def _use_paramiko(self) -> bool:
+        if self.mode('libssh2'):
+            return paramiko is not None
+        return paramiko is not None and not self.mode('ssh')
+
+    def _accept_unknown_host_keys(self) -> bool:
+        """
+        Check remote-host-key-policy option.
+
+        Host keys are checked against system known hosts. With the default
+        reject policy, unknown hosts are refused, with warning policy they
+        are accepted with a warning.
+        """
+        policy = self._config.get('remote-host-key-policy') or 'reject'
+        return str(policy).lower() == 'warning'
+
+    def _ssh_options(self) -> List[str]:
+        """Get OpenSSH client options for this remote."""
+        options = [
+            '-o', 'BatchMode=yes',
+            '-o', f'ControlPath={self._control_dir}/master',
+            '-p', str(self._port),
+        ]
+        if self._accept_unknown_host_keys():
+            # Changed host keys are still refused
+            options += ['-o', 'StrictHostKeyChecking=accept-new']
+        if self._timeout:
+            options += ['-o', f'ConnectTimeout={self._timeout}']
+        if self.user():
+            options += ['-l', self.user()]
+        return options
+
     def connect(self) -> bool:
         """
         Establish SSH connection.
-        
+
         Returns:
             True if successful, False otherwise
         """
-        # Placeholder for SSH connection logic
-        # Would use paramiko or similar library in real implementation
-        return False
-    
-    def run_inventory(self) -> Optional[str]:
+        if self._client or self._control_dir:
+            return True
+
+        if self._use_paramiko():
+            client = paramiko.SSHClient()
+            client.load_system_host_keys()
+            client.set_missing_host_key_policy(
+                paramiko.WarningPolicy() if self._accept_unknown_host_keys()
+                else paramiko.RejectPolicy()
+            )
+            try:
+                client.connect(
+                    self._host,
+                    port=self._port,
+                    username=self.user(),
+                    password=self.pass_(),
+                    timeout=self._timeout or None,
+                )
+            except (paramiko.SSHException, OSError) as e:
+                self.checking_error(str(e))
+                client.close()
+                return False
+            self._client = client
+        else:
+            if not shutil.which('ssh'):
+                self.checking_error("ssh command not found")
+                return False
+            # BatchMode disables password authentication
+            if self.pass_() and self.logger:
+                self.logger.warning(
+                    f"Password is ignored with ssh command for {self._host}, "
+                    "key authentication is required"
+                )
+            self._control_dir = tempfile.mkdtemp(prefix='glpi-ssh-')
+            # Start master connection in background
+            master = subprocess.run(
+                ['ssh', '-M', '-N', '-f', '-o', 'ControlPersist=yes']
+                + self._ssh_options() + [self._host],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE, text=True,
+            )
+            if master.returncode:
+                self.checking_error(master.stderr.strip() or "ssh connection failure")
+                shutil.rmtree(self._control_dir, ignore_errors=True)
+                self._control_dir = None
+                return False
+
+        self.prefetch_files(self.PREFETCH_FILES)
+        return True
+
+    def disconnect(self) -> None:
+        """Close SSH connection."""
+        if self._client:
+            self._client.close()
+            self._client = None
+
+        if self._control_dir:
+            subprocess.run(
+                ['ssh', '-O', 'exit'] + self._ssh_options() + [self._host],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            shutil.rmtree(self._control_dir, ignore_errors=True)
+            self._control_dir = None
+
+        self._files = {}
+        self._users = None
+
+    def _run(self, command: str) -> Optional[tuple]:
         """
-        Run inventory command via SSH.
-        
+        Run a command on a new channel.
+
+        Args:
+            command: Shell command
+
         Returns:
-            Inventory data as string or None
+            Tuple of exit status and stdout, or None on connection failure
         """
-        # Placeholder for running remote inventory
+        with self._channels:
+            if self._client:
+                try:
+                    channel = self._client.get_transport().open_session()
+                    channel.exec_command(command)
+                    # Drain stderr while reading stdout, a command writing
+                    # more than the channel window on stderr would block
+                    drain = threading.Thread(
+                        target=channel.makefile_stderr('rb').read, daemon=True
+                    )
+                    drain.start()
+                    stdout = channel.makefile('rb').read()
+                    drain.join()
+                    status = channel.recv_exit_status()
+                    channel.close()
+                except (paramiko.SSHException, OSError) as e:
+                    if self.logger:
+                        self.logger.debug(f"ssh command failure on {self._host}: {e}")
+                    return None
+                return status, stdout.decode('utf-8', errors='replace')
+
+            if self._control_dir:
+                result = subprocess.run(
+                    ['ssh'] + self._ssh_options() + [self._host, command],
+                    stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+                # 255 is reserved by ssh client for connection failures
+                if result.returncode == 255:
+                    return None
+                return result.returncode, result.stdout.decode('utf-8', errors='replace')
+
         return None
+
+    def _test(self, test: str, path: str) -> bool:
+        result = self._run(f"test {test} {shlex.quote(path)}")
+        return bool(result) and result[0] == 0
+
+    def prefetch_files(self, paths) -> None:
+        """
+        Read small files in batch with a single remote script.
+
+        Args:
+            paths: Files path, unreadable ones are remembered as missing
+        """
+        marker = uuid.uuid4().hex
+        script = ''.join(
+            f"if [ -f {quoted} -a -r {quoted} ]; then "
+            f"echo '{marker} BEGIN'; cat {quoted}; echo; echo '{marker} END'; "
+            f"else echo '{marker} NONE'; fi; "
+            for quoted in (shlex.quote(path) for path in paths)
+        )
+        result = self._run(script)
+        if not result:
+            return
+
+        blocks = iter(result[1].split(f"{marker} ")[1:])
+        for path in paths:
+            block = next(blocks, None)
+            if block is None:
+                break
+            if block.startswith('NONE'):
+                self._files[path] = None
+            elif block.startswith('BEGIN\n'):
+                # Remove BEGIN line and newline added after file content
+                content = block[len('BEGIN\n'):]
+                if content.endswith('\n'):
+                    content = content[:-1]
+                self._files[path] = content
+                # Skip END block
+                next(blocks, None)
+
+    def get_remote_file_handle(self, command=None, file=None, string=None,
+                               mode='r', logger=None, no_error_log=False):
+        """
+        Get a file handle on remote command output or file content.
+
+        Returns:
+            File handle or None
+        """
+        if string is not None:
+            return io.StringIO(string)
+
+        if file:
+            if file in self._files:
+                content = self._files[file]
+                if content is None:
+                    if logger and not no_error_log:
+                        logger.error(f"Can't open remote file {file}")
+                    return None
+                return io.StringIO(content)
+            command = f"cat {shlex.quote(file)}"
+
+        if isinstance(command, (list, tuple)):
+            command = ' '.join(shlex.quote(arg) for arg in command)
+
+        if not command:
+            return None
+
+        if logger:
+            logger.debug2(f"executing {command} on {self._host}")
+
+        result = self._run(command)
+        if result is None:
+            if logger and not no_error_log:
+                logger.error(f"Can't run {command} on {self._host}")
+            return None
+
+        status, output = result
+        if status and file:
+            if logger and not no_error_log:
+                logger.error(f"Can't open remote file {file}")
+            return None
+
+        return io.StringIO(output)
+
+    def get_remote_hostname(self) -> Optional[str]:
+        """Get remote hostname."""
+        result = self._run('hostname')
+        if result and result[0] == 0 and result[1].strip():
+            return result[1].strip().split('.')[0]
+        return self._host
+
+    def os_name(self) -> Optional[str]:
+        """Get remote OS name, like uname -s."""
+        if self._os_name is None:
+            result = self._run('uname -s')
+            if result and result[0] == 0:
+                self._os_name = result[1].strip()
+        return self._os_name
+
+    def remote_can_run(self, binary: str) -> bool:
+        result = self._run(f"command -v {shlex.quote(binary)}")
+        return bool(result) and result[0] == 0
+
+    def remote_glob(self, pattern: str, test: Optional[str] = None) -> List[str]:
+        test = test or '-e'
+        result = self._run(
+            f"for f in {pattern}; do [ {test} \"$f\" ] && echo \"$f\"; done"
+        )
+        if not result:
+            return []
+        return [line for line in result[1].splitlines() if line]
+
+    def remote_test_folder(self, path: str) -> bool:
+        return self._test('-d', path)
+
+    def remote_test_file(self, path: str, mode: Optional[str] = None) -> bool:
+        if path in self._files:
+            return self._files[path] is not None
+        return self._test('-r' if mode == 'r' else '-e', path)
+
+    def remote_test_link(self, path: str) -> bool:
+        return self._test('-h', path)
+
+    def remote_file_stat(self, path: str) -> Optional[os.stat_result]:
+        result = self._run(f"stat -c '%f %i %d %h %u %g %s %X %Y %Z' {shlex.quote(path)}")
+        if not result or result[0]:
+            return None
+        try:
+            fields = result[1].split()
+            return os.stat_result([int(fields[0], 16)] + [int(field) for field in fields[1:10]])
+        except (ValueError, IndexError):
+            return None
+
+    def remote_read_link(self, path: str) -> Optional[str]:
+        result = self._run(f"readlink {shlex.quote(path)}")
+        if not result or result[0]:
+            return None
+        return result[1].rstrip('\n')
+
+    def remote_get_next_user(self) -> Optional[Dict[str, Any]]:
+        """Get next user from remote passwd database, None after last."""
+        if self._users is None:
+            self._users = []
+            handle = self.get_remote_file_handle(file='/etc/passwd', no_error_log=True)
+            for line in handle or []:
+                fields = line.rstrip('\n').split(':')
+                if len(fields) < 7 or not fields[2].isdigit():
+                    continue
+                self._users.append({
+                    'name': fields[0],
+                    'uid': int(fields[2]),
+                    'dir': fields[5],
+                })
+
+        return self._users.pop(0) if self._users else None
+
+    def prepare(self) -> bool:
+        """
+        Set device id from remote hostname if not known yet.
+
+        Returns:
+            True if connected
+        """
+        if not (self._client or self._control_dir):
+            return False
+
+        if not self.deviceid():
+            hostname = self.get_remote_hostname()
+            self.deviceid(f"{hostname}-{time.strftime('%Y-%m-%d-%H-%M-%S')}")
+
+        return True
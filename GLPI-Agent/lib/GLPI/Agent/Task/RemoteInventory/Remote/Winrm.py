@@ -2,42 +2,254 @@
 GLPI Agent Task RemoteInventory Remote WinRM Module
 
 WinRM-based remote inventory connection.
+
+Commands are run in remote cmd shells by the WS-Management client, which
+keeps idle shells open for next commands. These shells are deleted when
+the remote is disconnected at the end of the inventory, instead of being
+left until the WinRM service IdleTimeout.
+
+Remote API used by tools is implemented with cmd builtins, and PowerShell
+for file stats and links.
 """
 
+import io
+import os
+import stat
+import subprocess
+import time
+from typing import Any, Dict, List, Optional
+
 from GLPI.Agent.Task.RemoteInventory.Remote import Remote
 
+try:
+    from GLPI.Agent.SOAP.WsMan import WsManClient
+except ImportError:
+    WsManClient = None
+
 
 class Winrm(Remote):
     """WinRM remote inventory connection"""
-    
+
     supported = True
     supported_modes = ('winrm',)
-    
+
     def __init__(self, **kwargs):
         """Initialize WinRM remote connection"""
         super().__init__(**kwargs)
-        
+
         # Set default WinRM port if not specified
         if not self._port:
             self._port = 5985  # Default HTTP port, 5986 for HTTPS
-    
+
+        self._winrm = None
+
     def connect(self) -> bool:
         """
         Establish WinRM connection.
-        
+
         Returns:
             True if successful, False otherwise
         """
-        # Placeholder for WinRM connection logic
-        # Would use pywinrm library in real implementation
-        return False
-    
-    def run_inventory(self) -> Optional[str]:
+        if self._winrm:
+            return True
+
+        if WsManClient is None:
+            self.checking_error("WinRM support not available")
+            return False
+
+        scheme = 'https' if self._port == 5986 else 'http'
+        winrm = WsManClient(
+            url=f"{scheme}://{self._host}:{self._port}/wsman",
+            user=self.user(),
+            password=self.pass_(),
+            config=self._config,
+            logger=self.logger,
+            timeout=self._timeout,
+            winrm=1,
+        )
+        if not winrm.identify():
+            self.checking_error(winrm.lasterror() or "WinRM identify failure")
+            return False
+
+        self._winrm = winrm
+        return True
+
+    def disconnect(self) -> None:
+        """Delete remote shells kept open and close WinRM connection."""
+        if self._winrm:
+            self._winrm.close_shells()
+            self._winrm = None
+
+    def _run(self, command: str) -> Optional[tuple]:
+        """
+        Run a command in a remote cmd shell.
+
+        Args:
+            command: cmd command line
+
+        Returns:
+            Tuple of exit code and stdout, or None on connection failure
+        """
+        if not self._winrm:
+            return None
+
+        result = self._winrm.shell(command)
+        if not result:
+            return None
+
+        try:
+            exitcode = int(result['exitcode'])
+        except (TypeError, ValueError):
+            exitcode = 255
+        return exitcode, result['stdout'] or ''
+
+    def _powershell(self, script: str) -> Optional[str]:
+        """Run a PowerShell script and get its output on success."""
+        result = self._run(subprocess.list2cmdline(
+            ['powershell', '-NoProfile', '-NonInteractive', '-Command', script]
+        ))
+        if not result or result[0]:
+            return None
+        return result[1]
+
+    @staticmethod
+    def _quote(path: str) -> str:
+        """Quote a path as a PowerShell literal string."""
+        return "'" + path.replace("'", "''") + "'"
+
+    def _attributes(self, pattern: str) -> List[tuple]:
+        """
+        Get files matching a cmd wildcard pattern with their attributes.
+
+        Returns:
+            List of attributes, size and path tuples. Missing files are
+            skipped as they have no attributes.
+        """
+        result = self._run(f'for %f in ("{pattern}") do @echo %~af^|%~zf^|%~ff')
+        if not result or result[0]:
+            return []
+
+        files = []
+        for line in result[1].splitlines():
+            fields = line.strip().split('|', 2)
+            if len(fields) == 3 and fields[0] and fields[2]:
+                files.append((fields[0], int(fields[1]) if fields[1].isdigit() else 0, fields[2]))
+        return files
+
+    def get_remote_file_handle(self, command=None, file=None, string=None,
+                               mode='r', logger=None, no_error_log=False):
         """
-        Run inventory command via WinRM.
-        
+        Get a file handle on remote command output or file content.
+
         Returns:
-            Inventory data as string or None
+            File handle or None
         """
-        # Placeholder for running remote inventory
+        if string is not None:
+            return io.StringIO(string)
+
+        if file:
+            command = f'type "{file}"'
+
+        if isinstance(command, (list, tuple)):
+            command = subprocess.list2cmdline(command)
+
+        if not command:
+            return None
+
+        if logger:
+            logger.debug2(f"executing {command} on {self._host}")
+
+        result = self._run(command)
+        if result is None:
+            if logger and not no_error_log:
+                logger.error(f"Can't run {command} on {self._host}")
+            return None
+
+        status, output = result
+        if status and file:
+            if logger and not no_error_log:
+                logger.error(f"Can't open remote file {file}")
+            return None
+
+        return io.StringIO(output)
+
+    def get_remote_hostname(self) -> Optional[str]:
+        """Get remote hostname."""
+        result = self._run('hostname')
+        if result and result[0] == 0 and result[1].strip():
+            return result[1].strip().split('.')[0]
+        return self._host
+
+    def os_name(self) -> Optional[str]:
+        """Get remote OS name, like platform.system() on Windows."""
+        return 'Windows'
+
+    def remote_can_run(self, binary: str) -> bool:
+        result = self._run(subprocess.list2cmdline(['where', '/q', binary]))
+        return bool(result) and result[0] == 0
+
+    def remote_glob(self, pattern: str, test: Optional[str] = None) -> List[str]:
+        files = self._attributes(pattern)
+        if test == '-s':
+            files = [entry for entry in files if entry[1] > 0]
+        elif test == '-h':
+            files = [entry for entry in files if 'l' in entry[0]]
+        return [entry[2] for entry in files]
+
+    def remote_test_folder(self, path: str) -> bool:
+        result = self._run(f'if exist "{path}\\*" (exit 0) else (exit 1)')
+        return bool(result) and result[0] == 0
+
+    def remote_test_file(self, path: str, mode: Optional[str] = None) -> bool:
+        result = self._run(f'if exist "{path}" (exit 0) else (exit 1)')
+        return bool(result) and result[0] == 0
+
+    def remote_test_link(self, path: str) -> bool:
+        return any('l' in entry[0] for entry in self._attributes(path))
+
+    def remote_file_stat(self, path: str) -> Optional[os.stat_result]:
+        output = self._powershell(
+            f"$i = Get-Item -Force -LiteralPath {self._quote(path)}; "
+            "$e = [datetime]'1970-01-01'; "
+            "'{0} {1} {2} {3} {4}' -f [int]$i.PSIsContainer, "
+            "$(if ($i.PSIsContainer) { 0 } else { $i.Length }), "
+            "[int64]($i.LastAccessTimeUtc - $e).TotalSeconds, "
+            "[int64]($i.LastWriteTimeUtc - $e).TotalSeconds, "
+            "[int64]($i.CreationTimeUtc - $e).TotalSeconds"
+        )
+        if not output:
+            return None
+        try:
+            folder, size, atime, mtime, ctime = (int(field) for field in output.split())
+        except ValueError:
+            return None
+        mode = stat.S_IFDIR | 0o755 if folder else stat.S_IFREG | 0o644
+        return os.stat_result([mode, 0, 0, 1, 0, 0, size, atime, mtime, ctime])
+
+    def remote_read_link(self, path: str) -> Optional[str]:
+        output = self._powershell(
+            f"(Get-Item -Force -LiteralPath {self._quote(path)}).Target"
+        )
+        if not output or not output.strip():
+            return None
+        return output.strip().splitlines()[0]
+
+    def remote_get_next_user(self) -> Optional[Dict[str, Any]]:
+        """Get next user from remote passwd database, Windows has none."""
         return None
+
+    def prepare(self) -> bool:
+        """
+        Set device id from remote hostname if not known yet.
+
+        Returns:
+            True if connected
+        """
+        if not self._winrm:
+            return False
+
+        if not self.deviceid():
+            hostname = self.get_remote_hostname()
+            self.deviceid(f"{hostname}-{time.strftime('%Y-%m-%d-%H-%M-%S')}")
+
+        return True
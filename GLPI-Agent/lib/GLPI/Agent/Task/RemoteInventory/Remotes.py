@@ -5,10 +5,31 @@ Manages multiple remote inventory connections.
 """
 
 from typing import Dict, List, Optional, Any
+from urllib.parse import urlparse
 
 from GLPI.Agent.Task.RemoteInventory.Remote import Remote
 
 
+def new_remote(**params) -> Remote:
+    """
+    Create a remote instance for the protocol of its URL.
+    
+    Args:
+        **params: Remote parameters including url or dump
+    
+    Returns:
+        Protocol Remote subclass instance, or Remote for unsupported ones
+    """
+    from GLPI.Agent.Task.RemoteInventory.Remote.Ssh import Ssh
+    from GLPI.Agent.Task.RemoteInventory.Remote.Winrm import Winrm
+    
+    url = params.get('url') or (params.get('dump') or {}).get('url') or ''
+    scheme = urlparse(url).scheme if '://' in url else 'ssh'
+    
+    remote_class = {'ssh': Ssh, 'winrm': Winrm}.get(scheme, Remote)
+    return remote_class(**params)
+
+
 class Remotes:
     """Manager for remote inventory connections"""
     
@@ -41,7 +62,7 @@ class Remotes:
                 if any(remote.url() == url for remote in self.getall()):
                     continue
                 
-                remote = Remote(
+                remote = new_remote(
                     url=url,
                     config=self._config,
                     logger=logger
@@ -70,7 +91,7 @@ class Remotes:
                 if not isinstance(dump, dict):
                     continue
                 
-                remote = Remote(
+                remote = new_remote(
                     dump=dump,
                     config=self._config,
                     logger=self.logger
@@ -17,6 +17,7 @@ import signal
 import subprocess
 import platform
 import threading
+import contextvars
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Union, Iterator, IO
@@ -33,26 +34,136 @@ except ImportError:
 # Keep a copy of sys.argv for compatibility
 ARGV = sys.argv.copy()
 
-# Global remote object for remote operations
-_remote = None
+# Remote object for remote operations. It is a context variable so remotes
+# can be inventoried concurrently, each one from its own context.
+_remote: contextvars.ContextVar = contextvars.ContextVar('remote', default=None)
 
 
 def set_remote_for_tools(remote_obj):
-    """Set remote object for tools operations."""
-    global _remote
-    _remote = remote_obj
+    """Set remote object for tools operations in current context."""
+    _remote.set(remote_obj)
 
 
 def reset_remote_for_tools():
-    """Reset remote object for tools operations."""
-    global _remote
-    _remote = None
+    """Reset remote object for tools operations in current context."""
+    _remote.set(None)
+
+
+def get_remote_for_tools():
+    """Get remote object for tools operations, None when running locally."""
+    return _remote.get()
+
+
+class CommandCache:
+    """
+    Run-scoped commands output cache.
+    
+    Outputs are keyed on command, environment and remote so the same command
+    run by different modules during a task is only executed once. Concurrent
+    callers asking for a command still running wait for its output instead
+    of starting it again.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._outputs: Dict[Any, Any] = {}
+        self._running: Dict[Any, threading.Event] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+    
+    def get(self, key: Any, loader: Callable[[], Any]) -> Any:
+        """
+        Get cached value for key, calling loader on first request.
+        
+        Args:
+            key: Cache key
+            loader: Function returning the command output or any value
+                computed from commands output
+            
+        Returns:
+            Cached value, None if the command can't be run
+        """
+        with self._lock:
+            if key in self._outputs:
+                self.hits += 1
+                return self._outputs[key]
+            running = self._running.get(key)
+            if running:
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._running[key] = threading.Event()
+        
+        if running:
+            running.wait()
+            with self._lock:
+                return self._outputs.get(key)
+        
+        output = None
+        try:
+            output = loader()
+        finally:
+            with self._lock:
+                self._outputs[key] = output
+                self._running.pop(key).set()
+        
+        return output
+    
+    def stats(self) -> Dict[str, int]:
+        """Get hits and misses counters."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+# Commands output cache, only set while a task is running
+_command_cache: contextvars.ContextVar = contextvars.ContextVar('command_cache', default=None)
+
+
+def set_command_cache_for_tools() -> CommandCache:
+    """Start caching commands output until reset_command_cache_for_tools()."""
+    cache = CommandCache()
+    _command_cache.set(cache)
+    return cache
+
+
+def get_run_cached(key: Any, loader: Callable[[], Any]) -> Any:
+    """
+    Get a value computed once per task run.
+    
+    The value is kept in the commands output cache so it is invalidated with
+    it. When no cache is enabled, loader is simply called.
+    
+    Args:
+        key: Value key, current remote is added to it
+        loader: Function computing the value
+        
+    Returns:
+        Computed value
+    """
+    cache = _command_cache.get()
+    if not cache:
+        return loader()
+    remote = _remote.get()
+    return cache.get((key, id(remote) if remote else None), loader)
+
+
+def reset_command_cache_for_tools() -> Dict[str, int]:
+    """
+    Invalidate commands output cache.
+    
+    Returns:
+        Hits and misses counters of the invalidated cache
+    """
+    cache = _command_cache.get()
+    _command_cache.set(None)
+    return cache.stats() if cache else {'hits': 0, 'misses': 0}
 
 
 def get_os_name() -> str:
     """Get the operating system name."""
-    if _remote:
-        return _remote.os_name()
+    remote = _remote.get()
+    if remote:
+        return remote.os_name()
     return platform.system()
 
 
@@ -73,8 +184,9 @@ def glob_files(pattern: str, test: Optional[str] = None) -> List[str]:
     Returns:
         List of matching files
     """
-    if _remote:
-        return _remote.remote_glob(pattern, test)
+    remote = _remote.get()
+    if remote:
+        return remote.remote_glob(pattern, test)
     
     files = glob.glob(pattern)
     
@@ -88,36 +200,41 @@ def glob_files(pattern: str, test: Optional[str] = None) -> List[str]:
 
 def has_folder(path: str) -> bool:
     """Check if folder exists."""
-    if _remote:
-        return _remote.remote_test_folder(path)
+    remote = _remote.get()
+    if remote:
+        return remote.remote_test_folder(path)
     return os.path.isdir(path)
 
 
 def has_file(path: str) -> bool:
     """Check if file exists."""
-    if _remote:
-        return _remote.remote_test_file(path)
+    remote = _remote.get()
+    if remote:
+        return remote.remote_test_file(path)
     return os.path.exists(path)
 
 
 def can_read(path: str) -> bool:
     """Check if file can be read."""
-    if _remote:
-        return _remote.remote_test_file(path, 'r')
+    remote = _remote.get()
+    if remote:
+        return remote.remote_test_file(path, 'r')
     return os.access(path, os.R_OK)
 
 
 def has_link(path: str) -> bool:
     """Check if path is a symbolic link."""
-    if _remote:
-        return _remote.remote_test_link(path)
+    remote = _remote.get()
+    if remote:
+        return remote.remote_test_link(path)
     return os.path.islink(path)
 
 
 def file_stat(path: str) -> Optional[os.stat_result]:
     """Get file statistics."""
-    if _remote:
-        return _remote.remote_file_stat(path)
+    remote = _remote.get()
+    if remote:
+        return remote.remote_file_stat(path)
     
     try:
         return os.stat(path)
@@ -127,8 +244,9 @@ def file_stat(path: str) -> Optional[os.stat_result]:
 
 def read_link(path: str) -> Optional[str]:
     """Read symbolic link target."""
-    if _remote:
-        return _remote.remote_read_link(path)
+    remote = _remote.get()
+    if remote:
+        return remote.remote_read_link(path)
     
     try:
         return os.readlink(path)
@@ -138,8 +256,9 @@ def read_link(path: str) -> Optional[str]:
 
 def get_next_user() -> Optional[Dict[str, Any]]:
     """Get next user from system user database."""
-    if _remote:
-        return _remote.remote_get_next_user()
+    remote = _remote.get()
+    if remote:
+        return remote.remote_get_next_user()
     
     if not pwd:
         return None
@@ -570,7 +689,8 @@ def get_file_handle(command: Union[str, List[str]] = None,
                    mode: str = 'r',
                    logger=None,
                    no_error_log: bool = False,
-                   local: bool = False) -> Optional[IO]:
+                   local: bool = False,
+                   cache: bool = True) -> Optional[IO]:
     """
     Get file handle for command, file, or string.
     
@@ -582,12 +702,23 @@ def get_file_handle(command: Union[str, List[str]] = None,
         logger: Logger object
         no_error_log: Suppress error logging
         local: Force local operation even with remote
+        cache: Use commands output cache when enabled for the running task
         
     Returns:
         File handle or None
     """
-    if _remote and not local and (file or command):
-        return _remote.get_remote_file_handle(
+    if command and cache and _command_cache.get():
+        output = _get_cached_command_output(
+            command, local=local, logger=logger, no_error_log=no_error_log
+        )
+        if output is None:
+            return None
+        from io import StringIO
+        return StringIO(output)
+    
+    remote = _remote.get()
+    if remote and not local and (file or command):
+        return remote.get_remote_file_handle(
             command=command, file=file, string=string, mode=mode,
             logger=logger, no_error_log=no_error_log
         )
@@ -611,15 +742,7 @@ def get_file_handle(command: Union[str, List[str]] = None,
                 logger.debug2(f"executing {log_command}")
             
             # Set environment for command execution
-            env = os.environ.copy()
-            env.update({'LC_ALL': 'C', 'LANG': 'C'})
-            
-            # Remove LD_LIBRARY_PATH for AppImage compatibility
-            if (env.get('LD_LIBRARY_PATH') and 
-                env.get('APPRUN_STARTUP_APPIMAGE_UUID') and 
-                env.get('APPDIR')):
-                env.pop('LD_LIBRARY_PATH', None)
-                env.pop('LD_PRELOAD', None)
+            env = _get_command_env()
             
             if isinstance(command, list):
                 proc = subprocess.Popen(
@@ -648,6 +771,60 @@ def get_file_handle(command: Union[str, List[str]] = None,
         raise ValueError("Neither command, file, nor string parameter given")
 
 
+def _get_command_env() -> Dict[str, str]:
+    """Get environment used to run commands."""
+    env = os.environ.copy()
+    env.update({'LC_ALL': 'C', 'LANG': 'C'})
+    
+    # Remove LD_LIBRARY_PATH for AppImage compatibility
+    if (env.get('LD_LIBRARY_PATH') and 
+        env.get('APPRUN_STARTUP_APPIMAGE_UUID') and 
+        env.get('APPDIR')):
+        env.pop('LD_LIBRARY_PATH', None)
+        env.pop('LD_PRELOAD', None)
+    
+    return env
+
+
+def _get_cached_command_output(command: Union[str, List[str]],
+                               local: bool = False,
+                               logger=None,
+                               no_error_log: bool = False) -> Optional[str]:
+    """
+    Get command output through the commands output cache.
+    
+    Args:
+        command: Command to execute
+        local: Force local operation even with remote
+        logger: Logger object
+        no_error_log: Suppress error logging
+        
+    Returns:
+        Command output or None if command can't be run
+    """
+    remote = _remote.get() if not local else None
+    env = _get_command_env()
+    key = (
+        tuple(command) if isinstance(command, list) else command,
+        tuple(sorted(env.items())) if not remote else None,
+        id(remote) if remote else None,
+    )
+    
+    def loader() -> Optional[str]:
+        handle = get_file_handle(
+            command=command, local=not remote, logger=logger,
+            no_error_log=no_error_log, cache=False
+        )
+        if not handle:
+            return None
+        try:
+            return handle.read()
+        finally:
+            handle.close()
+    
+    return _command_cache.get().get(key, loader)
+
+
 def get_first_line(command: Union[str, List[str]] = None, 
                   file: str = None, 
                   string: str = None,
@@ -764,8 +941,9 @@ def get_lines_count(command: Union[str, List[str]] = None,
 
 def can_run(binary: str) -> bool:
     """Check if binary can be executed."""
-    if _remote:
-        return _remote.remote_can_run(binary)
+    remote = _remote.get()
+    if remote:
+        return remote.remote_can_run(binary)
     
     if os.path.isabs(binary):
         return os.access(binary, os.X_OK)
@@ -905,7 +1083,8 @@ def run_function(module: str, function: str, params=None,
                 logger.debug(f"Unexpected error in {module}: {e}")
     
     if timeout:
-        thread = threading.Thread(target=target)
+        # Run in a copy of current context to keep remote and commands cache
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(target,))
         thread.daemon = True
         thread.start()
         thread.join(timeout)
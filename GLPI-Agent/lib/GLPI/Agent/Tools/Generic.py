@@ -34,6 +34,9 @@ except ImportError:
     def get_canon_mac_address(s):
         return s
 
+from GLPI.Agent.Tools.SMBIOS import get_smbios
+from GLPI.Agent.Tools.IdsIndex import IdsEntry, get_ids_index
+
 
 __all__ = [
     'get_dmidecode_infos',
@@ -44,59 +47,28 @@ __all__ = [
     'parse_lspci',
     'get_pci_devices',
     'get_edid_info',
-    'get_hdparm_info'
+    'get_hdparm_info',
+    'get_pci_device_vendor',
+    'get_pci_device_class',
+    'get_usb_device_vendor',
+    'get_edid_vendor'
 ]
 
 
-def get_dmidecode_infos(**params) -> Dict[str, List[Dict]]:
+def get_dmidecode_infos(**params) -> Dict[int, List[Dict]]:
     """
     Get hardware information from dmidecode output.
     
+    The SMBIOS model is shared by all callers during a task run, see
+    GLPI.Agent.Tools.SMBIOS.get_smbios().
+    
     Args:
-        **params: Parameters including command, file, logger
+        **params: Parameters including command, file, string, logger
         
     Returns:
-        Dictionary mapping hardware types to lists of devices
+        Mapping of DMI types to lists of structures fields
     """
-    if 'command' not in params:
-        params['command'] = 'dmidecode'
-    
-    lines = get_all_lines(**params)
-    if not lines:
-        return {}
-    
-    infos = {}
-    current_section = None
-    current_item = {}
-    
-    for line in lines:
-        # New section starts
-        if re.match(r'^Handle ', line):
-            if current_section and current_item:
-                if current_section not in infos:
-                    infos[current_section] = []
-                infos[current_section].append(current_item)
-            current_item = {}
-            current_section = None
-            continue
-        
-        # Section type
-        if line and not line.startswith('\t'):
-            current_section = line.strip()
-            continue
-        
-        # Property line
-        if line.startswith('\t') and ':' in line:
-            key, value = line.split(':', 1)
-            current_item[key.strip()] = value.strip()
-    
-    # Add last item
-    if current_section and current_item:
-        if current_section not in infos:
-            infos[current_section] = []
-        infos[current_section].append(current_item)
-    
-    return infos
+    return get_smbios(**params) or {}
 
 
 def get_cpu_info(**params) -> List[Dict]:
@@ -110,7 +82,7 @@ def get_cpu_info(**params) -> List[Dict]:
         List of CPU dictionaries
     """
     infos = get_dmidecode_infos(**params)
-    processors = infos.get('Processor Information', [])
+    processors = infos.get(4, [])
     
     cpus = []
     for proc in processors:
@@ -164,8 +136,8 @@ def get_infos_from_dmidecode(**params) -> Dict:
     }
     
     # Extract BIOS information
-    if 'BIOS Information' in infos and infos['BIOS Information']:
-        bios = infos['BIOS Information'][0]
+    if infos.get(0):
+        bios = infos[0][0]
         result['BIOS'] = {
             'BMANUFACTURER': bios.get('Vendor', ''),
             'BVERSION': bios.get('Version', ''),
@@ -173,8 +145,8 @@ def get_infos_from_dmidecode(**params) -> Dict:
         }
     
     # Extract System information
-    if 'System Information' in infos and infos['System Information']:
-        system = infos['System Information'][0]
+    if infos.get(1):
+        system = infos[1][0]
         result['SYSTEM'] = {
             'MANUFACTURER': system.get('Manufacturer', ''),
             'PRODUCTNAME': system.get('Product Name', ''),
@@ -335,6 +307,90 @@ def get_hdparm_info(**params) -> Optional[Dict]:
     return info
 
 
+def _get_ids_entry(database: str, key: Optional[str], children: str,
+                   **params) -> Optional[IdsEntry]:
+    """Get top level entry from a compiled ids database."""
+    if not key:
+        return None
+
+    index = get_ids_index(database, params.get('datadir'), params.get('logger'))
+    if not index:
+        return None
+
+    name = index.get(key)
+    if name is None:
+        return None
+
+    return IdsEntry(index, key, name, IdsEntry.CHILDREN[children])
+
+
+def get_pci_device_vendor(**params) -> Optional[IdsEntry]:
+    """
+    Get PCI vendor from pci.ids database.
+
+    Args:
+        **params: Parameters including id (4 hex digits), datadir, logger
+
+    Returns:
+        Mapping with name and devices keys, devices having name and
+        subdevices keys, or None if not found
+    """
+    vendor_id = params.pop('id', None)
+    return _get_ids_entry('pci', vendor_id.lower() if vendor_id else None,
+                          'pci', **params)
+
+
+def get_pci_device_class(**params) -> Optional[IdsEntry]:
+    """
+    Get PCI device class from pci.ids database.
+
+    Args:
+        **params: Parameters including id (2 hex digits), datadir, logger
+
+    Returns:
+        Mapping with name and subclasses keys, or None if not found
+    """
+    class_id = params.pop('id', None)
+    return _get_ids_entry('pci', f"C {class_id.lower()}" if class_id else None,
+                          'pci-class', **params)
+
+
+def get_usb_device_vendor(**params) -> Optional[IdsEntry]:
+    """
+    Get USB vendor from usb.ids database.
+
+    Args:
+        **params: Parameters including id (4 hex digits), datadir, logger
+
+    Returns:
+        Mapping with name and devices keys, or None if not found
+    """
+    vendor_id = params.pop('id', None)
+    return _get_ids_entry('usb', vendor_id.lower() if vendor_id else None,
+                          'usb', **params)
+
+
+def get_edid_vendor(**params) -> Optional[str]:
+    """
+    Get EDID vendor name from edid.ids database.
+
+    Args:
+        **params: Parameters including id (3 letters), datadir, logger
+
+    Returns:
+        Vendor name or None if not found
+    """
+    vendor_id = params.get('id')
+    if not vendor_id:
+        return None
+
+    index = get_ids_index('edid', params.get('datadir'), params.get('logger'))
+    if not index:
+        return None
+
+    return index.get(vendor_id)
+
+
 if __name__ == '__main__':
     print("GLPI Agent Tools Generic Module")
     print("Generic OS-independent utility functions")
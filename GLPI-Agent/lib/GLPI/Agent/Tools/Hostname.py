@@ -13,11 +13,11 @@ from typing import Optional
 
 # Import the main Tools module functions
 try:
-    from GLPI.Agent.Tools import get_first_line, empty, _remote
+    from GLPI.Agent.Tools import get_first_line, empty, get_remote_for_tools
 except ImportError:
     import sys
     sys.path.insert(0, '../../')
-    from Tools import get_first_line, empty, _remote
+    from Tools import get_first_line, empty, get_remote_for_tools
 
 
 __all__ = [
@@ -40,16 +40,17 @@ def get_hostname(fqdn: bool = False, short: bool = False) -> Optional[str]:
     """
     hostname = None
     
-    if _remote:
+    remote = get_remote_for_tools()
+    if remote:
         if fqdn:
-            hostname = _remote.getRemoteFQDN()
+            hostname = remote.getRemoteFQDN()
             if hostname:
                 # Remove trailing dot
                 hostname = hostname.rstrip('.')
         
         # Fallback on getRemoteHostname if fqdn was requested and failed
         if not hostname or empty(hostname):
-            hostname = _remote.getRemoteHostname()
+            hostname = remote.getRemoteHostname()
     else:
         if platform.system() == 'Windows':
             hostname = _get_hostname_windows()
@@ -148,8 +149,9 @@ def get_remote_fqdn() -> Optional[str]:
     Returns:
         Remote FQDN or None
     """
-    if _remote:
-        return _remote.getRemoteFQDN()
+    remote = get_remote_for_tools()
+    if remote:
+        return remote.getRemoteFQDN()
     return None
 
 
@@ -160,8 +162,9 @@ def get_remote_hostdomain() -> Optional[str]:
     Returns:
         Remote host domain or None
     """
-    if _remote:
-        return _remote.getRemoteHostDomain()
+    remote = get_remote_for_tools()
+    if remote:
+        return remote.getRemoteHostDomain()
     return None
 
 
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+GLPI Agent Tools IdsIndex - Python Implementation
+
+Compiled lookup index for the ids databases shipped in share directory:
+pci.ids, usb.ids, edid.ids and sysobject.ids.
+
+Each database is compiled once into a binary index file, a sorted array of
+fixed size records pointing to packed keys and values. The index file is
+memory-mapped and lookups are binary searches, so nothing is parsed when
+the agent starts and lookup cost doesn't depend on how many were done.
+
+Index files are built by tools/compileIds.py when the agent is installed,
+the data directory being usually read-only for the agent. When an index is
+missing or older than its database anyway, it is compiled at first lookup
+and saved if the data directory is writable.
+
+Keys use a space as level separator:
+    pci.ids:        "vvvv", "vvvv dddd", "vvvv dddd ssss:ssss",
+                    "C cc", "C cc ss", "C cc ss pp"
+    usb.ids:        "vvvv", "vvvv pppp"
+    edid.ids:       "AAA"
+    sysobject.ids:  "9.1.123", value is "manufacturer<TAB>type<TAB>model"
+"""
+
+import mmap
+import os
+import re
+import struct
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+__all__ = [
+    'IdsIndex',
+    'IdsEntry',
+    'compile_ids',
+    'get_ids_index',
+    'get_sysobject_id_info',
+]
+
+DEFAULT_DATADIR = str(Path(__file__).resolve().parents[4] / 'share')
+
+DATABASES = ('pci', 'usb', 'edid', 'sysobject')
+
+MAGIC = b'GLPIIDS1'
+_HEADER = struct.Struct('<8sI')
+# Record: data offset, key length, value length
+_RECORD = struct.Struct('<IHH')
+
+_HEX4 = r'([0-9a-f]{4})'
+_HEX2 = r'([0-9a-f]{2})'
+
+_indexes: Dict[str, Optional['IdsIndex']] = {}
+_indexes_lock = threading.Lock()
+
+
+def _parse_pci(lines: Iterator[str]) -> Iterator[Tuple[str, str]]:
+    """Get pci.ids entries as (key, name) tuples."""
+    vendor_re = re.compile(r'^' + _HEX4 + r'\s+(.*)')
+    device_re = re.compile(r'^\t' + _HEX4 + r'\s+(.*)')
+    subdevice_re = re.compile(r'^\t\t' + _HEX4 + r' ' + _HEX4 + r'\s+(.*)')
+    class_re = re.compile(r'^C ' + _HEX2 + r'\s+(.*)')
+    subclass_re = re.compile(r'^\t' + _HEX2 + r'\s+(.*)')
+    progif_re = re.compile(r'^\t\t' + _HEX2 + r'\s+(.*)')
+
+    vendor = device = pci_class = subclass = None
+    for line in lines:
+        if not line.strip() or line.startswith('#'):
+            continue
+
+        if pci_class is None:
+            match = vendor_re.match(line)
+            if match:
+                vendor, device = match.group(1), None
+                yield vendor, match.group(2)
+                continue
+
+            match = class_re.match(line)
+            if match:
+                vendor = device = None
+                pci_class = match.group(1)
+                yield f"C {pci_class}", match.group(2)
+                continue
+
+            if not vendor:
+                continue
+
+            match = device_re.match(line)
+            if match:
+                device = match.group(1)
+                yield f"{vendor} {device}", match.group(2)
+                continue
+
+            match = subdevice_re.match(line)
+            if match and device:
+                yield f"{vendor} {device} {match.group(1)}:{match.group(2)}", match.group(3)
+            continue
+
+        match = class_re.match(line)
+        if match:
+            pci_class, subclass = match.group(1), None
+            yield f"C {pci_class}", match.group(2)
+            continue
+
+        match = subclass_re.match(line)
+        if match:
+            subclass = match.group(1)
+            yield f"C {pci_class} {subclass}", match.group(2)
+            continue
+
+        match = progif_re.match(line)
+        if match and subclass:
+            yield f"C {pci_class} {subclass} {match.group(1)}", match.group(2)
+
+
+def _parse_usb(lines: Iterator[str]) -> Iterator[Tuple[str, str]]:
+    """Get usb.ids vendors and devices as (key, name) tuples."""
+    vendor_re = re.compile(r'^' + _HEX4 + r'\s+(.*)')
+    device_re = re.compile(r'^\t' + _HEX4 + r'\s+(.*)')
+
+    vendor = None
+    for line in lines:
+        if not line.strip() or line.startswith('#'):
+            continue
+
+        match = vendor_re.match(line)
+        if match:
+            vendor = match.group(1)
+            yield vendor, match.group(2)
+            continue
+
+        # Other top level lines start sections we don't support
+        if not line.startswith('\t'):
+            vendor = None
+            continue
+
+        match = device_re.match(line)
+        if match and vendor:
+            yield f"{vendor} {match.group(1)}", match.group(2)
+
+
+def _parse_edid(lines: Iterator[str]) -> Iterator[Tuple[str, str]]:
+    """Get edid.ids vendors as (key, name) tuples."""
+    vendor_re = re.compile(r'^([A-Z]{3}) __ (.*)$')
+    for line in lines:
+        match = vendor_re.match(line.rstrip('\n'))
+        if match:
+            yield match.group(1), match.group(2)
+
+
+def _parse_sysobject(lines: Iterator[str]) -> Iterator[Tuple[str, str]]:
+    """Get sysobject.ids entries as (key, tab separated infos) tuples."""
+    entry_re = re.compile(r'^([\d.]+)\t(.*)$')
+    for line in lines:
+        match = entry_re.match(line.rstrip('\n'))
+        if match:
+            yield match.group(1), match.group(2)
+
+
+_PARSERS = {
+    'pci': _parse_pci,
+    'usb': _parse_usb,
+    'edid': _parse_edid,
+    'sysobject': _parse_sysobject,
+}
+
+
+def compile_ids(database: str, source: str) -> bytes:
+    """
+    Compile an ids database into a binary index.
+
+    Args:
+        database: Database name, one of DATABASES
+        source: Path to the ids file
+
+    Returns:
+        Binary index content
+    """
+    entries: Dict[bytes, bytes] = {}
+    with open(source, 'r', encoding='utf-8', errors='replace') as handle:
+        for key, value in _PARSERS[database](handle):
+            # Keep first definition like ids files readers do
+            entries.setdefault(key.encode('utf-8'), value.strip().encode('utf-8')[:0xFFFF])
+
+    keys = sorted(entries)
+    data_start = _HEADER.size + _RECORD.size * len(keys)
+
+    records = bytearray()
+    data = bytearray()
+    for key in keys:
+        value = entries[key]
+        records += _RECORD.pack(data_start + len(data), len(key), len(value))
+        data += key
+        data += value
+
+    return _HEADER.pack(MAGIC, len(keys)) + bytes(records) + bytes(data)
+
+
+class IdsIndex:
+    """
+    Compiled ids database reader.
+
+    Records are sorted by key bytes, so a key is found by binary search
+    and all keys sharing a prefix are contiguous.
+    """
+
+    def __init__(self, buffer: Any):
+        """
+        Initialize reader.
+
+        Args:
+            buffer: Index content, as bytes or mmap
+
+        Raises:
+            ValueError: If buffer is not a valid index
+        """
+        if len(buffer) < _HEADER.size:
+            raise ValueError("truncated ids index")
+        magic, count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("not an ids index")
+        if len(buffer) < _HEADER.size + count * _RECORD.size:
+            raise ValueError("truncated ids index")
+        self._buffer = buffer
+        self._count = count
+
+    @classmethod
+    def open(cls, path: str) -> 'IdsIndex':
+        """
+        Open an index file with mmap.
+
+        Args:
+            path: Index file path
+
+        Returns:
+            IdsIndex instance
+        """
+        with open(path, 'rb') as handle:
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _record(self, index: int) -> Tuple[int, int, int]:
+        return _RECORD.unpack_from(self._buffer, _HEADER.size + index * _RECORD.size)
+
+    def _key(self, index: int) -> bytes:
+        offset, key_length, _ = self._record(index)
+        return self._buffer[offset:offset + key_length]
+
+    def _bisect(self, key: bytes) -> int:
+        """Get index of first record with a key not lower than key."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get value for a key.
+
+        Args:
+            key: Entry key
+
+        Returns:
+            Value or None if key is not in index
+        """
+        encoded = key.encode('utf-8')
+        index = self._bisect(encoded)
+        if index >= self._count:
+            return None
+        offset, key_length, value_length = self._record(index)
+        if self._buffer[offset:offset + key_length] != encoded:
+            return None
+        start = offset + key_length
+        return self._buffer[start:start + value_length].decode('utf-8')
+
+    def items(self, prefix: str) -> Iterator[Tuple[str, str]]:
+        """
+        Iterate over entries with keys starting with prefix, in key order.
+
+        Args:
+            prefix: Keys prefix
+
+        Yields:
+            (key, value) tuples
+        """
+        encoded = prefix.encode('utf-8')
+        index = self._bisect(encoded)
+        while index < self._count:
+            offset, key_length, value_length = self._record(index)
+            key = self._buffer[offset:offset + key_length]
+            if not key.startswith(encoded):
+                return
+            start = offset + key_length
+            yield key.decode('utf-8'), \
+                self._buffer[start:start + value_length].decode('utf-8')
+            index += 1
+
+
+class IdsEntry(Mapping):
+    """
+    Ids database entry.
+
+    Behaves like the dictionaries built by the Perl agent ids loaders: a
+    'name' key and, if the entry can have children, a mapping of children
+    entries by id under children key, like 'devices' for a PCI vendor.
+    Children are only looked up in the index when accessed.
+    """
+
+    # Children key by entry level, starting from top level entries
+    CHILDREN = {
+        'pci': ('devices', 'subdevices'),
+        'pci-class': ('subclasses', 'progifs'),
+        'usb': ('devices',),
+    }
+
+    def __init__(self, index: IdsIndex, key: str, name: str,
+                 children: Tuple[str, ...] = ()):
+        self._index = index
+        self._key = key
+        self._name = name
+        self._children = children
+
+    def __getitem__(self, item: str) -> Any:
+        if item == 'name':
+            return self._name
+        if self._children and item == self._children[0]:
+            return _IdsChildren(self._index, self._key, self._children[1:])
+        raise KeyError(item)
+
+    def __iter__(self) -> Iterator[str]:
+        yield 'name'
+        if self._children:
+            yield self._children[0]
+
+    def __len__(self) -> int:
+        return 2 if self._children else 1
+
+
+class _IdsChildren(Mapping):
+    """Children entries of an IdsEntry, by id."""
+
+    def __init__(self, index: IdsIndex, parent: str, children: Tuple[str, ...]):
+        self._index = index
+        self._prefix = parent + ' '
+        self._children = children
+
+    def __getitem__(self, item: str) -> IdsEntry:
+        key = self._prefix + str(item)
+        name = self._index.get(key)
+        if name is None:
+            raise KeyError(item)
+        return IdsEntry(self._index, key, name, self._children)
+
+    def __iter__(self) -> Iterator[str]:
+        offset = len(self._prefix)
+        for key, _ in self._index.items(self._prefix):
+            if ' ' not in key[offset:]:
+                yield key[offset:]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+def _load_index(database: str, datadir: str, logger=None) -> Optional[IdsIndex]:
+    """Open compiled index, compiling it first if missing or outdated."""
+    source = os.path.join(datadir, f"{database}.ids")
+    target = os.path.join(datadir, f"{database}.idx")
+
+    try:
+        source_mtime = os.stat(source).st_mtime
+    except OSError:
+        source_mtime = None
+
+    try:
+        if source_mtime is None or os.stat(target).st_mtime >= source_mtime:
+            return IdsIndex.open(target)
+    except (OSError, ValueError):
+        pass
+
+    if source_mtime is None:
+        if logger:
+            logger.debug(f"{database}.ids database not found in {datadir}")
+        return None
+
+    content = compile_ids(database, source)
+
+    # Save compiled index for next runs, atomically for concurrent readers
+    temp = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(temp, 'wb') as handle:
+            handle.write(content)
+        os.replace(temp, target)
+    except OSError:
+        if os.path.exists(temp):
+            os.unlink(temp)
+        if logger:
+            logger.debug(
+                f"Can't save {target} compiled index, run tools/compileIds.py to install it"
+            )
+
+    return IdsIndex(content)
+
+
+def get_ids_index(database: str, datadir: Optional[str] = None,
+                  logger=None) -> Optional[IdsIndex]:
+    """
+    Get compiled index for an ids database, opened once per process.
+
+    Args:
+        database: Database name, one of DATABASES
+        datadir: Agent data directory
+        logger: Logger instance
+
+    Returns:
+        IdsIndex instance or None if database is not available
+    """
+    datadir = datadir or DEFAULT_DATADIR
+    path = os.path.join(datadir, f"{database}.ids")
+
+    index = _indexes.get(path)
+    if index is not None or path in _indexes:
+        return index
+
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = _load_index(database, datadir, logger=logger)
+        return _indexes[path]
+
+
+_SYSOBJECTID_PREFIX = re.compile(
+    r'^(?:SNMPv2-SMI::enterprises|iso\.3\.6\.1\.4\.1|\.?1\.3\.6\.1\.4\.1)\.(\d+(?:\.\d+)*)$'
+)
+
+
+def get_sysobject_id_info(**params) -> Optional[Dict[str, str]]:
+    """
+    Get device infos from sysobject.ids for a sysObjectID.
+
+    The entry of the longest known prefix of the sysObjectID is used.
+
+    Args:
+        **params: Parameters including id, datadir, logger
+
+    Returns:
+        Dictionary with manufacturer, type and model keys when known,
+        or None
+    """
+    sysobjectid = params.get('id')
+    if not sysobjectid:
+        return None
+
+    match = _SYSOBJECTID_PREFIX.match(sysobjectid)
+    if not match:
+        logger = params.get('logger')
+        if logger:
+            logger.debug(f"invalid sysobjectID {sysobjectid}: no manufacturer ID")
+        return None
+
+    index = get_ids_index('sysobject', params.get('datadir'), params.get('logger'))
+    if not index:
+        return None
+
+    key = match.group(1)
+    while True:
+        value = index.get(key)
+        if value is not None:
+            break
+        if '.' not in key:
+            return None
+        key = key[:key.rindex('.')]
+
+    infos = {}
+    for field, info in zip(('manufacturer', 'type', 'model'), value.split('\t')):
+        if info:
+            infos[field] = info
+    return infos or None
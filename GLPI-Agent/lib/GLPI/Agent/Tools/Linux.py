@@ -10,6 +10,7 @@ Full functionality requires: /proc, /sys, udev, smartctl, ip, ifconfig, etc.
 
 import re
 import glob as glob_module
+import ipaddress
 import os
 from typing import List, Dict, Optional, Any
 from pathlib import Path
@@ -445,6 +446,10 @@ def get_interfaces_from_ip(**params) -> List[Dict]:
                         addr, prefix = addr_cidr.split('/', 1)
                         if part == 'inet':
                             interface['IPADDRESS'] = addr
+                            if prefix.isdigit() and int(prefix) <= 32:
+                                interface['IPMASK'] = str(
+                                    ipaddress.IPv4Network(f"0.0.0.0/{prefix}").netmask
+                                )
                         else:
                             interface['IPADDRESS6'] = addr
         
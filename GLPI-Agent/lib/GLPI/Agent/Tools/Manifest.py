@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+GLPI Agent Tools Manifest - Python Implementation
+
+Task modules manifest.
+
+A task like Inventory has many modules, most of them not supported on the
+running platform. The manifest records, for each module of a task package,
+what is needed to schedule it without importing it: category, platform
+guard, runAfter, runAfterIfEnabled and runMeIfTheseChecksFailed lists.
+
+Manifest values are read from modules source with ast, so no module code
+is run to build it. Manifests are built by tools/compileModules.py when the
+agent is installed, into a modules.json file in the task package directory. When that file
+is missing or older than a module, the manifest is built at first use and
+saved if the package directory is writable.
+"""
+
+import ast
+import json
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+__all__ = [
+    'MANIFEST_FILE',
+    'build_manifest',
+    'get_modules_manifest',
+    'is_platform_enabled',
+]
+
+MANIFEST_FILE = 'modules.json'
+
+# Increment when manifest format changes
+MANIFEST_VERSION = 1
+
+# Platform guard of modules by top level module, as lowercase OS names
+# returned by Tools.get_os_name(), including remote ones
+PLATFORMS = {
+    'AIX': ('aix',),
+    'BSD': ('freebsd', 'openbsd', 'netbsd', 'dragonfly', 'gnu/kfreebsd', 'gnukfreebsd'),
+    'HPUX': ('hp-ux', 'hpux'),
+    'Linux': ('linux',),
+    'MacOS': ('darwin',),
+    'Solaris': ('sunos', 'solaris'),
+    'Win32': ('windows', 'mswin32'),
+}
+
+# Module attributes, with their name as found in modules source
+_LISTS = {
+    'runAfter': ('runAfter', 'run_after'),
+    'runAfterIfEnabled': ('runAfterIfEnabled', 'run_after_if_enabled'),
+    'runMeIfTheseChecksFailed': ('runMeIfTheseChecksFailed', 'run_me_if_these_checks_failed'),
+    'other_categories': ('other_categories',),
+}
+
+_manifests: Dict[str, Optional[Dict[str, Dict[str, Any]]]] = {}
+_manifests_lock = threading.Lock()
+
+
+def _module_name(name: str) -> str:
+    """Get python module name from a module name which can use Perl syntax."""
+    return name.replace('::', '.')
+
+
+def _literal(node: ast.AST) -> Any:
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, RecursionError):
+        return None
+
+
+def _returned_literal(function: ast.AST) -> Any:
+    """Get first literal value returned by a function."""
+    for node in ast.walk(function):
+        if isinstance(node, ast.Return) and node.value is not None:
+            value = _literal(node.value)
+            if value is not None:
+                return value
+    return None
+
+
+def _parse_module(path: str) -> Dict[str, Any]:
+    """
+    Get manifest values from a module source.
+
+    Values can be set at module level or in a top level class, as
+    attributes or as functions returning a literal.
+    """
+    infos: Dict[str, Any] = {'category': None}
+    for key in _LISTS:
+        infos[key] = []
+
+    try:
+        with open(path, 'rb') as handle:
+            tree = ast.parse(handle.read(), filename=path)
+    except (OSError, SyntaxError, ValueError):
+        return infos
+
+    nodes = list(tree.body)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            nodes.extend(node.body)
+
+    for node in nodes:
+        if isinstance(node, ast.Assign):
+            names = [target.id for target in node.targets if isinstance(target, ast.Name)]
+            value = _literal(node.value)
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name) and node.value:
+            names = [node.target.id]
+            value = _literal(node.value)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            names = [node.name]
+            value = _returned_literal(node)
+        else:
+            continue
+
+        for name in names:
+            if name == 'category':
+                if isinstance(value, str) and not infos['category']:
+                    infos['category'] = value
+                continue
+            for key, aliases in _LISTS.items():
+                if name in aliases and isinstance(value, (list, tuple)):
+                    infos[key].extend(
+                        _module_name(item) for item in value if isinstance(item, str)
+                    )
+
+    return infos
+
+
+def _get_module_files(package_path: str, package_name: str) -> List[Tuple[str, str]]:
+    """
+    Get modules of a package with their source file, sorted by name.
+
+    Like Perl agent layout, a module can have a submodules directory with
+    the same name. Such a directory is walked whether or not it has an
+    __init__.py, and the module file is preferred to its __init__.py.
+    """
+    modules: Dict[str, str] = {}
+
+    def walk(path: str, prefix: str) -> None:
+        try:
+            entries = sorted(os.scandir(path), key=lambda entry: entry.name)
+        except OSError:
+            return
+        for entry in entries:
+            if entry.name.startswith(('.', '_')):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                name = f"{prefix}.{entry.name}"
+                init = os.path.join(entry.path, '__init__.py')
+                if name not in modules and os.path.exists(init):
+                    modules[name] = init
+                walk(entry.path, name)
+            elif entry.name.endswith('.py'):
+                modules[f"{prefix}.{entry.name[:-3]}"] = entry.path
+
+    walk(package_path, package_name)
+    return sorted(modules.items())
+
+
+def _get_sources_mtime(files: List[Tuple[str, str]]) -> float:
+    mtime = 0.0
+    for _, path in files:
+        try:
+            mtime = max(mtime, os.stat(path).st_mtime)
+        except OSError:
+            continue
+    return mtime
+
+
+def build_manifest(package_path: str, package_name: str) -> Dict[str, Any]:
+    """
+    Build the modules manifest of a task package.
+
+    Args:
+        package_path: Task package directory
+        package_name: Task package name, like GLPI.Agent.Task.Inventory
+
+    Returns:
+        Manifest dictionary, modules infos being under modules key by
+        module name
+    """
+    files = _get_module_files(package_path, package_name)
+    modules = {}
+    for name, path in files:
+        infos = _parse_module(path)
+        top = name[len(package_name) + 1:].split('.')[0]
+        infos['platform'] = list(PLATFORMS[top]) if top in PLATFORMS else None
+        infos['file'] = os.path.relpath(path, package_path)
+        modules[name] = infos
+
+    return {
+        'version': MANIFEST_VERSION,
+        'package': package_name,
+        'mtime': _get_sources_mtime(files),
+        'modules': modules,
+    }
+
+
+def _load_manifest(package_path: str, package_name: str,
+                   logger=None) -> Dict[str, Dict[str, Any]]:
+    """Load manifest file, building it first if missing or outdated."""
+    path = os.path.join(package_path, MANIFEST_FILE)
+
+    try:
+        with open(path, 'r', encoding='utf-8') as handle:
+            manifest = json.load(handle)
+        if manifest.get('version') == MANIFEST_VERSION \
+                and manifest.get('package') == package_name:
+            files = _get_module_files(package_path, package_name)
+            if [name for name, _ in files] == sorted(manifest['modules']) \
+                    and _get_sources_mtime(files) <= manifest['mtime']:
+                return manifest['modules']
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+
+    manifest = build_manifest(package_path, package_name)
+
+    # Save manifest for next runs, atomically for concurrent readers
+    temp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp, 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle, indent=1, sort_keys=True)
+        os.replace(temp, path)
+    except OSError:
+        if os.path.exists(temp):
+            os.unlink(temp)
+        if logger:
+            logger.debug2(
+                f"Can't save {path} modules manifest, run tools/compileModules.py to install it"
+            )
+
+    return manifest['modules']
+
+
+def get_modules_manifest(package_name: str, package_path: Optional[str] = None,
+                         logger=None) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Get modules manifest of a task package, loaded once per process.
+
+    The package itself is not imported.
+
+    Args:
+        package_name: Task package name, like GLPI.Agent.Task.Inventory
+        package_path: Task package directory, found from package name
+            if not set
+        logger: Logger instance
+
+    Returns:
+        Modules infos by module name, or None if package is not found
+    """
+    if package_name in _manifests:
+        return _manifests[package_name]
+
+    with _manifests_lock:
+        if package_name not in _manifests:
+            if not package_path:
+                package_path = _find_package_path(package_name)
+            _manifests[package_name] = _load_manifest(package_path, package_name, logger) \
+                if package_path else None
+        return _manifests[package_name]
+
+
+def _find_package_path(package_name: str) -> Optional[str]:
+    """Find a package directory from sys.path without importing it."""
+    relative = os.path.join(*package_name.split('.'))
+    for path in sys.path:
+        candidate = os.path.join(path or os.curdir, relative)
+        if os.path.isdir(candidate):
+            return candidate
+    return None
+
+
+def is_platform_enabled(infos: Dict[str, Any], os_name: Optional[str]) -> bool:
+    """
+    Check a module platform guard.
+
+    Args:
+        infos: Module manifest infos
+        os_name: Operating system name, like Tools.get_os_name() returns
+
+    Returns:
+        False if the module is dedicated to another platform
+    """
+    platforms = infos.get('platform')
+    if not platforms or not os_name:
+        return True
+    return os_name.lower() in platforms
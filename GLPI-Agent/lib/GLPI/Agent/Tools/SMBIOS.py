@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+GLPI Agent Tools SMBIOS - Python Implementation
+
+SMBIOS model built from dmidecode output or directly from the kernel exported
+DMI table, indexed by DMI type and handle.
+
+The model is built once per task run and shared by all inventory modules
+through get_smbios().
+"""
+
+import re
+import struct
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    from GLPI.Agent.Tools import (get_all_lines, get_run_cached,
+                                   get_remote_for_tools)
+except ImportError:
+    # Stub implementations
+    def get_all_lines(**params):
+        return []
+    def get_run_cached(key, loader):
+        return loader()
+    def get_remote_for_tools():
+        return None
+
+
+__all__ = [
+    'SMBIOS',
+    'get_smbios',
+    'parse_dmidecode',
+    'parse_dmi_table',
+]
+
+DMI_TABLE = '/sys/firmware/dmi/tables/DMI'
+DMI_ENTRY_POINT = '/sys/firmware/dmi/tables/smbios_entry_point'
+
+# Values dmidecode reports when a field is not really set
+IGNORED_VALUES = {
+    'N/A', 'Not Specified', 'Not Present', 'Not Provided', 'Unknown',
+    '<BAD INDEX>', '<OUT OF SPEC>',
+}
+
+_HANDLE_RE = re.compile(r'^Handle (0x[0-9A-Fa-f]+), DMI type (\d+)')
+# Structure fields are indented by one tab, nested list items by two
+_FIELD_RE = re.compile(r'^\t(\S[^:]+):\s(.*\S)')
+
+# DMI types decoded from binary table, other types need dmidecode
+NATIVE_TYPES = (0, 1, 2, 3)
+
+# String fields by DMI type as (offset, dmidecode field name)
+_STRING_FIELDS = {
+    0: ((0x04, 'Vendor'), (0x05, 'Version'), (0x08, 'Release Date')),
+    1: ((0x04, 'Manufacturer'), (0x05, 'Product Name'), (0x06, 'Version'),
+        (0x07, 'Serial Number'), (0x19, 'SKU Number'), (0x1A, 'Family')),
+    2: ((0x04, 'Manufacturer'), (0x05, 'Product Name'), (0x06, 'Version'),
+        (0x07, 'Serial Number'), (0x08, 'Asset Tag')),
+    3: ((0x04, 'Manufacturer'), (0x06, 'Version'), (0x07, 'Serial Number'),
+        (0x08, 'Asset Tag')),
+}
+
+CHASSIS_TYPES = [
+    None, 'Other', 'Unknown', 'Desktop', 'Low Profile Desktop', 'Pizza Box',
+    'Mini Tower', 'Tower', 'Portable', 'Laptop', 'Notebook', 'Hand Held',
+    'Docking Station', 'All In One', 'Sub Notebook', 'Space-saving',
+    'Lunch Box', 'Main Server Chassis', 'Expansion Chassis', 'Sub Chassis',
+    'Bus Expansion Chassis', 'Peripheral Chassis', 'RAID Chassis',
+    'Rack Mount Chassis', 'Sealed-case PC', 'Multi-system', 'CompactPCI',
+    'AdvancedTCA', 'Blade', 'Blade Enclosing', 'Tablet', 'Convertible',
+    'Detachable', 'IoT Gateway', 'Embedded PC', 'Mini PC', 'Stick PC',
+]
+
+
+class SMBIOS(Mapping):
+    """
+    SMBIOS structures indexed by DMI type and handle.
+
+    As a mapping, it gives the list of structures fields for a DMI type, like
+    get_dmidecode_infos() always did. Returned fields are copies so callers
+    can update them freely.
+
+    A model built from the binary table only contains NATIVE_TYPES. If a
+    complete loader is given, it is called once to replace the model content
+    when another DMI type is requested.
+    """
+
+    def __init__(self, loader: Optional[Callable[[], Optional['SMBIOS']]] = None):
+        """
+        Initialize an empty model.
+
+        Args:
+            loader: Function returning a complete model, only set for
+                partial models
+        """
+        self._types: Dict[int, List[Dict[str, str]]] = {}
+        self._handles: Dict[int, Dict[str, Any]] = {}
+        self._loader = loader
+        self._lock = threading.Lock()
+
+    def add(self, dmi_type: int, handle: Optional[int], fields: Dict[str, str]) -> None:
+        """
+        Add a structure to the model.
+
+        Args:
+            dmi_type: DMI type number
+            handle: Structure handle
+            fields: Structure fields as reported by dmidecode
+        """
+        self._types.setdefault(dmi_type, []).append(fields)
+        if handle is not None:
+            self._handles[handle] = {'type': dmi_type, 'fields': fields}
+
+    def _complete(self, dmi_type: Optional[int] = None) -> None:
+        """Load complete model if requested type is not natively decoded."""
+        if not self._loader or dmi_type in NATIVE_TYPES:
+            return
+        with self._lock:
+            if not self._loader:
+                return
+            loader, self._loader = self._loader, None
+            complete = loader()
+            if complete:
+                self._types = complete._types
+                self._handles = complete._handles
+
+    def get_type(self, dmi_type: int) -> List[Dict[str, str]]:
+        """
+        Get structures fields for a DMI type.
+
+        Args:
+            dmi_type: DMI type number
+
+        Returns:
+            List of fields dictionaries, empty if none found
+        """
+        self._complete(dmi_type)
+        return [dict(fields) for fields in self._types.get(dmi_type, [])]
+
+    def get_handle(self, handle: int) -> Optional[Dict[str, Any]]:
+        """
+        Get structure by handle.
+
+        Args:
+            handle: Structure handle
+
+        Returns:
+            Dictionary with type and fields keys, or None
+        """
+        self._complete()
+        structure = self._handles.get(handle)
+        if not structure:
+            return None
+        return {'type': structure['type'], 'fields': dict(structure['fields'])}
+
+    def __getitem__(self, dmi_type: int) -> List[Dict[str, str]]:
+        self._complete(dmi_type)
+        if dmi_type not in self._types:
+            raise KeyError(dmi_type)
+        return self.get_type(dmi_type)
+
+    def __iter__(self) -> Iterator[int]:
+        self._complete()
+        return iter(sorted(self._types))
+
+    def __len__(self) -> int:
+        self._complete()
+        return len(self._types)
+
+    def __bool__(self) -> bool:
+        # Don't load complete model just to check it is not empty
+        return bool(self._types)
+
+
+def parse_dmidecode(lines: List[str]) -> Optional[SMBIOS]:
+    """
+    Parse dmidecode output.
+
+    Args:
+        lines: dmidecode output lines
+
+    Returns:
+        SMBIOS model or None if output looks truncated
+    """
+    smbios = SMBIOS()
+    handle = dmi_type = fields = None
+
+    for line in lines:
+        match = _HANDLE_RE.match(line)
+        if match:
+            if fields:
+                smbios.add(dmi_type, handle, fields)
+            handle = int(match.group(1), 16)
+            dmi_type = int(match.group(2))
+            fields = {}
+            continue
+
+        if fields is None:
+            continue
+
+        match = _FIELD_RE.match(line)
+        if not match or match.group(2) in IGNORED_VALUES:
+            continue
+
+        fields[match.group(1)] = match.group(2)
+
+    if fields:
+        smbios.add(dmi_type, handle, fields)
+
+    # Don't return anything if dmidecode output is obviously truncated
+    if len(smbios._types) < 2:
+        return None
+
+    return smbios
+
+
+def _get_string(strings: List[str], index: int) -> Optional[str]:
+    """Get structure string by its 1-based index."""
+    if not index or index > len(strings):
+        return None
+    value = strings[index - 1].strip()
+    if not value or value in IGNORED_VALUES:
+        return None
+    return value
+
+
+def _get_uuid(data: bytes, version: tuple) -> Optional[str]:
+    """Format system UUID as dmidecode does."""
+    if len(data) < 16:
+        return None
+    if data == b'\x00' * 16 or data == b'\xff' * 16:
+        return None
+    # Since SMBIOS 2.6, first three fields are little-endian
+    if version >= (2, 6):
+        data = (data[3::-1] + data[5:3:-1] + data[7:5:-1] + data[8:])
+    hexa = data.hex().upper()
+    return f"{hexa[0:8]}-{hexa[8:12]}-{hexa[12:16]}-{hexa[16:20]}-{hexa[20:32]}"
+
+
+def parse_dmi_table(table: bytes, version: tuple = (3, 0)) -> Optional[SMBIOS]:
+    """
+    Parse raw DMI table as exported by the kernel.
+
+    Only NATIVE_TYPES structures are decoded.
+
+    Args:
+        table: DMI table content
+        version: SMBIOS version as (major, minor) tuple
+
+    Returns:
+        SMBIOS model or None if table looks invalid
+    """
+    smbios = SMBIOS()
+    offset = 0
+    size = len(table)
+
+    while offset + 4 <= size:
+        dmi_type, length, handle = struct.unpack_from('<BBH', table, offset)
+        if length < 4 or offset + length > size:
+            break
+
+        # Strings set follows formatted area and ends with a double null byte
+        end = table.find(b'\x00\x00', offset + length)
+        if end < 0:
+            break
+
+        if dmi_type in NATIVE_TYPES:
+            formatted = table[offset:offset + length]
+            strings = table[offset + length:end].decode('ascii', errors='replace')
+            strings = strings.split('\x00') if strings else []
+
+            fields = {}
+            for field_offset, name in _STRING_FIELDS[dmi_type]:
+                if field_offset < length:
+                    value = _get_string(strings, formatted[field_offset])
+                    if value:
+                        fields[name] = value
+
+            if dmi_type == 1 and length >= 0x19:
+                uuid = _get_uuid(formatted[0x08:0x18], version)
+                if uuid:
+                    fields['UUID'] = uuid
+
+            if dmi_type == 3 and length > 0x05:
+                chassis = formatted[0x05] & 0x7F
+                if chassis < len(CHASSIS_TYPES) and CHASSIS_TYPES[chassis]:
+                    fields['Type'] = CHASSIS_TYPES[chassis]
+
+            if fields:
+                smbios.add(dmi_type, handle, fields)
+
+        # End-of-table structure
+        if dmi_type == 127:
+            break
+
+        offset = end + 2
+
+    if len(smbios._types) < 2:
+        return None
+
+    return smbios
+
+
+def _get_smbios_version() -> tuple:
+    """Get SMBIOS version from kernel exported entry point."""
+    try:
+        with open(DMI_ENTRY_POINT, 'rb') as handle:
+            entry = handle.read(32)
+    except OSError:
+        return (3, 0)
+
+    if entry.startswith(b'_SM3_') and len(entry) > 8:
+        return (entry[7], entry[8])
+    if entry.startswith(b'_SM_') and len(entry) > 7:
+        return (entry[6], entry[7])
+    return (3, 0)
+
+
+def _load_dmidecode(**params) -> Optional[SMBIOS]:
+    """Build model from dmidecode output."""
+    if 'command' not in params:
+        params['command'] = 'dmidecode'
+    lines = get_all_lines(**params)
+    if not lines:
+        return None
+    return parse_dmidecode(lines)
+
+
+def _load_dmi_table(logger=None) -> Optional[SMBIOS]:
+    """Build partial model from kernel exported DMI table."""
+    try:
+        with open(DMI_TABLE, 'rb') as handle:
+            table = handle.read()
+    except OSError as e:
+        if logger:
+            logger.debug2(f"Can't read {DMI_TABLE}: {e}")
+        return None
+
+    return parse_dmi_table(table, _get_smbios_version())
+
+
+def get_smbios(**params) -> Optional[SMBIOS]:
+    """
+    Get SMBIOS model.
+
+    When given a command, a file or a string, dmidecode output is parsed from
+    it. Otherwise the model is built once per task run: locally, NATIVE_TYPES
+    are decoded from the kernel exported DMI table when readable, and
+    dmidecode is only run if another DMI type is requested.
+
+    Args:
+        **params: Parameters including logger, command, file, string
+
+    Returns:
+        SMBIOS model or None if not available
+    """
+    if params.get('command') or params.get('file') or params.get('string') is not None:
+        return _load_dmidecode(**params)
+
+    logger = params.get('logger')
+
+    def loader() -> Optional[SMBIOS]:
+        if not get_remote_for_tools():
+            smbios = _load_dmi_table(logger=logger)
+            if smbios:
+                smbios._loader = lambda: _load_dmidecode(logger=logger)
+                return smbios
+        return _load_dmidecode(logger=logger)
+
+    return get_run_cached('smbios', loader)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+GLPI Agent Tools Softwares - Python Implementation
+
+Helpers shared by software inventory providers.
+
+Package managers databases rarely change between two inventories, so a
+provider can keep its packages list in agent storage, alongside the state
+of the files it was built from. The list is rebuilt only when one of these
+files changed, compared by modification time, size and inode.
+
+Database files are local ones, so nothing is cached for a remote inventory.
+"""
+
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from GLPI.Agent.Tools import get_remote_for_tools
+except ImportError:
+    # Stub implementation
+    def get_remote_for_tools():
+        return None
+
+
+__all__ = [
+    'get_packages_cache_key',
+    'get_cached_packages',
+]
+
+# Increment when cached packages format changes
+CACHE_VERSION = 1
+
+
+def get_packages_cache_key(sources: List[str]) -> Optional[Tuple]:
+    """
+    Get a key identifying the current state of packages database files.
+
+    Args:
+        sources: Packages database files or directories. A directory only
+            covers added or removed entries, not updated ones.
+
+    Returns:
+        Tuple of (path, mtime, size, inode) tuples, with None values for
+        missing paths, or None if no source exists
+    """
+    key = []
+    found = False
+    for source in sources:
+        try:
+            stat = os.stat(source)
+        except OSError:
+            key.append((source, None, None, None))
+            continue
+        found = True
+        key.append((source, stat.st_mtime_ns, stat.st_size, stat.st_ino))
+
+    return (CACHE_VERSION,) + tuple(key) if found else None
+
+
+def get_cached_packages(**params) -> Optional[List[Dict[str, Any]]]:
+    """
+    Get packages list from storage cache, or build and cache it.
+
+    The list is always built during a remote inventory, as database files
+    state can only be checked on agent host.
+
+    Args:
+        **params: Parameters including:
+            - name: Cache name, like the provider name (required)
+            - sources: Packages database files the list depends on
+            - builder: Callable returning the packages list (required)
+            - storage: Agent Storage instance, no caching if not set
+            - logger: Logger instance
+
+    Returns:
+        List of packages dictionaries or None
+    """
+    name = params['name']
+    builder: Callable[[], Optional[List[Dict[str, Any]]]] = params['builder']
+    storage = params.get('storage')
+    logger = params.get('logger')
+
+    if not storage or get_remote_for_tools():
+        return builder()
+
+    key = get_packages_cache_key(params.get('sources') or [])
+    if not key:
+        return builder()
+
+    cache_name = f"softwares-{name}"
+    cache = storage.restore(name=cache_name)
+    if isinstance(cache, dict) and cache.get('key') == key:
+        if logger:
+            logger.debug(f"Using cached {name} packages list")
+        return cache.get('packages')
+
+    # Key is computed before building so a database updated while
+    # building the list will invalidate the cache at next run
+    packages = builder()
+    if packages:
+        storage.save(name=cache_name, data={'key': key, 'packages': packages})
+    elif cache is not None:
+        storage.remove(name=cache_name)
+
+    return packages
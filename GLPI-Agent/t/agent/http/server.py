@@ -9,6 +9,9 @@ import pytest
 sys.path.insert(0, 't/lib')
 sys.path.insert(0, 'lib')
 
+import hashlib
+import time
+
 try:
     from GLPI.Test.Agent import Agent as TestAgent
     from GLPI.Agent.HTTP.Server import Server as HTTPServer
@@ -16,6 +19,11 @@ try:
 except ImportError:
     TestAgent = HTTPServer = Logger = None
 
+try:
+    from GLPI.Agent.HTTP.Server import SharedPartsIndex, parse_range
+except ImportError:
+    SharedPartsIndex = parse_range = None
+
 
 @pytest.mark.skipif(platform.system() == 'Windows' and os.environ.get('GITHUB_ACTIONS'),
                    reason="Not working on GitHub Actions Windows image")
@@ -140,5 +148,64 @@ class TestHTTPServer:
         pytest.skip("Server listening tests require complex infrastructure")
 
 
+def _store_part(directory, content, expiration):
+    """Store a shared part like Deploy task does"""
+    sha512 = hashlib.sha512(content).hexdigest()
+    path = directory / str(expiration) / sha512[0] / sha512[1] / sha512[2:8]
+    path.parent.mkdir(parents=True)
+    path.write_bytes(content)
+    return sha512, str(path)
+
+
+@pytest.mark.skipif(SharedPartsIndex is None, reason="HTTP Server not implemented")
+class TestHTTPServerDeploy:
+    """Tests for GLPI Agent HTTP Server deploy parts serving"""
+
+    def test_shared_parts_index(self, tmp_path, monkeypatch):
+        """Test parts are hashed once and forgotten when expired or changed"""
+        shared = tmp_path / 'shared'
+        expiration = int(time.time()) + 3600
+        sha512, path = _store_part(shared, b'part content', expiration)
+        index = SharedPartsIndex()
+
+        hashed = []
+        original = SharedPartsIndex._sha512
+        monkeypatch.setattr(SharedPartsIndex, '_sha512', staticmethod(
+            lambda file: hashed.append(file) or original(file)
+        ))
+
+        assert index.find(sha512, [str(shared)]) == (path, 12)
+        assert index.find(sha512, [str(shared)]) == (path, 12)
+        assert hashed == [path]
+
+        # Unknown part
+        assert index.find('0' * 128, [str(shared)]) is None
+
+        # Changed part is checked again
+        with open(path, 'wb') as handle:
+            handle.write(b'corrupted part')
+        assert index.find(sha512, [str(shared)]) is None
+        assert index.find(sha512, [str(shared)]) is None
+        assert hashed == [path, path]
+
+        # Expired part
+        other, other_path = _store_part(shared, b'other', int(time.time()) + 3600)
+        assert index.find(other, [str(shared)]) == (other_path, 5)
+        monkeypatch.setattr(time, 'time', lambda: expiration + 7200)
+        index.expire()
+        assert len(index) == 0
+
+    def test_parse_range(self):
+        """Test Range header parsing"""
+        assert parse_range(None, 100) is None
+        assert parse_range('bytes=0-9', 100) == (0, 10)
+        assert parse_range('bytes=90-', 100) == (90, 10)
+        assert parse_range('bytes=-20', 100) == (80, 20)
+        assert parse_range('bytes=50-500', 100) == (50, 50)
+        assert parse_range('bytes=100-', 100) == (100, 0)
+        assert parse_range('bytes=0-1,5-6', 100) is None
+        assert parse_range('items=0-1', 100) is None
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
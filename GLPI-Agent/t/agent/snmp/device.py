@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+import sys
+import pytest
+
+sys.path.insert(0, 't/lib')
+sys.path.insert(0, 'lib')
+
+try:
+    from GLPI.Agent.SNMP.Device import SNMPDevice
+except ImportError:
+    SNMPDevice = None
+
+
+class CountingSNMP:
+    """SNMP session counting requests sent to device"""
+
+    VALUES = {
+        '1.3.6.1.2.1.1.5.0': 'switch',
+        '1.3.6.1.2.1.2.2.1.2.1': 'port1',
+        '1.3.6.1.2.1.2.2.1.2.2': 'port2',
+        '1.3.6.1.2.1.2.2.1.3.1': '6',
+        '1.3.6.1.2.1.2.2.1.3.2': '6',
+    }
+
+    def __init__(self):
+        self.requests = []
+        self.context = None
+        self.walk_truncated = False
+        self.truncate = False
+
+    def get(self, oid):
+        self.requests.append(('get', oid))
+        return self.VALUES.get(oid.lstrip('.'))
+
+    def walk(self, oid):
+        self.requests.append(('walk', oid))
+        base = oid.lstrip('.') + '.'
+        values = {
+            key[len(base):]: value for key, value in self.VALUES.items()
+            if key.startswith(base)
+        }
+        if self.context:
+            values = {key: f"{value}@{self.context}" for key, value in values.items()}
+        self.walk_truncated = self.truncate
+        if self.truncate:
+            values = dict(list(values.items())[:1])
+        return values or None
+
+    def switch_vlan_context(self, vlan_id):
+        if vlan_id == 'bad':
+            raise Exception("can't switch context")
+        self.context = vlan_id
+
+    def reset_original_context(self):
+        self.context = None
+
+    def set_sysobjectid(self, sysobjectid):
+        self.sysobjectid = sysobjectid
+
+
+@pytest.mark.skipif(SNMPDevice is None, reason="SNMP Device not implemented")
+class TestSNMPDeviceCache:
+    """Tests for SNMP device results cache"""
+
+    def test_walk_subtree_reuse(self):
+        snmp = CountingSNMP()
+        device = SNMPDevice(snmp=snmp)
+
+        iftable = device.walk('.1.3.6.1.2.1.2.2.1')
+        assert iftable['2.1'] == 'port1'
+
+        assert device.walk('.1.3.6.1.2.1.2.2.1.2') == {'1': 'port1', '2': 'port2'}
+        assert device.get('.1.3.6.1.2.1.2.2.1.3.2') == '6'
+        assert device.get('.1.3.6.1.2.1.2.2.1.3.3') is None
+        assert device.walk('.1.3.6.1.2.1.2.2.1.4') is None
+        assert snmp.requests == [('walk', '.1.3.6.1.2.1.2.2.1')]
+
+        # Returned walks are copies
+        iftable['2.1'] = 'foo'
+        assert device.walk('.1.3.6.1.2.1.2.2.1')['2.1'] == 'port1'
+
+    def test_get_cache(self):
+        snmp = CountingSNMP()
+        device = SNMPDevice(snmp=snmp)
+
+        assert device.get('.1.3.6.1.2.1.1.5.0') == 'switch'
+        assert device.get('.1.3.6.1.2.1.1.6.0') is None
+        assert device.get_many(['.1.3.6.1.2.1.1.5.0', '.1.3.6.1.2.1.1.6.0']) == {
+            '.1.3.6.1.2.1.1.5.0': 'switch',
+            '.1.3.6.1.2.1.1.6.0': None,
+        }
+        # Failed request is sent again
+        assert snmp.requests == [
+            ('get', '.1.3.6.1.2.1.1.5.0'),
+            ('get', '.1.3.6.1.2.1.1.6.0'),
+            ('get', '.1.3.6.1.2.1.1.6.0'),
+        ]
+
+    def test_get_timeout(self, monkeypatch):
+        snmp = CountingSNMP()
+        device = SNMPDevice(snmp=snmp)
+
+        # Transient timeout
+        monkeypatch.setattr(snmp, 'VALUES', {})
+        assert device.get('.1.3.6.1.2.1.1.5.0') is None
+        monkeypatch.undo()
+        assert device.get('.1.3.6.1.2.1.1.5.0') == 'switch'
+        assert device.get('.1.3.6.1.2.1.1.5.0') == 'switch'
+        assert len(snmp.requests) == 2
+
+    def test_vlan_context(self):
+        snmp = CountingSNMP()
+        device = SNMPDevice(snmp=snmp)
+
+        assert device.walk('.1.3.6.1.2.1.2.2.1.2')['1'] == 'port1'
+        device.switch_vlan_context(10)
+        assert device.walk('.1.3.6.1.2.1.2.2.1.2')['1'] == 'port1@10'
+        device.reset_original_context()
+        assert device.walk('.1.3.6.1.2.1.2.2.1.2')['1'] == 'port1'
+        assert len(snmp.requests) == 2
+
+    def test_vlan_context_failure(self):
+        snmp = CountingSNMP()
+        device = SNMPDevice(snmp=snmp)
+
+        device.switch_vlan_context(10)
+        assert device.walk('.1.3.6.1.2.1.2.2.1.2')['1'] == 'port1@10'
+        with pytest.raises(Exception):
+            device.switch_vlan_context('bad')
+        # Still in VLAN 10 context
+        assert device.walk('.1.3.6.1.2.1.2.2.1.2')['1'] == 'port1@10'
+        assert len(snmp.requests) == 1
+
+    def test_truncated_walk(self):
+        snmp = CountingSNMP()
+        device = SNMPDevice(snmp=snmp)
+
+        snmp.truncate = True
+        assert device.walk('.1.3.6.1.2.1.2.2.1.2') == {'1': 'port1'}
+        snmp.truncate = False
+        assert device.walk('.1.3.6.1.2.1.2.2.1.2') == {'1': 'port1', '2': 'port2'}
+        assert device.walk('.1.3.6.1.2.1.2.2.1.2') == {'1': 'port1', '2': 'port2'}
+        assert len(snmp.requests) == 2
+
+
+@pytest.mark.skipif(SNMPDevice is None, reason="SNMP Device not implemented")
+class TestSNMPDeviceSysObjectID:
+    """Tests for sysObjectID informations"""
+
+    def test_session_sysobjectid(self, monkeypatch):
+        """Test session gets sysObjectID without requesting it again"""
+        from GLPI.Agent.Tools import IdsIndex
+        monkeypatch.setattr(IdsIndex, 'get_sysobject_id_info', lambda **params: {
+            'type': 'NETWORKING', 'manufacturer': 'Cisco', 'model': 'C2960',
+        })
+        snmp = CountingSNMP()
+        device = SNMPDevice(snmp=snmp)
+
+        device.set_sysobjectid_infos('.1.3.6.1.4.1.9.1.1208')
+        assert snmp.sysobjectid == '.1.3.6.1.4.1.9.1.1208'
+        assert device.MODEL == 'C2960'
+        assert snmp.requests == []
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
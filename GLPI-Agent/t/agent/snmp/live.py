@@ -12,6 +12,97 @@ try:
 except ImportError:
     Live = None
 
+try:
+    from GLPI.Agent.SNMP import Live as live_module
+    from GLPI.Agent.SNMP.Live import SNMPLive, SNMP_VERSION_2C
+except ImportError:
+    live_module = SNMPLive = None
+
+
+def _oid_key(oid):
+    return tuple(int(number) for number in oid.lstrip('.').split('.'))
+
+
+class FakeAgent:
+    """SNMP agent answering GETBULK requests on an interfaces table"""
+
+    def __init__(self, rows, max_size=None, big_from=0):
+        self.rows = [
+            (f"1.3.6.1.2.1.2.2.1.2.{index}", f"eth{index}")
+            for index in range(1, rows + 1)
+        ] + [
+            (f"1.3.6.1.2.1.2.2.1.3.{index}", "6")
+            for index in range(1, rows + 1)
+        ]
+        self.max_size = max_size
+        # Only responses with rows after this one are too big
+        self.big_from = big_from
+        # max-repetitions of each GETBULK request
+        self.requests = []
+
+    def bulkCmd(self, engine, auth, transport, context, non_repeaters,
+                max_repetitions, start, lexicographicMode=True):
+        start_key = _oid_key(start)
+        rows = [row for row in self.rows if _oid_key(row[0]) > start_key]
+        while rows:
+            self.requests.append(max_repetitions)
+            response = rows[:max_repetitions]
+            if self.max_size and max_repetitions > self.max_size and \
+                    _oid_key(response[-1][0])[-1] > self.big_from:
+                yield None, 'tooBig', 0, []
+                return
+            # Like pysnmp, response rows are yielded one at a time
+            for name, value in response:
+                # Like pysnmp, stop when leaving the start OID subtree
+                # unless in lexicographic mode
+                key = _oid_key(name)
+                if not lexicographicMode and key[:len(start_key)] != start_key:
+                    return
+                yield None, 0, 0, [(name, value)]
+            rows = rows[max_repetitions:]
+
+
+class FakeGetAgent:
+    """SNMP agent answering GET requests like a SNMPv1 agent"""
+
+    def __init__(self, values, max_size=None, error=None):
+        self.values = values
+        self.max_size = max_size
+        self.error = error
+        # Requested OIDs of each GET request
+        self.requests = []
+
+    def getCmd(self, engine, auth, transport, context, *oids):
+        self.requests.append(list(oids))
+        if self.max_size and len(oids) > self.max_size:
+            return iter([(None, 'tooBig', 0, [])])
+        if self.error and len(oids) > 1:
+            return iter([(None, self.error, 0, [])])
+        for index, oid in enumerate(oids, start=1):
+            if oid not in self.values:
+                return iter([(None, 'noSuchName', index, [])])
+        return iter([(None, 0, 0, [(oid, self.values[oid]) for oid in oids])])
+
+
+def _get_session(monkeypatch, hostname, agent=None):
+    monkeypatch.setattr(SNMPLive, '_learnt', {})
+    monkeypatch.setattr(live_module, 'ContextData', lambda **params: None)
+    monkeypatch.setattr(live_module, 'ObjectType', lambda identity: identity)
+    monkeypatch.setattr(live_module, 'ObjectIdentity', lambda oid: oid)
+    if isinstance(agent, FakeAgent):
+        monkeypatch.setattr(live_module, 'bulkCmd', agent.bulkCmd)
+    elif agent:
+        monkeypatch.setattr(live_module, 'getCmd', agent.getCmd)
+
+    snmp = SNMPLive(hostname=hostname, version='2c', community='public')
+    snmp.session = {
+        'engine': None,
+        'auth_data': None,
+        'transport': None,
+        'version_id': SNMP_VERSION_2C,
+    }
+    return snmp
+
 
 @pytest.mark.skipif(Live is None, reason="SNMP Live not implemented")
 class TestSNMPLive:
@@ -30,5 +121,136 @@ class TestSNMPLive:
         pytest.skip("SNMP tests require SNMP agent")
 
 
+@pytest.mark.skipif(SNMPLive is None, reason="SNMP Live not available")
+class TestSNMPLiveBulkWalk:
+    """Tests for GETBULK max-repetitions adaptation"""
+
+    def test_shrink(self, monkeypatch):
+        """Test max-repetitions is halved on tooBig and learnt"""
+        agent = FakeAgent(30, max_size=10)
+        snmp = _get_session(monkeypatch, 'shrink', agent)
+
+        values = snmp.walk('.1.3.6.1.2.1.2.2.1.2')
+        assert len(values) == 30
+        assert values['30'] == 'eth30'
+        assert not snmp.walk_truncated
+        assert agent.requests[:3] == [25, 12, 6]
+        assert snmp._get_learnt('max_repetitions', 0) == 6
+
+        # Next session with this device starts from learnt value
+        agent.requests = []
+        snmp = SNMPLive(hostname='shrink', version='2c', community='public')
+        snmp.session = {'engine': None, 'auth_data': None, 'transport': None,
+                        'version_id': SNMP_VERSION_2C}
+        assert len(snmp.walk('.1.3.6.1.2.1.2.2.1.2')) == 30
+        assert agent.requests[0] == 6
+
+    def test_shrink_during_walk(self, monkeypatch):
+        """Test walk resumes after last row when shrunk in the middle of a walk"""
+        agent = FakeAgent(60, max_size=10, big_from=25)
+        snmp = _get_session(monkeypatch, 'resume', agent)
+
+        values = snmp.walk('.1.3.6.1.2.1.2.2.1.2')
+        assert sorted(values, key=int) == [str(index) for index in range(1, 61)]
+        assert values['60'] == 'eth60'
+        assert not snmp.walk_truncated
+        assert agent.requests[:4] == [25, 25, 12, 6]
+
+    def test_grow_back(self, monkeypatch):
+        """Test max-repetitions only grows back after multi-PDU walks"""
+        snmp = _get_session(monkeypatch, 'grow', FakeAgent(3))
+        snmp._set_learnt('max_repetitions', 8)
+
+        # A walk answered with one PDU doesn't grow the value back
+        assert len(snmp.walk('.1.3.6.1.2.1.2.2.1.2')) == 3
+        assert snmp._get_learnt('max_repetitions', 0) == 8
+
+        agent = FakeAgent(30)
+        monkeypatch.setattr(live_module, 'bulkCmd', agent.bulkCmd)
+        assert len(snmp.walk('.1.3.6.1.2.1.2.2.1.2')) == 30
+        assert agent.requests == [8, 8, 8, 8]
+        assert snmp._get_learnt('max_repetitions', 0) == 10
+
+    def test_no_grow_after_shrink(self, monkeypatch):
+        """Test max-repetitions doesn't grow back after a walk with errors"""
+        snmp = _get_session(monkeypatch, 'nogrow', FakeAgent(100, max_size=20))
+
+        assert len(snmp.walk('.1.3.6.1.2.1.2.2.1.2')) == 100
+        assert snmp._get_learnt('max_repetitions', 0) == 12
+
+
+def _get_oids(count):
+    return [f".1.3.6.1.2.1.2.2.1.5.{index}" for index in range(1, count + 1)]
+
+
+@pytest.mark.skipif(SNMPLive is None, reason="SNMP Live not available")
+class TestSNMPLiveGetMany:
+    """Tests for batched GET requests"""
+
+    def test_packing(self, monkeypatch):
+        """Test OIDs are packed in requests of learnt size"""
+        oids = _get_oids(40)
+        agent = FakeGetAgent({oid: '1000' for oid in oids})
+        snmp = _get_session(monkeypatch, 'packing', agent)
+
+        assert snmp.get_many(oids) == {oid: '1000' for oid in oids}
+        assert [len(request) for request in agent.requests] == [32, 8]
+
+    def test_too_big(self, monkeypatch):
+        """Test request size is halved on tooBig and learnt"""
+        oids = _get_oids(20)
+        agent = FakeGetAgent({oid: '1000' for oid in oids}, max_size=10)
+        snmp = _get_session(monkeypatch, 'toobig', agent)
+
+        assert snmp.get_many(oids) == {oid: '1000' for oid in oids}
+        assert [len(request) for request in agent.requests] == [20, 10, 10]
+        assert snmp._get_learnt('max_varbinds', 0) == 10
+
+    def test_error_index(self, monkeypatch):
+        """Test a failing varbind is removed from the request"""
+        oids = _get_oids(5)
+        agent = FakeGetAgent({oid: '1000' for oid in oids if oid != oids[2]})
+        snmp = _get_session(monkeypatch, 'index', agent)
+
+        values = snmp.get_many(oids)
+        assert values[oids[2]] is None
+        assert all(values[oid] == '1000' for oid in oids if oid != oids[2])
+        assert agent.requests == [oids, oids[:2] + oids[3:]]
+
+    def test_fallback(self, monkeypatch):
+        """Test other errors fall back to one get() per OID"""
+        oids = _get_oids(3)
+        agent = FakeGetAgent({}, error='genErr')
+        snmp = _get_session(monkeypatch, 'fallback', agent)
+        monkeypatch.setattr(snmp, 'get', lambda oid: f"value{oid[-1]}")
+
+        assert snmp.get_many(oids) == {
+            oids[0]: 'value1',
+            oids[1]: 'value2',
+            oids[2]: 'value3',
+        }
+        assert agent.requests == [oids]
+
+    def test_sysobjectid(self, monkeypatch):
+        """Test learnt size is shared by model without requesting sysObjectID"""
+        oids = _get_oids(20)
+        agent = FakeGetAgent({oid: '1000' for oid in oids}, max_size=10)
+        snmp = _get_session(monkeypatch, 'switch1', agent)
+        snmp.set_sysobjectid('.1.3.6.1.4.1.9.1.1208')
+
+        snmp.get_many(oids)
+        assert all('.1.3.6.1.2.1.1.2.0' not in request for request in agent.requests)
+
+        # Another device of the same model starts from learnt size
+        agent.requests = []
+        snmp = SNMPLive(hostname='switch2', version='2c', community='public')
+        snmp.session = {'engine': None, 'auth_data': None, 'transport': None,
+                        'version_id': SNMP_VERSION_2C}
+        assert snmp._get_learnt('max_varbinds', 0) == 0
+        snmp.set_sysobjectid('.1.3.6.1.4.1.9.1.1208')
+        snmp.get_many(oids)
+        assert [len(request) for request in agent.requests] == [10, 10]
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
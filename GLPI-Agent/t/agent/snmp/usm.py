@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import sys
+import pytest
+
+sys.path.insert(0, 't/lib')
+sys.path.insert(0, 'lib')
+
+try:
+    from GLPI.Agent.SNMP.Security import USM as usm_module
+    from GLPI.Agent.SNMP.Security.USM import (
+        USM, password_to_key, AUTH_PROTOCOL_HMACMD5, AUTH_PROTOCOL_HMACSHA,
+        PRIV_PROTOCOL_NONE
+    )
+except ImportError:
+    USM = None
+
+ENGINE_ID = bytes.fromhex('000000000000000000000002')
+
+
+@pytest.mark.skipif(USM is None, reason="USM not implemented")
+class TestSNMPSecurityUSM:
+    """Tests for GLPI Agent SNMP USM keys"""
+
+    def setup_method(self):
+        USM.clear_key_cache()
+
+    def test_password_to_key(self):
+        """Test RFC 3414 A.3 key localization samples"""
+        assert password_to_key('maplesyrup', ENGINE_ID, AUTH_PROTOCOL_HMACMD5).hex() == \
+            '526f5eed9fcce26f8964c2930787d82b'
+        assert password_to_key('maplesyrup', ENGINE_ID, AUTH_PROTOCOL_HMACSHA).hex() == \
+            '6695febc9288e36282235fc7151f128497b38f3f'
+
+    def test_key_cache(self, monkeypatch):
+        """Test password is only expanded once per protocol"""
+        calls = []
+        password_to_ku = usm_module._password_to_ku
+
+        def counting_password_to_ku(*args):
+            calls.append(args[1])
+            return password_to_ku(*args)
+
+        monkeypatch.setattr(usm_module, '_password_to_ku', counting_password_to_ku)
+
+        keys = set()
+        for engine in range(3):
+            engine_id = ENGINE_ID[:-1] + bytes([engine])
+            for _ in range(2):
+                usm = USM(
+                    username='user',
+                    auth_protocol=AUTH_PROTOCOL_HMACSHA,
+                    auth_password='maplesyrup',
+                    priv_protocol=PRIV_PROTOCOL_NONE,
+                    engine_id=engine_id,
+                )
+                keys.add(usm._auth_key)
+
+        assert calls == [AUTH_PROTOCOL_HMACSHA]
+        assert len(keys) == 3
+        assert password_to_key('maplesyrup', ENGINE_ID, AUTH_PROTOCOL_HMACSHA).hex() == \
+            '6695febc9288e36282235fc7151f128497b38f3f'
+
+        password_to_key('maplesyrup', ENGINE_ID, AUTH_PROTOCOL_HMACMD5)
+        assert calls == [AUTH_PROTOCOL_HMACSHA, AUTH_PROTOCOL_HMACMD5]
+
+    def test_key_cache_size(self, monkeypatch):
+        """Test key caches are bounded"""
+        monkeypatch.setattr(USM, '_kul_cache_size', 2)
+        for engine in range(4):
+            password_to_key('maplesyrup', ENGINE_ID[:-1] + bytes([engine]))
+        assert len(USM._kul_cache) == 2
+        assert len(USM._ku_cache) == 1
+        assert 'maplesyrup' not in repr(USM._ku_cache)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
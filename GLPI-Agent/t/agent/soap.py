@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 
+import io
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pytest
+from unittest.mock import Mock
 
 # Add paths for imports
 sys.path.insert(0, 't/lib')
@@ -12,9 +16,15 @@ try:
     from GLPI.Agent.Inventory import Inventory
     from GLPI.Agent.XML import XML
     from GLPI.Agent.SOAP.VMware import VMware
+    from GLPI.Agent.SOAP.VMware.Host import VMwareHost
     from GLPI.Agent.Tools.Virtualization import getVirtualMachinePowerState
 except ImportError:
-    Inventory = XML = VMware = getVirtualMachinePowerState = None
+    Inventory = XML = VMware = VMwareHost = getVirtualMachinePowerState = None
+
+try:
+    from GLPI.Agent.SOAP import WsMan
+except ImportError:
+    WsMan = None
 
 
 # Sample test data for ESX server
@@ -88,6 +98,79 @@ class TestSOAPVMware:
         pytest.skip("VMware VM list requires ESX server")
 
 
+# Batched RetrieveProperties response for two VMs with an unknown one
+VM_BATCH_RESPONSE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+ xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+<soapenv:Body>
+<RetrievePropertiesResponse xmlns="urn:vim25">
+<returnval><obj type="VirtualMachine">16</obj>
+<propSet><name>name</name><val xsi:type="xsd:string">ubuntu</val></propSet>
+<propSet><name>config.hardware.device</name><val xsi:type="ArrayOfVirtualDevice">
+<VirtualDevice xsi:type="VirtualIDEController"><key>200</key></VirtualDevice>
+<VirtualDevice xsi:type="VirtualE1000"><key>4000</key><macAddress>00:0c:29:e6:b8:5e</macAddress></VirtualDevice>
+</val></propSet>
+<propSet><name>guest.net</name><val xsi:type="ArrayOfGuestNicInfo">
+<GuestNicInfo xsi:type="GuestNicInfo"><network>VM Network</network><macAddress>00:0c:29:e6:b8:5e</macAddress>
+<dnsConfig><domainName>teclib.local</domainName></dnsConfig></GuestNicInfo>
+</val></propSet>
+<propSet><name>summary</name><val xsi:type="VirtualMachineSummary"><runtime><powerState>poweredOn</powerState></runtime>
+<config><uuid>564d8a5b-7a9c-f7e8-a0b9-e0d6a5e6b85e</uuid><memorySizeMB>512</memorySizeMB><numCpu>1</numCpu></config></val></propSet>
+</returnval>
+<returnval><obj type="VirtualMachine">32</obj>
+<propSet><name>name</name><val xsi:type="xsd:string">windows</val></propSet>
+<propSet><name>config.annotation</name><val xsi:type="xsd:string">test</val></propSet>
+</returnval>
+</RetrievePropertiesResponse>
+</soapenv:Body>
+</soapenv:Envelope>
+"""
+
+
+@pytest.mark.skipif(VMware is None, reason="VMware SOAP module not implemented")
+class TestSOAPVMwareBatch:
+    """Tests for VMware batched virtual machines retrieval"""
+
+    def test_get_virtual_machines_by_ids(self, monkeypatch):
+        """Test all VMs are retrieved with one streamed request"""
+        vmware = VMware(url='https://localhost/sdk/vimService')
+        vmware.property_collector = 'ha-property-collector'
+        requests = []
+
+        def send(action, xml_to_send, stream=False):
+            requests.append(xml_to_send)
+            assert stream
+            return io.BytesIO(VM_BATCH_RESPONSE)
+
+        monkeypatch.setattr(vmware, '_send', send)
+        vms = vmware._getVirtualMachinesByIds(['16', '32', '48'])
+
+        assert len(requests) == 1
+        assert '<all>0</all>' in requests[0]
+        assert '<pathSet>config.hardware.device</pathSet>' in requests[0]
+        assert requests[0].count('<obj type="VirtualMachine">') == 3
+
+        assert vms[2] == []
+
+        # Array properties are got as lists by Host
+        host = VMwareHost(hash=[{}], vms=vms)
+        host.enable_features_for_glpi_version('10.0.17')
+        machines = host.get_virtual_machines()
+        assert [machine['NAME'] for machine in machines] == ['ubuntu', 'windows']
+        assert machines[0]['MAC'] == '00:0c:29:e6:b8:5e'
+        assert machines[0]['OPERATINGSYSTEM']['DNS_DOMAIN'] == 'teclib.local'
+        assert machines[0]['MEMORY'] == '512'
+        assert machines[1]['MAC'] == ''
+        assert machines[1]['COMMENT'] == 'test'
+
+    def test_get_virtual_machines_by_ids_failure(self, monkeypatch):
+        """Test failure is reported to fall back on per VM requests"""
+        vmware = VMware(url='https://localhost/sdk/vimService')
+        monkeypatch.setattr(vmware, '_send', lambda *args, **kwargs: None)
+        assert vmware._getVirtualMachinesByIds(['16']) is None
+        assert vmware._getVirtualMachinesByIds([]) == []
+
+
 @pytest.mark.skipif(getVirtualMachinePowerState is None, reason="Virtualization tools not implemented")
 class TestVirtualizationTools:
     """Tests for virtualization utility functions"""
@@ -112,6 +195,117 @@ class TestSOAPInventory:
         pytest.skip("SOAP XML generation requires test data")
 
 
+@pytest.mark.skipif(WsMan is None, reason="WsMan SOAP module not implemented")
+class TestSOAPWsManShell:
+    """Tests for WinRM shells reuse"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        client = WsMan.WsManClient(url='http://localhost:5985/wsman', winrm=1)
+        calls = []
+        shells = iter(range(100))
+
+        def create():
+            calls.append('create')
+            return {'sid': next(shells), 'shell': None, 'resource': None,
+                    'selectorset': None, 'reused': False}
+
+        def command(shell, command):
+            calls.append('command')
+            return None if shell['sid'] in client.broken else command
+
+        def receive(sid, resource, selectorset, cid):
+            calls.append('receive')
+            return f"output {sid}", 1 if cid == 'fail' else 0
+
+        monkeypatch.setattr(client, '_create_shell', create)
+        monkeypatch.setattr(client, '_command', command)
+        monkeypatch.setattr(client, 'receive', receive)
+        monkeypatch.setattr(client, 'signal', lambda *args: calls.append('signal'))
+        monkeypatch.setattr(client, 'delete', lambda *args: calls.append('delete'))
+        monkeypatch.setattr(client, 'end', lambda *args: calls.append('end'))
+        client.calls = calls
+        client.broken = set()
+        return client
+
+    def test_shell_reuse(self, client):
+        """Test a shell is created once for several commands"""
+        for _ in range(3):
+            assert client.shell('ver') == {'stdout': 'output 0', 'exitcode': 0}
+        assert client.calls.count('create') == 1
+        assert 'delete' not in client.calls
+
+        client.close_shells()
+        assert client.calls.count('delete') == 1
+
+    def test_shell_exitcode(self, client):
+        """Test exit code is the one of each command run in pooled shells"""
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(client.shell, ['ver', 'fail'] * 8))
+        assert [result['exitcode'] for result in results] == [0, 1] * 8
+
+    def test_shell_expiration(self, client, monkeypatch):
+        """Test expired or remotely deleted shells are replaced"""
+        monkeypatch.setattr(WsMan, 'SHELL_IDLE_TIMEOUT', -1)
+        client.shell('ver')
+        client.shell('ver')
+        assert client.calls.count('create') == 2
+        assert client.calls.count('delete') == 1
+
+        # Shell deleted on remote side before its expiration
+        client.broken.add(1)
+        client._shells[0]['expiration'] = float('inf')
+        assert client.shell('ver')['stdout'] == 'output 2'
+        assert client.calls.count('create') == 3
+
+
+class RacyXML:
+    """XML handler giving other threads a chance to run while parsing"""
+
+    def write(self, structure):
+        return str(structure)
+
+    def string(self, content):
+        self._string = content
+
+    def dump_as_hash(self):
+        time.sleep(0.001)
+        return {'content': self._string}
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self._content = content
+
+    def is_success(self):
+        return True
+
+    def content(self):
+        return self._content
+
+
+@pytest.mark.skipif(WsMan is None, reason="WsMan SOAP module not implemented")
+class TestSOAPWsManSend:
+    """Tests for WsMan requests sent by threads"""
+
+    def test_send_threads(self, monkeypatch):
+        """Test each thread parses its own response with the shared XML handler"""
+        client = WsMan.WsManClient(url='http://localhost:5985/wsman', winrm=1)
+        monkeypatch.setattr(WsMan, '_xml', RacyXML())
+        # Server answers with the request content
+        monkeypatch.setattr(client, 'request',
+                            lambda request, **params: FakeResponse(request.message))
+
+        def send(index):
+            envelope = Mock()
+            envelope.get.return_value = index
+            return client._send(envelope)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(send, range(200)))
+        assert results == [{'content': str(index)} for index in range(200)]
+
+
 # Note: Full SOAP tests require actual ESX server connection or mocked responses
 # These are placeholder tests that can be expanded when ESX test infrastructure is available
 
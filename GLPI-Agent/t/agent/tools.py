@@ -21,6 +21,24 @@ except ImportError:
     getCanonicalManufacturer = compareVersion = None
     trimWhitespace = hex2dec = None
 
+try:
+    from GLPI.Agent.Tools import (
+        set_command_cache_for_tools, reset_command_cache_for_tools,
+        get_all_lines
+    )
+except ImportError:
+    set_command_cache_for_tools = reset_command_cache_for_tools = None
+    get_all_lines = None
+
+try:
+    from GLPI.Agent.Tools import set_remote_for_tools, reset_remote_for_tools
+    from GLPI.Agent.Tools.Hostname import (
+        get_hostname, get_remote_fqdn, get_remote_hostdomain
+    )
+except ImportError:
+    set_remote_for_tools = reset_remote_for_tools = None
+    get_hostname = get_remote_fqdn = get_remote_hostdomain = None
+
 
 # Test data
 SIZE_TESTS_OK = [
@@ -215,6 +233,64 @@ class TestToolsHex:
             assert result is None or result == 0
 
 
+@pytest.mark.skipif(set_command_cache_for_tools is None, reason="Tools not implemented")
+@pytest.mark.skipif(platform.system() == 'Windows', reason="Unix shell required")
+class TestToolsCommandCache:
+    """Tests for commands output cache"""
+    
+    def test_command_cache(self, tmp_path):
+        """Test commands are run once while cache is enabled"""
+        counter = tmp_path / 'counter'
+        command = f"echo run >> {counter}; echo output"
+        
+        set_command_cache_for_tools()
+        try:
+            assert get_all_lines(command=command) == ['output']
+            assert get_all_lines(command=command) == ['output']
+        finally:
+            stats = reset_command_cache_for_tools()
+        
+        assert counter.read_text().splitlines() == ['run']
+        assert stats == {'hits': 1, 'misses': 1}
+        
+        # Cache is invalidated
+        assert get_all_lines(command=command) == ['output']
+        assert counter.read_text().splitlines() == ['run', 'run']
+
+
+class FakeRemote:
+    def getRemoteFQDN(self):
+        return 'remote.example.com.'
+
+    def getRemoteHostname(self):
+        return 'remote'
+
+    def getRemoteHostDomain(self):
+        return 'example.com'
+
+
+@pytest.mark.skipif(get_hostname is None, reason="Hostname tools not implemented")
+class TestToolsHostname:
+    """Tests for hostname tools with and without remote"""
+    
+    def test_local(self):
+        """Test local hostname doesn't use a remote"""
+        assert get_hostname()
+        assert get_remote_fqdn() is None
+        assert get_remote_hostdomain() is None
+    
+    def test_remote(self):
+        """Test hostname is got from current remote"""
+        set_remote_for_tools(FakeRemote())
+        try:
+            assert get_hostname() == 'remote'
+            assert get_hostname(fqdn=True) == 'remote.example.com'
+            assert get_remote_fqdn() == 'remote.example.com.'
+            assert get_remote_hostdomain() == 'example.com'
+        finally:
+            reset_remote_for_tools()
+
+
 @pytest.mark.skipif(Tools is None, reason="Tools module not implemented")
 class TestToolsMisc:
     """Tests for miscellaneous tool functions"""
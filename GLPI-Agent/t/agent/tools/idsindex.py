@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import shutil
+import pytest
+
+sys.path.insert(0, 't/lib')
+sys.path.insert(0, 'lib')
+
+try:
+    from GLPI.Agent.Tools.IdsIndex import (
+        DATABASES, IdsEntry, IdsIndex, compile_ids, get_ids_index,
+        get_sysobject_id_info
+    )
+except ImportError:
+    IdsIndex = None
+
+
+@pytest.fixture
+def datadir(tmp_path):
+    for database in DATABASES:
+        shutil.copy(f"share/{database}.ids", tmp_path)
+    return str(tmp_path)
+
+
+@pytest.mark.skipif(IdsIndex is None, reason="IdsIndex not implemented")
+class TestToolsIdsIndex:
+    """Tests for GLPI Agent Tools IdsIndex"""
+
+    def test_pci(self, datadir):
+        index = get_ids_index('pci', datadir)
+        assert os.path.exists(os.path.join(datadir, 'pci.idx'))
+
+        vendor = IdsEntry(index, '8086', index.get('8086'), IdsEntry.CHILDREN['pci'])
+        assert vendor['name'] == 'Intel Corporation'
+        device = vendor['devices']['10d3']
+        assert device['name'] == '82574L Gigabit Network Connection'
+        assert device['subdevices']['8086:a01f']['name'] == 'Gigabit CT Desktop Adapter'
+        assert vendor.get('devices').get('zzzz') is None
+
+        pci_class = IdsEntry(index, 'C 03', index.get('C 03'), IdsEntry.CHILDREN['pci-class'])
+        assert pci_class['name'] == 'Display controller'
+        assert pci_class['subclasses']['00']['name'] == 'VGA compatible controller'
+
+    def test_reopen_with_mmap(self, datadir):
+        get_ids_index('usb', datadir)
+        index = IdsIndex.open(os.path.join(datadir, 'usb.idx'))
+        assert index.get('046d') == 'Logitech, Inc.'
+        assert index.get('046d c52b') == 'Unifying Receiver'
+        assert index.get('C 03') is None
+        assert '046d c52b' in [key for key, _ in index.items('046d c52')]
+
+    def test_edid(self, datadir):
+        assert get_ids_index('edid', datadir).get('SAM') == 'Samsung Electric Company'
+
+    def test_sysobject(self, datadir):
+        assert get_sysobject_id_info(id='.1.3.6.1.4.1.1.1.1.55', datadir=datadir) == {
+            'manufacturer': 'Proteon', 'type': 'NETWORKING', 'model': 'GT 60'
+        }
+        # Longest known prefix is used
+        assert get_sysobject_id_info(id='iso.3.6.1.4.1.1.1.1.55.9', datadir=datadir)['model'] == 'GT 60'
+        assert get_sysobject_id_info(id='.1.3.6.1.2.1.1', datadir=datadir) is None
+
+    def test_compile(self, datadir):
+        content = compile_ids('edid', os.path.join(datadir, 'edid.ids'))
+        index = IdsIndex(content)
+        keys = [key for key, _ in index.items('')]
+        assert keys == sorted(keys)
+        with pytest.raises(ValueError):
+            IdsIndex(b'foo')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
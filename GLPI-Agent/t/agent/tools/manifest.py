@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import sys
+import pytest
+
+sys.path.insert(0, 't/lib')
+sys.path.insert(0, 'lib')
+
+try:
+    from GLPI.Agent.Tools.Manifest import (MANIFEST_FILE, build_manifest,
+                                           get_modules_manifest, is_platform_enabled)
+except ImportError:
+    build_manifest = get_modules_manifest = is_platform_enabled = None
+
+
+MODULES = {
+    'Generic.py': '''
+class Generic:
+    category = "generic"
+''',
+    'Generic/Users.py': '''
+class Users:
+    @staticmethod
+    def category():
+        return "user"
+
+    @staticmethod
+    def other_categories():
+        return ["local_user", "local_group"]
+''',
+    'Linux.py': '''
+class Linux:
+    runAfter = ["GLPI::Agent::Task::Inventory::Generic"]
+
+    @staticmethod
+    def isEnabled(**params):
+        raise RuntimeError("must not be run")
+''',
+    'Linux/Storages/Lsilogic.py': '''
+category = "storage"
+run_me_if_these_checks_failed = ['GLPI.Agent.Task.Inventory.Linux.Storages.Megaraid']
+''',
+    'Win32/CPU.py': '''
+import not_existing_module
+
+class CPU:
+    category = "cpu"
+    runAfterIfEnabled = ["GLPI.Agent.Task.Inventory.Win32.Hardware"]
+''',
+}
+
+
+@pytest.fixture
+def package(tmp_path):
+    path = tmp_path / 'Inventory'
+    for name, content in MODULES.items():
+        module = path / name
+        module.parent.mkdir(parents=True, exist_ok=True)
+        module.write_text(content)
+    (path / '__init__.py').write_text('')
+    return str(path)
+
+
+@pytest.mark.skipif(build_manifest is None, reason="Manifest tools not implemented")
+class TestToolsManifest:
+    """Tests for GLPI Agent Tools Manifest"""
+
+    def test_build(self, package):
+        """Test manifest is built from modules source"""
+        modules = build_manifest(package, 'GLPI.Agent.Task.Inventory')['modules']
+
+        assert sorted(modules) == [
+            'GLPI.Agent.Task.Inventory.Generic',
+            'GLPI.Agent.Task.Inventory.Generic.Users',
+            'GLPI.Agent.Task.Inventory.Linux',
+            'GLPI.Agent.Task.Inventory.Linux.Storages.Lsilogic',
+            'GLPI.Agent.Task.Inventory.Win32.CPU',
+        ]
+
+        generic = modules['GLPI.Agent.Task.Inventory.Generic']
+        assert generic['category'] == 'generic'
+        assert generic['platform'] is None
+
+        users = modules['GLPI.Agent.Task.Inventory.Generic.Users']
+        assert users['category'] == 'user'
+        assert users['other_categories'] == ['local_user', 'local_group']
+
+        linux = modules['GLPI.Agent.Task.Inventory.Linux']
+        assert linux['runAfter'] == ['GLPI.Agent.Task.Inventory.Generic']
+        assert linux['platform'] == ['linux']
+
+        lsilogic = modules['GLPI.Agent.Task.Inventory.Linux.Storages.Lsilogic']
+        assert lsilogic['file'] == os.path.join('Linux', 'Storages', 'Lsilogic.py')
+        assert lsilogic['runMeIfTheseChecksFailed'] == [
+            'GLPI.Agent.Task.Inventory.Linux.Storages.Megaraid'
+        ]
+
+        cpu = modules['GLPI.Agent.Task.Inventory.Win32.CPU']
+        assert cpu['category'] == 'cpu'
+        assert cpu['runAfterIfEnabled'] == ['GLPI.Agent.Task.Inventory.Win32.Hardware']
+        assert cpu['platform'] == ['windows', 'mswin32']
+
+    def test_platform(self, package):
+        """Test platform guard"""
+        modules = build_manifest(package, 'GLPI.Agent.Task.Inventory')['modules']
+        cpu = modules['GLPI.Agent.Task.Inventory.Win32.CPU']
+        generic = modules['GLPI.Agent.Task.Inventory.Generic']
+
+        assert not is_platform_enabled(cpu, 'Linux')
+        assert is_platform_enabled(cpu, 'Windows')
+        assert is_platform_enabled(cpu, 'MSWin32')
+        assert is_platform_enabled(generic, 'Linux')
+        # Unknown remote OS
+        assert is_platform_enabled(cpu, None)
+
+    def test_load(self, package):
+        """Test manifest file is saved and refreshed when a module changes"""
+        manifest = get_modules_manifest('Test.Manifest.Load', package)
+        path = os.path.join(package, MANIFEST_FILE)
+        assert os.path.exists(path)
+        assert 'Test.Manifest.Load.Generic' in manifest
+
+        # Loaded once per process
+        assert get_modules_manifest('Test.Manifest.Load') is manifest
+
+        with open(path) as handle:
+            saved = json.load(handle)
+        assert saved['modules'] == manifest
+
+        # Outdated manifest file is rebuilt
+        module = os.path.join(package, 'Generic.py')
+        with open(module, 'w') as handle:
+            handle.write('category = "hardware"\n')
+        os.utime(module, (saved['mtime'] + 10, saved['mtime'] + 10))
+
+        from GLPI.Agent.Tools.Manifest import _load_manifest
+        modules = _load_manifest(package, 'Test.Manifest.Load')
+        assert modules['Test.Manifest.Load.Generic']['category'] == 'hardware'
+
+    def test_missing_package(self):
+        """Test missing package"""
+        assert get_modules_manifest('Test.Manifest.Missing') is None
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import sys
+import struct
+import pytest
+
+sys.path.insert(0, 't/lib')
+sys.path.insert(0, 'lib')
+
+try:
+    from GLPI.Agent.Tools.SMBIOS import parse_dmidecode, parse_dmi_table, get_smbios
+except ImportError:
+    parse_dmidecode = parse_dmi_table = get_smbios = None
+
+
+def _structure(dmi_type, handle, formatted, strings):
+    """Build a raw SMBIOS structure"""
+    header = struct.pack('<BBH', dmi_type, 4 + len(formatted), handle)
+    strings_set = b''.join(s.encode() + b'\x00' for s in strings) or b'\x00'
+    return header + formatted + strings_set + b'\x00'
+
+
+@pytest.mark.skipif(parse_dmidecode is None, reason="SMBIOS not implemented")
+class TestToolsSMBIOS:
+    """Tests for GLPI Agent Tools SMBIOS"""
+
+    def test_parse_dmidecode(self):
+        """Test dmidecode output is indexed by type and handle"""
+        with open('resources/generic/dmidecode/linux-1') as handle:
+            smbios = parse_dmidecode(handle.read().splitlines())
+
+        assert smbios is not None
+        assert smbios[0][0]['Vendor'] == 'American Megatrends Inc.'
+        assert smbios.get(2)[0]['Product Name'] == 'P5Q'
+        assert smbios.get(255) is None
+        assert smbios.get_handle(0x0000)['type'] == 0
+
+        # Returned fields are copies
+        smbios[0][0]['Vendor'] = 'foo'
+        assert smbios[0][0]['Vendor'] == 'American Megatrends Inc.'
+
+    def test_parse_dmidecode_truncated(self):
+        """Test truncated dmidecode output is ignored"""
+        assert parse_dmidecode([]) is None
+        assert parse_dmidecode([
+            'Handle 0x0000, DMI type 0, 24 bytes',
+            'BIOS Information',
+            '\tVendor: foo',
+        ]) is None
+
+    def test_parse_dmidecode_nested_list(self):
+        """Test nested list items don't override structure fields"""
+        smbios = parse_dmidecode([
+            'Handle 0x0000, DMI type 0, 24 bytes',
+            'BIOS Information',
+            '\tVendor: foo',
+            '\tCharacteristics:',
+            '\t\tVendor: nested',
+            'Handle 0x0001, DMI type 1, 27 bytes',
+            'System Information',
+            '\tManufacturer: bar',
+        ])
+
+        assert smbios[0][0] == {'Vendor': 'foo'}
+
+    def test_get_smbios_command(self, monkeypatch):
+        """Test dmidecode output is got from given command"""
+        with open('resources/generic/dmidecode/linux-1') as handle:
+            lines = handle.read().splitlines()
+        calls = []
+
+        def get_all_lines(**params):
+            calls.append(params)
+            return lines
+
+        monkeypatch.setattr(sys.modules[get_smbios.__module__], 'get_all_lines', get_all_lines)
+        smbios = get_smbios(command='dmidecode -q')
+
+        assert smbios.get(2)[0]['Product Name'] == 'P5Q'
+        assert calls == [{'command': 'dmidecode -q'}]
+
+    def test_parse_dmi_table(self):
+        """Test raw DMI table decoding"""
+        uuid = bytes.fromhex('1E00EB40008CCE018E2C00248C590A84')
+        table = b''.join([
+            _structure(0, 0x0000, bytes([1, 2, 0, 0, 3]) + bytes(13),
+                       ['American Megatrends Inc.', '2102', '04/07/2009']),
+            _structure(1, 0x0001, bytes([1, 2, 0, 3]) + uuid + bytes([6, 0, 0]),
+                       ['System manufacturer', 'P5Q', 'Serial']),
+            _structure(3, 0x0002, bytes([0, 0x83, 0, 0, 0]), []),
+            _structure(127, 0x0003, b'', []),
+        ])
+        smbios = parse_dmi_table(table, (2, 6))
+
+        assert smbios[0][0] == {
+            'Vendor': 'American Megatrends Inc.',
+            'Version': '2102',
+            'Release Date': '04/07/2009',
+        }
+        assert smbios[1][0]['UUID'] == '40EB001E-8C00-01CE-8E2C-00248C590A84'
+        assert smbios[1][0]['Serial Number'] == 'Serial'
+        assert 'Version' not in smbios[1][0]
+        assert smbios[3][0] == {'Type': 'Desktop'}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import sys
+import pytest
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, 't/lib')
+sys.path.insert(0, 'lib')
+
+try:
+    from GLPI.Agent.Storage import Storage
+    from GLPI.Agent.Tools.Softwares import get_cached_packages, get_packages_cache_key
+except ImportError:
+    Storage = get_cached_packages = get_packages_cache_key = None
+
+
+@pytest.mark.skipif(get_cached_packages is None, reason="Softwares tools not implemented")
+class TestToolsSoftwares:
+    """Tests for GLPI Agent Tools Softwares"""
+
+    def test_cache_key(self, tmp_path):
+        """Test key follows database files state"""
+        database = tmp_path / 'status'
+        missing = str(tmp_path / 'missing')
+
+        assert get_packages_cache_key([missing]) is None
+
+        database.write_text('foo\n')
+        key = get_packages_cache_key([str(database), missing])
+        assert key == get_packages_cache_key([str(database), missing])
+
+        database.write_text('foo bar\n')
+        assert key != get_packages_cache_key([str(database), missing])
+
+    def test_cached_packages(self, tmp_path):
+        """Test packages are only built when database changed"""
+        database = tmp_path / 'status'
+        database.write_text('foo\n')
+        storage = Storage(directory=str(tmp_path / 'var'))
+        calls = []
+
+        def builder():
+            calls.append(1)
+            return [{'NAME': 'foo', 'VERSION': str(len(calls))}]
+
+        params = dict(name='test', sources=[str(database)], builder=builder, storage=storage)
+        assert get_cached_packages(**params) == [{'NAME': 'foo', 'VERSION': '1'}]
+        assert get_cached_packages(**params) == [{'NAME': 'foo', 'VERSION': '1'}]
+        assert len(calls) == 1
+
+        database.write_text('foo bar\n')
+        assert get_cached_packages(**params) == [{'NAME': 'foo', 'VERSION': '2'}]
+        assert len(calls) == 2
+
+        # No storage, no cache
+        del params['storage']
+        assert get_cached_packages(**params) == [{'NAME': 'foo', 'VERSION': '3'}]
+
+    def test_remote_packages(self, tmp_path):
+        """Test packages of a remote are not cached"""
+        database = tmp_path / 'status'
+        database.write_text('foo\n')
+        storage = Storage(directory=str(tmp_path / 'var'))
+        calls = []
+
+        def builder():
+            calls.append(1)
+            return [{'NAME': 'foo', 'VERSION': str(len(calls))}]
+
+        params = dict(name='test', sources=[str(database)], builder=builder, storage=storage)
+        with patch('GLPI.Agent.Tools.Softwares.get_remote_for_tools', return_value=Mock()):
+            assert get_cached_packages(**params) == [{'NAME': 'foo', 'VERSION': '1'}]
+            assert get_cached_packages(**params) == [{'NAME': 'foo', 'VERSION': '2'}]
+        assert storage.restore(name='softwares-test') is None
+
+        # Local packages list is not the remote one
+        assert get_cached_packages(**params) == [{'NAME': 'foo', 'VERSION': '3'}]
+        assert get_cached_packages(**params) == [{'NAME': 'foo', 'VERSION': '3'}]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
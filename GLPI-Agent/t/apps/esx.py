@@ -2,6 +2,7 @@
 
 import os
 import sys
+import subprocess
 import pytest
 
 sys.path.insert(0, 't/lib')
@@ -20,6 +21,26 @@ class TestAppsESX:
         """Test ESX application"""
         pytest.skip("ESX tests require ESX server connection")
 
+    def run_esx(self, *args):
+        return subprocess.run(
+            [sys.executable, 'bin/glpi-esx.py', '--user', 'root', '--password', 'secret'] + list(args),
+            capture_output=True, text=True, timeout=60
+        )
+
+    def test_many_hosts_need_directory(self, tmp_path):
+        """Test many hosts are not written to stdout or to the same file"""
+        result = self.run_esx('--host', 'esx1,esx2', '--workers', '2')
+        assert result.returncode == 1
+        assert "must be an existing directory" in result.stderr
+
+        result = self.run_esx('--host', 'esx1,esx2', '--path', str(tmp_path / 'out.xml'))
+        assert result.returncode == 1
+        assert not (tmp_path / 'out.xml').exists()
+
+        result = self.run_esx('--host', 'esx1,esx2', '--workers', '2', '--path', str(tmp_path))
+        assert result.returncode == 0
+        assert sorted(os.listdir(tmp_path)) == ['esx1_inventory.xml', 'esx2_inventory.xml']
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
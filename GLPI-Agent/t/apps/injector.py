@@ -1,12 +1,75 @@
 #!/usr/bin/env python3
 
+import io
 import os
 import sys
+import gzip
+import json
+import threading
+import importlib.util
 import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
 
 sys.path.insert(0, 't/lib')
 sys.path.insert(0, 'lib')
 
+try:
+    spec = importlib.util.spec_from_file_location('glpi_injector', 'bin/glpi-injector.py')
+    injector = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(injector)
+except ImportError:
+    injector = None
+
+
+class InventoryServer(BaseHTTPRequestHandler):
+    """Fake GLPI server accepting inventories and giving OAuth tokens"""
+
+    tokens = []
+    inventories = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if self.path.endswith('/api.php/token'):
+            self.tokens.append(json.loads(body))
+            reply = {'access_token': 'token', 'expires_in': 3600}
+        else:
+            assert self.headers['Authorization'] == 'Bearer token'
+            self.inventories.append(gzip.decompress(body))
+            reply = {'status': 'ok'}
+        content = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+@pytest.fixture
+def server():
+    InventoryServer.tokens = []
+    InventoryServer.inventories = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), InventoryServer)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/front/inventory.php"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _args(url, **params):
+    args = dict(
+        url=url, useragent=None, xml_ua=False, json_ua=False, no_compression=False,
+        proxy=None, no_ssl_check=False, ssl_cert_file=None, debug=False, verbose=False,
+        oauth_client_id='id', oauth_client_secret='secret', remove=False, recursive=False,
+        workers=4,
+    )
+    args.update(params)
+    return SimpleNamespace(**args)
+
 
 class TestAppsInjector:
     """Tests for glpi-injector application"""
@@ -15,6 +78,57 @@ class TestAppsInjector:
         """Test injector application"""
         pytest.skip("Injector tests require test data")
 
+    @pytest.mark.skipif(injector is None, reason="injector not available")
+    def test_bulk_directory(self, server, tmp_path):
+        """Test directory bulk injection shares OAuth token and resumes"""
+        injector._session = None
+        injector.failed_files.clear()
+        inventories = tmp_path / 'inventories'
+        inventories.mkdir()
+        for index in range(10):
+            content = json.dumps({'content': {'index': index}}).encode()
+            if index % 2:
+                content = gzip.compress(content)
+            (inventories / f"{index}.json").write_bytes(content)
+
+        checkpoint_file = str(tmp_path / 'checkpoint')
+        checkpoint = injector.Checkpoint(checkpoint_file)
+        checkpoint.add(str(inventories / '0.json'))
+
+        injector.load_directory(str(inventories), _args(server), checkpoint)
+        checkpoint.close()
+
+        assert not injector.failed_files
+        assert len(InventoryServer.tokens) == 1
+        assert sorted(json.loads(inventory)['content']['index']
+                      for inventory in InventoryServer.inventories) == list(range(1, 10))
+        assert len(injector.Checkpoint(checkpoint_file).done) == 10
+
+    @pytest.mark.skipif(injector is None, reason="injector not available")
+    def test_file_checkpoint(self, server, tmp_path):
+        """Test a single file already recorded in checkpoint is not injected again"""
+        injector._session = None
+        injector.failed_files.clear()
+        inventory = tmp_path / 'inventory.json'
+        inventory.write_bytes(json.dumps({'content': {'index': 0}}).encode())
+
+        checkpoint = injector.Checkpoint(str(tmp_path / 'checkpoint'))
+        injector.load_file(str(inventory), _args(server), checkpoint)
+        injector.load_file(str(inventory), _args(server), checkpoint)
+        checkpoint.close()
+
+        assert not injector.failed_files
+        assert len(InventoryServer.inventories) == 1
+
+    @pytest.mark.skipif(injector is None, reason="injector not available")
+    def test_compress_stream(self):
+        """Test content is compressed into a temporary file"""
+        content = os.urandom(injector.CHUNK_SIZE * 3) + b'{"content": {}}'
+        with injector.compress_stream(io.BytesIO(content)) as compressed:
+            assert not isinstance(compressed, io.BytesIO)
+            assert os.fstat(compressed.fileno()).st_size > len(content)
+            assert gzip.decompress(compressed.read()) == content
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -1,23 +1,140 @@
 #!/usr/bin/env python3
 import sys
 import os
+import hashlib
+import shutil
+import tempfile
 import unittest
+from unittest.mock import Mock, patch
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..', 'lib'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..', 'lib'))
 
 try:
-    from GLPI.Agent.Task.Collect.Findfile import Findfile
+    from GLPI.Agent.Task.Collect import CollectTask
+    from GLPI.Agent.Storage import Storage
 except ImportError:
-    Findfile = None
+    CollectTask = Storage = None
 
 
+@unittest.skipIf(CollectTask is None, "Collect task not implemented")
 class TestCollectFindfile(unittest.TestCase):
-    
-    @unittest.skipIf(Findfile is None, "Findfile not implemented")
-    def test_collect_findfile(self):
-        """Test collect findfile"""
-        # TODO: Implement test logic
-        pass
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.searchdir = os.path.join(self.tempdir, 'search')
+        self.files = {
+            'a.txt': b'alpha',
+            'B.TXT': b'bravo bravo',
+            os.path.join('sub', 'a.txt'): b'alpha',
+            os.path.join('sub', 'deep', 'c.log'): b'charlie' * 100,
+        }
+        for name, content in self.files.items():
+            path = os.path.join(self.searchdir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as handle:
+                handle.write(content)
+
+        self.storage = Storage(directory=os.path.join(self.tempdir, 'var'))
+        self.target = Mock()
+        self.target.getStorage.return_value = self.storage
+        self.task = CollectTask(target=self.target)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir, ignore_errors=True)
+
+    def _find(self, **params):
+        params.setdefault('dir', self.searchdir)
+        params.setdefault('limit', 50)
+        params.setdefault('recursive', True)
+        return sorted(
+            os.path.relpath(result['path'], self.searchdir)
+            for result in self.task._find_file(**params)
+        )
+
+    def test_filters(self):
+        self.assertEqual(self._find(recursive=False, filter={'is_file': 1}),
+                         ['B.TXT', 'a.txt'])
+        self.assertEqual(self._find(filter={'is_dir': 1}),
+                         ['sub', os.path.join('sub', 'deep')])
+        self.assertEqual(self._find(filter={'name': 'a.txt'}),
+                         ['a.txt', os.path.join('sub', 'a.txt')])
+        self.assertEqual(self._find(filter={'iname': 'b.txt'}), ['B.TXT'])
+        self.assertEqual(self._find(filter={'regex': r'deep.*\.log$'}),
+                         [os.path.join('sub', 'deep', 'c.log')])
+        self.assertEqual(self._find(filter={'is_file': 1, 'sizeGreater': 10, 'sizeLower': 20}),
+                         ['B.TXT'])
+        self.assertEqual(self._find(filter={'sizeEquals': 5}),
+                         ['a.txt', os.path.join('sub', 'a.txt')])
+        self.assertEqual(len(self._find(filter={'is_file': 1}, limit=2)), 2)
+        self.assertEqual(self._find(filter={'regex': '('}), [])
+        self.assertEqual(self._find(dir=os.path.join(self.searchdir, 'missing')), [])
+
+    def test_checksums(self):
+        sha512 = hashlib.sha512(b'alpha').hexdigest()
+        sha256 = hashlib.sha256(b'alpha').hexdigest()
+        self.assertEqual(self._find(filter={'checkSumSHA512': sha512.upper()}),
+                         ['a.txt', os.path.join('sub', 'a.txt')])
+        self.assertEqual(self._find(filter={'checkSumSHA2': sha256, 'is_dir': 1}),
+                         ['a.txt', os.path.join('sub', 'a.txt')])
+        self.assertEqual(self._find(filter={'checkSumSHA256': '0' * 64}), [])
+
+    def test_checksums_cache(self):
+        sha512 = hashlib.sha512(b'bravo bravo').hexdigest()
+        self.assertEqual(self._find(filter={'checkSumSHA512': sha512}), ['B.TXT'])
+        self.assertEqual(len(self.storage.restore(name='collect-checksums')), 4)
+
+        # Cached digests are used by a new task, files are not read again
+        self.task = CollectTask(target=self.target)
+        self.assertEqual(len(self.task._restore_checksums()), 4)
+        with patch('builtins.open', side_effect=AssertionError("file read")):
+            self.assertEqual(self._find(filter={'checkSumSHA512': sha512}), ['B.TXT'])
+
+        # Updated file is hashed again
+        path = os.path.join(self.searchdir, 'a.txt')
+        with open(path, 'wb') as handle:
+            handle.write(b'bravo bravo')
+        self.assertEqual(self._find(filter={'checkSumSHA512': sha512}), ['B.TXT', 'a.txt'])
+
+        # Files filtered out by size are not hashed
+        target = Mock()
+        target.getStorage.return_value = Storage(directory=os.path.join(self.tempdir, 'other'))
+        self.task = CollectTask(target=target)
+        self.assertEqual(self._find(filter={'checkSumSHA512': sha512, 'sizeLower': 4}), [])
+        self.assertEqual(self.task._restore_checksums(), {})
+
+    def test_checksums_cache_size(self):
+        sha512 = hashlib.sha512(b'bravo bravo').hexdigest()
+        for index in range(6):
+            path = os.path.join(self.searchdir, 'many', f'{index}.txt')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as handle:
+                handle.write(b'delta %d' % index)
+        candidates = len(self._find(filter={'is_file': 1}, limit=100))
+        self.assertEqual(candidates, 10)
+
+        def reads(config):
+            self.task = CollectTask(target=self.target, config=config)
+            self.task._restore_checksums()
+            with patch('builtins.open', wraps=open) as opened:
+                self.assertEqual(self._find(filter={'checkSumSHA512': sha512}, limit=100),
+                                 ['B.TXT'])
+            # Storage files are opened too
+            return len([call for call in opened.call_args_list
+                        if str(call.args[0]).startswith(self.searchdir)])
+
+        # Cached digests are kept when walking more files than cache size
+        self.assertEqual(reads({'collect-checksums-cache': 4}), 10)
+        self.assertEqual(len(self.storage.restore(name='collect-checksums')), 4)
+        self.assertEqual(reads({'collect-checksums-cache': 4}), 6)
+
+        # Digests of vanished files are dropped to make room for other files
+        cached = [value[0] for value in self.storage.restore(name='collect-checksums').values()
+                  if not value[0].endswith('B.TXT')]
+        for path in cached[:2]:
+            os.remove(path)
+        self.assertEqual(reads({'collect-checksums-cache': 4}), 6)
+        self.assertEqual(reads({'collect-checksums-cache': 4}), 4)
+        self.assertEqual(len(self.storage.restore(name='collect-checksums')), 4)
 
 
 if __name__ == '__main__':
@@ -4,6 +4,8 @@ import os
 import unittest
 import tempfile
 import hashlib
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..', 'lib'))
@@ -79,6 +81,154 @@ class TestDeployFile(unittest.TestCase):
         self.assertTrue(file.file_parts_exists())
 
 
+
+class PartsHandler(BaseHTTPRequestHandler):
+    """Serve parts like a deploy mirror"""
+
+    parts = {}
+    requests = []
+
+    def do_GET(self):
+        sha512 = self.path.rsplit('/', 1)[-1]
+        self.requests.append(sha512)
+        content = self.parts.get(sha512)
+        if content is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeDatastore:
+    """Datastore remembering verified parts"""
+
+    def __init__(self, path):
+        self.path = path
+        self.config = {}
+        self.verified = {}
+
+    def checkVerifiedPart(self, sha512, path):
+        return self.verified.get(sha512) == os.stat(path).st_mtime_ns
+
+    def setVerifiedPart(self, sha512, path):
+        self.verified[sha512] = os.stat(path).st_mtime_ns
+
+    def saveVerifiedParts(self):
+        pass
+
+
+class TestDeployFileDownload(unittest.TestCase):
+
+    def setUp(self):
+        self.datastore = FakeDatastore(tempfile.mkdtemp())
+        PartsHandler.parts = {}
+        PartsHandler.requests = []
+        self.server = HTTPServer(('127.0.0.1', 0), PartsHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.mirror = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @unittest.skipIf(File is None, "Deploy File not implemented")
+    def test_download(self):
+        parts = [os.urandom(100000 + i) for i in range(6)]
+        multiparts = [hashlib.sha512(part).hexdigest() for part in parts]
+        for sha512, part in zip(multiparts, parts):
+            PartsHandler.parts[sha512] = part
+        # Corrupted part on mirror
+        PartsHandler.parts[multiparts[-1]] = b'corrupted'
+
+        file = File(
+            datastore=self.datastore,
+            sha512='void',
+            data={'multiparts': multiparts, 'mirrors': [self.mirror]}
+        )
+        file.download()
+
+        for sha512, part in zip(multiparts[:-1], parts):
+            with open(file.getPartFilePath(sha512), 'rb') as handle:
+                self.assertEqual(handle.read(), part)
+            self.assertIn(sha512, self.datastore.verified)
+        self.assertFalse(os.path.exists(file.getPartFilePath(multiparts[-1])))
+        self.assertFalse(file.filePartsExists())
+        # Failing part was retried
+        self.assertEqual(PartsHandler.requests.count(multiparts[-1]), File.DOWNLOAD_RETRIES)
+
+        # Only missing part is downloaded again, others are not hashed again
+        PartsHandler.parts[multiparts[-1]] = parts[-1]
+        PartsHandler.requests = []
+        file._getSha512ByFile = lambda path: self.fail("verified part hashed")
+        file.download()
+        self.assertEqual(PartsHandler.requests, [multiparts[-1]])
+        self.assertTrue(file.filePartsExists())
+
+    def _downloadWithP2P(self, p2p_class):
+        import GLPI.Agent.Task.Deploy.File as module
+
+        part = os.urandom(1000)
+        sha512 = hashlib.sha512(part).hexdigest()
+        PartsHandler.parts[sha512] = part
+
+        original = module.P2P
+        module.P2P = p2p_class
+        try:
+            file = File(
+                datastore=self.datastore,
+                sha512='void',
+                data={'multiparts': [sha512], 'mirrors': [self.mirror], 'p2p': True}
+            )
+            file.download()
+        finally:
+            module.P2P = original
+
+        # P2P failures fall back on mirrors
+        self.assertTrue(file.filePartsExists())
+        return file
+
+    @unittest.skipIf(File is None, "Deploy File not implemented")
+    def test_download_p2p_failure(self):
+        saved = []
+
+        class FailingP2P:
+            def __init__(self, **params):
+                pass
+
+            def find_peers(self, port):
+                raise OSError("no interface")
+
+            def save(self):
+                saved.append(True)
+
+        file = self._downloadWithP2P(FailingP2P)
+        self.assertIsNone(file.p2pnet)
+        self.assertEqual(saved, [])
+
+    @unittest.skipIf(File is None, "Deploy File not implemented")
+    def test_download_p2p_save_failure(self):
+
+        class ReadOnlyP2P:
+            def __init__(self, **params):
+                pass
+
+            def find_peers(self, port):
+                return []
+
+            def get_peers(self):
+                return []
+
+            def save(self):
+                raise OSError("read-only storage")
+
+        self._downloadWithP2P(ReadOnlyP2P)
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
 
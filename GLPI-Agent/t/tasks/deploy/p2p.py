@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 import sys
 import os
+import socket
+import time
+import types
 import unittest
+from unittest.mock import patch
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..', 'lib'))
 
@@ -20,9 +24,17 @@ class TestDeployP2P(unittest.TestCase):
             'result': []
         },
         {
-            'name': 'Ignore-Large-Range',
+            'name': 'Large-Range',
             'address': {'ip': '10.0.0.10', 'mask': '255.0.0.0'},
-            'result': []
+            'result': [
+                '10.0.0.7', '10.0.0.8', '10.0.0.9',
+                '10.0.0.11', '10.0.0.12', '10.0.0.13'
+            ]
+        },
+        {
+            'name': '10.0.0.1/30',
+            'address': {'ip': '10.0.0.1', 'mask': '255.255.255.252'},
+            'result': ['10.0.0.2']
         },
         {
             'name': '192.168.5.5',
@@ -61,18 +73,109 @@ class TestDeployP2P(unittest.TestCase):
             'address': {'ip': '192.168.2.253', 'mask': '255.255.255.0'},
             'result': [
                 '192.168.2.250', '192.168.2.251', '192.168.2.252',
-                '192.168.2.254', '192.168.2.255', '192.168.2.249'
+                '192.168.2.254', '192.168.2.249', '192.168.2.248'
             ]
         },
     ]
 
     @unittest.skipIf(P2P is None, "Deploy P2P not implemented")
     def test_p2p_address_generation(self):
+        p2p = P2P()
         for test in self.TESTS:
             with self.subTest(name=test['name']):
-                # Test P2P address generation
-                # Actual implementation depends on P2P class
-                pass
+                self.assertEqual(
+                    p2p._get_potential_peers(test['address'], 6),
+                    test['result']
+                )
+
+    @unittest.skipIf(P2P is None, "Deploy P2P not implemented")
+    def test_p2p_scan(self):
+        listener = socket.socket()
+        listener.bind(('0.0.0.0', 0))
+        listener.listen(8)
+        port = listener.getsockname()[1]
+
+        saved = {}
+
+        class Datastore:
+            def getP2PNet(self):
+                return saved.get('p2pnet')
+
+            def saveP2PNet(self, peers, force=False):
+                saved['p2pnet'] = peers
+
+        p2p = P2P(datastore=Datastore())
+        # Loopback network is ignored, so use potential peers directly
+        peers = p2p._scan_peers(['127.0.0.1', '127.0.0.2', '127.0.0.3'], port)
+        listener.close()
+        self.assertEqual(sorted(peers), ['127.0.0.1', '127.0.0.2', '127.0.0.3'])
+        self.assertEqual(sorted(saved['p2pnet']['peers']), sorted(peers))
+
+        # Fast peer which served a part is preferred, failing peer is tried last
+        p2p.record_success('127.0.0.3', 1000000, 0.1)
+        p2p.record_failure('127.0.0.1')
+        self.assertEqual(p2p.get_peers(), ['127.0.0.3', '127.0.0.2', '127.0.0.1'])
+        p2p.forget_peer('127.0.0.2')
+        self.assertEqual(p2p.get_peers(), ['127.0.0.3', '127.0.0.1'])
+
+        # Cached peers are used by another instance without scanning
+        p2p.save()
+        other = P2P(datastore=Datastore())
+        other._get_interfaces = lambda: self.fail("network scanned")
+        self.assertEqual(other.find_peers(port), ['127.0.0.3', '127.0.0.1'])
+
+        # Expired cache leads to a new scan
+        saved['p2pnet']['expires'] = time.time() - 1
+        other = P2P(datastore=Datastore())
+        other._get_interfaces = lambda: []
+        self.assertEqual(other.find_peers(port), [])
+
+    @unittest.skipIf(P2P is None, "Deploy P2P not implemented")
+    def test_p2p_probe_order(self):
+        probed = []
+
+        p2p = P2P(max_workers=1, max_peers=6)
+        p2p._get_interfaces = lambda: [
+            {'IPADDRESS': '192.168.0.10', 'IPMASK': '255.255.255.0', 'STATUS': 'Up'}
+        ]
+        p2p._probe = lambda peer, port: probed.append(peer)
+        self.assertEqual(p2p.find_peers(62354), [])
+
+        # Nearest addresses are probed first
+        self.assertEqual(probed, [
+            '192.168.0.9', '192.168.0.11', '192.168.0.8',
+            '192.168.0.12', '192.168.0.7', '192.168.0.13'
+        ])
+
+    @unittest.skipIf(P2P is None, "Deploy P2P not implemented")
+    def test_p2p_win32_interfaces(self):
+        import GLPI.Agent.Tools.Win32 as win32
+
+        def get_wmi_objects(**params):
+            if 'Win32_NetworkAdapterConfiguration' in params['query']:
+                return [
+                    {'Index': 1, 'IPEnabled': True, 'MACAddress': '00:11:22:33:44:55',
+                     'IPAddress': ['192.168.0.10', 'fe80::1'], 'IPSubnet': ['255.255.255.0', '64']},
+                    {'Index': 3, 'IPEnabled': False, 'MACAddress': None,
+                     'IPAddress': None, 'IPSubnet': None},
+                ]
+            return [
+                {'Index': 1, 'PNPDeviceID': 'PCI\\VEN_8086&DEV_100E'},
+                {'Index': 2, 'PNPDeviceID': 'ROOT\\NET\\0000'},
+                {'Index': 3, 'PNPDeviceID': None},
+            ]
+
+        tools = types.ModuleType(win32.__name__)
+        tools.__path__ = win32.__path__
+        tools.get_wmi_objects = get_wmi_objects
+        with patch.dict(sys.modules, {win32.__name__: tools}), \
+                patch('platform.system', return_value='Windows'):
+            interfaces = P2P()._get_win32_interfaces()
+
+        self.assertEqual(
+            [(i.get('IPADDRESS'), i.get('IPMASK'), i['STATUS']) for i in interfaces],
+            [('192.168.0.10', '255.255.255.0', 'Up')]
+        )
 
 
 if __name__ == '__main__':
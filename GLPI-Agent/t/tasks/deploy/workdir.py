@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+import sys
+import os
+import io
+import gzip
+import hashlib
+import tarfile
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..', 'lib'))
+
+try:
+    from GLPI.Agent.Task.Deploy.Datastore.WorkDir import WorkDir, FilePartsReader
+except ImportError:
+    WorkDir = FilePartsReader = None
+
+
+class FakeFile:
+    """Deploy file with gzipped parts stored in a directory"""
+
+    def __init__(self, directory, name, content, uncompress=False, part_size=1000):
+        self.name = name
+        self.name_local = None
+        self.uncompress = uncompress
+        self.sha512 = hashlib.sha512(content).hexdigest()
+        self.multiparts = []
+        self.paths = {}
+        for offset in range(0, len(content), part_size):
+            part = gzip.compress(content[offset:offset + part_size])
+            sha512 = hashlib.sha512(part).hexdigest()
+            path = os.path.join(directory, sha512[:8])
+            with open(path, 'wb') as handle:
+                handle.write(part)
+            self.multiparts.append(sha512)
+            self.paths[sha512] = path
+
+    def getPartFilePath(self, sha512):
+        return self.paths[sha512]
+
+
+def _tarball(files, mode='w:gz'):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+class TestDeployWorkDir(unittest.TestCase):
+
+    def setUp(self):
+        self.partsdir = tempfile.mkdtemp()
+        self.workdir = tempfile.mkdtemp()
+
+    @unittest.skipIf(FilePartsReader is None, "Deploy WorkDir not implemented")
+    def test_parts_reader(self):
+        content = os.urandom(5500)
+        file = FakeFile(self.partsdir, 'data.bin', content)
+        reader = FilePartsReader(file)
+        self.assertEqual(reader.read(), content)
+        self.assertTrue(reader.verified())
+
+        # Missing part
+        os.unlink(file.paths[file.multiparts[2]])
+        reader = FilePartsReader(file)
+        self.assertEqual(len(reader.read()), 4500)
+        self.assertFalse(reader.verified())
+
+    @unittest.skipIf(WorkDir is None, "Deploy WorkDir not implemented")
+    def test_prepare(self):
+        content = os.urandom(3000)
+        tarball = _tarball({'setup.exe': b'x' * 10000, 'conf/setup.ini': b'[setup]\n'})
+        workdir = WorkDir(path=self.workdir)
+        workdir.addFile(FakeFile(self.partsdir, 'data.bin', content))
+        workdir.addFile(FakeFile(self.partsdir, 'package.tar.gz', tarball, uncompress=True))
+        self.assertTrue(workdir.prepare())
+
+        self.assertEqual(sorted(os.listdir(self.workdir)), ['conf', 'data.bin', 'setup.exe'])
+        with open(os.path.join(self.workdir, 'data.bin'), 'rb') as handle:
+            self.assertEqual(handle.read(), content)
+        with open(os.path.join(self.workdir, 'conf', 'setup.ini'), 'rb') as handle:
+            self.assertEqual(handle.read(), b'[setup]\n')
+
+    @unittest.skipIf(WorkDir is None, "Deploy WorkDir not implemented")
+    def test_prepare_tar_bz2(self):
+        tarball = _tarball({'setup.exe': b'x' * 10000}, mode='w:bz2')
+        file = FakeFile(self.partsdir, 'package.tar.bz2', tarball, uncompress=True)
+        workdir = WorkDir(path=self.workdir)
+        workdir.addFile(file)
+        self.assertTrue(workdir.prepare())
+
+        # Archive is extracted from parts, not assembled as a .bz2 file
+        self.assertTrue(file.name_local.endswith('.tar.bz2'))
+        self.assertEqual(os.listdir(self.workdir), ['setup.exe'])
+
+    @unittest.skipIf(WorkDir is None, "Deploy WorkDir not implemented")
+    def test_prepare_corrupted_archive(self):
+        tarball = _tarball({'setup.exe': b'x' * 10000}, mode='w')
+        file = FakeFile(self.partsdir, 'package.tar', tarball, uncompress=True)
+        file.sha512 = '0' * 128
+        workdir = WorkDir(path=self.workdir)
+        workdir.addFile(file)
+        self.assertFalse(workdir.prepare())
+        # Extracted content is removed
+        self.assertEqual(os.listdir(self.workdir), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,24 +1,110 @@
 #!/usr/bin/env python3
+
 import sys
-import os
-import unittest
+import threading
+import time
+import pytest
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ..', 'lib'))
+sys.path.insert(0, 't/lib')
+sys.path.insert(0, 'lib')
 
 try:
-    from GLPI.Agent.Task.Esx import Esx
+    from GLPI.Agent.Task.ESX import ESXTask
 except ImportError:
-    Esx = None
+    ESXTask = None
+
+
+class FakeTarget:
+    def is_type(self, target_type):
+        return target_type == 'local'
+
+
+@pytest.mark.skipif(ESXTask is None, reason="ESX task not implemented")
+class TestESXTask:
+    """Tests for ESX task"""
+
+    def test_process_jobs_concurrently(self, monkeypatch):
+        """Test each job uses its own connection state"""
+        barrier = threading.Barrier(3, timeout=5)
+        connected = {}
+
+        def connect(task, host, user, password):
+            # All jobs must be connecting at the same time
+            barrier.wait()
+            if host == 'bad':
+                task.set_last_error(f"Can't connect to {host}")
+                return False
+            task.vpbs = host
+            connected[host] = task
+            return True
+
+        def server_inventory(task, deadline=None):
+            assert deadline > time.monotonic()
+            if task.vpbs == 'slow':
+                task.set_last_error("slow failure")
+
+        monkeypatch.setattr(ESXTask, 'connect', connect)
+        monkeypatch.setattr(ESXTask, 'server_inventory', server_inventory)
+
+        task = ESXTask(config={'esx-workers': 3}, target=FakeTarget())
+        jobs = [{'host': 'good'}, {'host': 'bad'}, {'host': 'slow'}]
+        results = {
+            job['host']: (part, error) for job, part, error in task._run_jobs(jobs)
+        }
+
+        assert results == {
+            'good': ('inventory', None),
+            'bad': ('login', "Can't connect to bad"),
+            'slow': ('inventory', "slow failure"),
+        }
+        assert connected['good'] is not connected['slow']
+        assert task.vpbs is None
+        assert task.get_last_error() is None
+
+    def test_server_inventory_deadline(self, monkeypatch):
+        """Test remaining hosts are skipped once deadline is reached"""
+        task = ESXTask(config={'backend-collect-timeout': 180}, target=FakeTarget())
+        inventoried = []
+        monkeypatch.setattr(task, 'get_host_ids', lambda: ['host-1', 'host-2', 'host-3'])
+        monkeypatch.setattr(task, 'create_inventory',
+                            lambda host_id, tag, deviceid: inventoried.append(host_id))
+
+        task.server_inventory(deadline=time.monotonic() + 60)
+        assert inventoried == ['host-1', 'host-2', 'host-3']
+        assert task.timeout() in (59, 60)
+        assert task.get_last_error() is None
+
+        inventoried.clear()
+        task.server_inventory(deadline=time.monotonic() - 1)
+        assert inventoried == []
+        assert task.get_last_error() == "Timeout reached, 3 host(s) not inventoried"
+    def test_connect(self, monkeypatch):
+        """Test VMware connection"""
+        created = []
+
+        class FakeVMware:
+            def __init__(self, **params):
+                created.append(params)
+
+            def connect(self, user, password):
+                return user == 'root'
+
+            def lastError(self):
+                return "Login failure"
+
+        monkeypatch.setattr(sys.modules[ESXTask.__module__], 'VMware', FakeVMware)
 
+        task = ESXTask(target=FakeTarget())
+        assert task.connect('esx', 'root', 'secret')
+        assert created[0]['url'] == 'https://esx/sdk/vimService'
+        assert created[0]['vcenter']
+        assert isinstance(task.vpbs, FakeVMware)
 
-class TestEsx(unittest.TestCase):
-    
-    @unittest.skipIf(Esx is None, "Esx not implemented")
-    def test_esx(self):
-        """Test esx"""
-        # TODO: Implement test logic
-        pass
+        task = ESXTask(target=FakeTarget())
+        assert not task.connect('esx', 'admin', 'secret')
+        assert task.get_last_error() == "Login failure"
+        assert task.vpbs is None
 
 
 if __name__ == '__main__':
-    unittest.main(verbosity=2)
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import io
+import sys
+import pytest
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, 't/lib')
+sys.path.insert(0, 'lib')
+
+try:
+    from GLPI.Agent.Task.Inventory.Generic.Softwares.Deb import Deb
+except ImportError:
+    Deb = None
+
+
+STATUS = """Package: adduser
+Status: install ok installed
+Priority: important
+Section: admin
+Installed-Size: 1228
+Architecture: all
+Version: 3.112+nmu2
+Description: add and remove users and groups
+ This package includes the 'adduser' and 'deluser' commands.
+ .
+ Version: not a field
+
+Package: libfoo1
+Status: deinstall ok config-files
+Architecture: amd64
+Version: 1.0-1
+Conffiles:
+ /etc/foo.conf 0123456789abcdef
+
+Package: zlib1g
+Status: hold ok installed
+Architecture: amd64
+Multi-Arch: same
+Version: 1:1.2.11.dfsg-2
+Section: libs
+"""
+
+
+@pytest.mark.skipif(Deb is None, reason="Deb module not implemented")
+class TestInventoryGenericSoftwaresDeb:
+    """Tests for Deb softwares inventory"""
+
+    def test_parse_status(self):
+        """Test dpkg status database parsing"""
+        packages = Deb._get_packages_from_status(handle=io.StringIO(STATUS))
+
+        assert packages == [
+            {
+                'NAME': 'adduser',
+                'ARCH': 'all',
+                'VERSION': '3.112+nmu2',
+                'FILESIZE': 1228 * 1024,
+                'FROM': 'deb',
+                'SYSTEM_CATEGORY': 'admin',
+            },
+            {
+                'NAME': 'zlib1g',
+                'ARCH': 'amd64',
+                'VERSION': '1:1.2.11.dfsg-2',
+                'FILESIZE': 0,
+                'FROM': 'deb',
+                'SYSTEM_CATEGORY': 'libs',
+            },
+        ]
+
+    def test_remote_packages(self):
+        """Test local dpkg status file is not read for a remote"""
+        module = 'GLPI.Agent.Task.Inventory.Generic.Softwares.Deb'
+        packages = [{'NAME': 'remote', 'VERSION': '1.0', 'FROM': 'deb'}]
+        with patch(f'{module}.get_remote_for_tools', return_value=Mock()), \
+                patch(f'{module}.os.access', return_value=True), \
+                patch(f'{module}.get_first_match', return_value='Debian'), \
+                patch.object(Deb, '_get_packages_from_status') as from_status, \
+                patch.object(Deb, '_get_packages_list', return_value=packages) as from_command:
+            assert Deb._get_packages() == [dict(packages[0], PUBLISHER='Debian')]
+        from_status.assert_not_called()
+        from_command.assert_called_once()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+import sys
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, Mock
+
+sys.path.insert(0, 't/lib')
+sys.path.insert(0, 'lib')
+
+try:
+    from GLPI.Agent.Task.Inventory import InventoryTask
+except ImportError:
+    InventoryTask = None
+
+
+class FakeModules:
+    """Inventory modules behaviours, recording when each one starts and ends"""
+
+    def __init__(self, **behaviours):
+        self.behaviours = behaviours
+        self.events = []
+        self.lock = threading.Lock()
+
+    def record(self, event, module):
+        with self.lock:
+            self.events.append((event, module))
+
+    def run_function(self, module, function, logger=None, timeout=None, params=None):
+        """Run module behaviour like run_function, giving up after timeout"""
+        self.record('start', module)
+        behaviour = self.behaviours.get(module)
+        try:
+            if behaviour:
+                thread = threading.Thread(target=behaviour, daemon=True)
+                thread.start()
+                thread.join(timeout)
+        finally:
+            self.record('end', module)
+
+    def index(self, event, module):
+        return self.events.index((event, module))
+
+    def ran(self):
+        return sorted(module for event, module in self.events if event == 'end')
+
+
+def _module(runAfter=None, runAfterIfEnabled=None, enabled=1):
+    return {
+        'enabled': enabled,
+        'done': 0,
+        'used': 0,
+        'runAfter': list(runAfter or []) + list(runAfterIfEnabled or []),
+        'runAfterIfEnabled': {m: 1 for m in runAfterIfEnabled or []},
+    }
+
+
+def _get_task(monkeypatch, fake, modules, **config):
+    module = sys.modules[InventoryTask.__module__]
+    monkeypatch.setattr(module, 'run_function', fake.run_function, raising=False)
+
+    config.setdefault('backend-collect-workers', 4)
+    task = InventoryTask(target=Mock())
+    task.logger = Mock()
+    task.config = config
+    task.target = Mock()
+    task.datadir = task.registry = None
+    task.inventory = MagicMock()
+    task.nochecksum = True
+    task.modules = modules
+    return task
+
+
+@pytest.mark.skipif(InventoryTask is None, reason="Inventory task not available")
+class TestInventoryScheduler:
+    """Tests for inventory modules dependency graph scheduling"""
+
+    def test_dependency_order(self, monkeypatch):
+        """Test a module only starts once all its dependencies are done"""
+        fake = FakeModules(
+            A=lambda: time.sleep(0.1),
+            B=lambda: time.sleep(0.05),
+        )
+        task = _get_task(monkeypatch, fake, {
+            'A': _module(),
+            'B': _module(runAfter=['A']),
+            'C': _module(runAfter=['A', 'B']),
+            'D': _module(),
+        })
+
+        task._feedInventory()
+
+        assert fake.ran() == ['A', 'B', 'C', 'D']
+        assert fake.index('end', 'A') < fake.index('start', 'B')
+        assert fake.index('end', 'B') < fake.index('start', 'C')
+        # Independent module doesn't wait for the others
+        assert fake.index('start', 'D') < fake.index('end', 'A')
+        assert all(task.modules[name]['done'] for name in 'ABCD')
+
+    def test_run_after_if_enabled(self, monkeypatch):
+        """Test a disabled soft dependency is ignored but an enabled one is honoured"""
+        fake = FakeModules(A=lambda: time.sleep(0.05))
+        task = _get_task(monkeypatch, fake, {
+            'A': _module(),
+            'B': _module(enabled=0),
+            'C': _module(runAfterIfEnabled=['A', 'B']),
+        })
+
+        task._feedInventory()
+
+        assert fake.ran() == ['A', 'C']
+        assert fake.index('end', 'A') < fake.index('start', 'C')
+
+    def test_disabled_hard_dependency(self, monkeypatch):
+        """Test a disabled hard dependency is an error"""
+        fake = FakeModules()
+        task = _get_task(monkeypatch, fake, {
+            'A': _module(enabled=0),
+            'B': _module(runAfter=['A']),
+        })
+
+        with pytest.raises(Exception, match="module A, needed before B, not enabled"):
+            task._feedInventory()
+        assert fake.ran() == []
+
+    def test_failing_module(self, monkeypatch):
+        """Test a failing module still releases its dependents"""
+        fake = FakeModules()
+        task = _get_task(monkeypatch, fake, {
+            'A': _module(),
+            'B': _module(runAfter=['A']),
+        })
+        # Failure outside of run_function protection
+        task.target.getStorage.side_effect = [RuntimeError("failure"), None]
+
+        task._feedInventory()
+
+        assert fake.ran() == ['B']
+        assert not task.modules['A']['done']
+        assert task.modules['B']['done']
+        task.logger.debug.assert_any_call("module A failure: failure")
+
+    def test_timed_out_module(self, monkeypatch):
+        """Test a module killed by timeout still releases its dependents"""
+        release = threading.Event()
+        fake = FakeModules(A=lambda: release.wait(5))
+        task = _get_task(monkeypatch, fake, {
+            'A': _module(),
+            'B': _module(runAfter=['A']),
+        }, **{'backend-collect-timeout': 0.1})
+
+        try:
+            task._feedInventory()
+        finally:
+            release.set()
+
+        assert fake.ran() == ['A', 'B']
+        assert fake.index('end', 'A') < fake.index('start', 'B')
+        assert task.modules['B']['done']
+
+    def test_sequential(self, monkeypatch):
+        """Test one worker runs modules one after the other"""
+        fake = FakeModules(**{name: lambda: time.sleep(0.01) for name in 'ABC'})
+        task = _get_task(monkeypatch, fake, {
+            'A': _module(),
+            'B': _module(),
+            'C': _module(runAfter=['A']),
+        }, **{'backend-collect-workers': 1})
+
+        task._feedInventory()
+
+        assert fake.events == [
+            ('start', 'A'), ('end', 'A'),
+            ('start', 'B'), ('end', 'B'),
+            ('start', 'C'), ('end', 'C'),
+        ]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
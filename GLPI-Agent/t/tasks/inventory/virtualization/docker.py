@@ -1,16 +1,61 @@
 #!/usr/bin/env python3
 import sys
 import os
+import json
+import socketserver
+import tempfile
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../'../..', 'lib'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'lib'))
 
 try:
-    from GLPI.Agent.Task.Inventory.Virtualization.Docker import Docker
+    from GLPI.Agent.Task.Inventory.Virtualization.Docker import Docker, EngineAPI
 except ImportError:
     Docker = None
 
 
+CONTAINERS = [
+    {'Id': 'cd5c4d55ff2b9a0f1e7d', 'Image': 'nginx:latest', 'Names': ['/web'], 'State': 'running'},
+    {'Id': '8f3a9d2e1c4b7a6f5e0d', 'Image': 'redis', 'Names': ['/cache'], 'State': 'exited'},
+    {'Id': '0a1b2c3d4e5f6a7b8c9d', 'Image': 'postgres:13', 'Names': ['/db']},
+]
+
+
+class EngineAPIHandler(BaseHTTPRequestHandler):
+    """Fake Engine API"""
+
+    protocol_version = 'HTTP/1.1'
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def address_string(self):
+        return 'unix'
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        if self.path == '/containers/json?all=1':
+            content = CONTAINERS
+        elif self.path == '/containers/0a1b2c3d4e5f6a7b8c9d/json':
+            content = {'State': {'Running': True}}
+        else:
+            self.send_error(404)
+            return
+        body = json.dumps(content).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class EngineAPIServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
 class TestInventoryVirtualizationDocker(unittest.TestCase):
     
     @unittest.skipIf(Docker is None, "Docker not implemented")
@@ -18,6 +63,42 @@ class TestInventoryVirtualizationDocker(unittest.TestCase):
         """Test inventory virtualization docker"""
         # TODO: Implement test logic
         pass
+    
+    @unittest.skipIf(Docker is None, "Docker not implemented")
+    def test_engine_api_containers(self):
+        """Test containers listing with Engine API"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'docker.sock')
+            server = EngineAPIServer(path, EngineAPIHandler)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                containers = Docker._get_api_containers(api=EngineAPI(path))
+            finally:
+                server.shutdown()
+                server.server_close()
+        
+        self.assertEqual(containers, [
+            {'VMTYPE': 'docker', 'UUID': 'cd5c4d55ff2b', 'IMAGE': 'nginx:latest',
+             'NAME': 'web', 'STATUS': 'running'},
+            {'VMTYPE': 'docker', 'UUID': '8f3a9d2e1c4b', 'IMAGE': 'redis',
+             'NAME': 'cache', 'STATUS': 'off'},
+            {'VMTYPE': 'docker', 'UUID': '0a1b2c3d4e5f', 'IMAGE': 'postgres:13',
+             'NAME': 'db', 'STATUS': 'running'},
+        ])
+        # Only container without listed state is inspected
+        self.assertEqual(EngineAPIHandler.requests, [
+            '/containers/json?all=1',
+            '/containers/0a1b2c3d4e5f6a7b8c9d/json',
+        ])
+    
+    @unittest.skipIf(Docker is None, "Docker not implemented")
+    def test_engine_api_unavailable(self):
+        """Test Engine API failure is reported as OSError"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            api = EngineAPI(os.path.join(tmpdir, 'missing.sock'))
+            with self.assertRaises(OSError):
+                Docker._get_api_containers(api=api)
 
 
 if __name__ == '__main__':
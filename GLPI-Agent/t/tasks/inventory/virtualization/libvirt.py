@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 import sys
 import os
+import tempfile
 import unittest
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../'../..', 'lib'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'lib'))
 
 try:
     from GLPI.Agent.Task.Inventory.Virtualization.Libvirt import Libvirt
@@ -11,6 +12,10 @@ except ImportError:
     Libvirt = None
 
 
+RESOURCES = os.path.join(os.path.dirname(__file__), '..', '..', '..', '..',
+                         'resources', 'virtualization', 'virsh')
+
+
 class TestInventoryVirtualizationLibvirt(unittest.TestCase):
     
     @unittest.skipIf(Libvirt is None, "Libvirt not implemented")
@@ -18,6 +23,42 @@ class TestInventoryVirtualizationLibvirt(unittest.TestCase):
         """Test inventory virtualization libvirt"""
         # TODO: Implement test logic
         pass
+    
+    @unittest.skipIf(Libvirt is None, "Libvirt not implemented")
+    def test_parse_dumpxml(self):
+        """Test single domain dumpxml parsing"""
+        infos = Libvirt._parse_dumpxml(file=os.path.join(RESOURCES, 'dumpxml4'))
+        self.assertEqual(infos, {
+            'vcpu': '1',
+            'uuid': 'a28ff943-8d89-38ee-fd28-1e675142951c',
+            'vmtype': 'kvm',
+            'memory': 2147,
+        })
+    
+    @unittest.skipIf(Libvirt is None, "Libvirt not implemented")
+    def test_parse_dumpxmls(self):
+        """Test batched dumpxml output parsing"""
+        with tempfile.NamedTemporaryFile('w', suffix='.xml', delete=False) as output:
+            for dump in ('dumpxml1', 'dumpxml2', 'dumpxml5_lxc'):
+                with open(os.path.join(RESOURCES, dump)) as handle:
+                    output.write(handle.read())
+                output.write('\n')
+        try:
+            domains = Libvirt._parse_dumpxmls(file=output.name)
+        finally:
+            os.unlink(output.name)
+        
+        self.assertEqual(len(domains), 3)
+        self.assertEqual(domains['Debian_Squeeze_64_bits'], {
+            'vcpu': '1',
+            'uuid': 'd0f1baf3-ac9d-e828-619f-91f074c8c6c4',
+            'vmtype': 'kvm',
+            'memory': 524,
+        })
+        self.assertEqual(
+            [infos['vmtype'] for infos in domains.values()],
+            ['kvm', 'kvm', 'lxc']
+        )
 
 
 if __name__ == '__main__':
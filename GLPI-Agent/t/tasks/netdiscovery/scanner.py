@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+import sys
+import asyncio
+import pytest
+
+sys.path.insert(0, 't/lib')
+sys.path.insert(0, 'lib')
+
+try:
+    from GLPI.Agent.Task.NetDiscovery.Job import NetDiscoveryJob
+    from GLPI.Agent.Task.NetDiscovery.Scanner import (
+        AdaptiveTimeout, NetDiscoveryScanner, SNMP_SUPPORT
+    )
+except ImportError:
+    AdaptiveTimeout = NetDiscoveryScanner = None
+    SNMP_SUPPORT = False
+
+
+def _get_job(start, end):
+    job = NetDiscoveryJob(
+        params={'PID': 1, 'TIMEOUT': 2, 'THREADS_DISCOVERY': 2},
+        credentials=[
+            {'ID': 1, 'VERSION': '2c', 'COMMUNITY': 'public'},
+            {'ID': 2, 'VERSION': '2c', 'COMMUNITY': 'private'},
+        ],
+        ranges=[{'IPSTART': start, 'IPEND': end, 'ENTITY': 0}],
+    )
+    for range_config in job.ranges():
+        ok, params = job.get_queue_params(range_config)
+        assert ok
+        job.update_queue(params['size'], params['range'])
+    return job
+
+
+if NetDiscoveryScanner is not None:
+    class FakeScanner(NetDiscoveryScanner):
+        """Scanner answering on even addresses with second credential"""
+
+        inflight = 0
+        max_inflight = 0
+
+        async def probe(self, ip, port, domain, credential, estimator):
+            FakeScanner.inflight += 1
+            FakeScanner.max_inflight = max(FakeScanner.max_inflight, FakeScanner.inflight)
+            await asyncio.sleep(0.01)
+            FakeScanner.inflight -= 1
+            return credential['ID'] == 2 and int(ip.split('.')[-1]) % 2 == 0
+
+        def get_device(self, ip, port, domain, credential):
+            return {'SNMPHOSTNAME': f"host-{ip}"}
+
+
+@pytest.mark.skipif(AdaptiveTimeout is None, reason="NetDiscovery scanner not available")
+class TestAdaptiveTimeout:
+    """Tests for probe timeout estimation"""
+
+    def test_initial(self):
+        assert AdaptiveTimeout(initial=1.0, maximum=2).timeout() == 1.0
+        assert AdaptiveTimeout(initial=5.0, maximum=2).timeout() == 2
+
+    def test_converges(self):
+        estimator = AdaptiveTimeout(initial=1.0, minimum=0.2, maximum=10)
+        for _ in range(50):
+            estimator.update(0.05)
+        assert estimator.timeout() == 0.2
+
+        estimator = AdaptiveTimeout(initial=1.0, minimum=0.2, maximum=10)
+        for _ in range(50):
+            estimator.update(0.5)
+        assert 0.5 <= estimator.timeout() < 0.6
+
+        # Jitter increases timeout
+        estimator.update(3)
+        assert estimator.timeout() > 1.5
+
+
+@pytest.mark.skipif(not SNMP_SUPPORT, reason="pysnmp not available")
+class TestNetDiscoveryScanner:
+    """Tests for asynchronous discovery engine"""
+
+    def test_scan(self):
+        job = _get_job('10.0.0.1', '10.0.0.40')
+        found = []
+        scanner = FakeScanner(job, callback=found.append, max_probes=16)
+        devices = scanner.run()
+
+        assert len(devices) == 20
+        assert found == devices
+        assert job.queuesize() == 40
+        assert job._queue['done'] == 40
+        assert FakeScanner.max_inflight == 16
+        assert devices[0]['AUTHSNMP'] == 2
+        assert devices[0]['ENTITY'] == 0
+        assert all(d['SNMPHOSTNAME'] == f"host-{d['IP']}" for d in devices)
+        assert all('AUTHPORT' not in d for d in devices)
+
+
+@pytest.mark.skipif(NetDiscoveryScanner is None, reason="NetDiscovery scanner not available")
+class TestNetDiscoveryScannerDevice:
+    """Tests for device information requests"""
+
+    def test_get_device_timeout(self, monkeypatch):
+        """Test device requests use job timeout, not probes one"""
+        created = []
+        module = sys.modules[NetDiscoveryScanner.__module__]
+        monkeypatch.setattr(module, 'SNMPLive', lambda **params: created.append(params))
+        monkeypatch.setattr(module, '_get_device_info', lambda snmp, logger=None: {})
+
+        job = _get_job('10.0.0.1', '10.0.0.1')
+        scanner = NetDiscoveryScanner(job)
+        # Fast answers lower probes timeout
+        estimator = scanner._get_timeout(job.ranges()[0])
+        estimator.update(0.001)
+
+        assert scanner.get_device('10.0.0.1', 161, 'udp/ipv4', {'VERSION': '2c'}) == {}
+        assert created[0]['timeout'] == 2
+        assert estimator.timeout() < 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+import sys
+import threading
+import time
+import pytest
+
+sys.path.insert(0, 't/lib')
+sys.path.insert(0, 'lib')
+
+try:
+    from GLPI.Agent.Task.NetInventory import NetInventoryTask
+    from GLPI.Agent.Task.NetInventory.Job import NetInventoryJob
+    from GLPI.Agent.SNMP.Device import SNMPDevice
+except ImportError:
+    NetInventoryTask = NetInventoryJob = SNMPDevice = None
+
+
+def _get_job(count, threads=1, **params):
+    return NetInventoryJob(
+        params=dict(PID=1, THREADS_QUERY=threads, **params),
+        credentials=[{'ID': 1, 'VERSION': '2c', 'COMMUNITY': 'public'}],
+        devices=[
+            {'ID': i, 'IP': f"10.0.0.{i}", 'TYPE': 'NETWORKING', 'AUTHSNMP_ID': 1}
+            for i in range(1, count + 1)
+        ],
+    )
+
+
+class FakeSNMP:
+    """SNMP session answering every request after a delay"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.requests = 0
+
+    def get(self, oid):
+        self.requests += 1
+        time.sleep(self.delay)
+        return 'value'
+
+
+if NetInventoryTask is not None:
+    class FakeTask(NetInventoryTask):
+        """Task recording results instead of sending them"""
+
+        def __init__(self, query):
+            super().__init__()
+            self.query = query
+            self.results = []
+
+        def query_device(self, device, credentials, timeout=None, deadline=None):
+            return self.query(device, deadline)
+
+        def send_result(self, inventory, pid=0):
+            self.results.append(inventory)
+            return True
+
+
+@pytest.mark.skipif(NetInventoryTask is None, reason="NetInventory task not available")
+class TestNetInventoryWorkers:
+    """Tests for concurrent devices inventory"""
+
+    def test_results_streaming(self):
+        """Test a device result is sent as soon as the device is done"""
+        fast_sent = threading.Event()
+
+        def query(device, deadline):
+            if device['ID'] == 1:
+                # Slow device is only done once fast device result was sent
+                assert fast_sent.wait(timeout=5)
+            return {'INFO': {'ID': device['ID']}}
+
+        task = FakeTask(query)
+        original = task.send_result
+
+        def send_result(inventory, pid=0):
+            if inventory['INFO']['ID'] == 2:
+                fast_sent.set()
+            return original(inventory, pid)
+
+        task.send_result = send_result
+
+        assert task.run_job(_get_job(2, threads=2)) == 2
+        assert [result['INFO']['ID'] for result in task.results] == [2, 1]
+
+    def test_device_timeout(self):
+        """Test no more request is sent to a device after its deadline"""
+        snmp = FakeSNMP(0.05)
+
+        def query(device, deadline):
+            snmp_device = SNMPDevice(snmp=snmp, deadline=deadline)
+            for index in range(100):
+                snmp_device.get(f".1.3.6.1.2.1.1.{index}.0")
+            return {'INFO': {'ID': device['ID']}}
+
+        task = FakeTask(query)
+        assert task.run_job(_get_job(1, DEVICE_TIMEOUT=0.2)) == 0
+
+        assert snmp.requests < 10
+        assert task.results == [{
+            'ERROR': {
+                'ID': 1,
+                'TYPE': 'NETWORKING',
+                'MESSAGE': "inventory not done after 0.2s",
+            }
+        }]
+
+    def test_threads(self):
+        """Test devices are inventoried by job THREADS_QUERY workers"""
+        lock = threading.Lock()
+        running = []
+        maximum = []
+
+        def query(device, deadline):
+            with lock:
+                running.append(device['ID'])
+                maximum.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(device['ID'])
+            return {'INFO': {'ID': device['ID']}}
+
+        task = FakeTask(query)
+        assert task.run_job(_get_job(9, threads=3)) == 9
+
+        assert max(maximum) == 3
+        assert sorted(result['INFO']['ID'] for result in task.results) == list(range(1, 10))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
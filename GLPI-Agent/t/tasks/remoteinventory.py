@@ -14,6 +14,57 @@ try:
 except ImportError:
     Logger = RemoteInventory = Server = None
 
+try:
+    from GLPI.Agent.Task.RemoteInventory import RemoteInventoryTask
+    from GLPI.Agent.Task.Inventory import InventoryTask
+except ImportError:
+    RemoteInventoryTask = InventoryTask = None
+
+
+class FakeRemote:
+    def __init__(self):
+        self.errors = []
+        self.disconnected = False
+
+    def safe_url(self):
+        return 'ssh://remote'
+
+    def connect(self):
+        return True
+
+    def prepare(self):
+        return True
+
+    def deviceid(self):
+        return 'remote-2024-01-01-00-00-00'
+
+    def protocol(self):
+        return 'ssh'
+
+    def disconnect(self):
+        self.disconnected = True
+
+    def run_error(self, error):
+        self.errors.append(error)
+
+
+class FakeRemotes:
+    def __init__(self, remotes):
+        self.remotes = remotes
+        self.saved = False
+
+    def clean_expired(self):
+        return 0
+
+    def count(self):
+        return len(self.remotes)
+
+    def getall(self):
+        return self.remotes
+
+    def save(self):
+        self.saved = True
+
 
 class TestRemoteInventory(unittest.TestCase):
     
@@ -58,6 +109,30 @@ class TestRemoteInventory(unittest.TestCase):
             pass
 
 
+@unittest.skipIf(RemoteInventoryTask is None, "RemoteInventory task not implemented")
+class TestRemoteInventoryRun(unittest.TestCase):
+
+    def test_run_in_worker_thread(self):
+        remote = FakeRemote()
+        remotes = FakeRemotes([remote])
+        module = sys.modules[RemoteInventoryTask.__module__]
+
+        # Inventory of remote supports aborting like a local inventory
+        def run(inventory):
+            inventory._supportAborting()
+
+        task = RemoteInventoryTask(logger=Mock(), config={'remote-workers': 1},
+                                   target=Mock(), storage=Mock())
+        with patch.object(module, 'Remotes', return_value=remotes), \
+                patch.object(InventoryTask, 'setRemote', create=True), \
+                patch.object(InventoryTask, 'run', run):
+            self.assertTrue(task.run())
+
+        self.assertEqual(remote.errors, [])
+        self.assertTrue(remote.disconnected)
+        self.assertTrue(remotes.saved)
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
 
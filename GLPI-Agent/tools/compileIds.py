@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Compile IDs - Python Implementation
+
+Compiles share/*.ids databases into the binary index files read by
+GLPI.Agent.Tools.IdsIndex. It is run by make install on the installed data
+directory, and can be run after any ids database update.
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'lib'))
+
+try:
+    from GLPI.Agent.Tools.IdsIndex import DATABASES, IdsIndex, compile_ids
+except ImportError as e:
+    print(f"ERROR: Failed to import required modules: {e}", file=sys.stderr)
+    sys.exit(1)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Compile ids databases index')
+    parser.add_argument('--datadir', default='share',
+                        help='directory containing ids databases (default: share)')
+    parser.add_argument('databases', nargs='*', metavar="DATABASE",
+                        help='databases to compile (default: all)')
+    args = parser.parse_args()
+
+    for database in args.databases or DATABASES:
+        source = os.path.join(args.datadir, f"{database}.ids")
+        target = os.path.join(args.datadir, f"{database}.idx")
+
+        if not os.path.exists(source):
+            print(f"ERROR: {source} not found", file=sys.stderr)
+            return 1
+
+        content = compile_ids(database, source)
+        with open(target, 'wb') as handle:
+            handle.write(content)
+
+        print(f"{target}: {len(IdsIndex(content))} entries, {len(content)} bytes")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Compile Modules - Python Implementation
+
+Builds the modules.json manifest of tasks packages, read by
+GLPI.Agent.Tools.Manifest to schedule task modules without importing them.
+It is run by make install on the installed modules directory, and can be run
+after any task module update.
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'lib'))
+
+try:
+    from GLPI.Agent.Tools.Manifest import MANIFEST_FILE, build_manifest
+except ImportError as e:
+    print(f"ERROR: Failed to import required modules: {e}", file=sys.stderr)
+    sys.exit(1)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Compile tasks modules manifest')
+    parser.add_argument('--libdir', default='lib',
+                        help='directory containing agent modules (default: lib)')
+    parser.add_argument('tasks', nargs='*', metavar="TASK",
+                        help='tasks to compile manifest for (default: Inventory)')
+    args = parser.parse_args()
+
+    for task in args.tasks or ['Inventory']:
+        package_name = f"GLPI.Agent.Task.{task}"
+        package_path = os.path.join(args.libdir, 'GLPI', 'Agent', 'Task', task)
+
+        if not os.path.isdir(package_path):
+            print(f"ERROR: {package_path} not found", file=sys.stderr)
+            return 1
+
+        manifest = build_manifest(package_path, package_name)
+        target = os.path.join(package_path, MANIFEST_FILE)
+        with open(target, 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle, indent=1, sort_keys=True)
+
+        modules = manifest['modules']
+        guarded = sum(1 for infos in modules.values() if infos['platform'])
+        print(f"{target}: {len(modules)} modules, {guarded} platform specific")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())